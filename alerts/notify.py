@@ -16,6 +16,11 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import get_logger
+
 class AlertManager:
     """Centralized alert and incident management system"""
     
@@ -31,30 +36,7 @@ class AlertManager:
         os.makedirs("logs/active", exist_ok=True)
         
         # Configure logger
-        self.logger = logging.getLogger('alert_manager')
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # File handler
-        log_file = "logs/active/alerts.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.logger = get_logger('alert_manager', log_file="logs/active/alerts.log")
     
     def load_environment(self):
         """Load required environment variables"""
@@ -394,6 +376,37 @@ class AlertManager:
             github_labels=['restore', operation]
         )
 
+    def send_performance_alert(self, operation: str, details: Dict):
+        """Send performance regression alert"""
+        title = f"Performance Regression: {operation}"
+
+        message = f"**Operation:** {operation}\n"
+        message += f"**Timestamp:** {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
+
+        if 'baseline_median_ms' in details and 'current_median_ms' in details:
+            message += f"**Median:** {details['baseline_median_ms']}ms -> {details['current_median_ms']}ms\n"
+
+        if details.get('slowdown') is not None:
+            message += f"**Slowdown:** {details['slowdown']:.0%}\n\n"
+
+        message += "**Details:**\n"
+        for key, value in details.items():
+            if key not in ['baseline_median_ms', 'current_median_ms', 'slowdown']:
+                message += f"- {key}: {value}\n"
+
+        message += "\n**Next Actions:**\n"
+        message += "1. Check benchmark logs: `tail -f logs/perf/benchmark.log`\n"
+        message += "2. Review the trend in `docs/perf/summary.md`\n"
+        message += "3. Re-run the benchmark: `python perf/perf_benchmark.py --run`\n"
+
+        return self.send_alert(
+            title=title,
+            message=message,
+            severity='warning',
+            tags=['performance', 'regression', operation],
+            github_labels=['performance', 'regression']
+        )
+
 def main():
     """Main entry point for testing alerts"""
     import argparse
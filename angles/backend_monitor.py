@@ -11,10 +11,24 @@ from typing import Dict, List, Any
 from .config import print_config_status, has_supabase, has_openai, has_notion, has_github
 from .supabase_client import SupabaseClient
 from .openai_bridge import OpenAIBridge
+from utils.health_probes import Probe, ProbeRunner, open_probe_cache
 
 
 logger = logging.getLogger(__name__)
 
+CHECK_NAMES = {
+    'backend_monitor.database': ('Database Connectivity', True),
+    'backend_monitor.memory_sync': ('Memory Sync Activity', False),
+    'backend_monitor.system_resources': ('System Resources', False),
+    'backend_monitor.openai': ('OpenAI API', False),
+    'backend_monitor.integrations': ('Integration Status', False)
+}
+
+
+def _check_result(probe: Probe, status: str, details: Dict[str, Any]) -> Dict[str, Any]:
+    name, critical = CHECK_NAMES[probe.name]
+    return {'name': name, 'status': status, 'details': details, 'critical': critical}
+
 
 class BackendMonitor:
     """System health monitoring and alerts"""
@@ -202,17 +216,35 @@ class BackendMonitor:
         
         return result
     
-    def run_health_checks(self) -> Dict[str, Any]:
-        """Run all health checks"""
+    def build_probe_runner(self) -> ProbeRunner:
+        """Health checks as concurrent probes sharing the health probe cache"""
+        probes = [
+            Probe('backend_monitor.database', self.check_database_connectivity, ttl=60, timeout=30,
+                  critical=True),
+            Probe('backend_monitor.memory_sync', self.check_memory_sync_activity, ttl=60, timeout=30,
+                  depends_on=['backend_monitor.database']),
+            Probe('backend_monitor.system_resources', self.check_system_resources, ttl=30, timeout=15),
+            # Costs a completion call, so a fresh answer is reused for a few minutes
+            Probe('backend_monitor.openai', self.check_openai_connectivity, ttl=300, timeout=60),
+            Probe('backend_monitor.integrations', self.check_integration_status, ttl=60, timeout=5)
+        ]
+        return ProbeRunner(
+            probes,
+            cache=open_probe_cache(),
+            failure_result=lambda probe, message: _check_result(probe, 'error', {'error': message}),
+            skip_result=lambda probe, reason: _check_result(probe, 'unavailable', {'message': reason}),
+            failed_statuses=('failed', 'error', 'critical', 'unavailable')
+        )
+    
+    def run_health_checks(self, force: bool = False) -> Dict[str, Any]:
+        """Run all health checks concurrently, reusing results still within their TTL unless force"""
         logger.info("🏥 Running system health checks")
         
-        checks = [
-            self.check_database_connectivity(),
-            self.check_memory_sync_activity(),
-            self.check_system_resources(),
-            self.check_openai_connectivity(),
-            self.check_integration_status()
-        ]
+        runner = self.build_probe_runner()
+        try:
+            checks = list(runner.run(force=force).values())
+        finally:
+            runner.cache.close()
         
         # Determine overall status
         critical_failed = any(check['status'] in ['failed', 'critical'] and check['critical'] for check in checks)
@@ -7,6 +7,7 @@ import logging
 from typing import Optional
 
 from .config import has_openai, OPENAI_API_KEY, OPENAI_MODEL
+from utils.llm_cache import cached_chat_completion
 
 
 logger = logging.getLogger(__name__)
@@ -43,7 +44,8 @@ class OpenAIBridge:
             return "OpenAI analysis unavailable - manual review recommended"
         
         try:
-            response = self.client.chat.completions.create(
+            content = cached_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {
@@ -59,7 +61,7 @@ class OpenAIBridge:
                 temperature=0.3
             )
             
-            result = response.choices[0].message.content.strip()
+            result = content.strip()
             logger.info("✅ OpenAI analysis completed")
             return result
             
@@ -14,6 +14,7 @@ from typing import Dict, Any, Optional
 from .config import has_github, GITHUB_TOKEN, GITHUB_REPO
 from .supabase_client import SupabaseClient
 from .utils import get_timestamp, safe_json_dumps
+from utils.backup_catalog import describe_archive, open_backup_catalog
 
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,22 @@ class BackupRestore:
         self.db = SupabaseClient()
         self.backup_dir = Path("backups")
         self.backup_dir.mkdir(exist_ok=True)
+        self.catalog = open_backup_catalog()
+    
+    def record_backup(self, backup_path: Path):
+        """Add a local backup ZIP to the backup catalog"""
+        description = describe_archive(str(backup_path))
+        self.catalog.record_backup(
+            backup_path.stem,
+            backup_path.name,
+            {'local': str(backup_path)},
+            created_at=backup_path.stat().st_mtime,
+            size_bytes=description['size_bytes'],
+            checksum=description['checksum'],
+            file_count=description['file_count'],
+            tables=description['tables'],
+            backup_type='angles'
+        )
     
     def create_db_export(self) -> Dict[str, Any]:
         """Create database export snapshot"""
@@ -95,6 +112,8 @@ class BackupRestore:
             }
             zipf.writestr('angles_structure.json', safe_json_dumps(angles_info, indent=2))
         
+        self.record_backup(backup_path)
+        
         logger.info(f"✅ Backup created: {backup_path} ({backup_path.stat().st_size} bytes)")
         return backup_path
     
@@ -129,6 +148,7 @@ class BackupRestore:
                     return False
             
             logger.info("✅ Backup pushed to GitHub successfully")
+            self.catalog.add_location(backup_path.stem, 'github', git_backup_path.name)
             
             # Clean up git-tracked file
             git_backup_path.unlink(missing_ok=True)
@@ -179,9 +199,16 @@ class BackupRestore:
             return False
     
     def list_backups(self) -> list:
-        """List available backup files"""
-        backups = list(self.backup_dir.glob("backup-*.zip"))
-        backups.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        """List available backup files, newest first, from the backup catalog"""
+        entries = self.catalog.list_backups(source='local', backup_type='angles')
+        if not entries:
+            # Catalog predates these backups: index them once
+            for backup in self.backup_dir.glob("backup-*.zip"):
+                self.record_backup(backup)
+            entries = self.catalog.list_backups(source='local', backup_type='angles')
+        
+        backups = [Path(entry['locations']['local']) for entry in entries]
+        backups = [backup for backup in backups if backup.exists()]
         
         logger.info(f"📋 Found {len(backups)} backup files")
         for backup in backups[:5]:  # Show latest 5
@@ -204,6 +231,7 @@ class BackupRestore:
         for backup in to_delete:
             try:
                 backup.unlink()
+                self.catalog.remove_location(backup.name, 'local')
                 logger.info(f"🗑️ Deleted old backup: {backup.name}")
             except Exception as e:
                 logger.error(f"Failed to delete {backup.name}: {e}")
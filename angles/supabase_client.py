@@ -12,6 +12,7 @@ import requests
 
 from .config import SUPABASE_URL, SUPABASE_KEY
 from .utils import safe_json_dumps, retry_with_backoff
+from utils.near_duplicates import index_decision
 
 
 logger = logging.getLogger(__name__)
@@ -68,7 +69,10 @@ class SupabaseClient:
             
             if response.status_code == 201:
                 result = response.json()
-                return result[0]['id'] if result else None
+                if not result:
+                    return None
+                index_decision(result[0]['id'], content)
+                return result[0]['id']
             else:
                 logger.error(f"Failed to insert decision: {response.status_code}")
                 return None
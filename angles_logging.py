@@ -13,16 +13,19 @@ Author: Angles AI Universe™ Backend Team
 Version: 1.0.0
 """
 
+import atexit
 import json
 import os
-import queue
 import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import uuid
 
+from utils.spool import Spool, FSYNC_INTERVAL
+
 try:
     from supabase import create_client, Client
     SUPABASE_AVAILABLE = True
@@ -32,30 +35,66 @@ except ImportError:
 
 
 class AnglesLogger:
-    """Main logging system for Angles AI Universe™ backend"""
+    """Main logging system for Angles AI Universe™ backend
+    
+    Log calls never block on the network: entries go into a bounded
+    in-memory buffer grouped by table and a background shipper sends them
+    as multi-row upserts, either when a table reaches ``batch_size`` rows or
+    every ``flush_interval`` seconds. When the buffer is full, or Supabase is
+    unreachable, entries are appended to an on-disk spool (see utils/spool.py)
+    and replayed once the connection is back. Rows carry their own uuid, so
+    replays are idempotent.
+    """
     
     def __init__(self):
         """Initialize the logging system"""
         self.supabase: Optional[Client] = None
-        self.queue_path = Path("logs/pending_logs.json")
-        self.log_queue = queue.Queue()
+        self.legacy_queue_path = Path("logs/pending_logs.json")
+        self.spool = Spool("logs/spool/angles_logs", fsync=os.getenv('ANGLES_LOG_FSYNC', FSYNC_INTERVAL))
         self.is_connected = False
         self.last_connection_attempt = 0
         self.connection_retry_interval = 30  # seconds
         
+        # Shipper settings
+        self.buffer_capacity = int(os.getenv('ANGLES_LOG_BUFFER_SIZE', '5000'))
+        self.batch_size = int(os.getenv('ANGLES_LOG_BATCH_SIZE', '100'))
+        self.flush_interval = float(os.getenv('ANGLES_LOG_FLUSH_INTERVAL', '2.0'))
+        
+        # Bounded in-memory buffer grouped by table
+        self.buffers: Dict[str, deque] = {}
+        self.buffered = 0
+        self.lock = threading.Lock()
+        self.replay_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.is_shutdown = False
+        
+        self.metrics = {
+            'enqueued': 0,
+            'shipped': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'buffer_high_watermark': 0,
+            'last_batch_latency_ms': 0.0
+        }
+        
         # Ensure logs directory exists
-        self.queue_path.parent.mkdir(exist_ok=True)
+        self.legacy_queue_path.parent.mkdir(exist_ok=True)
         
         # Initialize Supabase connection
         self._initialize_supabase()
         
-        # Load any pending logs from previous session
+        # Migrate logs queued by earlier versions into the spool
         self._load_pending_logs()
         
-        # Start background worker thread
-        self.worker_thread = threading.Thread(target=self._background_worker, daemon=True)
+        # Start background shipper thread
+        self.worker_thread = threading.Thread(target=self._background_worker, name="angles-log-shipper", daemon=True)
         self.worker_thread.start()
         
+        atexit.register(self.shutdown)
+        
         print("✅ Angles AI Universe™ logging system initialized")
     
     def _initialize_supabase(self):
@@ -103,20 +142,18 @@ class AnglesLogger:
             return False
     
     def _load_pending_logs(self):
-        """Load pending logs from previous session"""
+        """Move logs queued by earlier versions (one JSON array) into the spool"""
         
-        if not self.queue_path.exists():
+        if not self.legacy_queue_path.exists():
             return
         
         try:
-            with open(self.queue_path, 'r') as f:
+            with open(self.legacy_queue_path, 'r') as f:
                 pending_logs = json.load(f)
             
-            for log_entry in pending_logs:
-                self.log_queue.put(log_entry)
-            
-            # Clear the file after loading
-            self.queue_path.unlink()
+            self.spool.append_many(pending_logs)
+            self.spool.flush()
+            self.legacy_queue_path.unlink()
             
             if pending_logs:
                 print(f"📥 Loaded {len(pending_logs)} pending logs from previous session")
@@ -124,43 +161,22 @@ class AnglesLogger:
         except Exception as e:
             print(f"⚠️ Failed to load pending logs: {e}")
     
-    def _save_pending_logs(self):
-        """Save current queue to disk"""
+    def _spill(self, entries: List[Dict[str, Any]]):
+        """Write entries that cannot be buffered to the on-disk spool"""
         
-        if self.log_queue.empty():
+        if not entries:
             return
         
         try:
-            pending_logs = []
-            temp_queue = queue.Queue()
-            
-            # Extract all items from queue
-            while not self.log_queue.empty():
-                try:
-                    item = self.log_queue.get_nowait()
-                    pending_logs.append(item)
-                    temp_queue.put(item)
-                except queue.Empty:
-                    break
-            
-            # Put items back in queue
-            while not temp_queue.empty():
-                self.log_queue.put(temp_queue.get_nowait())
-            
-            # Save to file
-            if pending_logs:
-                with open(self.queue_path, 'w') as f:
-                    json.dump(pending_logs, f, indent=2, default=str)
-                
-                print(f"💾 Saved {len(pending_logs)} pending logs to disk")
-                
+            self.spool.append_many(entries)
+            self.metrics['spilled'] += len(entries)
         except Exception as e:
-            print(f"⚠️ Failed to save pending logs: {e}")
+            print(f"⚠️ Failed to spill {len(entries)} logs to disk: {e}")
     
     def _background_worker(self):
-        """Background worker to process queued logs"""
+        """Background shipper: batches buffered logs and replays the spill file"""
         
-        while True:
+        while not self.stopping.is_set():
             try:
                 # Check connection periodically
                 current_time = time.time()
@@ -172,78 +188,133 @@ class AnglesLogger:
                         self.is_connected = True
                         print("✅ Supabase connection restored")
                 
-                # Process queue if connected
                 if self.is_connected:
                     self._process_queue()
+                    self._replay_spill()
+                elif self.buffered >= self.buffer_capacity // 2:
+                    # Offline: keep memory bounded by moving the backlog to disk
+                    self._spill(self._drain_buffers())
                 
-                # Sleep before next iteration
-                time.sleep(5)
+                # Wake early when a table fills a batch
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
                 
             except Exception as e:
                 print(f"⚠️ Background worker error: {e}")
-                time.sleep(10)
+                self.stopping.wait(10)
+    
+    def _take_batch(self, table: str) -> List[Dict[str, Any]]:
+        """Pop up to batch_size entries for one table"""
+        
+        with self.lock:
+            buffer = self.buffers.get(table)
+            if not buffer:
+                return []
+            batch = [buffer.popleft() for _ in range(min(self.batch_size, len(buffer)))]
+            self.buffered -= len(batch)
+            return batch
+    
+    def _requeue_front(self, table: str, batch: List[Dict[str, Any]]):
+        """Return a failed batch to the head of its buffer (spilling on overflow)"""
+        
+        with self.lock:
+            room = self.buffer_capacity - self.buffered
+            keep, overflow = batch[:max(room, 0)], batch[max(room, 0):]
+            self.buffers.setdefault(table, deque()).extendleft(reversed(keep))
+            self.buffered += len(keep)
+        if overflow:
+            self._spill(overflow)
+    
+    def _drain_buffers(self) -> List[Dict[str, Any]]:
+        """Remove and return everything currently buffered"""
+        
+        with self.lock:
+            entries = [entry for buffer in self.buffers.values() for entry in buffer]
+            self.buffers = {}
+            self.buffered = 0
+        return entries
     
     def _process_queue(self):
-        """Process queued log entries"""
+        """Ship buffered entries as multi-row inserts, one table at a time"""
         
-        if not self.is_connected or self.log_queue.empty():
-            return
-        
-        processed_count = 0
-        max_batch_size = 10
-        
-        while not self.log_queue.empty() and processed_count < max_batch_size:
-            try:
-                log_entry = self.log_queue.get_nowait()
+        for table in list(self.buffers.keys()):
+            while self.is_connected:
+                batch = self._take_batch(table)
+                if not batch:
+                    break
                 
-                if self._insert_to_supabase(log_entry):
-                    processed_count += 1
-                    self.log_queue.task_done()
-                else:
-                    # Put back in queue if insert failed
-                    self.log_queue.put(log_entry)
+                if not self._insert_batch(table, [entry['data'] for entry in batch]):
+                    self._requeue_front(table, batch)
                     self.is_connected = False  # Mark as disconnected
+                    return
+                
+                if len(batch) < self.batch_size:
                     break
-                    
-            except queue.Empty:
-                break
-            except Exception as e:
-                print(f"⚠️ Error processing queue item: {e}")
-                self.is_connected = False
-                break
+    
+    def _replay_spill(self):
+        """Ship entries from the spool once connected again"""
+        
+        if not self.replay_lock.acquire(blocking=False):
+            return  # Another thread is already replaying
         
-        if processed_count > 0:
-            print(f"📤 Processed {processed_count} queued logs")
+        try:
+            while self.is_connected:
+                entries, position = self.spool.read_batch(self.batch_size)
+                if not entries:
+                    break
+                
+                by_table: Dict[str, List[Dict[str, Any]]] = {}
+                for entry in entries:
+                    by_table.setdefault(entry.get('table'), []).append(entry.get('data', {}))
+                
+                if not all(self._insert_batch(table, rows) for table, rows in by_table.items()):
+                    # Uncommitted: the whole batch is retried later (upserts make that safe)
+                    self.is_connected = False
+                    break
+                
+                self.spool.commit(position)
+                self.metrics['replayed'] += len(entries)
+        finally:
+            self.replay_lock.release()
     
-    def _insert_to_supabase(self, log_entry: Dict[str, Any]) -> bool:
-        """Insert log entry to appropriate Supabase table"""
+    def _insert_batch(self, table_name: Optional[str], rows: List[Dict[str, Any]]) -> bool:
+        """Insert many rows into one Supabase table with a single request"""
         
         if not self.supabase:
             return False
         
+        rows = [row for row in rows if row]
+        if not table_name or not rows:
+            print(f"⚠️ Invalid log batch for table {table_name}")
+            return True  # Consider it processed to avoid infinite retry
+        
+        start = time.perf_counter()
         try:
-            table_name = log_entry.get('table')
-            data = log_entry.get('data', {})
-            
-            if not table_name or not data:
-                print(f"⚠️ Invalid log entry: {log_entry}")
-                return True  # Consider it processed to avoid infinite retry
-            
-            # Insert to Supabase
-            result = self.supabase.table(table_name).insert(data).execute()
+            # Upsert on the row uuid so replays after partial failures are idempotent
+            result = self.supabase.table(table_name).upsert(rows).execute()
             
             if result.data:
+                self.metrics['shipped'] += len(rows)
+                self.metrics['batches'] += 1
+                self.metrics['last_batch_latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
                 return True
             else:
                 print(f"⚠️ Failed to insert to {table_name}: No data returned")
+                self.metrics['failed_batches'] += 1
                 return False
                 
         except Exception as e:
             print(f"⚠️ Supabase insert error: {e}")
+            self.metrics['failed_batches'] += 1
             return False
     
+    def _insert_to_supabase(self, log_entry: Dict[str, Any]) -> bool:
+        """Insert a single log entry to its Supabase table"""
+        
+        return self._insert_batch(log_entry.get('table'), [log_entry.get('data', {})])
+    
     def _queue_log(self, table: str, data: Dict[str, Any]):
-        """Queue a log entry for later processing"""
+        """Queue a log entry for the background shipper (never blocks on I/O)"""
         
         log_entry = {
             'table': table,
@@ -251,19 +322,21 @@ class AnglesLogger:
             'queued_at': datetime.now(timezone.utc).isoformat()
         }
         
-        if self.is_connected:
-            # Try immediate insert
-            if self._insert_to_supabase(log_entry):
-                return
-            else:
-                self.is_connected = False
-        
-        # Queue for later
-        self.log_queue.put(log_entry)
-        
-        # Periodically save queue to disk
-        if self.log_queue.qsize() % 10 == 0:
-            self._save_pending_logs()
+        with self.lock:
+            self.metrics['enqueued'] += 1
+            overflow = self.buffered >= self.buffer_capacity or self.is_shutdown
+            if not overflow:
+                buffer = self.buffers.setdefault(table, deque())
+                buffer.append(log_entry)
+                self.buffered += 1
+                self.metrics['buffer_high_watermark'] = max(self.metrics['buffer_high_watermark'], self.buffered)
+                batch_ready = len(buffer) >= self.batch_size
+        
+        if overflow:
+            # Backpressure: the buffer is full, keep the entry on disk instead
+            self._spill([log_entry])
+        elif batch_ready:
+            self.wakeup.set()
     
     def log_decision(self, decision_text: str, decision_type: str, decision_date: Optional[str] = None):
         """
@@ -362,18 +435,22 @@ class AnglesLogger:
         print(f"🤖 Agent activity logged: {agent_name} - {status} - {description[:50]}...")
     
     def get_queue_status(self) -> Dict[str, Any]:
-        """Get current queue and connection status"""
+        """Get current queue, connection and backpressure status"""
         
         return {
             'connected': self.is_connected,
-            'queue_size': self.log_queue.qsize(),
+            'queue_size': self.buffered,
+            'buffer_capacity': self.buffer_capacity,
+            'buffered_by_table': {table: len(buffer) for table, buffer in self.buffers.items()},
+            'spool': self.spool.stats(),
+            'metrics': dict(self.metrics),
             'supabase_available': SUPABASE_AVAILABLE,
             'last_connection_attempt': self.last_connection_attempt,
             'worker_thread_alive': self.worker_thread.is_alive()
         }
     
     def flush_queue(self) -> bool:
-        """Force process all queued logs immediately"""
+        """Force ship all buffered and spilled logs immediately"""
         
         if not self.is_connected:
             if not self._test_connection():
@@ -381,44 +458,35 @@ class AnglesLogger:
                 return False
             self.is_connected = True
         
-        initial_size = self.log_queue.qsize()
-        if initial_size == 0:
-            print("ℹ️ No logs in queue to flush")
-            return True
-        
+        initial_size = self.buffered
         print(f"🔄 Flushing {initial_size} queued logs...")
         
-        # Process all items in queue
-        processed = 0
-        while not self.log_queue.empty():
-            try:
-                log_entry = self.log_queue.get_nowait()
-                
-                if self._insert_to_supabase(log_entry):
-                    processed += 1
-                    self.log_queue.task_done()
-                else:
-                    # Put back in queue if insert failed
-                    self.log_queue.put(log_entry)
-                    break
-                    
-            except queue.Empty:
-                break
+        self._process_queue()
+        self._replay_spill()
         
-        print(f"✅ Successfully flushed {processed}/{initial_size} logs")
-        return processed == initial_size
+        flushed = self.buffered == 0 and self.spool.pending_bytes() == 0
+        print(f"{'✅' if flushed else '⚠️'} Flushed queued logs ({self.buffered} still buffered)")
+        return flushed
     
     def shutdown(self):
         """Shutdown the logging system gracefully"""
         
+        with self.lock:
+            if self.is_shutdown:
+                return
+            self.is_shutdown = True
+        
         print("🔄 Shutting down logging system...")
         
-        # Save any remaining logs to disk
-        self._save_pending_logs()
+        # Stop the shipper, then ship or spill whatever is left
+        self.stopping.set()
+        self.wakeup.set()
+        self.worker_thread.join(timeout=self.flush_interval + 5)
         
-        # Try to flush queue one more time
         if self.is_connected:
-            self.flush_queue()
+            self._process_queue()
+        self._spill(self._drain_buffers())
+        self.spool.flush()
         
         print("✅ Logging system shutdown complete")
 
@@ -4,7 +4,7 @@ Main application with scheduled agents and comprehensive routing
 """
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import schedule
@@ -25,6 +25,7 @@ from api.agents.verifier_agent import VerifierAgent
 # Import utilities
 from api.utils.logging import logger
 from api.config import settings
+from utils.tracing import get_tracer
 
 # Global agent instances
 memory_sync_agent = MemorySyncAgent()
@@ -112,6 +113,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Record one span per request, grouped by method and top-level path"""
+    segment = request.url.path.strip("/").split("/", 1)[0]
+    async with get_tracer().span(f"api.{request.method} /{segment}"):
+        return await call_next(request)
+
 # Include routers
 app.include_router(health_router)
 app.include_router(ui_router)
@@ -5,6 +5,7 @@ GPT-5 ready client with fallback to rule-based systems
 from typing import Optional, Dict, Any, List
 from api.config import settings
 from api.utils.logging import logger
+from utils.llm_cache import cached_chat_completion
 
 try:
     from openai import OpenAI
@@ -36,7 +37,8 @@ class OpenAIClient:
         
         try:
             # Using gpt-5 as placeholder for future model
-            response = self.client.chat.completions.create(
+            content = cached_chat_completion(
+                self.client,
                 model="gpt-5",  # Note: GPT-5 ready naming
                 messages=[
                     {
@@ -49,7 +51,7 @@ class OpenAIClient:
                 temperature=0.3
             )
             
-            summary = response.choices[0].message.content.strip()
+            summary = content.strip()
             logger.debug(f"Generated summary for text of length {len(text)}")
             return summary
             
@@ -68,7 +70,8 @@ class OpenAIClient:
                 for i, opt in enumerate(options)
             ])
             
-            response = self.client.chat.completions.create(
+            content = cached_chat_completion(
+                self.client,
                 model="gpt-5",
                 messages=[
                     {
@@ -84,7 +87,7 @@ class OpenAIClient:
                 temperature=0.5
             )
             
-            recommendation = response.choices[0].message.content.strip()
+            recommendation = content.strip()
             
             # Extract recommendation (simplified parsing)
             chosen = self._extract_chosen_option(recommendation, options)
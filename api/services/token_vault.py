@@ -28,7 +28,8 @@ class TokenVault:
                     VALUES (%s, %s, %s, %s, %s, %s)
                 """, (chunk_id, source, chunk, summary, links, utc_now()))
                 
-            logger.info(f"Ingested chunk from {source}: {chunk[:50]}...")
+            # Per-chunk hot path: debug level, formatted only when enabled
+            logger.debug("Ingested chunk from {}: {}...", source, chunk[:50])
             return chunk_id
             
         except Exception as e:
@@ -14,7 +14,8 @@ logger.add(
     sys.stdout,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level=settings.log_level,
-    colorize=True
+    colorize=True,
+    enqueue=True  # Writes happen on loguru's worker thread
 )
 
 # Add file handler with rotation
@@ -24,7 +25,8 @@ logger.add(
     level=settings.log_level,
     rotation="10 MB",
     retention="1 week",
-    compression="gz"
+    compression="gz",
+    enqueue=True
 )
 
 # Export configured logger
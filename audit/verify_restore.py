@@ -13,15 +13,17 @@ import json
 import tempfile
 import shutil
 import logging
-import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-import requests
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+from utils.backup_mirror import BackupMirror, MirrorError
+from utils.drift_engine import DriftEngine, SupabaseTableSource
+from utils.streaming_restore import iter_json_array
+
 class RestoreVerificationSystem:
     """Comprehensive restore verification and backup validation"""
     
@@ -105,8 +107,8 @@ class RestoreVerificationSystem:
         self.logger.info("📋 Environment loaded for restore verification")
     
     def clone_backup_repository(self, temp_dir: str) -> Dict[str, Any]:
-        """Clone latest backup repository to temp directory"""
-        self.logger.info("🐙 Cloning backup repository...")
+        """Check out the backup exports from the local repository mirror into temp_dir"""
+        self.logger.info("🐙 Syncing backup repository mirror...")
         
         clone_results = {
             'success': False,
@@ -114,7 +116,8 @@ class RestoreVerificationSystem:
             'clone_time_seconds': 0,
             'error_message': None,
             'commit_hash': None,
-            'commit_date': None
+            'commit_date': None,
+            'initial_clone': None
         }
         
         if not self.env['repo_url']:
@@ -126,37 +129,22 @@ class RestoreVerificationSystem:
         try:
             repo_path = os.path.join(temp_dir, 'backup_repo')
             
-            # Construct clone URL with token if available
-            clone_url = self.env['repo_url']
-            if self.env['github_token'] and 'github.com' in clone_url:
-                # Insert token into URL
-                clone_url = clone_url.replace('https://github.com/', f'https://{self.env["github_token"]}@github.com/')
+            # Incremental fetch of the branch tip, then a sparse checkout of export/ only
+            mirror = BackupMirror(self.env['repo_url'], token=self.env['github_token'])
+            sync = mirror.sync()
+            mirror.checkout(repo_path, ['export/'])
             
-            # Clone repository
-            clone_cmd = ['git', 'clone', clone_url, repo_path]
-            result = subprocess.run(clone_cmd, capture_output=True, text=True, timeout=300)
+            clone_results['success'] = True
+            clone_results['repo_path'] = repo_path
+            clone_results['commit_hash'] = sync['commit']
+            clone_results['commit_date'] = sync['commit_date']
+            clone_results['initial_clone'] = sync['initial_clone']
             
-            if result.returncode == 0:
-                clone_results['success'] = True
-                clone_results['repo_path'] = repo_path
-                
-                # Get latest commit info
-                commit_cmd = ['git', 'log', '-1', '--format=%H|%ad', '--date=iso']
-                commit_result = subprocess.run(commit_cmd, cwd=repo_path, capture_output=True, text=True, timeout=30)
-                
-                if commit_result.returncode == 0:
-                    commit_info = commit_result.stdout.strip().split('|')
-                    if len(commit_info) >= 2:
-                        clone_results['commit_hash'] = commit_info[0]
-                        clone_results['commit_date'] = commit_info[1]
-                
-                self.logger.info(f"✅ Repository cloned successfully to {repo_path}")
-            else:
-                clone_results['error_message'] = f"Git clone failed: {result.stderr}"
-                self.logger.error(f"❌ {clone_results['error_message']}")
+            self.logger.info(f"✅ Backup exports checked out to {repo_path} "
+                             f"({'initial clone' if sync['initial_clone'] else 'incremental fetch'})")
         
-        except subprocess.TimeoutExpired:
-            clone_results['error_message'] = "Git clone timeout after 300 seconds"
+        except MirrorError as e:
+            clone_results['error_message'] = f"Backup mirror failed: {e}"
             self.logger.error(f"❌ {clone_results['error_message']}")
         except Exception as e:
             clone_results['error_message'] = f"Clone failed: {str(e)}"
@@ -406,7 +394,7 @@ class RestoreVerificationSystem:
         return errors
     
     def compare_with_live_supabase(self, repo_path: str, file_analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Compare export data with live Supabase data"""
+        """Compare export data with live Supabase data using bucketed row-hash drift analysis"""
         self.logger.info("🔄 Comparing with live Supabase data...")
         
         comparison_results = {
@@ -414,7 +402,7 @@ class RestoreVerificationSystem:
             'tables_compared': 0,
             'discrepancies': [],
             'record_count_comparison': {},
-            'sample_data_comparison': {}
+            'drift_analysis': {}
         }
         
         if not self.env['supabase_url'] or not self.env['supabase_key']:
@@ -422,13 +410,8 @@ class RestoreVerificationSystem:
             self.logger.warning("⚠️ Supabase comparison skipped - credentials not available")
             return comparison_results
         
-        headers = {
-            'apikey': self.env['supabase_key'],
-            'Authorization': f"Bearer {self.env['supabase_key']}",
-            'Content-Type': 'application/json'
-        }
-        
         export_dir = os.path.join(repo_path, 'export')
+        engine = DriftEngine()
         
         for table_name in ['decision_vault', 'ai_decision_log']:
             if table_name in file_analysis:
@@ -438,36 +421,32 @@ class RestoreVerificationSystem:
                     file_path = os.path.join(export_dir, file_info['path'])
                     
                     with open(file_path, 'r') as f:
-                        export_data = json.load(f)
+                        export_data = list(iter_json_array(f))
                     
-                    export_count = len(export_data)
+                    live_source = SupabaseTableSource(self.env['supabase_url'], self.env['supabase_key'], table_name)
+                    drift = engine.compare(export_data, live_source)
                     
-                    # Get live Supabase count
-                    url = f"{self.env['supabase_url']}/rest/v1/{table_name}"
-                    response = requests.head(url, headers=headers, params={'select': 'count'}, timeout=30)
+                    export_count = drift['backup_count']
+                    live_count = drift['live_count']
                     
-                    if response.status_code == 200:
-                        content_range = response.headers.get('content-range', '0-0/0')
-                        live_count = int(content_range.split('/')[-1]) if '/' in content_range else 0
-                        
-                        comparison_results['record_count_comparison'][table_name] = {
-                            'export_count': export_count,
-                            'live_count': live_count,
-                            'difference': abs(export_count - live_count)
-                        }
-                        
-                        # Check for significant discrepancies
-                        difference_pct = (abs(export_count - live_count) / max(live_count, 1)) * 100
-                        if difference_pct > 10:  # More than 10% difference
-                            comparison_results['discrepancies'].append(
-                                f"{table_name}: Significant count difference - Export: {export_count}, Live: {live_count} ({difference_pct:.1f}% diff)"
-                            )
-                        
-                        comparison_results['tables_compared'] += 1
-                        self.logger.info(f"✅ {table_name}: Export {export_count}, Live {live_count} records")
+                    comparison_results['record_count_comparison'][table_name] = {
+                        'export_count': export_count,
+                        'live_count': live_count,
+                        'difference': abs(export_count - live_count)
+                    }
+                    comparison_results['drift_analysis'][table_name] = drift
+                    
+                    # Check for significant discrepancies
+                    if drift['drift_percentage'] > 10:  # More than 10% of records differ
+                        comparison_results['discrepancies'].append(
+                            f"{table_name}: Significant drift - {drift['missing_in_live']} missing in live, "
+                            f"{drift['missing_in_backup']} missing in export, {drift['modified_records']} modified "
+                            f"({drift['drift_percentage']:.1f}% drift)"
+                        )
                     
-                    else:
-                        comparison_results['discrepancies'].append(f"Cannot access live {table_name} table: HTTP {response.status_code}")
+                    comparison_results['tables_compared'] += 1
+                    self.logger.info(f"✅ {table_name}: Export {export_count}, Live {live_count} records, "
+                                     f"{drift['drift_percentage']:.1f}% drift ({drift['round_trips']} requests)")
                 
                 except Exception as e:
                     comparison_results['discrepancies'].append(f"Comparison failed for {table_name}: {str(e)}")
@@ -687,7 +666,12 @@ class RestoreVerificationSystem:
                     markdown += f"**{table_name}:**\n"
                     markdown += f"- Export: {counts['export_count']:,} records\n"
                     markdown += f"- Live: {counts['live_count']:,} records\n"
-                    markdown += f"- Difference: {counts['difference']:,} records\n\n"
+                    markdown += f"- Difference: {counts['difference']:,} records\n"
+                    drift = data_validation.get('drift_analysis', {}).get(table_name)
+                    if drift:
+                        markdown += f"- Missing in live: {drift['missing_in_live']:,}, missing in export: {drift['missing_in_backup']:,}, modified: {drift['modified_records']:,}\n"
+                        markdown += f"- Drift: {drift['drift_percentage']:.1f}%\n"
+                    markdown += "\n"
         
         # Critical issues
         if self.verification_results['critical_issues']:
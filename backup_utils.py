@@ -36,6 +36,7 @@ from supabase import create_client, Client
 sys.path.append(str(Path(__file__).parent))
 
 from notion_backup_logger import create_notion_logger
+from utils.backup_catalog import describe_archive, open_backup_catalog
 
 @dataclass
 class BackupConfig:
@@ -81,6 +82,7 @@ class UnifiedBackupManager:
         # Initialize clients
         self.supabase = self._init_supabase_client()
         self.cipher = self._init_encryption()
+        self.catalog = open_backup_catalog()
         
         # Backup configuration
         self.memory_paths = [
@@ -187,6 +189,14 @@ class UnifiedBackupManager:
         else:
             return f"memory_backup_{timestamp}.zip"
     
+    def _file_checksum(self, path: Path) -> str:
+        """SHA-256 of a file, recorded in the metadata so restores can verify members"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
     def _create_backup_archive(self, timestamp: str) -> Optional[str]:
         """Create compressed archive of memory files"""
         try:
@@ -194,6 +204,7 @@ class UnifiedBackupManager:
             temp_path = Path(tempfile.gettempdir()) / filename
             
             file_count = 0
+            checksums = {}
             
             with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
                 # Add individual memory files
@@ -202,6 +213,7 @@ class UnifiedBackupManager:
                     
                     if path.is_file() and path.exists():
                         zip_file.write(path, path.name)
+                        checksums[path.name] = self._file_checksum(path)
                         file_count += 1
                         self.logger.info(f"📁 Added file: {memory_path}")
                     
@@ -212,6 +224,7 @@ class UnifiedBackupManager:
                                 # Preserve directory structure in zip
                                 arc_name = file_path.relative_to(path.parent)
                                 zip_file.write(file_path, str(arc_name))
+                                checksums[arc_name.as_posix()] = self._file_checksum(file_path)
                                 file_count += 1
                                 self.logger.info(f"📁 Added file: {file_path}")
                     
@@ -224,6 +237,7 @@ class UnifiedBackupManager:
                     "backup_type": self.config.backup_type,
                     "tag": self.config.tag,
                     "files_included": file_count,
+                    "checksums": checksums,
                     "version": "2.0.0",
                     "system": "MemorySyncAgent™"
                 }
@@ -552,6 +566,37 @@ class UnifiedBackupManager:
         except Exception as e:
             self.logger.warning(f"Failed to log backup to Notion: {e}")
     
+    def _record_in_catalog(self, result: BackupResult, backup_file_path: str):
+        """Record where this backup was stored, before the local file is removed"""
+        locations = {}
+        if result.storage_url:
+            locations['supabase'] = f"{self.storage_prefix}/{result.filename}"
+        if result.github_commit_hash:
+            locations['github'] = f"export/{result.filename}"
+        if not locations:
+            return
+        
+        try:
+            description = describe_archive(backup_file_path)
+            backup_id = result.filename.replace('.encrypted', '')
+            if backup_id.endswith('.zip'):
+                backup_id = backup_id[:-len('.zip')]
+            
+            self.catalog.record_backup(
+                backup_id,
+                result.filename,
+                locations,
+                size_bytes=description['size_bytes'],
+                checksum=description['checksum'],
+                file_count=result.file_count,
+                tables=description['tables'],
+                backup_type=self.config.backup_type,
+                tag=self.config.tag
+            )
+            self.logger.info(f"📇 Recorded in backup catalog: {', '.join(sorted(locations))}")
+        except Exception as e:
+            self.logger.warning(f"Failed to record backup in catalog: {e}")
+    
     def _cleanup_old_backups(self):
         """Remove backups older than retention period"""
         if not self.supabase:
@@ -579,6 +624,7 @@ class UnifiedBackupManager:
                     delete_result = self.supabase.storage.from_(self.bucket_name).remove([f"{self.storage_prefix}/{file_name}"])
                     if delete_result:
                         deleted_count += 1
+                        self.catalog.remove_location(file_name, 'supabase')
                         self.logger.info(f"🗑️ Deleted old backup: {file_name}")
             
             if deleted_count > 0:
@@ -641,6 +687,8 @@ class UnifiedBackupManager:
                             result.github_commit_hash = commit_hash
                             result.github_commit_url = commit_url
                     
+                    self._record_in_catalog(result, encrypted_path)
+                    
                     # Cleanup temporary files
                     try:
                         if encrypted_path:
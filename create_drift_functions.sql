@@ -0,0 +1,47 @@
+-- Create drift_bucket_digests for backup-vs-live drift analysis (utils/drift_engine.py)
+-- Run this SQL in Supabase SQL Editor
+--
+-- Returns one row per id-range bucket with the row count and the XOR of
+-- per-row md5 digests (split into two signed 64-bit halves), so a client can
+-- compare a whole table against a backup in one round-trip and only fetch
+-- the buckets that differ. Row digest = md5 of the listed columns' text
+-- values joined with chr(31), NULL rendered as \N.
+-- Requires PostgreSQL 14+ (bit_xor aggregate).
+
+CREATE OR REPLACE FUNCTION drift_bucket_digests(
+    p_table TEXT,
+    p_columns TEXT[],
+    p_boundaries TEXT[]
+)
+RETURNS TABLE (bucket INTEGER, row_count BIGINT, hi BIGINT, lo BIGINT)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    id_type TEXT;
+    row_text TEXT;
+BEGIN
+    SELECT format_type(atttypid, atttypmod) INTO id_type
+    FROM pg_attribute
+    WHERE attrelid = p_table::regclass AND attname = 'id';
+
+    SELECT string_agg(format('coalesce(%I::text, %L)', c, E'\\N'), ', ' ORDER BY ord)
+    INTO row_text
+    FROM unnest(p_columns) WITH ORDINALITY AS cols(c, ord);
+
+    RETURN QUERY EXECUTE format(
+        'SELECT d.bucket, count(*), '
+        '       bit_xor((''x'' || substr(d.digest, 1, 16))::bit(64)::bigint), '
+        '       bit_xor((''x'' || substr(d.digest, 17, 16))::bit(64)::bigint) '
+        'FROM (SELECT (SELECT count(*) FROM unnest($1::%s[]) AS lower_bound '
+        '              WHERE t.id >= lower_bound)::integer AS bucket, '
+        '             md5(concat_ws(chr(31), %s)) AS digest '
+        '      FROM %I t) d '
+        'GROUP BY d.bucket ORDER BY d.bucket',
+        id_type, row_text, p_table)
+    USING p_boundaries;
+END;
+$$;
+
+-- Grant permissions
+GRANT EXECUTE ON FUNCTION drift_bucket_digests(TEXT, TEXT[], TEXT[]) TO authenticated, service_role;
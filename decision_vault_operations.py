@@ -6,6 +6,7 @@ Handles decision documentation in Supabase
 import os
 from datetime import date, datetime
 from config import supabase
+from utils.near_duplicates import index_decision
 from typing import Optional, List, Dict, Any
 
 def store_decision(decision: str, decision_type: str, decision_date: Optional[date] = None, 
@@ -51,6 +52,9 @@ def store_decision(decision: str, decision_type: str, decision_date: Optional[da
         result = supabase.table("decision_vault").insert(decision_data).execute()
         
         if result.data:
+            # Keep the near-duplicate index current (failures are logged, never fail the store)
+            index_decision(result.data[0]["id"], decision_data["decision"])
+            
             return {
                 "success": True,
                 "data": result.data[0],
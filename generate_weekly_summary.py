@@ -17,6 +17,11 @@ from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 import glob
 
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from utils.log_index import get_log_index
+
 # Import helpers
 try:
     from alerts.notify import AlertManager
@@ -37,6 +42,7 @@ class WeeklySummaryGenerator:
         self.load_environment()
         self.alert_manager = AlertManager() if AlertManager else None
         self.git_helper = GitHelper() if GitHelper else None
+        self.log_index = get_log_index()
         
         # Calculate week range (Sunday to Saturday)
         now = datetime.now(timezone.utc)
@@ -188,31 +194,12 @@ class WeeklySummaryGenerator:
         return ops_events
     
     def parse_log_files(self, pattern: str) -> List[Dict]:
-        """Parse log files matching pattern"""
-        entries = []
-        log_files = glob.glob(pattern)
-        
-        for log_file in log_files:
-            try:
-                with open(log_file, 'r') as f:
-                    for line in f:
-                        # Simple log parsing - assumes format: timestamp - level - message
-                        parts = line.strip().split(' - ', 2)
-                        if len(parts) >= 3:
-                            try:
-                                timestamp = datetime.fromisoformat(parts[0].replace('Z', '+00:00'))
-                                entries.append({
-                                    'timestamp': timestamp.isoformat(),
-                                    'level': parts[1],
-                                    'message': parts[2]
-                                })
-                            except:
-                                # Skip malformed entries
-                                continue
-            except Exception as e:
-                self.logger.warning(f"⚠️ Failed to parse log file {log_file}: {e}")
-        
-        return entries
+        """Parse this week's entries from log files matching pattern (including archives)"""
+        try:
+            return list(self.log_index.query(pattern, start=self.week_start, end=self.week_end))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to query log files {pattern}: {e}")
+            return []
     
     def is_in_week_range(self, timestamp_str: str) -> bool:
         """Check if timestamp is in current week range"""
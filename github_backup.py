@@ -26,6 +26,10 @@ import base64
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
+from utils.logger import get_logger
+from utils.tracing import trace
+from utils.backup_catalog import describe_archive, open_backup_catalog
+
 try:
     from git_helpers import GitHelper
 except ImportError:
@@ -45,6 +49,7 @@ class GitHubBackupSystem:
         self.load_environment()
         self.git_helper = GitHelper() if GitHelper else None
         self.alert_manager = AlertManager() if AlertManager else None
+        self.catalog = open_backup_catalog()
         
         # Backup configuration
         self.config = {
@@ -56,7 +61,8 @@ class GitHubBackupSystem:
             'retention_days': 30,
             'batch_size': 50,
             'sanitize_secrets': True,
-            'include_logs': False  # Exclude logs by default for security
+            'include_logs': False,  # Exclude logs by default for security
+            'catalog_manifest': 'backups/catalog.jsonl'
         }
         
         # Secret patterns to sanitize
@@ -93,30 +99,7 @@ class GitHubBackupSystem:
         """Setup logging for backup system"""
         os.makedirs("logs/backup", exist_ok=True)
         
-        self.logger = logging.getLogger('github_backup')
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # File handler
-        log_file = "logs/backup/github_backup.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.logger = get_logger('github_backup', log_file="logs/backup/github_backup.log")
     
     def load_environment(self):
         """Load environment variables"""
@@ -180,7 +163,9 @@ class GitHubBackupSystem:
             '*.log',
             'sync_queue.jsonl',
             '*.lock',
-            '*.pid'
+            '*.pid',
+            'backup_catalog.sqlite3',
+            '.cache/'
         ]
         
         # Skip logs if configured
@@ -244,6 +229,7 @@ class GitHubBackupSystem:
             self.backup_results['errors'].append(f"Supabase export failed: {e}")
             return False
     
+    @trace("backup.create_archive")
     def create_backup_archive(self) -> Optional[str]:
         """Create compressed backup archive with checksums"""
         try:
@@ -321,6 +307,36 @@ class GitHubBackupSystem:
             self.backup_results['errors'].append(f"Archive creation failed: {e}")
             return None
     
+    def record_in_catalog(self, backup_path: str, pushed: bool) -> bool:
+        """Record the archive in the backup catalog and rewrite the JSON-lines manifest"""
+        try:
+            locations = {'local': backup_path}
+            if pushed:
+                locations['github'] = backup_path
+            else:
+                self.catalog.remove_location(self.backup_results['backup_id'], 'github')
+            
+            description = describe_archive(backup_path)
+            self.catalog.record_backup(
+                self.backup_results['backup_id'],
+                os.path.basename(backup_path),
+                locations,
+                created_at=os.path.getmtime(backup_path),
+                size_bytes=description['size_bytes'],
+                checksum=description['checksum'],
+                file_count=description['file_count'],
+                tables=description['tables'],
+                backup_type='full'
+            )
+            self.catalog.export_jsonl(self.config['catalog_manifest'])
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"❌ Failed to update backup catalog: {e}")
+            self.backup_results['warnings'].append(f"Backup catalog not updated: {e}")
+            return False
+    
+    @trace("backup.push_to_github")
     def push_to_github(self, backup_path: str) -> bool:
         """Push backup to GitHub repository"""
         if not self.git_helper:
@@ -329,7 +345,7 @@ class GitHubBackupSystem:
         
         try:
             # Use GitHelper for safe commit and push
-            files_to_commit = [backup_path, backup_path + '.checksums']
+            files_to_commit = [backup_path, backup_path + '.checksums', self.config['catalog_manifest']]
             commit_message = f"Automated backup {self.backup_results['backup_id']}"
             
             result = self.git_helper.safe_commit_and_push(files_to_commit, commit_message)
@@ -351,7 +367,7 @@ class GitHubBackupSystem:
     def basic_git_push(self, backup_path: str) -> bool:
         """Basic Git operations without GitHelper"""
         try:
-            files_to_add = [backup_path, backup_path + '.checksums']
+            files_to_add = [backup_path, backup_path + '.checksums', self.config['catalog_manifest']]
             
             # Git add
             for file_path in files_to_add:
@@ -392,6 +408,10 @@ class GitHubBackupSystem:
             for filename in os.listdir(self.config['backup_dir']):
                 file_path = os.path.join(self.config['backup_dir'], filename)
                 
+                # The catalog is rewritten on every backup, never expire it
+                if filename.startswith(('backup_catalog.sqlite3', 'catalog.jsonl')):
+                    continue
+                
                 if os.path.isfile(file_path):
                     file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
                     
@@ -399,11 +419,13 @@ class GitHubBackupSystem:
                         try:
                             os.remove(file_path)
                             removed_count += 1
+                            self.catalog.remove_location(filename, 'local')
                             self.logger.info(f"🗑️ Removed old backup: {filename}")
                         except Exception as e:
                             self.logger.error(f"❌ Failed to remove {filename}: {e}")
             
             if removed_count > 0:
+                self.catalog.export_jsonl(self.config['catalog_manifest'])
                 self.logger.info(f"✅ Cleaned up {removed_count} old backup files")
         
         except Exception as e:
@@ -452,6 +474,7 @@ class GitHubBackupSystem:
         except Exception as e:
             self.logger.error(f"❌ Failed to send backup alert: {e}")
     
+    @trace("backup.run_full")
     def run_full_backup(self) -> Dict[str, Any]:
         """Run complete backup process"""
         self.logger.info("🚀 Starting full GitHub backup process...")
@@ -474,11 +497,13 @@ class GitHubBackupSystem:
                 self.backup_results['errors'].append("Failed to create backup archive")
                 return self.backup_results
             
-            # Step 3: Push to GitHub
+            # Step 3: Push to GitHub, with the catalog manifest listing this backup
             self.logger.info("🚀 Step 3: Pushing to GitHub...")
+            self.record_in_catalog(backup_path, pushed=True)
             if self.push_to_github(backup_path):
                 self.backup_results['status'] = 'success'
             else:
+                self.record_in_catalog(backup_path, pushed=False)
                 self.backup_results['status'] = 'partial'
                 self.backup_results['errors'].append("GitHub push failed")
             
@@ -16,7 +16,6 @@ import logging
 import requests
 import subprocess
 import hashlib
-import zipfile
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set, Tuple
@@ -35,6 +34,11 @@ try:
 except ImportError:
     AlertManager = None
 
+from utils.backup_catalog import open_backup_catalog, parse_manifest, read_manifest
+from utils.backup_mirror import BackupMirror, MirrorError
+from utils.drift_engine import DriftEngine, RecordsSource, SupabaseTableSource
+from utils.streaming_restore import StreamingArchiveRestore
+
 class GitHubRestoreSystem:
     """Comprehensive GitHub restore system with drift detection"""
     
@@ -44,6 +48,7 @@ class GitHubRestoreSystem:
         self.load_environment()
         self.git_helper = GitHelper() if GitHelper else None
         self.alert_manager = AlertManager() if AlertManager else None
+        self.catalog = open_backup_catalog()
         
         # Restore configuration
         self.config = {
@@ -55,6 +60,7 @@ class GitHubRestoreSystem:
             'dry_run_mode': False,
             'verify_checksums': True,
             'compare_with_live': True,
+            'drift_rows_per_bucket': 500,
             'restore_tables': ['decision_vault', 'memory_log', 'agent_activity'],
             'excluded_restore_paths': [
                 'logs/',
@@ -129,37 +135,77 @@ class GitHubRestoreSystem:
         self.logger.info("📋 Environment loaded for GitHub restore")
     
     def clone_backup_repository(self, temp_dir: str) -> bool:
-        """Clone backup repository to temporary directory"""
+        """Check out the latest backup from the local repository mirror into temp_dir
+        
+        The mirror is fetched incrementally and only the newest backup archive,
+        its checksum manifest and the catalog are checked out, so this does not
+        slow down as backup history grows.
+        """
         try:
             if not self.env['repo_url']:
                 self.logger.error("❌ REPO_URL not configured")
                 return False
             
-            self.logger.info(f"📥 Cloning backup repository to {temp_dir}...")
-            
-            # Use git clone
-            cmd = ['git', 'clone', self.env['repo_url'], temp_dir]
-            
-            if self.env['github_token']:
-                # Add authentication
-                auth_url = self.env['repo_url'].replace('https://', f"https://{self.env['github_token']}@")
-                cmd = ['git', 'clone', auth_url, temp_dir]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            mirror = BackupMirror(self.env['repo_url'], token=self.env['github_token'])
+            sync = mirror.sync()
+            mode = 'initial clone' if sync['initial_clone'] else 'incremental fetch'
+            self.logger.info(f"📥 Backup mirror at {sync['commit'][:8]} ({mode}, {sync['seconds']:.1f}s)")
+            
+            backup_dir = self.config['backup_dir']
+            paths = [f"{backup_dir}/catalog.jsonl"]
+            backup_files = sorted(
+                (name for name in mirror.list_files(f"{backup_dir}/")
+                 if os.path.basename(name).startswith('backup_') and name.endswith('.zip')),
+                reverse=True
+            )
             
-            if result.returncode == 0:
-                self.logger.info("✅ Repository cloned successfully")
-                return True
-            else:
-                self.logger.error(f"❌ Git clone failed: {result.stderr}")
-                self.restore_results['errors'].append(f"Git clone failed: {result.stderr}")
-                return False
+            # The pushed catalog manifest names the latest backup; fall back to filename order
+            manifest = mirror.read_file(f"{backup_dir}/catalog.jsonl")
+            if manifest:
+                for entry in parse_manifest(manifest.decode('utf-8')):
+                    path = f"{backup_dir}/{entry['filename']}"
+                    if 'github' in entry.get('locations', {}) and path in backup_files:
+                        backup_files.remove(path)
+                        backup_files.insert(0, path)
+                        break
+            
+            if backup_files:
+                paths += [backup_files[0], backup_files[0] + '.checksums']
+            
+            mirror.checkout(temp_dir, paths)
+            self.logger.info(f"✅ Checked out {len(paths)} paths from backup mirror")
+            return True
         
+        except MirrorError as e:
+            self.logger.error(f"❌ Backup mirror failed: {e}")
+            self.restore_results['errors'].append(f"Backup mirror failed: {e}")
+            return False
         except Exception as e:
             self.logger.error(f"❌ Clone operation failed: {e}")
             self.restore_results['errors'].append(f"Clone operation failed: {e}")
             return False
     
+    def find_cataloged_backup(self) -> Optional[str]:
+        """Local copy of the newest backup pushed to GitHub, per the backup catalog"""
+        try:
+            entry = self.catalog.latest(source='github')
+            if not entry:
+                return None
+            
+            local_path = entry['locations'].get('local')
+            if not local_path or not os.path.isfile(local_path):
+                return None
+            if entry['size_bytes'] is not None and os.path.getsize(local_path) != entry['size_bytes']:
+                self.logger.warning(f"⚠️ Local copy of {entry['filename']} differs from catalog, ignoring it")
+                return None
+            
+            self.logger.info(f"📇 Latest backup from catalog: {entry['filename']} (no clone needed)")
+            return local_path
+        
+        except Exception as e:
+            self.logger.warning(f"⚠️ Backup catalog lookup failed: {e}")
+            return None
+    
     def find_latest_backup(self, repo_dir: str) -> Optional[str]:
         """Find the latest backup archive in repository"""
         try:
@@ -169,6 +215,15 @@ class GitHubRestoreSystem:
                 self.logger.error(f"❌ Backup directory not found: {backup_dir}")
                 return None
             
+            # Catalog manifest pushed alongside the archives
+            manifest_path = os.path.join(backup_dir, 'catalog.jsonl')
+            if os.path.exists(manifest_path):
+                for entry in read_manifest(manifest_path):
+                    if 'github' in entry.get('locations', {}) and \
+                            os.path.isfile(os.path.join(backup_dir, entry['filename'])):
+                        self.logger.info(f"📦 Latest backup found: {entry['filename']} (catalog)")
+                        return os.path.join(backup_dir, entry['filename'])
+            
             # Find all backup files
             backup_files = []
             for filename in os.listdir(backup_dir):
@@ -207,29 +262,19 @@ class GitHubRestoreSystem:
             with open(checksum_file, 'r') as f:
                 stored_checksums = json.load(f)
             
-            # Extract backup to temp dir for verification
-            with tempfile.TemporaryDirectory() as verify_dir:
-                with zipfile.ZipFile(backup_path, 'r') as zipf:
-                    zipf.extractall(verify_dir)
-                
-                verified = 0
-                failed = 0
-                
-                for file_path, expected_checksum in stored_checksums.items():
-                    extracted_file = os.path.join(verify_dir, file_path)
-                    
-                    if os.path.exists(extracted_file):
-                        actual_checksum = self.calculate_checksum(extracted_file)
-                        
-                        if actual_checksum == expected_checksum:
-                            verified += 1
-                        else:
-                            failed += 1
-                            self.logger.error(f"❌ Checksum mismatch: {file_path}")
-                            self.restore_results['errors'].append(f"Checksum mismatch: {file_path}")
-                    else:
-                        failed += 1
-                        self.logger.error(f"❌ Missing file in backup: {file_path}")
+            # Stream each listed member through SHA-256 without extracting the archive
+            with StreamingArchiveRestore(backup_path, stored_checksums) as archive:
+                verification = archive.verify(list(stored_checksums))
+            
+            verified = verification['verified']
+            failed = verification['failed']
+            
+            for error in verification['errors']:
+                self.logger.error(f"❌ Checksum mismatch: {error}")
+                self.restore_results['errors'].append(f"Checksum mismatch: {error}")
+            
+            for file_path in verification['missing']:
+                self.logger.error(f"❌ Missing file in backup: {file_path}")
             
             self.restore_results['checksum_verification'] = {
                 'verified': verified,
@@ -261,8 +306,8 @@ class GitHubRestoreSystem:
         except Exception:
             return ""
     
-    def analyze_data_drift(self, backup_data: Dict[str, List], live_data: Dict[str, List]) -> Dict[str, Any]:
-        """Analyze drift between backup and live data"""
+    def analyze_data_drift(self, backup_data: Dict[str, List], live_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze drift between backup and live data (record lists or live table sources)"""
         drift_analysis = {
             'total_drift_score': 0,
             'tables': {},
@@ -302,183 +347,115 @@ class GitHubRestoreSystem:
         
         return drift_analysis
     
-    def analyze_table_drift(self, table_name: str, backup_records: List[Dict], live_records: List[Dict]) -> Dict[str, Any]:
-        """Analyze drift for a specific table"""
-        analysis = {
-            'backup_count': len(backup_records),
-            'live_count': len(live_records),
-            'missing_in_live': 0,
-            'missing_in_backup': 0,
-            'modified_records': 0,
-            'drift_percentage': 0,
-            'sample_differences': []
-        }
-        
-        # Create ID-based lookups
-        backup_by_id = {str(record.get('id', '')): record for record in backup_records}
-        live_by_id = {str(record.get('id', '')): record for record in live_records}
-        
-        # Check missing records
-        backup_ids = set(backup_by_id.keys())
-        live_ids = set(live_by_id.keys())
-        
-        analysis['missing_in_live'] = len(backup_ids - live_ids)
-        analysis['missing_in_backup'] = len(live_ids - backup_ids)
-        
-        # Check modified records
-        common_ids = backup_ids & live_ids
-        for record_id in list(common_ids)[:10]:  # Sample first 10
-            backup_record = backup_by_id[record_id]
-            live_record = live_by_id[record_id]
-            
-            # Compare key fields (excluding timestamps)
-            backup_content = {k: v for k, v in backup_record.items() if k not in ['created_at', 'updated_at']}
-            live_content = {k: v for k, v in live_record.items() if k not in ['created_at', 'updated_at']}
-            
-            if backup_content != live_content:
-                analysis['modified_records'] += 1
-                
-                # Store sample difference
-                if len(analysis['sample_differences']) < 3:
-                    analysis['sample_differences'].append({
-                        'id': record_id,
-                        'backup': backup_content,
-                        'live': live_content
-                    })
-        
-        # Calculate drift percentage
-        total_changes = analysis['missing_in_live'] + analysis['missing_in_backup'] + analysis['modified_records']
-        total_records = max(analysis['backup_count'], analysis['live_count'])
-        
-        if total_records > 0:
-            analysis['drift_percentage'] = (total_changes / total_records) * 100
+    def analyze_table_drift(self, table_name: str, backup_records: List[Dict], live_records: Any) -> Dict[str, Any]:
+        """Exact drift for one table from bucketed row hashes; only differing buckets are fetched"""
+        live_source = RecordsSource(live_records) if isinstance(live_records, list) else live_records
+        engine = DriftEngine(rows_per_bucket=self.config['drift_rows_per_bucket'])
         
+        try:
+            analysis = engine.compare(backup_records, live_source)
+        except Exception as e:
+            self.logger.error(f"❌ Drift analysis failed for {table_name}: {e}")
+            self.restore_results['warnings'].append(f"Drift analysis failed for {table_name}: {e}")
+            return {'backup_count': len(backup_records), 'live_count': 0, 'missing_in_live': 0,
+                    'missing_in_backup': 0, 'modified_records': 0, 'drift_percentage': 0,
+                    'sample_differences': [], 'error': str(e)}
+        
+        self.logger.info(f"📊 {table_name}: {analysis['drift_percentage']:.1f}% drift "
+                         f"({analysis['mismatched_buckets']}/{analysis['buckets']} buckets differ, "
+                         f"{analysis['rows_fetched']} rows fetched in {analysis['round_trips']} requests via {analysis['method']})")
         return analysis
     
-    def fetch_live_data(self) -> Dict[str, List]:
-        """Fetch current live data from Supabase"""
-        live_data = {}
-        
+    def live_table_sources(self) -> Dict[str, SupabaseTableSource]:
+        """Live Supabase tables for drift analysis; rows are only read for differing buckets"""
         if not self.env['supabase_url'] or not self.env['supabase_key']:
             self.logger.warning("⚠️ Supabase credentials not available")
-            return live_data
-        
-        try:
-            headers = {
-                'apikey': self.env['supabase_key'],
-                'Authorization': f"Bearer {self.env['supabase_key']}",
-                'Content-Type': 'application/json'
-            }
-            
-            for table in self.config['restore_tables']:
-                try:
-                    url = f"{self.env['supabase_url']}/rest/v1/{table}"
-                    params = {'select': '*', 'order': 'created_at.desc'}
-                    
-                    response = requests.get(url, headers=headers, params=params, timeout=30)
-                    
-                    if response.status_code == 200:
-                        live_data[table] = response.json()
-                        self.logger.info(f"📊 Fetched {len(live_data[table])} live records from {table}")
-                    else:
-                        self.logger.error(f"❌ Failed to fetch live data from {table}: HTTP {response.status_code}")
-                        live_data[table] = []
-                
-                except Exception as e:
-                    self.logger.error(f"❌ Error fetching live data from {table}: {e}")
-                    live_data[table] = []
+            return {}
         
-        except Exception as e:
-            self.logger.error(f"❌ Live data fetch failed: {e}")
-        
-        return live_data
+        return {table: SupabaseTableSource(self.env['supabase_url'], self.env['supabase_key'], table)
+                for table in self.config['restore_tables']}
     
-    def load_backup_data(self, extracted_dir: str) -> Dict[str, List]:
-        """Load data from backup exports"""
+    def load_backup_data(self, backup_path: str) -> Dict[str, List]:
+        """Load data from backup exports, parsing each export incrementally from the archive"""
         backup_data = {}
-        export_dir = os.path.join(extracted_dir, self.config['export_dir'])
-        
-        if not os.path.exists(export_dir):
-            self.logger.warning("⚠️ Export directory not found in backup")
-            return backup_data
+        export_prefix = f"{self.config['export_dir']}/"
         
         try:
-            for filename in os.listdir(export_dir):
-                if filename.endswith('.json'):
-                    # Extract table name from filename
-                    table_name = filename.split('_')[0]
+            with StreamingArchiveRestore(backup_path) as archive:
+                export_files = [name for name in archive.names()
+                                if name.startswith(export_prefix) and name.endswith('.json')
+                                and '/' not in name[len(export_prefix):]]
+                
+                if not export_files:
+                    self.logger.warning("⚠️ Export directory not found in backup")
+                    return backup_data
+                
+                for member in export_files:
+                    # Table name is the filename prefix (e.g. decision_vault_20250807.json)
+                    filename = os.path.basename(member)
+                    table_name = next((table for table in self.config['restore_tables']
+                                       if filename.startswith(f"{table}_") or filename == f"{table}.json"), None)
                     
-                    if table_name in self.config['restore_tables']:
-                        file_path = os.path.join(export_dir, filename)
-                        
-                        with open(file_path, 'r') as f:
-                            data = json.load(f)
-                            backup_data[table_name] = data
-                            self.logger.info(f"📥 Loaded {len(data)} backup records from {table_name}")
+                    if table_name:
+                        data = list(archive.iter_records(member))
+                        backup_data[table_name] = data
+                        self.logger.info(f"📥 Loaded {len(data)} backup records from {table_name}")
         
         except Exception as e:
             self.logger.error(f"❌ Error loading backup data: {e}")
         
         return backup_data
     
-    def should_exclude_path(self, path: str) -> bool:
-        """Check if path should be excluded from restore"""
-        for pattern in self.config['excluded_restore_paths']:
-            if pattern in path or path.endswith(pattern.replace('*', '')):
-                return True
-        return False
+    def exclude_globs(self) -> List[str]:
+        """Excluded restore paths as member globs (directory entries match anywhere in the path)"""
+        return [f"*{pattern}*" if pattern.endswith('/') else pattern
+                for pattern in self.config['excluded_restore_paths']]
     
-    def restore_files(self, extracted_dir: str, target_dir: str = '.') -> bool:
-        """Restore files from extracted backup"""
-        if self.config['dry_run_mode']:
-            self.logger.info("🔍 DRY RUN: Simulating file restore...")
-            return True
-        
+    def restore_files(self, backup_path: str, target_dir: str = '.',
+                      patterns: Optional[List[str]] = None) -> bool:
+        """Stream selected files from the backup archive straight to their destinations"""
         try:
-            restored_count = 0
-            skipped_count = 0
-            
-            for root, dirs, files in os.walk(extracted_dir):
-                # Skip excluded directories
-                dirs[:] = [d for d in dirs if not self.should_exclude_path(os.path.join(root, d))]
+            with StreamingArchiveRestore(backup_path, self.archive_checksums(backup_path), self.logger) as archive:
+                if self.config['dry_run_mode']:
+                    self.logger.info("🔍 DRY RUN: Simulating file restore...")
+                    stats = archive.restore(target_dir, patterns, self.exclude_globs(), dry_run=True)
+                    self.logger.info(f"🔍 DRY RUN: Would restore {stats['restored']} files ({stats['bytes']} bytes)")
+                    return True
                 
-                for file in files:
-                    source_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(source_path, extracted_dir)
-                    target_path = os.path.join(target_dir, relative_path)
-                    
-                    if self.should_exclude_path(relative_path):
-                        skipped_count += 1
-                        continue
-                    
-                    try:
-                        # Create target directory if needed
-                        os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                        
-                        # Copy file
-                        shutil.copy2(source_path, target_path)
-                        restored_count += 1
-                        
-                        if restored_count % 100 == 0:
-                            self.logger.info(f"📁 Restored {restored_count} files...")
-                    
-                    except Exception as e:
-                        self.logger.error(f"❌ Failed to restore {relative_path}: {e}")
-                        self.restore_results['errors'].append(f"Failed to restore {relative_path}")
+                stats = archive.restore(target_dir, patterns, self.exclude_globs())
             
-            self.restore_results['files_restored'] = restored_count
-            self.restore_results['files_skipped'] = skipped_count
+            for error in stats['errors']:
+                self.restore_results['errors'].append(f"Failed to restore {error}")
             
-            self.logger.info(f"✅ Restored {restored_count} files, skipped {skipped_count}")
-            return True
+            self.restore_results['files_restored'] = stats['restored']
+            self.restore_results['files_skipped'] = stats['skipped']
+            
+            self.logger.info(f"✅ Restored {stats['restored']} files, skipped {stats['skipped']}")
+            return stats['failed'] == 0
         
         except Exception as e:
             self.logger.error(f"❌ File restore failed: {e}")
             self.restore_results['errors'].append(f"File restore failed: {e}")
             return False
     
-    def run_restore_verification(self, backup_source: Optional[str] = None) -> Dict[str, Any]:
-        """Run complete restore verification process"""
+    def archive_checksums(self, backup_path: str) -> Dict[str, str]:
+        """Stored member checksums from the .checksums sidecar, if any"""
+        checksum_file = backup_path + '.checksums'
+        if not self.config['verify_checksums'] or not os.path.exists(checksum_file):
+            return {}
+        
+        with open(checksum_file, 'r') as f:
+            return json.load(f)
+    
+    def run_restore_verification(self, backup_source: Optional[str] = None,
+                                 patterns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run complete restore verification process
+        
+        Args:
+            backup_source: Local backup archive; when omitted the catalog's local copy of the
+                latest GitHub backup is used, and the repository is only cloned without one
+            patterns: Archive member globs to restore (default: everything not excluded)
+        """
         self.logger.info("🔄 Starting GitHub restore verification...")
         self.logger.info("=" * 60)
         
@@ -488,14 +465,18 @@ class GitHubRestoreSystem:
         start_time = datetime.now()
         
         try:
+            if not backup_source:
+                backup_source = self.find_cataloged_backup()
+            
             with tempfile.TemporaryDirectory(prefix=self.config['temp_dir_prefix']) as temp_dir:
                 repo_dir = os.path.join(temp_dir, 'repo')
                 
-                # Step 1: Clone backup repository
-                self.logger.info("📥 Step 1: Cloning backup repository...")
-                if not self.clone_backup_repository(repo_dir):
-                    self.restore_results['status'] = 'failed'
-                    return self.restore_results
+                # Step 1: Clone backup repository (not needed for a local archive)
+                if not backup_source:
+                    self.logger.info("📥 Step 1: Cloning backup repository...")
+                    if not self.clone_backup_repository(repo_dir):
+                        self.restore_results['status'] = 'failed'
+                        return self.restore_results
                 
                 # Step 2: Find latest backup
                 self.logger.info("🔍 Step 2: Finding latest backup...")
@@ -513,19 +494,12 @@ class GitHubRestoreSystem:
                 if not self.verify_backup_checksums(backup_path):
                     self.restore_results['warnings'].append("Backup integrity verification failed")
                 
-                # Step 4: Extract backup
-                self.logger.info("📦 Step 4: Extracting backup archive...")
-                extract_dir = os.path.join(temp_dir, 'extracted')
-                
-                with zipfile.ZipFile(backup_path, 'r') as zipf:
-                    zipf.extractall(extract_dir)
-                
-                # Step 5: Compare with live data (drift detection)
+                # Step 4: Compare with live data (drift detection), reading exports from the archive
                 if self.config['compare_with_live']:
-                    self.logger.info("📊 Step 5: Analyzing data drift...")
+                    self.logger.info("📊 Step 4: Analyzing data drift...")
                     
-                    backup_data = self.load_backup_data(extract_dir)
-                    live_data = self.fetch_live_data()
+                    backup_data = self.load_backup_data(backup_path)
+                    live_data = self.live_table_sources()
                     
                     drift_analysis = self.analyze_data_drift(backup_data, live_data)
                     self.restore_results['drift_analysis'] = drift_analysis
@@ -538,9 +512,9 @@ class GitHubRestoreSystem:
                     
                     self.restore_results['recommendations'].extend(drift_analysis['recommendations'])
                 
-                # Step 6: Restore files
-                self.logger.info("📁 Step 6: Restoring files...")
-                if not self.restore_files(extract_dir):
+                # Step 5: Stream files from the archive
+                self.logger.info("📁 Step 5: Restoring files...")
+                if not self.restore_files(backup_path, patterns=patterns):
                     self.restore_results['status'] = 'partial'
                 else:
                     self.restore_results['status'] = 'success'
@@ -646,6 +620,8 @@ def main():
     parser.add_argument('--no-drift-check', action='store_true', help='Skip data drift analysis')
     parser.add_argument('--no-checksum-verify', action='store_true', help='Skip checksum verification')
     parser.add_argument('--drift-threshold', type=float, default=10, help='Max drift threshold percentage')
+    parser.add_argument('--path', action='append', dest='paths',
+                        help='Archive member glob to restore (repeatable, e.g. "memory/*")')
     
     args = parser.parse_args()
     
@@ -663,7 +639,7 @@ def main():
             restore_system.config['max_drift_threshold'] = args.drift_threshold
         
         if args.run or not any(vars(args).values()):
-            results = restore_system.run_restore_verification(args.backup_file)
+            results = restore_system.run_restore_verification(args.backup_file, patterns=args.paths)
             
             # Exit codes based on results
             if results['status'] == 'success':
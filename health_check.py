@@ -23,6 +23,10 @@ import hashlib
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
+from utils.logger import get_logger
+from utils.backup_catalog import DEFAULT_CATALOG_PATH, open_backup_catalog
+from utils.health_probes import Probe, ProbeRunner, open_probe_cache
+
 try:
     from alerts.notify import AlertManager
 except ImportError:
@@ -55,7 +59,8 @@ class DeepHealthCheckSystem:
             'validate_data_integrity': True,
             'check_log_rotation': True,
             'verify_backup_freshness': True,
-            'max_backup_age_hours': 48
+            'max_backup_age_hours': 48,
+            'force_refresh': False  # Ignore cached probe results
         }
         
         # Health check results
@@ -86,36 +91,27 @@ class DeepHealthCheckSystem:
             ('service_processes', self.check_service_processes, False)
         ]
         
+        # How long each result stays fresh (seconds) and what has to succeed first
+        self.probe_options = {
+            'system_resources': {'ttl': 30},
+            'disk_space': {'ttl': 300},
+            'supabase_connectivity': {'ttl': 60},
+            'notion_connectivity': {'ttl': 120},
+            'git_operations': {'ttl': 120},
+            'memory_bridge': {'ttl': 60},
+            'log_system': {'ttl': 300},
+            'backup_freshness': {'ttl': 600},
+            'data_integrity': {'ttl': 600, 'depends_on': ['supabase_connectivity']},
+            'service_processes': {'ttl': 60}
+        }
+        
         self.logger.info("❤️ Angles AI Universe™ Deep Health Check System Initialized")
     
     def setup_logging(self):
         """Setup logging for health check system"""
         os.makedirs("logs/health", exist_ok=True)
         
-        self.logger = logging.getLogger('health_check')
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # File handler
-        log_file = "logs/health/health_check.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.logger = get_logger('health_check', log_file="logs/health/health_check.log")
     
     def load_environment(self):
         """Load environment variables"""
@@ -124,6 +120,7 @@ class DeepHealthCheckSystem:
             'supabase_key': os.getenv('SUPABASE_KEY'),
             'notion_token': os.getenv('NOTION_TOKEN'),
             'notion_database_id': os.getenv('NOTION_DATABASE_ID'),
+            'notion_api_base_url': os.getenv('NOTION_API_BASE_URL', 'https://api.notion.com'),
             'github_token': os.getenv('GITHUB_TOKEN'),
             'repo_url': os.getenv('REPO_URL')
         }
@@ -293,7 +290,7 @@ class DeepHealthCheckSystem:
             }
             
             # Test with simple API call
-            url = 'https://api.notion.com/v1/users/me'
+            url = f"{self.env['notion_api_base_url']}/v1/users/me"
             
             start_time = time.time()
             response = requests.get(url, headers=headers, timeout=self.config['timeout_per_check'])
@@ -493,23 +490,35 @@ class DeepHealthCheckSystem:
                 result['issues'].append('Backup directory not found')
                 return result
             
-            # Find backups
-            backup_files = []
-            for filename in os.listdir(backup_dir):
-                if filename.endswith('.zip') and filename.startswith('backup_'):
-                    backup_files.append(filename)
-            
-            result['metrics']['backup_count'] = len(backup_files)
-            
-            if backup_files:
-                # Find latest backup
-                backup_files.sort(reverse=True)
-                latest_backup = os.path.join(backup_dir, backup_files[0])
+            # Prefer the backup catalog (all sources) over listing the directory
+            catalog_summary = None
+            catalog_path = os.getenv('BACKUP_CATALOG_PATH', DEFAULT_CATALOG_PATH)
+            if os.path.exists(catalog_path):
+                catalog = open_backup_catalog(catalog_path)
+                try:
+                    catalog_summary = catalog.summary()
+                finally:
+                    catalog.close()
+            
+            if catalog_summary and catalog_summary['backup_count']:
+                result['metrics']['backup_count'] = catalog_summary['backup_count']
+                result['metrics']['latest_backup_age_hours'] = catalog_summary['latest_backup_age_hours']
+                result['metrics']['backup_sources'] = catalog_summary['sources']
+            else:
+                backup_files = [filename for filename in os.listdir(backup_dir)
+                                if filename.endswith('.zip') and filename.startswith('backup_')]
+                result['metrics']['backup_count'] = len(backup_files)
                 
+                if backup_files:
+                    # Find latest backup
+                    backup_files.sort(reverse=True)
+                    latest_backup = os.path.join(backup_dir, backup_files[0])
+                    backup_time = datetime.fromtimestamp(os.path.getmtime(latest_backup))
+                    result['metrics']['latest_backup_age_hours'] = (datetime.now() - backup_time).total_seconds() / 3600
+            
+            if result['metrics']['backup_count']:
                 # Check age
-                backup_time = datetime.fromtimestamp(os.path.getmtime(latest_backup))
-                age_hours = (datetime.now() - backup_time).total_seconds() / 3600
-                result['metrics']['latest_backup_age_hours'] = age_hours
+                age_hours = result['metrics']['latest_backup_age_hours']
                 
                 if age_hours > self.config['max_backup_age_hours'] * 2:
                     result['status'] = 'critical'
@@ -778,6 +787,24 @@ class DeepHealthCheckSystem:
         except Exception as e:
             self.logger.error(f"❌ Failed to send health alert: {e}")
     
+    def build_probe_runner(self) -> ProbeRunner:
+        """Probes for every defined check, sharing the cross-process result cache"""
+        probes = [
+            Probe(check_name, check_function,
+                  ttl=self.probe_options.get(check_name, {}).get('ttl', 60),
+                  timeout=self.config['timeout_per_check'],
+                  depends_on=self.probe_options.get(check_name, {}).get('depends_on', ()),
+                  critical=is_critical)
+            for check_name, check_function, is_critical in self.health_checks
+        ]
+        
+        # Keep dependencies of a reduced (--quick) check list resolvable
+        names = {probe.name for probe in probes}
+        for probe in probes:
+            probe.depends_on = tuple(dependency for dependency in probe.depends_on if dependency in names)
+        
+        return ProbeRunner(probes, cache=open_probe_cache())
+    
     def run_deep_health_check(self) -> Dict[str, Any]:
         """Run complete deep health check"""
         self.logger.info("❤️ Starting deep system health check...")
@@ -786,12 +813,17 @@ class DeepHealthCheckSystem:
         start_time = datetime.now()
         
         try:
-            # Run all health checks
-            for check_name, check_function, is_critical in self.health_checks:
-                self.logger.info(f"🔍 Running {check_name} check...")
-                
+            # Run all health checks concurrently, reusing results that are still fresh
+            self.logger.info(f"🔍 Running {len(self.health_checks)} checks concurrently...")
+            runner = self.build_probe_runner()
+            try:
+                probe_results = runner.run(force=self.config['force_refresh'])
+            finally:
+                runner.cache.close()
+            
+            for check_name, _, is_critical in self.health_checks:
                 try:
-                    check_result = check_function()
+                    check_result = probe_results[check_name]
                     self.health_results['checks'][check_name] = check_result
                     
                     # Collect issues
@@ -810,7 +842,9 @@ class DeepHealthCheckSystem:
                         'info': 'ℹ️'
                     }.get(check_result['status'], '❓')
                     
-                    self.logger.info(f"   {status_icon} {check_name}: {check_result['status']}")
+                    cached = ' (cached)' if check_result.get('cached') else ''
+                    self.logger.info(f"   {status_icon} {check_name}: {check_result['status']}{cached} "
+                                     f"[{check_result.get('duration_ms', 0):.0f}ms]")
                     
                     if check_result.get('issues'):
                         for issue in check_result['issues'][:3]:  # Show first 3 issues
@@ -902,6 +936,7 @@ def main():
     parser.add_argument('--quick', action='store_true', help='Run only critical checks')
     parser.add_argument('--no-alerts', action='store_true', help='Disable alert notifications')
     parser.add_argument('--save-snapshot', action='store_true', help='Save detailed health snapshot')
+    parser.add_argument('--fresh', action='store_true', help='Ignore cached probe results and rerun every check')
     
     args = parser.parse_args()
     
@@ -912,6 +947,9 @@ def main():
         if args.no_alerts:
             health_system.alert_manager = None
         
+        if args.fresh:
+            health_system.config['force_refresh'] = True
+        
         if args.quick:
             # Only run critical checks
             health_system.health_checks = [
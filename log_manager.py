@@ -13,11 +13,18 @@ import gzip
 import shutil
 import logging
 import glob
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 import json
 
+from utils.logger import get_logger
+from utils.log_compression import (
+    CODEC_GZIP, CODEC_ZSTD, ZSTD_AVAILABLE, compress_file, compressed_suffix,
+    latest_dictionary, train_dictionary
+)
+
 # Import alert manager
 try:
     from alerts.notify import AlertManager
@@ -42,30 +49,7 @@ class LogManager:
     
     def setup_logging(self):
         """Setup logging for log manager"""
-        self.logger = logging.getLogger('log_manager')
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # File handler
-        log_file = "logs/active/log_manager.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.logger = get_logger('log_manager', log_file="logs/active/log_manager.log")
     
     def load_configuration(self):
         """Load log retention configuration"""
@@ -96,7 +80,15 @@ class LogManager:
             
             # Compression settings
             'compress_after_days': 7,
-            'compression_level': 6
+            'compression_level': 6,
+            'compression_codec': os.getenv('LOG_COMPRESSION_CODEC', CODEC_GZIP),  # gzip or zstd
+            'compression_workers': int(os.getenv('LOG_COMPRESSION_WORKERS', str(os.cpu_count() or 1))),
+            'zstd_level': 10,
+            'zstd_dictionary': True,        # Train a shared dictionary on archived lines
+            'dictionary_max_age_days': 30,  # Retrain after this many days
+            
+            # Rotation: copytruncate keeps open handles valid, move is the legacy behaviour
+            'rotation_mode': os.getenv('LOG_ROTATION_MODE', 'copytruncate')
         }
         
         self.logger.info("📋 Log retention configuration loaded")
@@ -154,11 +146,11 @@ class LogManager:
                     archive_name = f"{Path(file_path).stem}_{timestamp}.log"
                     archive_path = f"logs/archive/{archive_name}"
                     
-                    # Move to archive
-                    shutil.move(file_path, archive_path)
-                    
-                    # Create new empty log file
-                    Path(file_path).touch()
+                    if self.config['rotation_mode'] == 'move':
+                        shutil.move(file_path, archive_path)
+                        Path(file_path).touch()
+                    else:
+                        self.copy_truncate(file_path, archive_path)
                     
                     rotation_stats['files_rotated'] += 1
                     rotation_stats['total_size_freed'] += file_size_mb
@@ -173,6 +165,23 @@ class LogManager:
         self.logger.info(f"🔄 Rotation complete: {rotation_stats['files_rotated']} files rotated, {rotation_stats['total_size_freed']:.1f}MB freed")
         return rotation_stats
     
+    def copy_truncate(self, file_path: str, archive_path: str):
+        """
+        Copy a live log to the archive, then truncate it in place
+        
+        Writers keep their open handles; logging opens files in append mode,
+        so they continue at the new end of file. Bytes appended while copying
+        are copied too before the truncate, leaving only the gap between the
+        last read and the truncate call.
+        """
+        with open(file_path, 'rb') as f_in, open(archive_path, 'wb') as f_out:
+            while True:
+                chunk = f_in.read(1024 * 1024)
+                if not chunk:
+                    break
+                f_out.write(chunk)
+            os.truncate(file_path, 0)
+    
     def archive_old_files(self) -> Dict[str, Any]:
         """Archive files older than retention period"""
         self.logger.info("📦 Archiving old active log files...")
@@ -222,7 +231,7 @@ class LogManager:
         return archive_stats
     
     def compress_archive_files(self) -> Dict[str, Any]:
-        """Compress archived files older than compression threshold"""
+        """Compress archived files older than compression threshold across a thread pool"""
         self.logger.info("🗜️ Compressing old archive files...")
         
         compression_stats = {
@@ -230,57 +239,121 @@ class LogManager:
             'files_checked': 0,
             'compression_ratio': 0,
             'space_saved': 0,
+            'codec': self.config['compression_codec'],
+            'dictionary': None,
+            'workers': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'bytes_per_second': 0,
             'errors': []
         }
         
         archive_files = glob.glob("logs/archive/*.log")
         cutoff_days = self.config['compress_after_days']
-        total_original_size = 0
-        total_compressed_size = 0
+        candidates = []
         
         for file_path in archive_files:
             compression_stats['files_checked'] += 1
-            
             try:
                 stat_info = os.stat(file_path)
                 age_days = self.check_file_age(file_path, stat_info)
-                
                 if age_days > cutoff_days:
-                    file_size_mb = self.check_file_size(stat_info)
                     self.logger.info(f"🗜️ Compressing archive file: {file_path} ({age_days} days old)")
-                    
-                    # Create compressed file path
-                    compressed_path = f"logs/compressed/{Path(file_path).name}.gz"
-                    
-                    # Compress file
-                    with open(file_path, 'rb') as f_in:
-                        with gzip.open(compressed_path, 'wb', compresslevel=self.config['compression_level']) as f_out:
-                            shutil.copyfileobj(f_in, f_out)
-                    
-                    # Get compressed file size
-                    compressed_size = os.path.getsize(compressed_path) / (1024 * 1024)
-                    
-                    # Remove original
-                    os.remove(file_path)
-                    
-                    compression_stats['files_compressed'] += 1
-                    total_original_size += file_size_mb
-                    total_compressed_size += compressed_size
-                    
-                    self.logger.info(f"✅ Compressed {file_path} ({file_size_mb:.1f}MB → {compressed_size:.1f}MB)")
-                    
-            except Exception as e:
+                    candidates.append(file_path)
+            except OSError as e:
                 error_msg = f"Failed to compress {file_path}: {str(e)}"
                 compression_stats['errors'].append(error_msg)
                 self.logger.error(f"❌ {error_msg}")
         
+        if not candidates:
+            self.logger.info("🗜️ Compression complete: no archives due")
+            return compression_stats
+        
+        codec = compression_stats['codec']
+        if codec == CODEC_ZSTD and not ZSTD_AVAILABLE:
+            self.logger.warning("⚠️ zstandard not installed, falling back to gzip")
+            codec = compression_stats['codec'] = CODEC_GZIP
+        
+        level = self.config['zstd_level'] if codec == CODEC_ZSTD else self.config['compression_level']
+        dictionary_path = self.get_compression_dictionary(candidates) if codec == CODEC_ZSTD else None
+        compression_stats['dictionary'] = dictionary_path
+        
+        workers = max(1, min(self.config['compression_workers'], len(candidates)))
+        compression_stats['workers'] = workers
+        jobs = [(file_path, f"logs/compressed/{Path(file_path).name}{compressed_suffix(codec)}")
+                for file_path in candidates]
+        
+        start = datetime.now(timezone.utc)
+        
+        def record(result):
+            # Remove original only once its archive is safely in place
+            os.remove(result['source'])
+            compression_stats['files_compressed'] += 1
+            compression_stats['bytes_in'] += result['bytes_in']
+            compression_stats['bytes_out'] += result['bytes_out']
+            self.logger.info(f"✅ Compressed {result['source']} "
+                             f"({result['bytes_in'] / (1024 * 1024):.1f}MB → {result['bytes_out'] / (1024 * 1024):.1f}MB)")
+        
+        def record_error(file_path, error):
+            error_msg = f"Failed to compress {file_path}: {str(error)}"
+            compression_stats['errors'].append(error_msg)
+            self.logger.error(f"❌ {error_msg}")
+        
+        if workers == 1:
+            for source, target in jobs:
+                try:
+                    record(compress_file(source, target, codec, level, dictionary_path))
+                except Exception as e:
+                    record_error(source, e)
+        else:
+            # Threads, not processes: forking while the logging, tracing and spool
+            # threads hold locks can deadlock the children, and zlib/zstd release
+            # the GIL while compressing
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='log-compress') as pool:
+                futures = {pool.submit(compress_file, source, target, codec, level, dictionary_path): source
+                           for source, target in jobs}
+                for future in as_completed(futures):
+                    try:
+                        record(future.result())
+                    except Exception as e:
+                        record_error(futures[future], e)
+        
+        elapsed = max((datetime.now(timezone.utc) - start).total_seconds(), 1e-6)
+        total_original_size = compression_stats['bytes_in'] / (1024 * 1024)
+        total_compressed_size = compression_stats['bytes_out'] / (1024 * 1024)
+        compression_stats['bytes_per_second'] = round(compression_stats['bytes_in'] / elapsed, 1)
+        
         if total_original_size > 0:
             compression_stats['compression_ratio'] = (total_compressed_size / total_original_size) * 100
             compression_stats['space_saved'] = total_original_size - total_compressed_size
         
-        self.logger.info(f"🗜️ Compression complete: {compression_stats['files_compressed']} files, {compression_stats['compression_ratio']:.1f}% ratio, {compression_stats['space_saved']:.1f}MB saved")
+        self.logger.info(f"🗜️ Compression complete: {compression_stats['files_compressed']} files ({codec}, {workers} workers), "
+                         f"{compression_stats['compression_ratio']:.1f}% ratio, {compression_stats['space_saved']:.1f}MB saved, "
+                         f"{compression_stats['bytes_per_second'] / (1024 * 1024):.1f}MB/s")
         return compression_stats
     
+    def get_compression_dictionary(self, sample_files: List[str]) -> Optional[str]:
+        """Current zstd dictionary, retrained from sample files when missing or stale"""
+        if not self.config['zstd_dictionary']:
+            return None
+        
+        dictionary_path = latest_dictionary()
+        if dictionary_path:
+            age_days = self.check_file_age(dictionary_path, os.stat(dictionary_path))
+            if age_days <= self.config['dictionary_max_age_days']:
+                return dictionary_path
+        
+        try:
+            trained = train_dictionary(sample_files)
+        except Exception as e:
+            self.logger.warning(f"⚠️ zstd dictionary training failed: {e}")
+            trained = None
+        
+        if trained:
+            self.logger.info(f"📚 Trained zstd dictionary: {trained}")
+            return trained
+        return dictionary_path
+    
     def cleanup_old_compressed_files(self) -> Dict[str, Any]:
         """Remove compressed files older than retention period"""
         self.logger.info("🗑️ Cleaning up old compressed files...")
@@ -292,7 +365,7 @@ class LogManager:
             'errors': []
         }
         
-        compressed_files = glob.glob("logs/compressed/*.gz")
+        compressed_files = glob.glob("logs/compressed/*.gz") + glob.glob("logs/compressed/*.zst")
         cutoff_days = self.config['compressed_retention']
         
         for file_path in compressed_files:
@@ -407,7 +480,7 @@ class LogManager:
                 })
         
         # Check compressed files for cleanup
-        compressed_files = glob.glob("logs/compressed/*.gz")
+        compressed_files = glob.glob("logs/compressed/*.gz") + glob.glob("logs/compressed/*.zst")
         for file_path in compressed_files:
             try:
                 stat_info = os.stat(file_path)
@@ -486,6 +559,10 @@ class LogManager:
             self.logger.info(f"   Files rotated: {maintenance_result['rotation_stats']['files_rotated']}")
             self.logger.info(f"   Files archived: {maintenance_result['archive_stats']['files_archived']}")
             self.logger.info(f"   Files compressed: {maintenance_result['compression_stats']['files_compressed']}")
+            if maintenance_result['compression_stats'].get('bytes_in'):
+                compression = maintenance_result['compression_stats']
+                self.logger.info(f"   Compression: {compression['codec']}, {compression['compression_ratio']:.1f}% ratio, "
+                                 f"{compression['bytes_per_second'] / (1024 * 1024):.1f}MB/s")
             self.logger.info(f"   Files deleted: {maintenance_result['cleanup_stats']['files_deleted']}")
             
             if maintenance_result['errors']:
@@ -621,6 +698,7 @@ def main():
             print(f"\\n🗜️ Compression Results:")
             print(f"  Files compressed: {stats['files_compressed']}")
             print(f"  Compression ratio: {stats['compression_ratio']:.1f}%")
+            print(f"  Throughput: {stats['bytes_per_second'] / (1024 * 1024):.1f}MB/s ({stats['codec']}, {stats['workers']} workers)")
             print(f"  Space saved: {stats['space_saved']:.1f}MB")
         
         elif args.cleanup:
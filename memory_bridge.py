@@ -14,6 +14,9 @@ from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
 
+from utils.llm_cache import cached_chat_completion, is_json_object
+from utils.near_duplicates import get_duplicate_index
+
 # Check for OpenAI availability
 try:
     from openai import OpenAI
@@ -38,6 +41,27 @@ try:
 except ImportError:
     AI_CLIENT_AVAILABLE = False
 
+# Decisions packed into one classification request
+CLASSIFY_BATCH_SIZE = int(os.getenv('AI_CLASSIFY_BATCH_SIZE', '20'))
+
+# Offline batch jobs (request files and manifests)
+BATCH_JOBS_DIR = Path("logs/ai/batches")
+
+CLASSIFICATION_SYSTEM_PROMPT = """You are an expert system architect analyzing architectural decisions.
+The user message is JSON of the form {"decisions": [{"id": "...", "text": "..."}]}.
+Classify every decision and respond only with valid JSON of the form:
+{"classifications": {"<id>": {
+    "type": "architecture|technical|business|process|security",
+    "priority": "critical|high|medium|low",
+    "category": "specific category name",
+    "confidence": 0.0-1.0,
+    "key_concepts": ["concept1", "concept2"],
+    "potential_impact": "brief impact assessment",
+    "related_decisions": ["potential related areas"],
+    "action_items": ["actionable items if any"]
+}}}
+Use exactly the ids given in the input."""
+
 class AIEnhancedMemoryBridge:
     """
     GPT-5 Enhanced Memory Bridge for intelligent decision management
@@ -51,12 +75,16 @@ class AIEnhancedMemoryBridge:
     - Predictive memory insights
     """
     
-    def __init__(self, enable_ai: bool = True):
+    def __init__(self, enable_ai: bool = True, client: Any = None):
         self.logger = logging.getLogger('ai_memory_bridge')
-        self.enable_ai = enable_ai and OPENAI_AVAILABLE
+        self.enable_ai = enable_ai and (OPENAI_AVAILABLE or client is not None)
         
-        # Initialize OpenAI client using AI client module
-        if self.enable_ai and AI_CLIENT_AVAILABLE:
+        # Initialize OpenAI client using AI client module (or an injected client, e.g. StubChatClient)
+        if self.enable_ai and client is not None:
+            self.client = client
+            self.model = getattr(client, 'model', None) or (get_model() if AI_CLIENT_AVAILABLE else 'stub')
+            self.logger.info(f"✅ AI engine initialized with injected client - Model: {self.model}")
+        elif self.enable_ai and AI_CLIENT_AVAILABLE:
             self.client = get_client()
             self.model = get_model()
             if self.client:
@@ -111,7 +139,8 @@ class AIEnhancedMemoryBridge:
             }}
             """
             
-            response = self.client.chat.completions.create(
+            content = cached_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert system architect analyzing architectural decisions. Respond only with valid JSON."},
@@ -119,10 +148,11 @@ class AIEnhancedMemoryBridge:
                 ],
                 response_format={"type": "json_object"},
                 max_tokens=500,
-                temperature=0.3
+                temperature=0.3,
+                validate=self._is_classification
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             
             # Add metadata
             result['ai_analysis'] = True
@@ -136,6 +166,202 @@ class AIEnhancedMemoryBridge:
             self.logger.error(f"❌ AI classification failed: {e}")
             return self._fallback_classification(decision_text)
     
+    def classify_decisions(self, decisions: Dict[str, str],
+                           batch_size: int = CLASSIFY_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Classify many decisions, packing ``batch_size`` decisions per request
+        
+        Args:
+            decisions: Mapping of decision id to decision text
+            batch_size: Decisions per chat request
+            
+        Returns:
+            Classification per decision id. Items that are missing or malformed
+            in the model output fall back to keyword classification one by one.
+        """
+        if not self.enable_ai:
+            return {decision_id: self._fallback_classification(text) for decision_id, text in decisions.items()}
+        
+        results = {}
+        fallbacks = 0
+        items = list(decisions.items())
+        
+        for start in range(0, len(items), batch_size):
+            chunk = dict(items[start:start + batch_size])
+            
+            try:
+                content = cached_chat_completion(
+                    self.client,
+                    model=self.model,
+                    # Partial answers are used but not cached, so missing items are retried
+                    validate=lambda content: len(self._parse_batch_classifications(content, chunk)) == len(chunk),
+                    **self._batch_classification_request(chunk)
+                )
+                parsed = self._parse_batch_classifications(content, chunk)
+            except Exception as e:
+                self.logger.error(f"❌ AI batch classification failed: {e}")
+                parsed = {}
+            
+            for decision_id, text in chunk.items():
+                if decision_id in parsed:
+                    results[decision_id] = parsed[decision_id]
+                else:
+                    results[decision_id] = self._fallback_classification(text)
+                    fallbacks += 1
+        
+        self.logger.info(f"✅ AI batch classification completed: {len(results)} decisions, {fallbacks} fallbacks")
+        return results
+    
+    @staticmethod
+    def _is_classification(content: str) -> bool:
+        """Whether a single classification response is usable (and so worth caching)"""
+        result = json.loads(content)
+        return isinstance(result, dict) and isinstance(result.get('type'), str) \
+            and isinstance(result.get('priority'), str)
+    
+    def _batch_classification_request(self, chunk: Dict[str, str]) -> Dict[str, Any]:
+        """Chat request parameters (without model) for one classification batch"""
+        payload = {'decisions': [{'id': decision_id, 'text': text} for decision_id, text in chunk.items()]}
+        return {
+            'messages': [
+                {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+            ],
+            'response_format': {"type": "json_object"},
+            'max_tokens': 300 * len(chunk) + 200,
+            'temperature': 0.3
+        }
+    
+    def _parse_batch_classifications(self, content: Optional[str],
+                                     chunk: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Extract valid per-id classifications from a batch response"""
+        try:
+            data = json.loads(content or '')
+        except ValueError:
+            self.logger.warning(f"⚠️ Malformed batch classification response ({len(chunk)} decisions)")
+            return {}
+        
+        classifications = data.get('classifications') if isinstance(data, dict) else None
+        if isinstance(classifications, list):
+            classifications = {str(item.get('id')): item for item in classifications if isinstance(item, dict)}
+        if not isinstance(classifications, dict):
+            return {}
+        
+        timestamp = datetime.now(timezone.utc).isoformat()
+        parsed = {}
+        for decision_id in chunk:
+            result = classifications.get(decision_id)
+            if not isinstance(result, dict) or not isinstance(result.get('type'), str) \
+                    or not isinstance(result.get('priority'), str):
+                continue
+            result = {key: value for key, value in result.items() if key != 'id'}
+            result['ai_analysis'] = True
+            result['analysis_timestamp'] = timestamp
+            result['model_used'] = self.model
+            parsed[decision_id] = result
+        
+        return parsed
+    
+    def submit_classification_batch(self, decisions: Dict[str, str],
+                                    batch_size: int = CLASSIFY_BATCH_SIZE) -> Optional[str]:
+        """
+        Submit a large backfill through the OpenAI Batch API (offline, 24h window)
+        
+        Args:
+            decisions: Mapping of decision id to decision text
+            batch_size: Decisions per chat request inside the job
+            
+        Returns:
+            Batch job id, or None if AI is unavailable or submission failed
+        """
+        if not self.enable_ai:
+            self.logger.warning("⚠️ AI disabled - batch submission skipped")
+            return None
+        
+        BATCH_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        requests_file = BATCH_JOBS_DIR / f"classify_{timestamp}.jsonl"
+        
+        items = list(decisions.items())
+        chunks = {}
+        with open(requests_file, 'w') as f:
+            for start in range(0, len(items), batch_size):
+                custom_id = f"chunk-{start // batch_size}"
+                chunk = dict(items[start:start + batch_size])
+                chunks[custom_id] = chunk
+                f.write(json.dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': {'model': self.model, **self._batch_classification_request(chunk)}
+                }, ensure_ascii=False) + '\n')
+        
+        try:
+            with open(requests_file, 'rb') as f:
+                uploaded = self.client.files.create(file=f, purpose='batch')
+            job = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
+            )
+        except Exception as e:
+            self.logger.error(f"❌ Batch submission failed: {e}")
+            return None
+        
+        with open(BATCH_JOBS_DIR / f"{job.id}.json", 'w') as f:
+            json.dump({
+                'batch_id': job.id,
+                'submitted_at': datetime.now(timezone.utc).isoformat(),
+                'model': self.model,
+                'requests_file': str(requests_file),
+                'chunks': chunks
+            }, f, indent=2, ensure_ascii=False)
+        
+        self.logger.info(f"📤 Submitted classification batch {job.id}: {len(items)} decisions in {len(chunks)} requests")
+        return job.id
+    
+    def collect_classification_batch(self, batch_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Collect results of a submitted batch job
+        
+        Returns:
+            Classification per decision id (with per-item fallback), or None
+            while the job is still running
+        """
+        with open(BATCH_JOBS_DIR / f"{batch_id}.json", 'r') as f:
+            manifest = json.load(f)
+        chunks = manifest['chunks']
+        
+        job = self.client.batches.retrieve(batch_id)
+        if job.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            self.logger.info(f"⏳ Batch {batch_id} is {job.status}")
+            return None
+        
+        parsed = {}
+        if job.status == 'completed' and getattr(job, 'output_file_id', None):
+            output = self.client.files.content(job.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    chunk = chunks.get(entry.get('custom_id'), {})
+                    body = (entry.get('response') or {}).get('body') or {}
+                    content = body['choices'][0]['message']['content']
+                except (ValueError, KeyError, IndexError, TypeError):
+                    continue
+                parsed.update(self._parse_batch_classifications(content, chunk))
+        else:
+            self.logger.warning(f"⚠️ Batch {batch_id} ended as {job.status} - using fallback classification")
+        
+        results = {}
+        for chunk in chunks.values():
+            for decision_id, text in chunk.items():
+                results[decision_id] = parsed.get(decision_id) or self._fallback_classification(text)
+        
+        self.logger.info(f"📥 Collected batch {batch_id}: {len(parsed)}/{len(results)} classified by AI")
+        return results
+    
     def _fallback_classification(self, decision_text: str) -> Dict[str, Any]:
         """Fallback classification using keyword matching"""
         text_lower = decision_text.lower()
@@ -222,7 +448,8 @@ class AIEnhancedMemoryBridge:
             - Risk assessment
             """
             
-            response = self.client.chat.completions.create(
+            content = cached_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert technical writer specializing in architectural decisions. Respond only with valid JSON."},
@@ -230,10 +457,11 @@ class AIEnhancedMemoryBridge:
                 ],
                 response_format={"type": "json_object"},
                 max_tokens=800,
-                temperature=0.4
+                temperature=0.4,
+                validate=is_json_object
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             result['ai_optimized'] = True
             result['optimization_timestamp'] = datetime.now(timezone.utc).isoformat()
             
@@ -250,64 +478,35 @@ class AIEnhancedMemoryBridge:
                 'error': str(e)
             }
     
-    def find_similar_decisions(self, decision_text: str, 
-                             existing_decisions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def find_similar_decisions(self, decision_text: str,
+                             existing_decisions: Optional[List[Dict[str, Any]]] = None,
+                             threshold: Optional[float] = None,
+                             limit: int = 10) -> List[Dict[str, Any]]:
         """
-        AI-powered similarity detection for duplicate prevention
+        Local near-duplicate detection (MinHash/LSH) for duplicate prevention
         
         Args:
             decision_text: New decision to check
-            existing_decisions: List of existing decisions to compare against
+            existing_decisions: Decisions to compare against; indexed on the fly
+                if missing. When omitted the full decision_vault index is searched.
+            threshold: Minimum estimated similarity (default DUPLICATE_THRESHOLD)
+            limit: Maximum number of matches
             
         Returns:
             List of similar decisions with similarity scores
         """
-        if not self.enable_ai or not existing_decisions:
-            return []
-        
         try:
-            # Prepare existing decisions for comparison
-            decision_texts = [
-                f"ID: {d.get('id', 'unknown')}\nText: {d.get('decision', d.get('text', ''))}"
-                for d in existing_decisions[:20]  # Limit to prevent token overflow
-            ]
-            
-            prompt = f"""
-            Find decisions similar to this new decision:
-            
-            New Decision: {decision_text}
-            
-            Existing Decisions:
-            {chr(10).join(decision_texts)}
-            
-            Please provide a JSON response with:
-            {{
-                "similar_decisions": [
-                    {{
-                        "id": "decision_id",
-                        "similarity_score": 0.0-1.0,
-                        "reason": "why they are similar",
-                        "overlap_type": "duplicate|related|complementary"
-                    }}
-                ]
-            }}
-            
-            Only include decisions with similarity_score > 0.6
-            """
+            index = get_duplicate_index()
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at analyzing architectural decisions for similarities and duplicates. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=600,
-                temperature=0.2
-            )
+            candidate_ids = None
+            if existing_decisions is not None:
+                if not existing_decisions:
+                    return []
+                index.add_many(d for d in existing_decisions if d.get('id') is not None and d['id'] not in index)
+                candidate_ids = {str(d['id']) for d in existing_decisions if d.get('id') is not None}
             
-            result = json.loads(response.choices[0].message.content)
-            similar_decisions = result.get('similar_decisions', [])
+            similar_decisions = index.query(decision_text, threshold=threshold, limit=limit,
+                                            candidate_ids=candidate_ids)
             
             self.logger.info(f"✅ Found {len(similar_decisions)} similar decisions")
             return similar_decisions
@@ -369,7 +568,8 @@ class AIEnhancedMemoryBridge:
             }}
             """
             
-            response = self.client.chat.completions.create(
+            content = cached_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert enterprise architect analyzing decision patterns and trends. Respond only with valid JSON."},
@@ -377,10 +577,11 @@ class AIEnhancedMemoryBridge:
                 ],
                 response_format={"type": "json_object"},
                 max_tokens=1000,
-                temperature=0.3
+                temperature=0.3,
+                validate=is_json_object
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             result['ai_generated'] = True
             result['analysis_timestamp'] = datetime.now(timezone.utc).isoformat()
             result['model_used'] = self.model
@@ -454,18 +655,19 @@ class AIEnhancedMemoryBridge:
         }
         
         # Analyze each decision individually (limit to prevent resource exhaustion)
+        texts = {}
         for i, decision in enumerate(decisions[:10]):  # Limit for performance
-            decision_id = decision.get('id', f'decision_{i}')
             decision_text = decision.get('decision', decision.get('text', ''))
-            
             if decision_text:
-                # Classify decision
-                classification = self.classify_decision(decision_text)
-                report['classifications'][decision_id] = classification
-                
-                # Optimize decision text
-                optimization = self.optimize_decision_text(decision_text)
-                report['optimizations'][decision_id] = optimization
+                texts[str(decision.get('id', f'decision_{i}'))] = decision_text
+        
+        # Classify decisions (batched request)
+        report['classifications'] = self.classify_decisions(texts)
+        
+        for decision_id, decision_text in texts.items():
+            # Optimize decision text
+            optimization = self.optimize_decision_text(decision_text)
+            report['optimizations'][decision_id] = optimization
         
         # Find potential duplicates
         if len(decisions) > 1:
@@ -10,8 +10,11 @@ Version: 1.0.0
 import os
 import sys
 import json
+import hashlib
 import logging
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional
 from pathlib import Path
@@ -42,6 +45,11 @@ except ImportError:
     AI_BRIDGE_AVAILABLE = False
     AIEnhancedMemoryBridge = None
 
+# Classifications collected from offline batch backfills, keyed by decision checksum
+AI_CLASSIFICATIONS_FILE = Path("memory/ai_classifications.json")
+# Most recent classifications kept in that file
+AI_CLASSIFICATIONS_MAX = int(os.getenv('AI_CLASSIFICATIONS_MAX', '10000'))
+
 def setup_logging():
     """Setup logging for memory sync"""
     os.makedirs("logs/active", exist_ok=True)
@@ -78,7 +86,8 @@ class NotionClient:
     def __init__(self, token: str, database_id: str):
         self.token = token
         self.database_id = database_id
-        self.base_url = "https://api.notion.com/v1"
+        # NOTION_API_BASE_URL points at a local stand-in (tools/fake_services.py)
+        self.base_url = f"{os.getenv('NOTION_API_BASE_URL', 'https://api.notion.com')}/v1"
         
         self.headers = {
             'Authorization': f'Bearer {token}',
@@ -178,6 +187,15 @@ class MemorySync:
             'skipped': 0
         }
         
+        # Staged pipeline settings (AI enrichment pool, Notion writer pool, batch size)
+        self.ai_workers = int(os.getenv('MEMORY_SYNC_AI_WORKERS', '4'))
+        self.notion_workers = int(os.getenv('MEMORY_SYNC_NOTION_WORKERS', '3'))
+        self.batch_size = int(os.getenv('MEMORY_SYNC_BATCH_SIZE', '100'))
+        
+        # AI enrichment results keyed by decision checksum (seeded from collected offline backfills)
+        self._ai_cache: Dict[str, Dict[str, Any]] = self._load_ai_classifications()
+        self._ai_cache_lock = threading.Lock()
+        
         # Initialize AI bridge for GPT-5 analysis
         if AI_BRIDGE_AVAILABLE:
             try:
@@ -236,8 +254,8 @@ class MemorySync:
             if not decision_text:
                 return decision
             
-            # Get AI classification and analysis
-            ai_analysis = self.ai_bridge.classify_decision(decision_text)
+            # Get AI classification and analysis (cached per decision checksum)
+            ai_analysis = self._classify_cached(decision_text)
             
             # Create enhanced decision with AI insights
             enhanced_decision = decision.copy()
@@ -263,6 +281,123 @@ class MemorySync:
             enhanced_decision['ai_timestamp'] = datetime.now(timezone.utc).isoformat()
             return enhanced_decision
     
+    @staticmethod
+    def decision_checksum(decision_text: str) -> str:
+        """Checksum of the decision text used as AI cache key"""
+        return hashlib.sha256(decision_text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _from_model(classification: Dict[str, Any]) -> bool:
+        """Whether a classification came from the model (keyword fallbacks are never cached)"""
+        return isinstance(classification, dict) and classification.get('ai_analysis') is True
+    
+    def _classify_cached(self, decision_text: str) -> Dict[str, Any]:
+        """Classify a decision, reusing earlier model results for identical text"""
+        key = self.decision_checksum(decision_text)
+        
+        with self._ai_cache_lock:
+            cached = self._ai_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        ai_analysis = self.ai_bridge.classify_decision(decision_text)
+        
+        if self._from_model(ai_analysis):
+            with self._ai_cache_lock:
+                self._ai_cache[key] = ai_analysis
+        return ai_analysis
+    
+    def _prime_ai_cache(self, batch: List[Dict[str, Any]]):
+        """Classify a batch's uncached decisions with packed requests before enrichment"""
+        if not self.ai_bridge:
+            return
+        
+        pending = {}
+        with self._ai_cache_lock:
+            for decision in batch:
+                decision_text = decision.get('decision', '')
+                if decision_text:
+                    key = self.decision_checksum(decision_text)
+                    if key not in self._ai_cache:
+                        pending[key] = decision_text
+        
+        if not pending:
+            return
+        
+        try:
+            classifications = self.ai_bridge.classify_decisions(pending)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Batch AI classification failed, falling back per decision: {e}")
+            return
+        
+        with self._ai_cache_lock:
+            self._ai_cache.update((key, value) for key, value in classifications.items() if self._from_model(value))
+    
+    def _load_ai_classifications(self) -> Dict[str, Dict[str, Any]]:
+        """Load classifications collected from offline batch backfills"""
+        try:
+            if AI_CLASSIFICATIONS_FILE.exists():
+                with open(AI_CLASSIFICATIONS_FILE, 'r') as f:
+                    stored = json.load(f)
+                # Files written before fallbacks were filtered may still hold some
+                return {key: value for key, value in stored.items() if self._from_model(value)}
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to load stored AI classifications: {e}")
+        return {}
+    
+    def submit_ai_backfill(self) -> Optional[str]:
+        """Submit every decision for offline batch classification"""
+        if not self.ai_bridge:
+            self.logger.warning("⚠️ AI analysis not available - backfill skipped")
+            return None
+        
+        decisions = self.get_unsynced_decisions(sync_all=True)
+        pending = {}
+        for decision in decisions:
+            decision_text = decision.get('decision', '')
+            if decision_text:
+                key = self.decision_checksum(decision_text)
+                if key not in self._ai_cache:
+                    pending[key] = decision_text
+        
+        if not pending:
+            self.logger.info("✅ All decisions already classified")
+            return None
+        
+        if self.dry_run:
+            self.logger.info(f"🔍 [DRY RUN] Would submit {len(pending)} decisions for batch classification")
+            return None
+        
+        return self.ai_bridge.submit_classification_batch(pending)
+    
+    def collect_ai_backfill(self, batch_id: str) -> bool:
+        """Collect an offline batch and store its classifications for later syncs"""
+        if not self.ai_bridge:
+            self.logger.warning("⚠️ AI analysis not available - nothing to collect")
+            return False
+        
+        classifications = self.ai_bridge.collect_classification_batch(batch_id)
+        if classifications is None:
+            return False
+        
+        stored = {key: value for key, value in classifications.items() if self._from_model(value)}
+        with self._ai_cache_lock:
+            for key, value in stored.items():
+                self._ai_cache.pop(key, None)
+                self._ai_cache[key] = value
+            # Newest entries last (dict order); older ones beyond the cap are dropped
+            kept = dict(list(self._ai_cache.items())[-AI_CLASSIFICATIONS_MAX:])
+        
+        AI_CLASSIFICATIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = AI_CLASSIFICATIONS_FILE.with_suffix('.json.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(kept, f, indent=2, ensure_ascii=False)
+        tmp_file.replace(AI_CLASSIFICATIONS_FILE)
+        
+        self.logger.info(f"💾 Stored {len(stored)} of {len(classifications)} classifications "
+                         f"({len(classifications) - len(stored)} fallbacks skipped) in {AI_CLASSIFICATIONS_FILE}")
+        return True
+    
     def get_unsynced_decisions(self, sync_all: bool = False, recent_only: bool = False) -> List[Dict[str, Any]]:
         """Get unsynced decisions from Supabase"""
         try:
@@ -323,6 +458,31 @@ class MemorySync:
             self.logger.error(f"❌ Error marking decision {decision_id} as synced: {e}")
             return False
     
+    def mark_decisions_synced(self, decision_ids: List[str]) -> bool:
+        """Mark a batch of decisions as synced with a single PATCH"""
+        if self.dry_run or not decision_ids:
+            return True
+        
+        try:
+            data = {
+                'synced': True,
+                'synced_at': datetime.now(timezone.utc).isoformat()
+            }
+            
+            id_list = ",".join(str(decision_id) for decision_id in decision_ids)
+            response = requests.patch(
+                f"{self.supabase_url}/rest/v1/decision_vault?id=in.({id_list})",
+                headers=self.supabase_headers,
+                json=data,
+                timeout=30
+            )
+            
+            return response.status_code in (200, 204)
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error marking {len(decision_ids)} decisions as synced: {e}")
+            return False
+    
     def sync_decision_to_notion(self, decision: Dict[str, Any]) -> bool:
         """Sync single decision to Notion"""
         if not self.notion_client:
@@ -357,34 +517,78 @@ class MemorySync:
             self.logger.info("✅ No decisions to sync")
             return True
         
-        for i, decision in enumerate(decisions, 1):
-            self.logger.info(f"📝 Processing {i}/{len(decisions)}: {decision['decision'][:50]}...")
+        pending = []
+        for decision in decisions:
             self.sync_stats['processed'] += 1
             
             # Skip if already synced (for sync_all mode)
             if decision.get('synced') and not sync_all:
-                self.logger.info("   ⏭️ Already synced, skipping")
                 self.sync_stats['skipped'] += 1
                 continue
             
-            # 🤖 GPT-5 Analysis Integration
-            enhanced_decision = self.enhance_decision_with_ai(decision)
+            pending.append(decision)
+        
+        self.logger.info(f"📝 Processing {len(pending)} decisions "
+                         f"(AI workers: {self.ai_workers}, Notion workers: {self.notion_workers})")
+        
+        with ThreadPoolExecutor(max_workers=self.ai_workers, thread_name_prefix='ai-enrich') as ai_pool, \
+             ThreadPoolExecutor(max_workers=self.notion_workers, thread_name_prefix='notion-write') as notion_pool:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                self._sync_decision_batch(batch, ai_pool, notion_pool)
+                self.logger.info(f"📦 Batch {start // self.batch_size + 1}: "
+                                 f"{min(start + self.batch_size, len(pending))}/{len(pending)} decisions processed")
+        
+        return self.sync_stats['failed'] == 0
+    
+    def _sync_decision_batch(self, batch: List[Dict[str, Any]],
+                             ai_pool: ThreadPoolExecutor,
+                             notion_pool: ThreadPoolExecutor):
+        """Run one batch through AI enrichment -> Notion write -> bulk synced flag
+        
+        Each decision is handed to the Notion writer as soon as its enrichment
+        finishes, so both pools stay busy; synced flags go out in one PATCH.
+        """
+        
+        # 🤖 GPT-5 Analysis Integration (packed classification requests, then bounded worker pool)
+        self._prime_ai_cache(batch)
+        ai_futures = {ai_pool.submit(self.enhance_decision_with_ai, decision): decision for decision in batch}
+        
+        notion_writes = []
+        for future in as_completed(ai_futures):
+            decision = ai_futures[future]
+            try:
+                enhanced_decision = future.result()
+            except Exception as e:
+                self.logger.warning(f"⚠️ AI enrichment failed for {decision.get('id')}: {e}")
+                enhanced_decision = decision
             
-            # Sync to Notion
-            notion_success = True
+            # Sync to Notion (concurrent writer)
+            notion_future = None
             if self.notion_client:
-                notion_success = self.sync_decision_to_notion(enhanced_decision)
+                notion_future = notion_pool.submit(self.sync_decision_to_notion, enhanced_decision)
+            notion_writes.append((notion_future, decision))
+        
+        synced_ids = []
+        for notion_future, decision in notion_writes:
+            notion_success = True
+            if notion_future is not None:
+                try:
+                    notion_success = notion_future.result()
+                except Exception as e:
+                    self.logger.error(f"❌ Error syncing to Notion: {e}")
+                    notion_success = False
             
             if notion_success:
-                # Mark as synced
-                if self.mark_decision_synced(decision['id']):
-                    self.sync_stats['synced'] += 1
-                else:
-                    self.sync_stats['failed'] += 1
+                synced_ids.append(decision['id'])
             else:
                 self.sync_stats['failed'] += 1
         
-        return self.sync_stats['failed'] == 0
+        # Mark as synced (one bulk PATCH per batch)
+        if self.mark_decisions_synced(synced_ids):
+            self.sync_stats['synced'] += len(synced_ids)
+        else:
+            self.sync_stats['failed'] += len(synced_ids)
     
     def generate_export_summary(self) -> bool:
         """Generate JSON export summary"""
@@ -448,6 +652,10 @@ def main():
     parser.add_argument('--all', action='store_true', help='Sync all decisions (ignore synced flag)')
     parser.add_argument('--recent', action='store_true', help='Sync recent decisions only (last 24h)')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without executing')
+    parser.add_argument('--ai-backfill-submit', action='store_true',
+                        help='Submit all decisions for offline batch AI classification')
+    parser.add_argument('--ai-backfill-collect', metavar='BATCH_ID',
+                        help='Collect an offline batch and store its classifications')
     
     args = parser.parse_args()
     
@@ -459,6 +667,17 @@ def main():
             print(f"🔗 Connection test: {'✅ PASSED' if success else '❌ FAILED'}")
             sys.exit(0 if success else 1)
         
+        if args.ai_backfill_submit:
+            batch_id = sync_engine.submit_ai_backfill()
+            if batch_id:
+                print(f"📤 Submitted batch {batch_id} - collect with --ai-backfill-collect {batch_id}")
+            sys.exit(0)
+        
+        if args.ai_backfill_collect:
+            success = sync_engine.collect_ai_backfill(args.ai_backfill_collect)
+            print(f"📥 Batch collection: {'✅ STORED' if success else '⏳ NOT READY'}")
+            sys.exit(0 if success else 1)
+        
         success = sync_engine.run_sync(sync_all=args.all, recent_only=args.recent)
         sys.exit(0 if success else 1)
         
@@ -0,0 +1,41 @@
+-- Angles AI Universe™ decision_vault change log for near-real-time sync
+-- Feeds sync/realtime_sync.py; the scheduled full reconcile stays as a safety net
+-- Rows are deleted by the worker once pushed (SupabaseClient.prune_changes)
+
+create table if not exists decision_vault_changes(
+  seq bigserial primary key,
+  record_id uuid not null,
+  op text not null,
+  changed_at timestamptz default now()
+);
+create index if not exists idx_decision_vault_changes_record on decision_vault_changes(record_id);
+
+create or replace function log_decision_vault_change()
+returns trigger as $$
+declare
+  change_seq bigint;
+begin
+  -- Sync bookkeeping writes (notion_page_id, notion_synced, checksum,
+  -- updated_at) must not re-trigger a push, only content changes do
+  if tg_op = 'UPDATE'
+     and new.decision is not distinct from old.decision
+     and new.type is not distinct from old.type
+     and new.date is not distinct from old.date then
+    return new;
+  end if;
+
+  insert into decision_vault_changes(record_id, op)
+  values (coalesce(new.id, old.id), tg_op)
+  returning seq into change_seq;
+
+  -- Wakes LISTEN-ing workers immediately; polling workers pick it up anyway
+  perform pg_notify('decision_vault_changes', change_seq::text);
+
+  return coalesce(new, old);
+end;
+$$ language plpgsql;
+
+drop trigger if exists decision_vault_change_log on decision_vault;
+create trigger decision_vault_change_log
+  after insert or update or delete on decision_vault
+  for each row execute function log_decision_vault_change();
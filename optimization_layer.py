@@ -13,17 +13,21 @@ import time
 import json
 import psutil
 import logging
-import statistics
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import threading
 import queue
 import functools
+from collections import deque
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
+from utils.logger import get_logger
+from utils.metrics_store import open_metrics_store
+from utils.tracing import Span, get_tracer
+
 try:
     from alerts.notify import AlertManager
 except ImportError:
@@ -52,15 +56,21 @@ class PerformanceMonitor:
             'auto_optimization': True
         }
         
-        # Performance metrics storage
+        # Performance metrics storage (ring buffers, histograms and SQLite rollups)
         self.metrics_queue = queue.Queue(maxsize=self.config['performance_history_size'])
+        self.metrics_store = open_metrics_store()
         self.current_metrics = {}
-        self.performance_history = []
-        self.optimization_suggestions = []
+        self.optimization_suggestions = deque(maxlen=100)
         
-        # Task performance tracking
+        # Task performance tracking (running totals; recent runs live in metrics_store).
+        # Written by the tracer's flush thread, so every access holds metrics_lock
         self.task_metrics = {}
         self.slow_tasks = {}
+        self.metrics_lock = threading.Lock()
+        
+        # Spans from traced functions are delivered here by the tracer's flush thread
+        self.tracer = get_tracer()
+        self.tracer.add_sink(self.record_spans)
         
         # Threading
         self.monitoring_thread = None
@@ -73,107 +83,62 @@ class PerformanceMonitor:
         """Setup logging for optimization layer"""
         os.makedirs("logs/optimization", exist_ok=True)
         
-        self.logger = logging.getLogger('optimization_layer')
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # File handler
-        log_file = "logs/optimization/optimization.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.logger = get_logger('optimization_layer', log_file="logs/optimization/optimization.log")
     
     def performance_monitor(self, func_name: Optional[str] = None):
-        """Decorator to monitor function performance"""
+        """Decorator to monitor function performance (spans are aggregated off the calling thread)"""
         def decorator(func):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                task_name = func_name or func.__name__
-                start_time = time.time()
-                start_memory = psutil.Process().memory_info().rss
-                success = False
-                error = None
-                result = None
-                
-                try:
-                    result = func(*args, **kwargs)
-                    success = True
-                except Exception as e:
-                    success = False
-                    error = str(e)
-                    raise
-                finally:
-                    end_time = time.time()
-                    end_memory = psutil.Process().memory_info().rss
-                    
-                    duration = (end_time - start_time) * 1000  # ms
-                    memory_delta = end_memory - start_memory
-                    
-                    # Record task performance
-                    self.record_task_performance(task_name, {
-                        'duration_ms': duration,
-                        'memory_delta_bytes': memory_delta,
-                        'success': success,
-                        'error': error,
-                        'timestamp': datetime.now(timezone.utc).isoformat()
-                    })
-                
-                return result
-            return wrapper
+            return self.tracer.trace(func_name or func.__name__)(func)
         return decorator
     
+    def record_spans(self, spans: List[Span]):
+        """Tracer sink: fold finished spans into task metrics"""
+        for span in spans:
+            self.record_task_performance(span.name, {
+                'duration_ms': span.duration_ms,
+                'memory_delta_bytes': span.memory_delta_bytes or 0,
+                'success': span.success,
+                'error': span.error,
+                'timestamp': datetime.fromtimestamp(span.timestamp, timezone.utc).isoformat(),
+                'epoch': span.timestamp
+            })
+    
     def record_task_performance(self, task_name: str, metrics: Dict[str, Any]):
         """Record performance metrics for a task"""
-        if task_name not in self.task_metrics:
-            self.task_metrics[task_name] = {
-                'runs': 0,
-                'total_duration': 0,
-                'total_memory_delta': 0,
-                'successes': 0,
-                'failures': 0,
-                'average_duration': 0,
-                'max_duration': 0,
-                'min_duration': float('inf'),
-                'recent_runs': []
-            }
-        
-        stats = self.task_metrics[task_name]
         duration = metrics['duration_ms']
         
-        # Update basic stats
-        stats['runs'] += 1
-        stats['total_duration'] += duration
-        stats['total_memory_delta'] += metrics['memory_delta_bytes']
-        
-        if metrics['success']:
-            stats['successes'] += 1
-        else:
-            stats['failures'] += 1
-        
-        # Update duration stats
-        stats['average_duration'] = stats['total_duration'] / stats['runs']
-        stats['max_duration'] = max(stats['max_duration'], duration)
-        stats['min_duration'] = min(stats['min_duration'], duration)
+        with self.metrics_lock:
+            if task_name not in self.task_metrics:
+                self.task_metrics[task_name] = {
+                    'runs': 0,
+                    'total_duration': 0,
+                    'total_memory_delta': 0,
+                    'successes': 0,
+                    'failures': 0,
+                    'average_duration': 0,
+                    'max_duration': 0,
+                    'min_duration': float('inf')
+                }
+            
+            stats = self.task_metrics[task_name]
+            
+            # Update basic stats
+            stats['runs'] += 1
+            stats['total_duration'] += duration
+            stats['total_memory_delta'] += metrics['memory_delta_bytes']
+            
+            if metrics['success']:
+                stats['successes'] += 1
+            else:
+                stats['failures'] += 1
+            
+            # Update duration stats
+            stats['average_duration'] = stats['total_duration'] / stats['runs']
+            stats['max_duration'] = max(stats['max_duration'], duration)
+            stats['min_duration'] = min(stats['min_duration'], duration)
         
-        # Keep recent runs (last 10)
-        stats['recent_runs'].append(metrics)
-        if len(stats['recent_runs']) > 10:
-            stats['recent_runs'].pop(0)
+        self.metrics_store.record_task(task_name, duration, metrics['success'], metrics['memory_delta_bytes'],
+                                       timestamp=metrics.get('epoch'))
         
         # Check for slow tasks
         if duration > self.config['response_time_threshold']:
@@ -183,14 +148,12 @@ class PerformanceMonitor:
     
     def flag_slow_task(self, task_name: str, metrics: Dict[str, Any]):
         """Flag and analyze slow tasks"""
-        if task_name not in self.slow_tasks:
-            self.slow_tasks[task_name] = []
-        
-        self.slow_tasks[task_name].append(metrics)
-        
-        # Keep only recent slow runs (last 5)
-        if len(self.slow_tasks[task_name]) > 5:
-            self.slow_tasks[task_name].pop(0)
+        with self.metrics_lock:
+            if task_name not in self.slow_tasks:
+                # Keep only recent slow runs (last 5)
+                self.slow_tasks[task_name] = deque(maxlen=5)
+            
+            self.slow_tasks[task_name].append(metrics)
         
         self.logger.warning(f"🐌 Slow task detected: {task_name} took {metrics['duration_ms']:.1f}ms")
         
@@ -242,6 +205,11 @@ class PerformanceMonitor:
         
         return None
     
+    def _task_metrics_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the task totals, safe to iterate while spans keep arriving"""
+        with self.metrics_lock:
+            return {task_name: dict(stats) for task_name, stats in self.task_metrics.items()}
+    
     def collect_system_metrics(self) -> Dict[str, Any]:
         """Collect current system performance metrics"""
         try:
@@ -340,7 +308,7 @@ class PerformanceMonitor:
         recommendations = []
         
         # Analyze task performance
-        for task_name, stats in self.task_metrics.items():
+        for task_name, stats in self._task_metrics_snapshot().items():
             if stats['runs'] < 5:  # Not enough data
                 continue
             
@@ -368,11 +336,11 @@ class PerformanceMonitor:
                 })
         
         # System resource recommendations
-        if self.performance_history:
-            recent_metrics = self.performance_history[-10:]  # Last 10 measurements
+        if len(self.metrics_store.system):
+            recent_means = self.metrics_store.system_means(last=10)  # Last 10 measurements
             
-            avg_cpu = statistics.mean(m.get('cpu', {}).get('percent', 0) for m in recent_metrics)
-            avg_memory = statistics.mean(m.get('memory', {}).get('used_percent', 0) for m in recent_metrics)
+            avg_cpu = recent_means['cpu_percent']
+            avg_memory = recent_means['memory_percent']
             
             if avg_cpu > 70:
                 recommendations.append({
@@ -491,14 +459,14 @@ class PerformanceMonitor:
         """Clear application caches to free memory"""
         # Clear any in-memory caches
         try:
-            # Clear performance history to free memory
-            if len(self.performance_history) > 100:
-                self.performance_history = self.performance_history[-50:]
+            # Persist the current metrics window (buffers themselves are fixed-size)
+            self.metrics_store.flush()
             
             # Clear old task metrics
-            for task_name in list(self.task_metrics.keys()):
-                if self.task_metrics[task_name]['runs'] == 0:
-                    del self.task_metrics[task_name]
+            with self.metrics_lock:
+                for task_name in list(self.task_metrics.keys()):
+                    if self.task_metrics[task_name]['runs'] == 0:
+                        del self.task_metrics[task_name]
             
             self.logger.info("🧹 Cleared application caches")
         except Exception as e:
@@ -511,7 +479,7 @@ class PerformanceMonitor:
         # This would integrate with the scheduler to adjust frequencies
         # For now, just log recommendations
         
-        for task_name, stats in self.task_metrics.items():
+        for task_name, stats in self._task_metrics_snapshot().items():
             if stats['runs'] < 5:
                 continue
             
@@ -532,6 +500,7 @@ class PerformanceMonitor:
             return
         
         self.stop_event.clear()
+        self.tracer.add_sink(self.record_spans)  # No-op unless stop_monitoring removed it
         self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
         self.monitoring_thread.daemon = True
         self.monitoring_thread.start()
@@ -546,11 +515,11 @@ class PerformanceMonitor:
                 metrics = self.collect_system_metrics()
                 if metrics:
                     self.current_metrics = metrics
-                    self.performance_history.append(metrics)
-                    
-                    # Keep history size manageable
-                    if len(self.performance_history) > self.config['performance_history_size']:
-                        self.performance_history.pop(0)
+                    self.metrics_store.record_system(
+                        metrics.get('cpu', {}).get('percent', 0),
+                        metrics.get('memory', {}).get('used_percent', 0),
+                        metrics.get('disk', {}).get('used_percent', 0)
+                    )
                     
                     # Analyze health
                     alerts = self.analyze_system_health(metrics)
@@ -614,8 +583,8 @@ class PerformanceMonitor:
             report = {
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'recommendations': recommendations,
-                'task_metrics': self.task_metrics,
-                'optimization_suggestions': self.optimization_suggestions,
+                'task_metrics': self.get_task_metrics(),
+                'optimization_suggestions': list(self.optimization_suggestions),
                 'system_metrics': self.current_metrics
             }
             
@@ -639,15 +608,39 @@ class PerformanceMonitor:
         if self.optimization_thread and self.optimization_thread.is_alive():
             self.optimization_thread.join(timeout=5)
         
+        self.tracer.remove_sink(self.record_spans)
+        self.metrics_store.flush()
         self.logger.info("🛑 Performance monitoring stopped")
     
+    def get_task_metrics(self) -> Dict[str, Any]:
+        """Task totals with latency percentiles and the last 10 runs"""
+        return {
+            task_name: {
+                **stats,
+                'latency': self.metrics_store.task_summary(task_name),
+                'recent_runs': self.metrics_store.recent_runs(task_name, 10)
+            }
+            for task_name, stats in self._task_metrics_snapshot().items()
+        }
+    
+    def get_task_latency(self, task_name: str, hours: int = 24,
+                         resolution_seconds: int = 3600) -> List[Dict[str, Any]]:
+        """Persisted latency percentiles of a task over time (for the health dashboard)"""
+        self.metrics_store.flush()
+        return self.metrics_store.query_task_latency(
+            task_name, since=time.time() - hours * 3600, resolution_seconds=resolution_seconds
+        )
+    
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary"""
+        with self.metrics_lock:
+            slow_tasks = {task_name: list(runs) for task_name, runs in self.slow_tasks.items()}
+        
         return {
             'current_metrics': self.current_metrics,
-            'task_metrics': self.task_metrics,
-            'optimization_suggestions': self.optimization_suggestions,
-            'slow_tasks': self.slow_tasks,
+            'task_metrics': self.get_task_metrics(),
+            'optimization_suggestions': list(self.optimization_suggestions),
+            'slow_tasks': slow_tasks,
             'recommendations': self.generate_optimization_recommendations()
         }
 
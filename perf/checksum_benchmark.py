@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Angles AI Universe™ Checksum Micro-Benchmark
+Compares per-record DiffEngine.compute_checksum with the batch compute_checksums API
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sync.diff import DiffEngine
+from sync.config import DECISION_TYPES
+
+RESULTS_DIR = "logs/perf"
+
+WORDS = ['adopt', 'Postgres', 'for', 'the', 'memory', 'vault', 'rotate', 'keys', 'monthly',
+         'Notion', 'sync', 'backup', 'restore', 'weekly', 'review', 'API', 'latency']
+
+
+def generate_records(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate synthetic decision records with messy whitespace and casing"""
+    rng = random.Random(seed)
+    records = []
+
+    for i in range(count):
+        words = rng.choices(WORDS, k=rng.randint(4, 24))
+        spacer = rng.choice([' ', '  ', '\t', ' \n '])
+        records.append({
+            'id': f"rec-{i}",
+            'decision': f"  {spacer.join(words)} #{i} ",
+            'type': rng.choice(DECISION_TYPES + ['  ops ', None]),
+            'date': rng.choice(['2025-08-07', '2025-08-07T10:00:00Z', None, f"2025-07-{(i % 28) + 1:02d}"])
+        })
+
+    return records
+
+
+def time_call(func, repeat: int) -> float:
+    """Return the best wall time (seconds) of repeat calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(count: int = 100000, repeat: int = 5) -> Dict[str, Any]:
+    """Run per-record vs batch checksum benchmark and verify identical output"""
+    engine = DiffEngine()
+    records = generate_records(count)
+
+    per_record = [engine.compute_checksum(record) for record in records]
+    batch = engine.compute_checksums(records)
+    identical = per_record == batch
+
+    per_record_s = time_call(lambda: [engine.compute_checksum(r) for r in records], repeat)
+    batch_s = time_call(lambda: engine.compute_checksums(records), repeat)
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'records': count,
+        'repeat': repeat,
+        'identical': identical,
+        'per_record_records_per_sec': round(count / per_record_s, 1),
+        'batch_records_per_sec': round(count / batch_s, 1),
+        'speedup': round(per_record_s / batch_s, 2)
+    }
+
+
+def main():
+    """Main entry point for checksum micro-benchmark"""
+    parser = argparse.ArgumentParser(description='DiffEngine checksum micro-benchmark')
+    parser.add_argument('--records', type=int, default=100000, help='Number of synthetic records')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best is reported)')
+    parser.add_argument('--save', action='store_true', help=f'Save results JSON to {RESULTS_DIR}')
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.records, args.repeat)
+
+    print(f"\n🔢 Checksum Benchmark ({results['records']} records)")
+    print(f"  Per-record: {results['per_record_records_per_sec']:,.0f} records/sec")
+    print(f"  Batch:      {results['batch_records_per_sec']:,.0f} records/sec")
+    print(f"  Speedup:    {results['speedup']}x")
+    print(f"  Identical:  {'✅' if results['identical'] else '❌'}")
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out_file = Path(RESULTS_DIR) / f"checksum_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(out_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"  Saved:      {out_file}")
+
+    sys.exit(0 if results['identical'] else 1)
+
+
+if __name__ == "__main__":
+    main()
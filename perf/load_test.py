@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Angles AI Universe™ Offline Load Test
+Drives memory sync, restore and bidirectional sync against the local fake services
+
+Every scenario points the real client code at tools/fake_services.py
+through its usual environment variables, seeds the fake Supabase tables
+and Notion database, runs the code path end to end and reports
+throughput plus the per-route latency and 429 counts seen by the server.
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from perf.checksum_benchmark import WORDS
+from tools.fake_services import FakeServices, FaultProfile
+
+RESULTS_DIR = "logs/perf"
+SCENARIOS = ['memory_sync', 'restore', 'sync']
+
+# MemorySync fetches at most this many unsynced decisions per run
+MEMORY_SYNC_FETCH_LIMIT = 1000
+
+
+def make_decisions(count: int, seed: int = 29, prefix: str = "Decision") -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{
+        'decision': f"{prefix} {i}: {' '.join(rng.choices(WORDS, k=10))}",
+        'date': f"2025-08-{(i % 28) + 1:02d}",
+        'type': rng.choice(['technical', 'strategic', 'ops']),
+        'active': True,
+        'synced': False
+    } for i in range(count)]
+
+
+def quiet(logger: logging.Logger) -> logging.Logger:
+    """Per-record INFO logging would dominate the measurement"""
+    logger.setLevel(logging.WARNING)
+    return logger
+
+
+# Scenarios
+
+def scenario_memory_sync(fake: FakeServices, records: int) -> Dict[str, Any]:
+    """Unsynced decision_vault rows -> Notion pages -> synced flags"""
+    from memory_sync import MemorySync
+
+    fake.tables.seed('decision_vault', make_decisions(records))
+    fake.reset_stats()
+
+    sync = MemorySync(dry_run=False)
+    sync.ai_bridge = None  # AI enrichment is not under test
+    quiet(sync.logger)
+
+    start = time.perf_counter()
+    runs = 0
+    # Each run picks up to MEMORY_SYNC_FETCH_LIMIT rows, as the scheduled job does
+    while runs < records // MEMORY_SYNC_FETCH_LIMIT + 5:
+        runs += 1
+        processed_before = sync.sync_stats['processed']
+        sync.sync_decisions()
+        if sync.sync_stats['processed'] == processed_before or \
+                not any(not row.get('synced') for row in fake.tables.rows('decision_vault')):
+            break
+    seconds = time.perf_counter() - start
+
+    return {
+        'seconds': seconds,
+        'completed': sync.sync_stats['synced'],
+        'runs': runs,
+        'result': dict(sync.sync_stats),
+        'verified': {
+            'notion_pages': len(fake.workspace.pages),
+            'rows_marked_synced': sum(1 for row in fake.tables.rows('decision_vault') if row.get('synced'))
+        }
+    }
+
+
+def scenario_restore(fake: FakeServices, records: int) -> Dict[str, Any]:
+    """Exported decision files -> existing-key scan -> batched upserts"""
+    from restore_from_github import RestoreRunner
+
+    decisions = make_decisions(records, prefix="Restored")
+    # A tenth already exist, exercising the skip path
+    fake.tables.seed('decision_vault', decisions[:records // 10])
+    fake.reset_stats()
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        with open(os.path.join(export_dir, 'decisions.json'), 'w') as f:
+            json.dump({'decisions': decisions}, f)
+
+        runner = RestoreRunner(dry_run=False)
+        runner.safe_export_dir = Path(export_dir)
+        quiet(runner.logger)
+
+        start = time.perf_counter()
+        runner.restore_decisions_from_files()
+        seconds = time.perf_counter() - start
+
+    stats = runner.restore_stats
+    return {
+        'seconds': seconds,
+        'completed': stats['decisions_restored'] + stats['decisions_skipped'],
+        'result': dict(stats),
+        'verified': {'rows': len(fake.tables.rows('decision_vault'))}
+    }
+
+
+def scenario_sync(fake: FakeServices, records: int) -> Dict[str, Any]:
+    """Full bidirectional Supabase <-> Notion sync"""
+    import sync.config as sync_config
+    from sync.config import DECISION_TYPES, NOTION_PROPERTY_MAPPING
+
+    try:
+        from sync.run_sync import BidirectionalSync
+    except ImportError as e:
+        return {'skipped': f"sync dependencies unavailable: {e}"}
+
+    rng = random.Random(31)
+    rows = []
+    for decision in make_decisions(records):
+        decision['type'] = rng.choice(DECISION_TYPES)
+        rows.append(decision)
+    fake.tables.seed('decision_vault', rows[:records // 2 + records // 4])
+
+    # A quarter of the decisions exist only in Notion
+    for decision in rows[records // 2:]:
+        fake.workspace.create_page({
+            'parent': {'database_id': fake.database_id},
+            'properties': {
+                NOTION_PROPERTY_MAPPING['decision']: {'title': [{'text': {'content': decision['decision']}}]},
+                NOTION_PROPERTY_MAPPING['type']: {'multi_select': [{'name': decision['type']}]},
+                NOTION_PROPERTY_MAPPING['date']: {'date': {'start': decision['date']}}
+            }
+        })
+    fake.reset_stats()
+
+    sync_config._config = None  # Pick up the fake service environment
+    try:
+        bidirectional = BidirectionalSync(dry_run=False)
+    except ImportError as e:
+        return {'skipped': f"sync dependencies unavailable: {e}"}
+
+    start = time.perf_counter()
+    stats = bidirectional.run_sync()
+    seconds = time.perf_counter() - start
+
+    return {
+        'seconds': seconds,
+        'completed': stats.get('created', 0) + stats.get('updated', 0),
+        'result': {key: value for key, value in stats.items() if key != 'error_details'},
+        'verified': {
+            'notion_pages': len(fake.workspace.pages),
+            'supabase_rows': len(fake.tables.rows('decision_vault'))
+        }
+    }
+
+
+SCENARIO_FUNCTIONS: Dict[str, Callable[[FakeServices, int], Dict[str, Any]]] = {
+    'memory_sync': scenario_memory_sync,
+    'restore': scenario_restore,
+    'sync': scenario_sync
+}
+
+
+def run_load_test(scenarios: List[str], records: int = 1000,
+                  supabase_faults: Dict[str, Any] = None, notion_faults: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Run scenarios against one fake server, resetting data between them"""
+    supabase_faults = supabase_faults or {}
+    notion_faults = notion_faults or {}
+    results = {}
+
+    with FakeServices(supabase_faults=FaultProfile(**supabase_faults),
+                      notion_faults=FaultProfile(seed=1, **notion_faults)) as fake:
+        saved_env = {name: os.environ.get(name) for name in fake.environment()}
+        os.environ.update(fake.environment())
+        try:
+            for name in scenarios:
+                fake.reset()
+                outcome = SCENARIO_FUNCTIONS[name](fake, records)
+                if 'skipped' not in outcome:
+                    seconds = outcome['seconds']
+                    outcome['seconds'] = round(seconds, 3)
+                    outcome['records_per_second'] = round(outcome['completed'] / seconds, 1) if seconds else None
+                    outcome['services'] = fake.stats_snapshot()
+                results[name] = outcome
+        finally:
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'records': records,
+        'faults': {'supabase': supabase_faults, 'notion': notion_faults},
+        'scenarios': results
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n🏋️ Load Test ({report['records']} records)")
+    for name, outcome in report['scenarios'].items():
+        if 'skipped' in outcome:
+            print(f"\n  {name}: ⏭️  skipped ({outcome['skipped']})")
+            continue
+        print(f"\n  {name}: {outcome['completed']} records in {outcome['seconds']}s "
+              f"({outcome['records_per_second']} records/sec)")
+        print(f"    Result:   {outcome['result']}")
+        print(f"    Verified: {outcome['verified']}")
+        for service, stats in outcome['services'].items():
+            if not stats['requests']:
+                continue
+            print(f"    {service}: {stats['requests']} requests, {stats['requests_per_second']} req/s, "
+                  f"{stats['throttled']} throttled")
+            for route, route_stats in stats['routes'].items():
+                latency = route_stats['latency']
+                print(f"      {route:<42} {route_stats['requests']:>6}  p50 {latency['p50_ms']:.1f}ms  "
+                      f"p95 {latency['p95_ms']:.1f}ms  p99 {latency['p99_ms']:.1f}ms  {route_stats['statuses']}")
+
+
+def main():
+    """Main entry point for the offline load test"""
+    parser = argparse.ArgumentParser(description='Load test sync, memory sync and restore against fake services')
+    parser.add_argument('--scenario', choices=SCENARIOS + ['all'], default='all')
+    parser.add_argument('--records', type=int, default=1000, help='Decisions per scenario')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added latency per request (both services)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Latency jitter (+/-)')
+    parser.add_argument('--notion-rate-limit', type=float, default=0.0, help='Notion requests/sec (Notion allows ~3)')
+    parser.add_argument('--supabase-rate-limit', type=float, default=0.0, help='Supabase requests/sec')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Probability of an injected 503')
+    parser.add_argument('--save', action='store_true', help=f'Save report JSON to {RESULTS_DIR}')
+
+    args = parser.parse_args()
+
+    shared = {'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'failure_rate': args.failure_rate}
+    report = run_load_test(
+        SCENARIOS if args.scenario == 'all' else [args.scenario],
+        records=args.records,
+        supabase_faults={**shared, 'rate_limit': args.supabase_rate_limit},
+        notion_faults={**shared, 'rate_limit': args.notion_rate_limit}
+    )
+    print_report(report)
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out_file = Path(RESULTS_DIR) / f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(out_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved: {out_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Angles AI Universe™ Logging Micro-Benchmark
+Measures caller-side cost of synchronous file logging vs the queued logging pipeline
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import LoggingPipeline, DEFAULT_FILE_FORMAT
+
+RESULTS_DIR = "logs/perf"
+
+
+def time_calls(func, calls: int, repeat: int, settle=None) -> float:
+    """Return the best per-call time (microseconds) over repeat runs of calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(calls):
+            func(i)
+        best = min(best, time.perf_counter() - start)
+        if settle:
+            settle()  # Drain between runs so measurements don't overlap
+    return best / calls * 1e6
+
+
+def run_benchmark(calls: int = 20000, repeat: int = 3) -> Dict[str, Any]:
+    """Time log calls from the caller's point of view"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Baseline: what setup_logging() used to do in each module
+        sync_logger = logging.getLogger('bench_sync')
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        sync_handler = logging.FileHandler(os.path.join(tmp_dir, 'sync.log'))
+        sync_handler.setFormatter(logging.Formatter(DEFAULT_FILE_FORMAT))
+        sync_logger.addHandler(sync_handler)
+
+        os.environ['LOG_CONSOLE'] = 'false'
+        os.environ['LOG_JSON_FILE'] = os.path.join(tmp_dir, 'angles.jsonl')
+        os.environ['LOG_SAMPLING'] = 'bench_sampled=0.01'
+        pipeline = LoggingPipeline()
+
+        queued_logger = logging.getLogger('bench_queued')
+        pipeline.attach(queued_logger, logging.INFO, os.path.join(tmp_dir, 'queued.log'))
+        sampled_logger = logging.getLogger('bench_sampled')
+        pipeline.attach(sampled_logger, logging.INFO)
+
+        payload = {'table': 'decision_vault', 'records': 100}
+
+        results = {
+            'sync_file_fstring_us': time_calls(
+                lambda i: sync_logger.info(f"Processed batch {i}: {payload}"), calls, repeat),
+            'queued_us': time_calls(
+                lambda i: queued_logger.info("Processed batch %d", i, extra={'context': payload}), calls, repeat, pipeline.flush),
+            'queued_disabled_debug_us': time_calls(
+                lambda i: queued_logger.debug("Processed batch %d: %s", i, payload), calls, repeat, pipeline.flush),
+            'queued_sampled_us': time_calls(
+                lambda i: sampled_logger.info("Processed batch %d", i), calls, repeat, pipeline.flush)
+        }
+
+        for i in range(calls):
+            queued_logger.info("Processed batch %d", i, extra={'context': payload})
+        drain_start = time.perf_counter()
+        pipeline.flush()
+        drain_s = time.perf_counter() - drain_start
+        pipeline.stop()
+        sync_handler.close()
+        sync_logger.removeHandler(sync_handler)
+
+        for var in ('LOG_CONSOLE', 'LOG_JSON_FILE', 'LOG_SAMPLING'):
+            os.environ.pop(var, None)
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'calls': calls,
+        'repeat': repeat,
+        **{name: round(value, 3) for name, value in results.items()},
+        'queue_drain_s': round(drain_s, 3),
+        'speedup': round(results['sync_file_fstring_us'] / results['queued_us'], 2)
+    }
+
+
+def main():
+    """Main entry point for logging micro-benchmark"""
+    parser = argparse.ArgumentParser(description='Logging pipeline micro-benchmark')
+    parser.add_argument('--calls', type=int, default=20000, help='Log calls per run')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--save', action='store_true', help=f'Save results JSON to {RESULTS_DIR}')
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.calls, args.repeat)
+
+    print(f"\n📝 Logging Benchmark ({results['calls']} calls)")
+    print(f"  Sync FileHandler:   {results['sync_file_fstring_us']:.2f} µs/call")
+    print(f"  Queued pipeline:    {results['queued_us']:.2f} µs/call")
+    print(f"  Disabled debug:     {results['queued_disabled_debug_us']:.2f} µs/call")
+    print(f"  Sampled (1%):       {results['queued_sampled_us']:.2f} µs/call")
+    print(f"  Queue drain:        {results['queue_drain_s']:.3f}s")
+    print(f"  Speedup:            {results['speedup']}x")
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out_file = Path(RESULTS_DIR) / f"logging_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(out_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"  Saved:      {out_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,6 @@ import time
 import logging
 import requests
 import subprocess
-import statistics
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
@@ -24,6 +23,10 @@ import tempfile
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+from utils.logger import get_logger
+from utils.metrics_store import LatencyHistogram
+from utils.benchmark_store import open_benchmark_store, detect_regression
+
 try:
     from alerts.notify import AlertManager
 except ImportError:
@@ -34,6 +37,9 @@ try:
 except ImportError:
     GitHelper = None
 
+OPERATIONS = ['supabase_read', 'supabase_write', 'notion_write', 'git_push']
+
+
 class PerformanceBenchmarkSystem:
     """Comprehensive performance benchmarking system"""
     
@@ -43,6 +49,9 @@ class PerformanceBenchmarkSystem:
         self.load_environment()
         self.alert_manager = AlertManager() if AlertManager else None
         self.git_helper = GitHelper() if GitHelper else None
+        self.store = None
+        
+        samples = int(os.getenv('PERF_BENCHMARK_SAMPLES', '10'))
         
         # Benchmark configuration
         self.config = {
@@ -52,7 +61,17 @@ class PerformanceBenchmarkSystem:
             'critical_threshold_ms': 5000,
             'temp_table_name': 'audit_perf_temp',
             'csv_date_format': '%Y%m%d',
-            'summary_days': 30
+            'summary_days': 30,
+            'samples_per_operation': {
+                'supabase_read': samples,
+                'supabase_write': samples,
+                'notion_write': min(samples, 5),  # Notion allows ~3 requests/sec
+                'git_push': 1  # Every sample is a real commit and push
+            },
+            'warmup_samples': 1,
+            'regression_window_runs': 7,
+            'regression_alpha': 0.01,
+            'regression_min_slowdown': 0.10
         }
         
         # Initialize benchmark results
@@ -63,6 +82,8 @@ class PerformanceBenchmarkSystem:
             'supabase_write_ms': None,
             'notion_write_ms': None,
             'git_push_ms': None,
+            'operations': {},
+            'regressions': [],
             'overall_status': 'unknown',
             'warnings': [],
             'errors': [],
@@ -75,30 +96,7 @@ class PerformanceBenchmarkSystem:
         """Setup logging for performance benchmarking"""
         os.makedirs("logs/perf", exist_ok=True)
         
-        self.logger = logging.getLogger('perf_benchmark')
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # File handler
-        log_file = "logs/perf/benchmark.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self.logger = get_logger('perf_benchmark', log_file="logs/perf/benchmark.log")
     
     def load_environment(self):
         """Load required environment variables"""
@@ -107,6 +105,7 @@ class PerformanceBenchmarkSystem:
             'supabase_key': os.getenv('SUPABASE_KEY'),
             'notion_token': os.getenv('NOTION_TOKEN') or os.getenv('NOTION_API_KEY'),
             'notion_database_id': os.getenv('NOTION_DATABASE_ID'),
+            'notion_api_base_url': os.getenv('NOTION_API_BASE_URL', 'https://api.notion.com'),
             'github_token': os.getenv('GITHUB_TOKEN'),
             'repo_url': os.getenv('REPO_URL', '')
         }
@@ -159,12 +158,6 @@ class PerformanceBenchmarkSystem:
                 read_result['records_read'] = records_count
                 read_result['avg_ms_per_record'] = duration_ms / records_count if records_count > 0 else 0
                 
-                # Check performance warnings
-                if duration_ms > self.config['critical_threshold_ms']:
-                    self.benchmark_results['errors'].append(f"Supabase read critical: {duration_ms:.1f}ms")
-                elif duration_ms > self.config['warning_threshold_ms']:
-                    self.benchmark_results['warnings'].append(f"Supabase read slow: {duration_ms:.1f}ms")
-                
                 self.logger.info(f"✅ Supabase read: {records_count} records in {duration_ms:.1f}ms")
             else:
                 read_result['error_message'] = f"HTTP {response.status_code}: {response.text[:200]}"
@@ -218,12 +211,6 @@ class PerformanceBenchmarkSystem:
                 write_result['success'] = True
                 write_result['duration_ms'] = duration_ms
                 
-                # Check performance warnings
-                if duration_ms > self.config['critical_threshold_ms']:
-                    self.benchmark_results['errors'].append(f"Supabase write critical: {duration_ms:.1f}ms")
-                elif duration_ms > self.config['warning_threshold_ms']:
-                    self.benchmark_results['warnings'].append(f"Supabase write slow: {duration_ms:.1f}ms")
-                
                 # Attempt cleanup
                 if write_result['test_record_id']:
                     try:
@@ -253,7 +240,8 @@ class PerformanceBenchmarkSystem:
             'duration_ms': None,
             'page_id': None,
             'error_message': None,
-            'fallback_used': False
+            'fallback_used': False,
+            'cleanup_success': False
         }
         
         if not self.env['notion_token']:
@@ -289,7 +277,7 @@ class PerformanceBenchmarkSystem:
                         'select': {'name': 'perf'}
                     }
                 
-                url = 'https://api.notion.com/v1/pages'
+                url = f"{self.env['notion_api_base_url']}/v1/pages"
             else:
                 notion_result['error_message'] = "No Notion database ID available"
                 return notion_result
@@ -304,11 +292,14 @@ class PerformanceBenchmarkSystem:
                 notion_result['success'] = True
                 notion_result['duration_ms'] = duration_ms
                 
-                # Check performance warnings
-                if duration_ms > self.config['critical_threshold_ms']:
-                    self.benchmark_results['errors'].append(f"Notion write critical: {duration_ms:.1f}ms")
-                elif duration_ms > self.config['warning_threshold_ms']:
-                    self.benchmark_results['warnings'].append(f"Notion write slow: {duration_ms:.1f}ms")
+                # Archive the test page so repeated samples don't pile up
+                if notion_result['page_id']:
+                    try:
+                        archive_response = requests.patch(f"{url}/{notion_result['page_id']}", headers=headers,
+                                                          json={'archived': True}, timeout=10)
+                        notion_result['cleanup_success'] = archive_response.status_code == 200
+                    except:
+                        pass  # Cleanup is best effort
                 
                 self.logger.info(f"✅ Notion write: {duration_ms:.1f}ms")
             else:
@@ -378,12 +369,6 @@ class PerformanceBenchmarkSystem:
             git_result['duration_ms'] = duration_ms
             git_result['success'] = git_result['operations']['add'] and git_result['operations']['commit']
             
-            # Check performance warnings
-            if duration_ms > self.config['critical_threshold_ms']:
-                self.benchmark_results['errors'].append(f"Git push critical: {duration_ms:.1f}ms")
-            elif duration_ms > self.config['warning_threshold_ms']:
-                self.benchmark_results['warnings'].append(f"Git push slow: {duration_ms:.1f}ms")
-            
             # Clean up temp file
             try:
                 os.remove(temp_file)
@@ -398,7 +383,85 @@ class PerformanceBenchmarkSystem:
             self.logger.error(f"❌ Git push error: {str(e)}")
         
         return git_result
-    
+
+    def get_store(self):
+        """Open the benchmark sample store on first use"""
+        if self.store is None:
+            self.store = open_benchmark_store()
+        return self.store
+
+    def sample_operation(self, operation: str, benchmark) -> Tuple[Dict[str, Any], List[float]]:
+        """
+        Run a benchmark repeatedly after warmup and summarize its latency
+
+        Returns:
+            (last result with duration_ms set to the median, successful sample durations)
+        """
+        sample_count = self.config['samples_per_operation'][operation]
+        warmup = self.config['warmup_samples'] if sample_count > 1 else 0
+
+        for _ in range(warmup):
+            result = benchmark()
+            if not result['success']:
+                # Missing credentials or a down service won't improve with more samples
+                return result, []
+
+        durations = []
+        last_success = None
+        result = None
+        for _ in range(sample_count):
+            result = benchmark()
+            if result['success'] and result['duration_ms'] is not None:
+                durations.append(result['duration_ms'])
+                last_success = result
+            elif not durations:
+                return result, []
+
+        result = dict(last_success or result)
+        histogram = LatencyHistogram()
+        for duration_ms in durations:
+            histogram.record(duration_ms)
+
+        result['duration_ms'] = sorted(durations)[len(durations) // 2]
+        result['samples'] = len(durations)
+        result['failed_samples'] = sample_count - len(durations)
+        result['latency'] = histogram.summary()
+
+        self.logger.info(f"📏 {operation}: median {result['duration_ms']:.1f}ms over {len(durations)} samples "
+                         f"(p95 {result['latency']['p95_ms']:.1f}ms)")
+        return result, durations
+
+    def check_thresholds(self, label: str, duration_ms: Optional[float]):
+        """Flag slow or critical median latency"""
+        if duration_ms is None:
+            return
+
+        if duration_ms > self.config['critical_threshold_ms']:
+            self.benchmark_results['errors'].append(f"{label} critical: {duration_ms:.1f}ms")
+        elif duration_ms > self.config['warning_threshold_ms']:
+            self.benchmark_results['warnings'].append(f"{label} slow: {duration_ms:.1f}ms")
+
+    def detect_regressions(self, run_samples: Dict[str, List[float]], run_timestamp: float) -> List[Dict[str, Any]]:
+        """Compare this run's samples against the trailing window of earlier runs"""
+        regressions = []
+        store = self.get_store()
+
+        for operation, samples in run_samples.items():
+            trailing = store.trailing_samples(operation, run_timestamp, self.config['regression_window_runs'])
+            baseline = [value for run in trailing for value in run]
+
+            result = detect_regression(samples, baseline,
+                                       alpha=self.config['regression_alpha'],
+                                       min_slowdown=self.config['regression_min_slowdown'])
+            if result['regressed']:
+                result['operation'] = operation
+                result['baseline_runs'] = len(trailing)
+                regressions.append(result)
+                self.logger.warning(f"📉 {operation} regressed: median {result['baseline_median_ms']:.1f}ms -> "
+                                    f"{result['current_median_ms']:.1f}ms (p={result['p_value']:.4f})")
+
+        return regressions
+
     def emit_csv_results(self) -> bool:
         """Emit benchmark results to CSV file"""
         try:
@@ -469,35 +532,20 @@ class PerformanceBenchmarkSystem:
             return False
     
     def collect_recent_performance_data(self) -> List[Dict[str, Any]]:
-        """Collect performance data from recent CSV files"""
+        """Collect per-run samples of the last summary_days from the benchmark store"""
         perf_data = []
         
         try:
-            # Look for CSV files in the last N days
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=self.config['summary_days'])
+            since = datetime.now(timezone.utc) - timedelta(days=self.config['summary_days'])
             
-            current_date = start_date
-            while current_date <= end_date:
-                csv_file = f"logs/perf/perf_{current_date.strftime(self.config['csv_date_format'])}.csv"
-                
-                if os.path.exists(csv_file):
-                    with open(csv_file, 'r') as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            # Convert numeric fields
-                            try:
-                                for field in ['supabase_read_ms', 'supabase_write_ms', 'notion_write_ms', 'git_push_ms', 'duration_total_ms']:
-                                    if row[field] and row[field] != 'None':
-                                        row[field] = float(row[field])
-                                    else:
-                                        row[field] = None
-                            except:
-                                pass
-                            
-                            perf_data.append(row)
-                
-                current_date += timedelta(days=1)
+            for run in self.get_store().runs_since(since.timestamp()):
+                row = {
+                    'timestamp': datetime.fromtimestamp(run['timestamp'], timezone.utc).isoformat(),
+                    'benchmark_id': run['run_id']
+                }
+                for operation in OPERATIONS + ['duration_total']:
+                    row[f"{operation}_ms"] = run.get(operation)
+                perf_data.append(row)
         
         except Exception as e:
             self.logger.error(f"❌ Error collecting performance data: {str(e)}")
@@ -505,7 +553,11 @@ class PerformanceBenchmarkSystem:
         return perf_data
     
     def calculate_performance_statistics(self, perf_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate performance statistics (min/avg/p95)"""
+        """Calculate performance statistics (min/avg/p50/p95/p99/max)
+        
+        Metric values are either a single duration or a run's list of samples;
+        percentiles come from an HDR histogram instead of sorting every value.
+        """
         stats = {
             'total_benchmarks': len(perf_data),
             'date_range': {
@@ -519,50 +571,73 @@ class PerformanceBenchmarkSystem:
             return stats
         
         # Date range
-        timestamps = [row['timestamp'] for row in perf_data if row['timestamp']]
+        timestamps = [row['timestamp'] for row in perf_data if row.get('timestamp')]
         if timestamps:
             stats['date_range']['start'] = min(timestamps)
             stats['date_range']['end'] = max(timestamps)
         
         # Calculate stats for each metric
-        metrics = ['supabase_read_ms', 'supabase_write_ms', 'notion_write_ms', 'git_push_ms', 'duration_total_ms']
+        metrics = [f"{operation}_ms" for operation in OPERATIONS] + ['duration_total_ms']
         
         for metric in metrics:
-            values = [row[metric] for row in perf_data if row[metric] is not None]
-            
-            if values:
+            histogram = LatencyHistogram()
+            minimum = None
+            
+            for row in perf_data:
+                value = row.get(metric)
+                if value is None:
+                    continue
+                for sample in (value if isinstance(value, list) else [value]):
+                    histogram.record(sample)
+                    minimum = sample if minimum is None else min(minimum, sample)
+            
+            if histogram.total:
+                summary = histogram.summary()
                 stats['metrics'][metric] = {
-                    'count': len(values),
-                    'min': min(values),
-                    'avg': statistics.mean(values),
-                    'p95': self.calculate_percentile(values, 95),
-                    'max': max(values)
+                    'count': histogram.total,
+                    'min': minimum,
+                    'avg': summary['mean_ms'],
+                    'p50': summary['p50_ms'],
+                    'p95': summary['p95_ms'],
+                    'p99': summary['p99_ms'],
+                    'max': summary['max_ms']
                 }
             else:
                 stats['metrics'][metric] = {
                     'count': 0,
                     'min': None,
                     'avg': None,
+                    'p50': None,
                     'p95': None,
+                    'p99': None,
                     'max': None
                 }
         
         return stats
     
-    def calculate_percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate percentile value"""
+    def calculate_percentiles(self, values: List[float], percentiles: List[int]) -> Dict[int, float]:
+        """Calculate several percentiles with a single sort"""
         if not values:
-            return 0
+            return {percentile: 0 for percentile in percentiles}
         
         sorted_values = sorted(values)
-        index = (percentile / 100) * len(sorted_values)
+        results = {}
         
-        if index.is_integer():
-            return sorted_values[int(index) - 1]
-        else:
-            lower = sorted_values[int(index)]
-            upper = sorted_values[min(int(index) + 1, len(sorted_values) - 1)]
-            return lower + (upper - lower) * (index - int(index))
+        for percentile in percentiles:
+            index = (percentile / 100) * len(sorted_values)
+            
+            if index.is_integer():
+                results[percentile] = sorted_values[int(index) - 1]
+            else:
+                lower = sorted_values[int(index)]
+                upper = sorted_values[min(int(index) + 1, len(sorted_values) - 1)]
+                results[percentile] = lower + (upper - lower) * (index - int(index))
+        
+        return results
+    
+    def calculate_percentile(self, values: List[float], percentile: int) -> float:
+        """Calculate percentile value"""
+        return self.calculate_percentiles(values, [percentile])[percentile]
     
     def generate_summary_markdown(self, summary: Dict[str, Any]) -> str:
         """Generate Markdown summary content"""
@@ -576,19 +651,18 @@ class PerformanceBenchmarkSystem:
 
 ## Performance Metrics (Last {self.config['summary_days']} Days)
 
-| Metric | Count | Min (ms) | Avg (ms) | P95 (ms) | Max (ms) |
-|--------|-------|----------|----------|----------|----------|
+| Metric | Samples | Min (ms) | Avg (ms) | P50 (ms) | P95 (ms) | P99 (ms) | Max (ms) |
+|--------|---------|----------|----------|----------|----------|----------|----------|
 """
         
+        def fmt(value):
+            return f"{value:.1f}" if value is not None else "N/A"
+        
         for metric_name, stats in summary['metrics'].items():
             display_name = metric_name.replace('_', ' ').title()
-            count = stats['count']
-            min_val = f"{stats['min']:.1f}" if stats['min'] is not None else "N/A"
-            avg_val = f"{stats['avg']:.1f}" if stats['avg'] is not None else "N/A"
-            p95_val = f"{stats['p95']:.1f}" if stats['p95'] is not None else "N/A"
-            max_val = f"{stats['max']:.1f}" if stats['max'] is not None else "N/A"
+            values = " | ".join(fmt(stats.get(key)) for key in ['min', 'avg', 'p50', 'p95', 'p99', 'max'])
             
-            content += f"| {display_name} | {count} | {min_val} | {avg_val} | {p95_val} | {max_val} |\n"
+            content += f"| {display_name} | {stats['count']} | {values} |\n"
         
         content += f"""
 ## Performance Thresholds
@@ -602,12 +676,25 @@ class PerformanceBenchmarkSystem:
 **Status:** {self.benchmark_results['overall_status']}  
 **Timestamp:** {self.benchmark_results['timestamp']}
 
-### Latest Results
-- **Supabase Read:** {self.benchmark_results['supabase_read_ms']:.1f}ms
-- **Supabase Write:** {self.benchmark_results['supabase_write_ms']:.1f}ms  
-- **Notion Write:** {self.benchmark_results['notion_write_ms']:.1f}ms
-- **Git Push:** {self.benchmark_results['git_push_ms']:.1f}ms
+### Latest Results (median)
+- **Supabase Read:** {fmt(self.benchmark_results['supabase_read_ms'])}ms
+- **Supabase Write:** {fmt(self.benchmark_results['supabase_write_ms'])}ms  
+- **Notion Write:** {fmt(self.benchmark_results['notion_write_ms'])}ms
+- **Git Push:** {fmt(self.benchmark_results['git_push_ms'])}ms
 
+## Regressions
+
+"""
+        
+        if self.benchmark_results['regressions']:
+            for regression in self.benchmark_results['regressions']:
+                content += (f"- **{regression['operation']}:** {regression['baseline_median_ms']:.1f}ms -> "
+                            f"{regression['current_median_ms']:.1f}ms (+{regression['slowdown']:.0%}, "
+                            f"p={regression['p_value']:.4f})\n")
+        else:
+            content += "No significant slowdowns against the trailing window.\n"
+        
+        content += """
 ---
 *Auto-generated by Angles AI Universe™ Performance Benchmarking System*
 """
@@ -621,30 +708,54 @@ class PerformanceBenchmarkSystem:
         total_start_time = time.time()
         
         try:
+            run_samples = {}
+            
             # Step 1: Benchmark Supabase read
             self.logger.info("1️⃣ Benchmarking Supabase read operations...")
-            supabase_read = self.benchmark_supabase_read()
+            supabase_read, run_samples['supabase_read'] = self.sample_operation('supabase_read', self.benchmark_supabase_read)
             self.benchmark_results['supabase_read_ms'] = supabase_read['duration_ms']
             
             # Step 2: Benchmark Supabase write
             self.logger.info("2️⃣ Benchmarking Supabase write operations...")
-            supabase_write = self.benchmark_supabase_write()
+            supabase_write, run_samples['supabase_write'] = self.sample_operation('supabase_write', self.benchmark_supabase_write)
             self.benchmark_results['supabase_write_ms'] = supabase_write['duration_ms']
             
             # Step 3: Benchmark Notion write
             self.logger.info("3️⃣ Benchmarking Notion write operations...")
-            notion_write = self.benchmark_notion_write()
+            notion_write, run_samples['notion_write'] = self.sample_operation('notion_write', self.benchmark_notion_write)
             self.benchmark_results['notion_write_ms'] = notion_write['duration_ms']
             
             # Step 4: Benchmark Git push
             self.logger.info("4️⃣ Benchmarking Git push operations...")
-            git_push = self.benchmark_git_push()
+            git_push, run_samples['git_push'] = self.sample_operation('git_push', self.benchmark_git_push)
             self.benchmark_results['git_push_ms'] = git_push['duration_ms']
             
+            for operation, result in zip(OPERATIONS, [supabase_read, supabase_write, notion_write, git_push]):
+                self.benchmark_results['operations'][operation] = {
+                    'samples': result.get('samples', 0),
+                    'failed_samples': result.get('failed_samples', 0),
+                    'latency': result.get('latency'),
+                    'error_message': result.get('error_message')
+                }
+                self.check_thresholds(operation.replace('_', ' ').capitalize(), result['duration_ms'])
+            
             # Calculate total duration
             total_duration_ms = (time.time() - total_start_time) * 1000
             self.benchmark_results['duration_total_ms'] = total_duration_ms
             
+            # Step 5: Compare against the trailing window and store this run's samples
+            self.logger.info("5️⃣ Checking for regressions...")
+            run_samples = {operation: samples for operation, samples in run_samples.items() if samples}
+            run_timestamp = time.time()
+            regressions = self.detect_regressions(run_samples, run_timestamp)
+            self.benchmark_results['regressions'] = regressions
+            for regression in regressions:
+                self.benchmark_results['warnings'].append(
+                    f"{regression['operation']} regressed +{regression['slowdown']:.0%} (p={regression['p_value']:.4f})")
+            
+            run_samples['duration_total'] = [total_duration_ms]
+            self.get_store().record_run(self.benchmark_results['benchmark_id'], run_timestamp, run_samples)
+            
             # Determine overall status
             if self.benchmark_results['errors']:
                 self.benchmark_results['overall_status'] = 'failed'
@@ -653,12 +764,12 @@ class PerformanceBenchmarkSystem:
             else:
                 self.benchmark_results['overall_status'] = 'healthy'
             
-            # Step 5: Emit CSV results
-            self.logger.info("5️⃣ Exporting results to CSV...")
+            # Step 6: Emit CSV results
+            self.logger.info("6️⃣ Exporting results to CSV...")
             csv_success = self.emit_csv_results()
             
-            # Step 6: Update rolling summary
-            self.logger.info("6️⃣ Updating performance summary...")
+            # Step 7: Update rolling summary
+            self.logger.info("7️⃣ Updating performance summary...")
             summary_success = self.update_rolling_summary()
             
             # Log final results
@@ -677,14 +788,10 @@ class PerformanceBenchmarkSystem:
                 for error in self.benchmark_results['errors']:
                     self.logger.error(f"❌ {error}")
             
-            # Send alerts for critical performance issues
-            if self.alert_manager and self.benchmark_results['errors']:
-                self.alert_manager.send_alert(
-                    title="Performance Benchmark Critical Issues",
-                    message=f"Performance benchmark detected critical issues: {', '.join(self.benchmark_results['errors'])}",
-                    severity="warning",
-                    tags=['performance', 'benchmark', 'critical']
-                )
+            # Alert only on statistically significant slowdowns, not on single slow samples
+            if self.alert_manager:
+                for regression in regressions:
+                    self.alert_manager.send_performance_alert(regression['operation'], regression)
         
         except Exception as e:
             self.benchmark_results['overall_status'] = 'error'
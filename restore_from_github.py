@@ -3,6 +3,11 @@
 Angles AI Universe™ Restore from GitHub
 Safe restore with collision handling
 
+Decisions are restored in bulk: existing (decision, date) keys are fetched
+in one keyset-paged scan, new decisions get deterministic ids and are
+upserted in batches with on_conflict=id, so re-running a restore is
+idempotent and costs a few requests per thousand decisions.
+
 Author: Angles AI Universe™ Backend Team
 Version: 1.0.0
 """
@@ -14,7 +19,7 @@ import logging
 import argparse
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 
 try:
     import requests
@@ -28,6 +33,9 @@ except ImportError:
     print("❌ utils.git_helpers not available")
     sys.exit(1)
 
+from utils.json_sanitizer import JSONSanitizer
+from utils.near_duplicates import index_decisions
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -67,9 +75,12 @@ def setup_logging():
 class RestoreRunner:
     """GitHub restore with collision-safe upserts"""
     
-    def __init__(self, dry_run: bool = False):
+    def __init__(self, dry_run: bool = False, batch_size: int = 500):
         self.logger = setup_logging()
         self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.scan_page_size = 1000
+        self.sanitizer = JSONSanitizer()
         
         # Configuration
         self.repo_url = os.getenv('REPO_URL')
@@ -186,6 +197,110 @@ class RestoreRunner:
             self.logger.error(f"❌ Error checking decision existence: {e}")
             return None
     
+    def prepare_decision(self, decision_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the decision_vault row, with an id derived from its content"""
+        insert_data = {
+            'decision': decision_data.get('decision', ''),
+            'date': decision_data.get('date', datetime.now().date().isoformat()),
+            'type': decision_data.get('type', 'other'),
+            'active': decision_data.get('active', True),
+            'comment': decision_data.get('comment', ''),
+            'synced': False  # Mark as unsynced so it gets processed by memory sync
+        }
+        insert_data['id'] = self.sanitizer.create_deterministic_id(insert_data)
+        return insert_data
+    
+    def fetch_existing_keys(self) -> Optional[Set[Tuple[str, str]]]:
+        """Fetch every existing (decision, date) key in one keyset-paged scan"""
+        keys = set()
+        last_id = None
+        
+        try:
+            while True:
+                params = {
+                    'select': 'id,decision,date',
+                    'order': 'id.asc',
+                    'limit': str(self.scan_page_size)
+                }
+                if last_id is not None:
+                    params['id'] = f"gt.{last_id}"
+                
+                response = requests.get(
+                    f"{self.supabase_url}/rest/v1/decision_vault",
+                    headers=self.supabase_headers,
+                    params=params,
+                    timeout=30
+                )
+                
+                if response.status_code != 200:
+                    self.logger.error(f"❌ Failed to scan existing decisions: HTTP {response.status_code}")
+                    return None
+                
+                rows = response.json()
+                keys.update((row.get('decision') or '', str(row.get('date') or '')) for row in rows)
+                
+                if len(rows) < self.scan_page_size:
+                    break
+                last_id = rows[-1]['id']
+            
+            self.logger.info(f"🔎 Found {len(keys)} existing decisions")
+            return keys
+        
+        except Exception as e:
+            self.logger.error(f"❌ Error scanning existing decisions: {e}")
+            return None
+    
+    def upsert_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of prepared decisions; returns how many were written
+        
+        Rows whose id already exists are left untouched (ignore-duplicates),
+        so retrying a batch is safe. A rejected batch is split in halves to
+        isolate the bad records instead of dropping the whole batch.
+        """
+        headers = dict(self.supabase_headers)
+        headers['Prefer'] = 'resolution=ignore-duplicates,return=minimal'
+        
+        try:
+            response = requests.post(
+                f"{self.supabase_url}/rest/v1/decision_vault?on_conflict=id",
+                headers=headers,
+                json=batch,
+                timeout=60
+            )
+            
+            if response.status_code in [200, 201, 204]:
+                index_decisions(batch)
+                return len(batch)
+            
+            if len(batch) == 1:
+                self.logger.error(f"   ❌ Failed to restore decision: HTTP {response.status_code}")
+                self.logger.error(f"      Response: {response.text}")
+                self.restore_stats['decisions_failed'] += 1
+                return 0
+        
+        except Exception as e:
+            if len(batch) == 1:
+                self.logger.error(f"❌ Error upserting decision: {e}")
+                self.restore_stats['decisions_failed'] += 1
+                return 0
+        
+        middle = len(batch) // 2
+        return self.upsert_batch(batch[:middle]) + self.upsert_batch(batch[middle:])
+    
+    def flush_batch(self, batch: List[Dict[str, Any]]):
+        """Write one batch of new decisions and update the stats"""
+        if not batch:
+            return
+        
+        if self.dry_run:
+            self.logger.info(f"🔍 [DRY RUN] Would restore {len(batch)} decisions")
+            return
+        
+        written = self.upsert_batch(batch)
+        self.restore_stats['decisions_restored'] += written
+        self.logger.info(f"   ✅ Restored batch of {written}/{len(batch)} decisions "
+                         f"({self.restore_stats['decisions_restored']} total)")
+    
     def upsert_decision(self, decision_data: Dict[str, Any]) -> bool:
         """Upsert decision to Supabase with collision handling"""
         if not self.supabase_enabled:
@@ -208,15 +323,7 @@ class RestoreRunner:
                 self.restore_stats['decisions_skipped'] += 1
                 return True
             
-            # Prepare decision data for insert
-            insert_data = {
-                'decision': decision_text,
-                'date': decision_date,
-                'type': decision_data.get('type', 'other'),
-                'active': decision_data.get('active', True),
-                'comment': decision_data.get('comment', ''),
-                'synced': False  # Mark as unsynced so it gets processed by memory sync
-            }
+            insert_data = self.prepare_decision(decision_data)
             
             # Insert new decision
             response = requests.post(
@@ -242,7 +349,7 @@ class RestoreRunner:
             return False
     
     def restore_decisions_from_files(self) -> bool:
-        """Restore decisions from exported JSON files"""
+        """Restore decisions from exported JSON files in batches"""
         self.logger.info("📋 Restoring decisions from exported files...")
         
         if not self.safe_export_dir.exists():
@@ -255,8 +362,19 @@ class RestoreRunner:
             self.logger.info("ℹ️ No JSON files found to restore")
             return True
         
+        if not self.supabase_enabled:
+            self.logger.warning("⚠️ Supabase not configured, skipping decision restore")
+            return True
+        
         self.logger.info(f"📁 Found {len(json_files)} JSON files to process")
         
+        # One scan instead of one existence query per decision
+        existing_keys = self.fetch_existing_keys()
+        if existing_keys is None:
+            return False
+        
+        pending = []
+        
         for json_file in json_files:
             self.logger.info(f"📄 Processing {json_file.name}...")
             
@@ -279,12 +397,28 @@ class RestoreRunner:
                     self.logger.warning(f"   ⚠️ Invalid decision format at index {i}")
                     continue
                 
-                self.logger.info(f"   📝 Processing {i}/{len(decisions)}: {decision['decision'][:50]}...")
-                self.upsert_decision(decision)
+                row = self.prepare_decision(decision)
+                key = (row['decision'], str(row['date']))
+                
+                # Existing rows and repeats within this restore are skipped
+                if key in existing_keys:
+                    self.restore_stats['decisions_skipped'] += 1
+                    continue
+                existing_keys.add(key)
+                
+                pending.append(row)
+                if len(pending) >= self.batch_size:
+                    self.flush_batch(pending)
+                    pending = []
             
             self.restore_stats['files_pulled'] += 1
         
-        return True
+        self.flush_batch(pending)
+        
+        if self.restore_stats['decisions_skipped']:
+            self.logger.info(f"   ⏭️ Skipped {self.restore_stats['decisions_skipped']} decisions that already exist")
+        
+        return self.restore_stats['decisions_failed'] == 0
     
     def run_restore(self, restore_decisions: bool = False) -> bool:
         """Run complete restore process"""
@@ -329,11 +463,12 @@ def main():
     parser = argparse.ArgumentParser(description='Restore from GitHub')
     parser.add_argument('--restore-decisions', action='store_true', help='Restore decisions to Supabase')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without executing')
+    parser.add_argument('--batch-size', type=int, default=500, help='Decisions per bulk upsert request')
     
     args = parser.parse_args()
     
     try:
-        restore_runner = RestoreRunner(dry_run=args.dry_run)
+        restore_runner = RestoreRunner(dry_run=args.dry_run, batch_size=args.batch_size)
         success = restore_runner.run_restore(restore_decisions=args.restore_decisions)
         sys.exit(0 if success else 1)
         
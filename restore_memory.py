@@ -7,6 +7,7 @@ This module provides:
 - Multi-source restore: Supabase storage, GitHub repository, local files
 - AES-256 decryption using existing encryption key
 - Full validation and schema checking
+- Streaming, selective restore straight from the archive (no extraction)
 - Supabase decision_vault restore with timestamps
 - Safety features: dry-run, confirmations, pre-restore snapshots
 - Comprehensive logging and error handling
@@ -18,15 +19,15 @@ Version: 1.0.0
 import os
 import sys
 import json
+import fnmatch
 import zipfile
 import argparse
 import logging
 import tempfile
-import subprocess
 import shutil
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from logging.handlers import RotatingFileHandler
 
 # Add project root to path for imports
@@ -45,6 +46,10 @@ except ImportError:
 
 from backup_utils import UnifiedBackupManager, BackupConfig
 from notion_backup_logger import create_notion_logger
+from utils.backup_catalog import open_backup_catalog
+from utils.backup_mirror import BackupMirror, MirrorError
+from utils.near_duplicates import index_decisions
+from utils.streaming_restore import StreamingArchiveRestore
 
 class MemoryRestoreManager:
     """Manages memory system restoration from multiple sources"""
@@ -65,12 +70,16 @@ class MemoryRestoreManager:
         # Initialize clients
         self.supabase = self._init_supabase_client()
         self.cipher = self._init_encryption()
+        self.catalog = open_backup_catalog()
         
         # Restore paths
         self.restore_temp_dir = Path('restore_temp')
         self.backup_dir = Path('backups')
         self.memory_dir = Path('memory')
         
+        # Archive members restored into the memory directory
+        self.memory_members = ['state.json', 'session_cache.json', 'long_term.db', 'indexes/']
+        
         # Bucket configuration
         self.bucket_name = 'memory_backups'
         
@@ -180,6 +189,28 @@ class MemoryRestoreManager:
             self.logger.error(f"Error creating pre-restore snapshot: {e}")
             return None
     
+    def resolve_latest_backup(self, source: str) -> Optional[str]:
+        """Filename of the newest cataloged backup stored in source"""
+        try:
+            entry = self.catalog.latest(source=source)
+        except Exception as e:
+            self.logger.warning(f"Backup catalog lookup failed: {e}")
+            return None
+        
+        if entry:
+            self.logger.info(f"📇 Latest {source} backup from catalog: {entry['filename']} ({entry['timestamp']})")
+            return entry['filename']
+        return None
+    
+    def cataloged_location(self, filename: str, source: str) -> Optional[str]:
+        """Where the catalog says source holds filename, if it knows"""
+        try:
+            entry = self.catalog.find(filename)
+        except Exception as e:
+            self.logger.debug(f"Backup catalog lookup failed: {e}")
+            return None
+        return entry['locations'].get(source) if entry else None
+    
     def download_from_supabase(self, filename: str, storage_prefix: str = None) -> Optional[str]:
         """Download backup file from Supabase storage"""
         if not self.supabase:
@@ -187,12 +218,16 @@ class MemoryRestoreManager:
             return None
         
         try:
-            # Try both prefixes if not specified
-            prefixes_to_try = [storage_prefix] if storage_prefix else ['manual', 'daily']
+            # Try the cataloged path, then both prefixes if not specified
+            if storage_prefix:
+                storage_paths = [f"{storage_prefix}/{filename}"]
+            else:
+                storage_paths = [f"{prefix}/{filename}" for prefix in ('manual', 'daily')]
+                cataloged_path = self.cataloged_location(filename, 'supabase')
+                if cataloged_path:
+                    storage_paths = [cataloged_path] + [path for path in storage_paths if path != cataloged_path]
             
-            for prefix in prefixes_to_try:
-                storage_path = f"{prefix}/{filename}"
-                
+            for storage_path in storage_paths:
                 try:
                     # Download file from storage
                     response = self.supabase.storage.from_(self.bucket_name).download(storage_path)
@@ -218,7 +253,7 @@ class MemoryRestoreManager:
             return None
     
     def download_from_github(self, filename: str, tag: str = None) -> Optional[str]:
-        """Download backup file from GitHub repository"""
+        """Download backup file from GitHub repository via the local backup mirror"""
         if not self.github_token or not self.repo_url:
             self.logger.error("GitHub credentials not available")
             return None
@@ -226,49 +261,36 @@ class MemoryRestoreManager:
         try:
             self.logger.info("📥 Downloading from GitHub repository...")
             
-            # Clone or update repository
-            repo_dir = Path('github_restore_temp')
-            
-            if repo_dir.exists():
-                shutil.rmtree(repo_dir)
-            
-            # Clone repository
-            clone_url = self.repo_url.replace('https://', f'https://x-access-token:{self.github_token}@')
-            result = subprocess.run(['git', 'clone', clone_url, str(repo_dir)], 
-                                 capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                self.logger.error(f"Failed to clone repository: {result.stderr}")
-                return None
+            # Incremental fetch of the branch tip; file contents are fetched on demand
+            mirror = BackupMirror(self.repo_url, token=self.github_token)
+            mirror.sync()
             
-            # If tag is specified, checkout that commit/tag
+            # If tag is specified, fetch just that commit/tag
+            revision = None
             if tag:
-                result = subprocess.run(['git', 'checkout', tag], 
-                                     cwd=repo_dir, capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.logger.warning(f"Failed to checkout tag {tag}: {result.stderr}")
+                try:
+                    revision = mirror.fetch_revision(tag)
+                except MirrorError as e:
+                    self.logger.warning(f"Failed to fetch tag {tag}: {e}")
             
             # Look for backup file in export directory
-            export_dir = repo_dir / 'export'
-            backup_files = list(export_dir.glob(f"*{filename}*")) if export_dir.exists() else []
+            export_files = [path for path in mirror.list_files('export/', revision) if path.count('/') == 1]
+            backup_files = [path for path in export_files if fnmatch.fnmatch(Path(path).name, f"*{filename}*")]
             
             if not backup_files:
-                backup_files = list(export_dir.glob("*.zip")) if export_dir.exists() else []
+                backup_files = [path for path in export_files if path.endswith('.zip')]
             
             if not backup_files:
                 self.logger.error(f"Backup file not found in GitHub repository: {filename}")
                 return None
             
-            # Use the first matching file
-            source_file = backup_files[0]
-            dest_file = self.restore_temp_dir / source_file.name
-            
-            shutil.copy2(source_file, dest_file)
+            # Use the newest matching file
+            source_file = sorted(backup_files, reverse=True)[0]
+            dest_file = self.restore_temp_dir / Path(source_file).name
             
-            # Cleanup
-            shutil.rmtree(repo_dir)
+            mirror.copy_file(source_file, str(dest_file), revision)
             
-            self.logger.info(f"📥 Downloaded from GitHub: {source_file.name}")
+            self.logger.info(f"📥 Downloaded from GitHub: {Path(source_file).name}")
             return str(dest_file)
             
         except Exception as e:
@@ -278,8 +300,10 @@ class MemoryRestoreManager:
     def get_local_backup(self, filename: str) -> Optional[str]:
         """Get backup file from local backups directory"""
         try:
-            # Check multiple possible locations
-            possible_paths = [
+            # Check multiple possible locations, the cataloged one first
+            cataloged_path = self.cataloged_location(filename, 'local')
+            possible_paths = [Path(cataloged_path)] if cataloged_path else []
+            possible_paths += [
                 self.backup_dir / filename,
                 Path(filename),  # Direct path
                 Path('export') / filename,
@@ -342,24 +366,23 @@ class MemoryRestoreManager:
             self.logger.error(f"Failed to decrypt backup file: {e}")
             return None
     
-    def validate_backup_structure(self, backup_path: str) -> Dict[str, Any]:
-        """Validate backup file structure and contents"""
+    def validate_backup_structure(self, backup_path: str, only: str = 'all') -> Dict[str, Any]:
+        """Validate backup structure from the archive directory and metadata only"""
         validation_result = {
             'valid': False,
             'backup_metadata': None,
             'memory_files': [],
-            'decision_vault_data': None,
+            'decision_file': None,
             'errors': []
         }
         
         try:
-            with zipfile.ZipFile(backup_path, 'r') as zip_file:
-                file_list = zip_file.namelist()
+            with StreamingArchiveRestore(backup_path) as archive:
+                file_list = archive.names()
                 
                 # Check for metadata file
                 if 'backup_metadata.json' in file_list:
-                    metadata_content = zip_file.read('backup_metadata.json').decode('utf-8')
-                    validation_result['backup_metadata'] = json.loads(metadata_content)
+                    validation_result['backup_metadata'] = archive.read_json('backup_metadata.json')
                     self.logger.info("✅ Found backup metadata")
                 else:
                     validation_result['errors'].append("Missing backup_metadata.json")
@@ -370,106 +393,113 @@ class MemoryRestoreManager:
                     if memory_file in file_list:
                         validation_result['memory_files'].append(memory_file)
                 
-                # Check for decision vault data (might be in a separate file or embedded)
+                # Check for decision vault data; its records are streamed later, not loaded here
                 decision_files = [f for f in file_list if 'decision' in f.lower() and f.endswith('.json')]
                 if decision_files:
-                    decision_content = zip_file.read(decision_files[0]).decode('utf-8')
-                    validation_result['decision_vault_data'] = json.loads(decision_content)
+                    validation_result['decision_file'] = decision_files[0]
                     self.logger.info(f"✅ Found decision vault data: {decision_files[0]}")
+            
+            # Mark as valid if we have the components this restore needs
+            required = {
+                'all': validation_result['memory_files'],
+                'memory': validation_result['memory_files'],
+                'decisions': validation_result['decision_file']
+            }[only]
+            
+            if validation_result['backup_metadata'] and required:
+                validation_result['valid'] = True
+                self.logger.info("✅ Backup structure validation passed")
+            else:
+                validation_result['errors'].append("Missing essential backup components")
                 
-                # Mark as valid if we have essential components
-                if validation_result['backup_metadata'] and validation_result['memory_files']:
-                    validation_result['valid'] = True
-                    self.logger.info("✅ Backup structure validation passed")
-                else:
-                    validation_result['errors'].append("Missing essential backup components")
-                    
         except Exception as e:
             validation_result['errors'].append(f"Failed to validate backup: {e}")
             self.logger.error(f"Backup validation failed: {e}")
         
         return validation_result
     
-    def extract_backup(self, backup_path: str) -> bool:
-        """Extract backup to restore temp directory"""
-        try:
-            self.logger.info("📦 Extracting backup archive...")
-            
-            # Clear restore temp directory
-            if self.restore_temp_dir.exists():
-                shutil.rmtree(self.restore_temp_dir)
-            self.restore_temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Ensure we're using the absolute path
-            abs_backup_path = Path(backup_path).resolve()
-            
-            with zipfile.ZipFile(abs_backup_path, 'r') as zip_file:
-                zip_file.extractall(self.restore_temp_dir)
-            
-            self.logger.info(f"✅ Backup extracted to {self.restore_temp_dir}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to extract backup: {e}")
-            return False
-    
-    def restore_memory_files(self) -> bool:
-        """Restore memory files from extracted backup"""
-        if self.dry_run:
-            self.logger.info("📁 [DRY-RUN] Would restore memory files")
-            return True
+    def restore_memory_files(self, backup_path: str, checksums: Optional[Dict[str, str]] = None,
+                             paths: Optional[List[str]] = None) -> bool:
+        """Stream memory files from the archive straight into the memory directory
+        
+        Args:
+            backup_path: Decrypted backup archive
+            checksums: SHA-256 per member from the backup metadata, verified while streaming
+            paths: Member globs to restore instead of the standard memory files
+        """
+        patterns = paths or self.memory_members
         
         try:
-            self.logger.info("📁 Restoring memory files...")
-            
-            # Ensure memory directory exists
-            self.memory_dir.mkdir(parents=True, exist_ok=True)
+            with StreamingArchiveRestore(backup_path, checksums, self.logger) as archive:
+                if self.dry_run:
+                    stats = archive.restore(str(self.memory_dir), patterns,
+                                            exclude=['backup_metadata.json'], dry_run=True)
+                    self.logger.info(f"📁 [DRY-RUN] Would restore {stats['restored']} memory files: {stats['files']}")
+                    return True
+                
+                self.logger.info("📁 Restoring memory files...")
+                self.memory_dir.mkdir(parents=True, exist_ok=True)
+                stats = archive.restore(str(self.memory_dir), patterns, exclude=['backup_metadata.json'])
             
-            # Restore individual files
-            memory_files = ['state.json', 'session_cache.json', 'long_term.db']
-            restored_count = 0
+            for name in stats['files']:
+                self.logger.info(f"📁 Restored: {name}")
             
-            for memory_file in memory_files:
-                source_path = self.restore_temp_dir / memory_file
-                dest_path = self.memory_dir / memory_file
-                
-                if source_path.exists():
-                    shutil.copy2(source_path, dest_path)
-                    self.logger.info(f"📁 Restored: {memory_file}")
-                    restored_count += 1
-                else:
+            for memory_file in ['state.json', 'session_cache.json', 'long_term.db']:
+                if paths is None and memory_file not in stats['files']:
                     self.logger.warning(f"Memory file not found in backup: {memory_file}")
             
-            # Restore indexes directory
-            source_indexes = self.restore_temp_dir / 'indexes'
+            # A full restore replaces the indexes directory: drop files the backup doesn't have
+            restored_indexes = {self.memory_dir / name for name in stats['files'] if name.startswith('indexes/')}
             dest_indexes = self.memory_dir / 'indexes'
+            if paths is None and restored_indexes and not stats['failed']:
+                for stale in dest_indexes.rglob('*'):
+                    if stale.is_file() and stale not in restored_indexes:
+                        stale.unlink()
             
-            if source_indexes.exists() and source_indexes.is_dir():
-                if dest_indexes.exists():
-                    shutil.rmtree(dest_indexes)
-                shutil.copytree(source_indexes, dest_indexes)
-                self.logger.info("📁 Restored: indexes directory")
-                restored_count += 1
+            if stats['failed']:
+                self.logger.error(f"❌ {stats['failed']} memory files failed verification: {stats['errors']}")
+                return False
             
-            self.logger.info(f"✅ Restored {restored_count} memory components")
-            return restored_count > 0
+            self.logger.info(f"✅ Restored {stats['restored']} memory files ({stats['bytes']} bytes)")
+            return stats['restored'] > 0
             
         except Exception as e:
             self.logger.error(f"Failed to restore memory files: {e}")
             return False
     
-    def restore_decision_vault(self, decision_data: List[Dict[str, Any]]) -> bool:
-        """Restore decision vault data to Supabase"""
+    def stream_decision_records(self, backup_path: str, decision_file: str,
+                                checksums: Optional[Dict[str, str]] = None) -> Optional[Iterable[Dict[str, Any]]]:
+        """Verify the decision export, then stream its records one at a time"""
+        with StreamingArchiveRestore(backup_path, checksums, self.logger) as archive:
+            verification = archive.verify([decision_file])
+        
+        if verification['failed']:
+            self.logger.error(f"❌ Decision export failed verification: {verification['errors']}")
+            return None
+        
+        def records():
+            with StreamingArchiveRestore(backup_path) as archive:
+                yield from archive.iter_records(decision_file)
+        
+        return records()
+    
+    def restore_decision_vault(self, decision_data: Iterable[Dict[str, Any]]) -> bool:
+        """Restore decision vault data to Supabase
+        
+        decision_data may be a generator streaming records from the archive,
+        so it is consumed exactly once.
+        """
         if not self.supabase:
             self.logger.warning("Supabase not available, skipping decision vault restore")
             return True
         
         if self.dry_run:
-            self.logger.info(f"🗄️ [DRY-RUN] Would restore {len(decision_data)} decision vault records")
+            record_count = sum(1 for _ in decision_data)
+            self.logger.info(f"🗄️ [DRY-RUN] Would restore {record_count} decision vault records")
             return True
         
         try:
-            self.logger.info(f"🗄️ Restoring {len(decision_data)} decision vault records...")
+            self.logger.info("🗄️ Restoring decision vault records...")
             
             restored_count = 0
             updated_count = 0
@@ -495,6 +525,7 @@ class MemoryRestoreManager:
                             update_result = self.supabase.table('decision_vault').update(record).eq('id', record_id).execute()
                             if update_result.data:
                                 updated_count += 1
+                                index_decisions(update_result.data)
                             else:
                                 self.logger.warning(f"Failed to update record {record_id}")
                         else:
@@ -502,6 +533,7 @@ class MemoryRestoreManager:
                             insert_result = self.supabase.table('decision_vault').insert(record).execute()
                             if insert_result.data:
                                 restored_count += 1
+                                index_decisions(insert_result.data)
                             else:
                                 self.logger.warning(f"Failed to insert record {record_id}")
                     else:
@@ -510,6 +542,7 @@ class MemoryRestoreManager:
                         insert_result = self.supabase.table('decision_vault').insert(record).execute()
                         if insert_result.data:
                             restored_count += 1
+                            index_decisions(insert_result.data)
                         else:
                             self.logger.warning("Failed to insert record without ID")
                 
@@ -545,8 +578,14 @@ class MemoryRestoreManager:
         except Exception as e:
             self.logger.warning(f"Failed to log restore action to Notion: {e}")
     
-    def run_restore(self, source: str, filename: str = None, tag: str = None, force: bool = False) -> bool:
-        """Execute complete restore process"""
+    def run_restore(self, source: str, filename: str = None, tag: str = None, force: bool = False,
+                    only: str = 'all', paths: Optional[List[str]] = None) -> bool:
+        """Execute complete restore process
+        
+        Args:
+            only: 'all', 'memory' (memory files only) or 'decisions' (decision vault only)
+            paths: Archive member globs restored instead of the standard memory files
+        """
         start_time = datetime.now()
         
         self.logger.info(f"🔄 Starting restore from {source.upper()}")
@@ -554,6 +593,8 @@ class MemoryRestoreManager:
             self.logger.info(f"📁 Target file: {filename}")
         if tag:
             self.logger.info(f"🏷️ Tag: {tag}")
+        if only != 'all' or paths:
+            self.logger.info(f"🎯 Selective restore: {only}{f' {paths}' if paths else ''}")
         
         try:
             # Create restore temp directory
@@ -580,9 +621,13 @@ class MemoryRestoreManager:
             # Step 3: Download/get backup file
             backup_file_path = None
             
+            # A tag pins the GitHub checkout, otherwise the catalog names the latest backup
+            if not filename and not tag:
+                filename = self.resolve_latest_backup(source)
+            
             if source == 'supabase':
                 if not filename:
-                    self.logger.error("Filename required for Supabase restore")
+                    self.logger.error("Filename required for Supabase restore (no cataloged backup)")
                     return False
                 backup_file_path = self.download_from_supabase(filename)
             
@@ -591,7 +636,7 @@ class MemoryRestoreManager:
             
             elif source == 'local':
                 if not filename:
-                    self.logger.error("Filename required for local restore")
+                    self.logger.error("Filename required for local restore (no cataloged backup)")
                     return False
                 backup_file_path = self.get_local_backup(filename)
             
@@ -610,24 +655,23 @@ class MemoryRestoreManager:
                 return False
             
             # Step 5: Validate backup structure
-            validation = self.validate_backup_structure(decrypted_path)
+            validation = self.validate_backup_structure(decrypted_path, only)
             if not validation['valid']:
                 self.logger.error(f"Backup validation failed: {validation['errors']}")
                 return False
             
-            # Step 6: Extract backup
-            if not self.extract_backup(decrypted_path):
-                self.logger.error("Failed to extract backup")
-                return False
+            checksums = (validation['backup_metadata'] or {}).get('checksums')
             
-            # Step 7: Restore memory files
-            if not self.restore_memory_files():
-                self.logger.error("Failed to restore memory files")
-                return False
+            # Step 6: Stream memory files from the archive
+            if only in ('all', 'memory'):
+                if not self.restore_memory_files(decrypted_path, checksums, paths):
+                    self.logger.error("Failed to restore memory files")
+                    return False
             
-            # Step 8: Restore decision vault if data is available
-            if validation['decision_vault_data']:
-                if not self.restore_decision_vault(validation['decision_vault_data']):
+            # Step 7: Stream decision vault records if data is available
+            if only in ('all', 'decisions') and validation['decision_file']:
+                records = self.stream_decision_records(decrypted_path, validation['decision_file'], checksums)
+                if records is None or not self.restore_decision_vault(records):
                     self.logger.error("Failed to restore decision vault")
                     return False
             
@@ -673,6 +717,8 @@ Examples:
   python restore_memory.py --source github --tag v2.1.0
   python restore_memory.py --source local --file /backups/backup.zip --force
   python restore_memory.py --source supabase --file backup.zip --dry-run
+  python restore_memory.py --source local --file backup.zip --only decisions
+  python restore_memory.py --source local --file backup.zip --path 'indexes/*' --path state.json
         """
     )
     
@@ -686,7 +732,7 @@ Examples:
     parser.add_argument(
         '--file',
         type=str,
-        help='Backup filename (required for supabase and local sources)'
+        help='Backup filename (default: latest backup in the catalog for the source)'
     )
     
     parser.add_argument(
@@ -707,6 +753,20 @@ Examples:
         help='Simulate restore without making changes'
     )
     
+    parser.add_argument(
+        '--only',
+        choices=['all', 'memory', 'decisions'],
+        default='all',
+        help='Restore only memory files or only decision vault records'
+    )
+    
+    parser.add_argument(
+        '--path',
+        action='append',
+        dest='paths',
+        help='Archive member glob to restore (repeatable, e.g. "indexes/*")'
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -733,7 +793,9 @@ Examples:
             source=args.source,
             filename=args.file,
             tag=args.tag,
-            force=args.force
+            force=args.force,
+            only=args.only,
+            paths=args.paths
         )
         
         # Print results
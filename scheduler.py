@@ -72,7 +72,8 @@ class UnifiedScheduler:
             'memory_sync': {'runs': 0, 'failures': 0, 'last_run': None},
             'daily_backup': {'runs': 0, 'failures': 0, 'last_run': None},
             'weekly_restore': {'runs': 0, 'failures': 0, 'last_run': None},
-            'autosync': {'runs': 0, 'failures': 0, 'last_run': None}
+            'autosync': {'runs': 0, 'failures': 0, 'last_run': None},
+            'duplicate_index': {'runs': 0, 'failures': 0, 'last_run': None}
         }
         
         # Enable/disable flags
@@ -81,6 +82,7 @@ class UnifiedScheduler:
         self.enable_daily_backup = True
         self.enable_weekly_restore = True
         self.enable_autosync = True
+        self.enable_duplicate_index = True
         
         # Built-in scheduler tracking
         self.last_runs = {
@@ -89,6 +91,7 @@ class UnifiedScheduler:
             'daily_backup': 0,
             'weekly_restore': 0,
             'autosync': 0,
+            'duplicate_index': 0,
             'status_report': 0
         }
         
@@ -195,6 +198,17 @@ class UnifiedScheduler:
             timeout=120
         )
     
+    def job_rebuild_duplicate_index(self):
+        """Daily near-duplicate index rebuild (catches rows written outside the indexed paths)"""
+        if not self.enable_duplicate_index:
+            return
+        
+        self.run_command(
+            [sys.executable, '-m', 'utils.near_duplicates', '--rebuild'],
+            'duplicate_index',
+            timeout=600
+        )
+    
     def print_scheduler_status(self):
         """Print current scheduler status"""
         uptime = datetime.now(timezone.utc) - self.start_time
@@ -254,6 +268,11 @@ class UnifiedScheduler:
                 schedule.every().hour.do(self.job_autosync_files)
                 self.logger.info("   ✅ File autosync: Every hour")
             
+            # Daily duplicate index rebuild at 04:00 UTC
+            if self.enable_duplicate_index:
+                schedule.every().day.at("04:00").do(self.job_rebuild_duplicate_index)
+                self.logger.info("   ✅ Duplicate index rebuild: 04:00 UTC")
+            
             # Status report every 6 hours
             schedule.every(6).hours.do(self.print_scheduler_status)
             self.logger.info("   ✅ Status report: Every 6 hours")
@@ -266,6 +285,7 @@ class UnifiedScheduler:
             self.logger.info("   ✅ Daily backup: 02:00 UTC")
             self.logger.info("   ✅ Weekly restore test: Sundays 03:00 UTC")
             self.logger.info("   ✅ File autosync: Every hour")
+            self.logger.info("   ✅ Duplicate index rebuild: 04:00 UTC")
             self.logger.info("   ✅ Status report: Every 6 hours")
     
     def run_initial_health_check(self):
@@ -373,6 +393,12 @@ class UnifiedScheduler:
                     self.job_weekly_restore_test()
                     self.last_runs['weekly_restore'] = now.timestamp()
             
+            # Duplicate index rebuild at 04:00 UTC
+            if current_hour == 4 and current_minute == 0:
+                if (now.timestamp() - self.last_runs['duplicate_index']) >= 86400:
+                    self.job_rebuild_duplicate_index()
+                    self.last_runs['duplicate_index'] = now.timestamp()
+            
             time.sleep(60)  # Check every minute
 
 def main():
@@ -36,6 +36,15 @@ class SyncConfig:
     
     # Sync frequency (minutes)
     sync_interval: int = 15
+    
+    # Near-real-time sync (sync/realtime_sync.py)
+    realtime_poll_seconds: float = 5.0
+    realtime_batch_window: float = 1.0
+    realtime_cursor_file: str = "logs/realtime_sync_cursor.json"
+    database_url: Optional[str] = None
+    
+    # Alternative Notion API host, e.g. tools/fake_services.py for load tests
+    notion_base_url: Optional[str] = None
 
 
 def load_config() -> SyncConfig:
@@ -68,7 +77,11 @@ def load_config() -> SyncConfig:
         notion_database_id=notion_database_id,
         batch_size=int(os.getenv('SYNC_BATCH_SIZE', '100')),
         max_retries=int(os.getenv('SYNC_MAX_RETRIES', '3')),
-        sync_interval=int(os.getenv('SYNC_INTERVAL_MINUTES', '15'))
+        sync_interval=int(os.getenv('SYNC_INTERVAL_MINUTES', '15')),
+        realtime_poll_seconds=float(os.getenv('SYNC_REALTIME_POLL_SECONDS', '5')),
+        realtime_batch_window=float(os.getenv('SYNC_REALTIME_BATCH_WINDOW', '1')),
+        database_url=os.getenv('DATABASE_URL'),
+        notion_base_url=os.getenv('NOTION_API_BASE_URL')
     )
 
 
@@ -86,6 +99,8 @@ def get_config() -> SyncConfig:
 
 # Constants
 SUPABASE_TABLE = 'decision_vault'
+CHANGE_LOG_TABLE = 'decision_vault_changes'
+CHANGE_NOTIFY_CHANNEL = 'decision_vault_changes'
 NOTION_PROPERTY_MAPPING = {
     'decision': 'Decision',      # Title
     'type': 'Type',             # Multi-select
@@ -10,12 +10,16 @@ Version: 1.0.0
 import hashlib
 import re
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterable, Iterator, Callable
 from dataclasses import dataclass
 
 from .logging_util import get_logger
 
 
+# Precompiled normalization patterns
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
 @dataclass
 class SyncDelta:
     """Represents sync changes needed"""
@@ -30,6 +34,51 @@ class SyncDelta:
     
     # Statistics
     total_changes: int = 0
+    
+    def iter_operations(self) -> Iterator['SyncOp']:
+        """Yield changes as operations in apply order"""
+        
+        for record in self.create_in_supabase:
+            yield SyncOp(SyncOp.CREATE_IN_SUPABASE, None, record)
+        for record in self.create_in_notion:
+            yield SyncOp(SyncOp.CREATE_IN_NOTION, None, record)
+        for current, new in self.update_in_supabase:
+            yield SyncOp(SyncOp.UPDATE_IN_SUPABASE, current, new)
+        for current, new in self.update_in_notion:
+            yield SyncOp(SyncOp.UPDATE_IN_NOTION, current, new)
+
+
+class SyncOp:
+    """Single sync operation (create or update on one side)"""
+    
+    __slots__ = ('action', 'current', 'new')
+    
+    CREATE_IN_SUPABASE = 'create_in_supabase'
+    CREATE_IN_NOTION = 'create_in_notion'
+    UPDATE_IN_SUPABASE = 'update_in_supabase'
+    UPDATE_IN_NOTION = 'update_in_notion'
+    
+    def __init__(self, action: str, current: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        self.action = action
+        self.current = current  # None for creates
+        self.new = new
+    
+    def __repr__(self) -> str:
+        return f"SyncOp({self.action!r})"
+
+
+class ChecksumEntry:
+    """Compact per-record index entry (key, checksum, link, timestamp)"""
+    
+    __slots__ = ('key', 'checksum', 'page_id', 'updated_at', 'matched')
+    
+    def __init__(self, key: str, checksum: bytes, page_id: Optional[str] = None,
+                 updated_at: Optional[str] = None):
+        self.key = key
+        self.checksum = checksum  # raw SHA256 digest (32 bytes)
+        self.page_id = page_id
+        self.updated_at = updated_at
+        self.matched = False
 
 
 class DiffEngine:
@@ -53,9 +102,64 @@ class DiffEngine:
         # Compute SHA256
         checksum = hashlib.sha256(checksum_data.encode('utf-8')).hexdigest()
         
-        self.logger.info(f"🔢 Computed checksum for record", checksum=checksum[:8])
+        self.logger.debug(f"🔢 Computed checksum for record", checksum=checksum[:8])
         return checksum
     
+    def compute_checksums(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Compute checksums for many records at once
+        
+        Produces exactly the same values as calling compute_checksum per
+        record, but normalizes each field column in one bulk pass and skips
+        per-record logging.
+        """
+        
+        if not records:
+            return []
+        
+        decisions = self._normalize_texts([record.get('decision', '') for record in records])
+        types = self._normalize_texts([record.get('type', '') for record in records])
+        
+        dates = [str(date_val).split('T')[0] if date_val else '' for date_val in
+                 (record.get('date') for record in records)]
+        
+        sha256 = hashlib.sha256
+        checksums = [
+            sha256(f"{decision}|{type_val}|{date_val}".encode('utf-8')).hexdigest()
+            for decision, type_val, date_val in zip(decisions, types, dates)
+        ]
+        
+        self.logger.debug(f"🔢 Computed {len(checksums)} checksums")
+        return checksums
+    
+    def _normalize_texts(self, values: List[Any]) -> List[str]:
+        """Bulk version of _normalize_text
+        
+        str.split() with no separator splits on the same Unicode whitespace
+        as the \\s+ pattern and drops leading/trailing runs, so
+        ' '.join(text.split()) equals strip + collapse without the regex
+        engine. Repeated values (e.g. decision types) are normalized once.
+        """
+        
+        cache: Dict[Any, str] = {}
+        normalized = []
+        
+        for value in values:
+            if not value:
+                normalized.append('')
+                continue
+            
+            key = value if isinstance(value, str) else None
+            if key is not None and key in cache:
+                normalized.append(cache[key])
+                continue
+            
+            text = ' '.join(str(value).split()).lower()
+            if key is not None and len(cache) < 1024:
+                cache[key] = text
+            normalized.append(text)
+        
+        return normalized
+    
     def _normalize_text(self, text: Any) -> str:
         """Normalize text for consistent comparison"""
         if not text:
@@ -63,7 +167,7 @@ class DiffEngine:
         
         # Convert to string and normalize whitespace
         normalized = str(text).strip()
-        normalized = re.sub(r'\s+', ' ', normalized)  # Multiple spaces to single
+        normalized = WHITESPACE_PATTERN.sub(' ', normalized)  # Multiple spaces to single
         normalized = normalized.lower()  # Case insensitive
         
         return normalized
@@ -131,17 +235,23 @@ class DiffEngine:
         
         return delta
     
+    def _fill_missing_checksums(self, records: List[Dict[str, Any]]):
+        """Compute checksums in bulk for records that lack one"""
+        
+        missing = [record for record in records if not record.get('checksum')]
+        for record, checksum in zip(missing, self.compute_checksums(missing)):
+            record['checksum'] = checksum
+    
     def _index_supabase_records(self, records: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
         """Index Supabase records by ID and checksum"""
         
         by_id = {}
         by_checksum = {}
         
+        # Ensure checksums are computed
+        self._fill_missing_checksums(records)
+        
         for record in records:
-            # Ensure checksum is computed
-            if not record.get('checksum'):
-                record['checksum'] = self.compute_checksum(record)
-            
             # Index by ID
             if record.get('id'):
                 by_id[record['id']] = record
@@ -157,11 +267,10 @@ class DiffEngine:
         by_id = {}
         by_checksum = {}
         
+        # Ensure checksums are computed
+        self._fill_missing_checksums(records)
+        
         for record in records:
-            # Ensure checksum is computed
-            if not record.get('checksum'):
-                record['checksum'] = self.compute_checksum(record)
-            
             # Index by page ID
             if record.get('notion_page_id'):
                 by_id[record['notion_page_id']] = record
@@ -302,4 +411,249 @@ class DiffEngine:
                 self.logger.warning(f"⚠️ Record missing required field: {field}")
                 return False
         
-        return True
\ No newline at end of file
+        return True
+
+
+class StreamingDiffEngine(DiffEngine):
+    """Memory-bounded diff engine for very large sync sets
+    
+    Keeps only compact ChecksumEntry indexes for both sides, fetches full
+    payloads for records that actually differ (in batches, through caller
+    supplied fetchers) and yields SyncOp objects lazily so the apply stage
+    can start before the whole delta is known.
+    
+    Matching follows DiffEngine.compute_sync_delta: notion_page_id first,
+    checksum as fallback, everything left over becomes a create.
+    """
+    
+    def __init__(self, batch_size: int = 100):
+        """Initialize streaming diff engine"""
+        super().__init__()
+        self.batch_size = batch_size
+    
+    def make_entry(self, record: Dict[str, Any], key_field: str) -> Optional[ChecksumEntry]:
+        """Reduce a record to a compact index entry (None if it has no key)"""
+        
+        key = record.get(key_field)
+        if not key:
+            return None
+        
+        checksum = record.get('checksum') or self.compute_checksum(record)
+        
+        return ChecksumEntry(
+            key=key,
+            checksum=self._pack_checksum(checksum),
+            page_id=record.get('notion_page_id') if key_field != 'notion_page_id' else key,
+            updated_at=record.get('updated_at')
+        )
+    
+    @staticmethod
+    def _pack_checksum(checksum: str) -> bytes:
+        """Store hex digests as raw bytes, anything else verbatim"""
+        try:
+            return bytes.fromhex(checksum)
+        except ValueError:
+            return checksum.encode('utf-8')
+    
+    @staticmethod
+    def _unpack_checksum(checksum: bytes) -> str:
+        """Inverse of _pack_checksum for 32-byte digests"""
+        return checksum.hex() if len(checksum) == 32 else checksum.decode('utf-8', 'replace')
+    
+    def build_index(self, records: Iterable[Dict[str, Any]], key_field: str,
+                    retain: Optional[Callable[[Dict[str, Any], ChecksumEntry], None]] = None) -> Dict[str, ChecksumEntry]:
+        """Consume a record stream into a key -> ChecksumEntry index
+        
+        Records are dropped as soon as their entry is built (unless retain
+        keeps them), so the stream can be a generator over paged API results.
+        """
+        
+        index: Dict[str, ChecksumEntry] = {}
+        chunk: List[Dict[str, Any]] = []
+        
+        def add_chunk():
+            self._fill_missing_checksums(chunk)
+            for record in chunk:
+                entry = self.make_entry(record, key_field)
+                if entry is not None:
+                    index[entry.key] = entry
+                    if retain is not None:
+                        retain(record, entry)
+            chunk.clear()
+        
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= self.batch_size:
+                add_chunk()
+        add_chunk()
+        
+        return index
+    
+    def iter_sync_delta(self,
+                        supabase_records: Iterable[Dict[str, Any]],
+                        notion_records: Iterable[Dict[str, Any]],
+                        fetch_supabase: Callable[[List[str]], Iterable[Dict[str, Any]]],
+                        fetch_notion: Callable[[List[str]], Iterable[Dict[str, Any]]]) -> Iterator[SyncOp]:
+        """Stream sync operations between Supabase and Notion
+        
+        Args:
+            supabase_records: Iterable of Supabase rows (only id, notion_page_id,
+                checksum and updated_at are kept; decision/type/date are used
+                when checksum is missing)
+            notion_records: Iterable of parsed Notion records
+            fetch_supabase: Returns full Supabase rows for a list of ids
+            fetch_notion: Returns full Notion records for a list of page ids
+                that were not kept from the notion_records stream
+        
+        Notion records already arrive in full, so the ones that can end up in
+        an operation (anything but a page whose Supabase row has the same
+        checksum) are kept while indexing instead of being retrieved again
+        page by page. That set is bounded by the diff.
+        """
+        
+        sb_index = self.build_index(supabase_records, 'id')
+        
+        sb_page_checksums = {e.page_id: e.checksum for e in sb_index.values() if e.page_id}
+        notion_payloads: Dict[str, Dict[str, Any]] = {}
+        
+        def retain_notion(record: Dict[str, Any], entry: ChecksumEntry):
+            if sb_page_checksums.get(entry.key) != entry.checksum:
+                notion_payloads[entry.key] = record
+        
+        notion_index = self.build_index(notion_records, 'notion_page_id', retain=retain_notion)
+        del sb_page_checksums
+        
+        def fetch_notion_pending(page_ids: List[str]) -> List[Dict[str, Any]]:
+            found, missing = [], []
+            for page_id in page_ids:
+                record = notion_payloads.pop(page_id, None)
+                if record is not None:
+                    found.append(record)
+                else:
+                    missing.append(page_id)
+            if missing:
+                found.extend(fetch_notion(missing))
+            return found
+        
+        self.logger.info(f"🔍 Streaming sync delta: {len(sb_index)} Supabase, {len(notion_index)} Notion")
+        
+        counts = {SyncOp.CREATE_IN_SUPABASE: 0, SyncOp.CREATE_IN_NOTION: 0,
+                  SyncOp.UPDATE_IN_SUPABASE: 0, SyncOp.UPDATE_IN_NOTION: 0}
+        
+        for op in self._iter_pending_ops(sb_index, notion_index, fetch_supabase, fetch_notion_pending):
+            counts[op.action] += 1
+            yield op
+        
+        self.logger.info(f"✅ Streaming sync delta complete",
+                        create_sb=counts[SyncOp.CREATE_IN_SUPABASE],
+                        create_notion=counts[SyncOp.CREATE_IN_NOTION],
+                        update_sb=counts[SyncOp.UPDATE_IN_SUPABASE],
+                        update_notion=counts[SyncOp.UPDATE_IN_NOTION],
+                        total=sum(counts.values()))
+    
+    def _iter_pending_ops(self, sb_index: Dict[str, ChecksumEntry],
+                          notion_index: Dict[str, ChecksumEntry],
+                          fetch_supabase: Callable[[List[str]], Iterable[Dict[str, Any]]],
+                          fetch_notion: Callable[[List[str]], Iterable[Dict[str, Any]]]) -> Iterator[SyncOp]:
+        """Plan operations on the compact indexes and materialize them in batches"""
+        
+        pending: List[Tuple[str, Optional[ChecksumEntry], Optional[ChecksumEntry]]] = []
+        
+        def flush() -> Iterator[SyncOp]:
+            yield from self._materialize(pending, fetch_supabase, fetch_notion)
+            pending.clear()
+        
+        # 1. Match by notion_page_id (primary strategy)
+        for sb_entry in sb_index.values():
+            if not sb_entry.page_id:
+                continue
+            notion_entry = notion_index.get(sb_entry.page_id)
+            if notion_entry is None or notion_entry.matched:
+                continue
+            
+            if sb_entry.checksum != notion_entry.checksum:
+                winner = self._resolve_conflict({'updated_at': sb_entry.updated_at},
+                                                {'updated_at': notion_entry.updated_at})
+                action = SyncOp.UPDATE_IN_NOTION if winner == 'supabase' else SyncOp.UPDATE_IN_SUPABASE
+                pending.append((action, sb_entry, notion_entry))
+                if len(pending) >= self.batch_size:
+                    yield from flush()
+            
+            sb_entry.matched = True
+            notion_entry.matched = True
+        
+        # 2. Match by checksum (fallback strategy, last record per checksum wins)
+        sb_by_checksum = {e.checksum: e for e in sb_index.values()}
+        notion_by_checksum = {e.checksum: e for e in notion_index.values()}
+        
+        for checksum, sb_entry in sb_by_checksum.items():
+            if sb_entry.matched:
+                continue
+            notion_entry = notion_by_checksum.get(checksum)
+            if notion_entry is None or notion_entry.matched:
+                continue
+            
+            pending.append(('link', sb_entry, notion_entry))
+            sb_entry.matched = True
+            notion_entry.matched = True
+            if len(pending) >= self.batch_size:
+                yield from flush()
+        
+        del sb_by_checksum, notion_by_checksum
+        
+        # 3. Handle unmatched records (creates)
+        for sb_entry in sb_index.values():
+            if not sb_entry.matched:
+                pending.append((SyncOp.CREATE_IN_NOTION, sb_entry, None))
+                if len(pending) >= self.batch_size:
+                    yield from flush()
+        
+        for notion_entry in notion_index.values():
+            if not notion_entry.matched:
+                pending.append((SyncOp.CREATE_IN_SUPABASE, None, notion_entry))
+                if len(pending) >= self.batch_size:
+                    yield from flush()
+        
+        if pending:
+            yield from flush()
+    
+    def _materialize(self, pending: List[Tuple[str, Optional[ChecksumEntry], Optional[ChecksumEntry]]],
+                     fetch_supabase: Callable[[List[str]], Iterable[Dict[str, Any]]],
+                     fetch_notion: Callable[[List[str]], Iterable[Dict[str, Any]]]) -> Iterator[SyncOp]:
+        """Fetch full payloads for a batch of planned operations and yield them"""
+        
+        sb_keys = [sb.key for _, sb, _ in pending if sb is not None]
+        notion_keys = [n.key for action, _, n in pending if n is not None and action != 'link']
+        
+        sb_payloads = {r['id']: r for r in fetch_supabase(sb_keys)} if sb_keys else {}
+        notion_payloads = {r['notion_page_id']: r for r in fetch_notion(notion_keys)} if notion_keys else {}
+        
+        for action, sb_entry, notion_entry in pending:
+            sb_record = sb_payloads.get(sb_entry.key) if sb_entry is not None else None
+            notion_record = None
+            if notion_entry is not None and action != 'link':
+                notion_record = notion_payloads.get(notion_entry.key)
+                if notion_record is None:
+                    self.logger.warning("⚠️ Notion page vanished before payload fetch", page_id=notion_entry.key)
+                    continue
+            if sb_entry is not None and sb_record is None:
+                self.logger.warning("⚠️ Supabase record vanished before payload fetch", record_id=sb_entry.key)
+                continue
+            
+            for record, entry in ((sb_record, sb_entry), (notion_record, notion_entry)):
+                if record is not None and not record.get('checksum'):
+                    record['checksum'] = self._unpack_checksum(entry.checksum)
+            
+            if action == 'link':
+                linked_sb_record = sb_record.copy()
+                linked_sb_record['notion_page_id'] = notion_entry.key
+                linked_sb_record['notion_synced'] = True
+                yield SyncOp(SyncOp.UPDATE_IN_SUPABASE, sb_record, linked_sb_record)
+            elif action == SyncOp.UPDATE_IN_NOTION:
+                yield SyncOp(action, notion_record, sb_record)
+            elif action == SyncOp.UPDATE_IN_SUPABASE:
+                yield SyncOp(action, sb_record, notion_record)
+            elif action == SyncOp.CREATE_IN_NOTION:
+                yield SyncOp(action, None, sb_record)
+            else:
+                yield SyncOp(action, None, notion_record)
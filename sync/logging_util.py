@@ -9,69 +9,51 @@ Version: 1.0.0
 
 import json
 import logging
-import logging.handlers
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from utils.logger import get_logger as get_structured_logger
+
 
 class SyncLogger:
-    """Enhanced logger for sync operations"""
+    """Enhanced logger for sync operations
+    
+    Records go through the shared asynchronous logging pipeline
+    (utils.logger): context kwargs travel as structured data and are only
+    serialized on the listener thread, in the JSON lines log and appended
+    to the text line in logs/sync.log.
+    """
     
     def __init__(self, log_file: str = "logs/sync.log"):
         """Initialize sync logger with rotation"""
         
-        # Ensure logs directory exists
-        Path(log_file).parent.mkdir(exist_ok=True)
-        
-        # Setup logger
-        self.logger = logging.getLogger('sync_service')
-        self.logger.setLevel(logging.INFO)
-        
-        # Clear existing handlers
-        self.logger.handlers.clear()
-        
-        # Rotating file handler (10MB max, 5 backups)
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file, 
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5
+        # Rotating file (10MB max, 5 backups) plus shared console/JSON outputs
+        self.logger = get_structured_logger(
+            'sync_service',
+            log_file=log_file,
+            file_format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            max_bytes=10*1024*1024
         )
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+    
+    def debug(self, message: str, **kwargs):
+        """Log debug message with optional context"""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, extra={'context': kwargs})
     
     def info(self, message: str, **kwargs):
         """Log info message with optional context"""
-        if kwargs:
-            message += f" | Context: {json.dumps(kwargs, default=str)}"
-        self.logger.info(message)
+        self.logger.info(message, extra={'context': kwargs})
     
     def warning(self, message: str, **kwargs):
         """Log warning message with optional context"""
-        if kwargs:
-            message += f" | Context: {json.dumps(kwargs, default=str)}"
-        self.logger.warning(message)
+        self.logger.warning(message, extra={'context': kwargs})
     
     def error(self, message: str, error: Optional[Exception] = None, **kwargs):
         """Log error message with optional exception and context"""
         if error:
             message += f" | Error: {error}"
-        if kwargs:
-            message += f" | Context: {json.dumps(kwargs, default=str)}"
-        self.logger.error(message)
+        self.logger.error(message, extra={'context': kwargs})
     
     def sync_start(self, sync_type: str = "bidirectional"):
         """Log sync operation start"""
@@ -10,7 +10,7 @@ Version: 1.0.0
 import json
 import time
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 
 try:
     from notion_client import Client as NotionAPIClient
@@ -34,7 +34,10 @@ class NotionClient:
             raise ImportError("notion-client package is required")
         
         try:
-            self.client = NotionAPIClient(auth=self.config.notion_api_key)
+            client_options = {'auth': self.config.notion_api_key}
+            if self.config.notion_base_url:
+                client_options['base_url'] = self.config.notion_base_url
+            self.client = NotionAPIClient(**client_options)
             self.database_id = self.config.notion_database_id
             self.logger.info("✅ Notion client initialized")
         except Exception as e:
@@ -90,6 +93,50 @@ class NotionClient:
         self.logger.info(f"✅ Fetched {len(pages)} total pages from Notion")
         return pages
     
+    def iter_record_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield parsed records one API page at a time"""
+        
+        start_cursor = None
+        
+        while True:
+            batch, next_cursor = self._fetch_batch_with_retry(start_cursor)
+            
+            records = []
+            for page in batch:
+                try:
+                    records.append(self.parse_page_to_record(page))
+                except Exception as e:
+                    self.logger.error(f"❌ Failed to parse Notion page: {page.get('id')}", error=e)
+            
+            if records:
+                yield records
+            
+            time.sleep(self.config.rate_limit_delay)
+            
+            if not batch or not next_cursor:
+                break
+            
+            start_cursor = next_cursor
+    
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield parsed records page by page without holding the whole database"""
+        
+        for batch in self.iter_record_batches():
+            yield from batch
+    
+    def fetch_records_by_page_ids(self, page_ids: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve and parse specific pages"""
+        
+        records = []
+        for page_id in page_ids:
+            try:
+                page = self.client.pages.retrieve(page_id=page_id)
+                records.append(self.parse_page_to_record(page))
+            except Exception as e:
+                self.logger.error(f"❌ Failed to retrieve Notion page: {page_id}", error=e)
+        
+        return records
+    
     def _fetch_batch_with_retry(self, start_cursor: Optional[str] = None) -> tuple[List[Dict[str, Any]], Optional[str]]:
         """Fetch a batch of pages with retry logic"""
         
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Pipelined bidirectional sync runner for Supabase-Notion sync
+Overlaps fetch, diff and apply stages for Angles AI Universe™
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterator
+
+from .run_sync import BidirectionalSync
+from .diff import SyncOp
+from utils.tracing import trace
+
+
+# Sentinel marking the end of a stage's output
+_DONE = object()
+# Sentinel ending a fetch stage whose service failed part-way through
+_FAILED = object()
+
+
+class _Writer:
+    """Single-threaded writer draining an ordered task queue for one service"""
+
+    def __init__(self, name: str, logger, queue_size: int):
+        self.name = name
+        self.logger = logger
+        self.tasks: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name=f"sync-writer-{name}", daemon=True)
+        self.completed = 0
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, task: Callable[[], Any]):
+        # Blocks when the writer falls behind (backpressure on the diff stage)
+        self.tasks.put(task)
+
+    def close(self):
+        self.tasks.put(_DONE)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is _DONE:
+                break
+            try:
+                task()
+            except Exception as e:
+                self.logger.error(f"❌ {self.name} writer task failed", error=e)
+            self.completed += 1
+
+
+class PipelinedSync(BidirectionalSync):
+    """Bidirectional sync with overlapping fetch, diff and apply stages
+
+    Both remote fetches run concurrently in their own threads and hand
+    keyed batches to the diff stage as they arrive. Records linked by
+    notion_page_id are compared as soon as both sides have been seen and
+    the resulting update is streamed to a per-service writer thread while
+    fetching continues. Checksum fallback matching and creates need the
+    complete picture, so they are resolved once both fetches finish using
+    DiffEngine.compute_sync_delta on the (usually small) leftovers. If a
+    fetch fails the leftovers are incomplete and are not applied at all:
+    creating from them would duplicate records that exist on the unread side.
+
+    End-to-end latency approaches the slowest single stage instead of the
+    sum of all stages.
+    """
+
+    # Bounded queues keep memory flat when one stage outpaces another
+    FETCH_QUEUE_SIZE = 8
+    WRITER_QUEUE_SIZE = 256
+    # How often a fetcher blocked on a full queue checks whether the diff stage stopped
+    FETCH_PUT_TIMEOUT = 0.5
+
+    @trace("sync.pipeline.run")
+    def run_sync(self) -> Dict[str, Any]:
+        """Run pipelined bidirectional sync process"""
+
+        start_time = datetime.now()
+        stats = {
+            'start_time': start_time.isoformat(),
+            'mode': 'pipelined',
+            'supabase_count': 0,
+            'notion_count': 0,
+            'created': 0,
+            'updated': 0,
+            'deleted': 0,
+            'errors': 0,
+            'error_details': []
+        }
+
+        try:
+            self.logger.sync_start("pipelined bidirectional")
+
+            if not self._test_connections():
+                raise Exception("Connection tests failed")
+
+            self._run_pipeline(stats)
+
+            end_time = datetime.now()
+            stats['duration'] = (end_time - start_time).total_seconds()
+            stats['end_time'] = end_time.isoformat()
+
+            self._save_health_status(stats)
+
+            self.logger.sync_complete(stats)
+            return stats
+
+        except Exception as e:
+            stats['errors'] = 1
+            stats['error_details'].append(str(e))
+            stats['duration'] = (datetime.now() - start_time).total_seconds()
+
+            self.logger.sync_error(e, "pipelined sync")
+            self._save_health_status(stats)
+            raise
+
+    def _run_pipeline(self, stats: Dict[str, Any]):
+        """Wire fetchers, incremental diff and writers together"""
+
+        batches: queue.Queue = queue.Queue(maxsize=self.FETCH_QUEUE_SIZE)
+        fetch_errors: List[Exception] = []
+        stats_lock = threading.Lock()
+        # Set once the diff stage stops consuming, so blocked fetchers give up
+        stop = threading.Event()
+
+        fetchers = [
+            threading.Thread(target=self._fetch_stage, name="sync-fetch-supabase", daemon=True,
+                             args=('supabase', self._supabase_batches, batches, fetch_errors, stop)),
+            threading.Thread(target=self._fetch_stage, name="sync-fetch-notion", daemon=True,
+                             args=('notion', self._notion_batches, batches, fetch_errors, stop)),
+        ]
+        writers = {
+            'supabase': _Writer('supabase', self.logger, self.WRITER_QUEUE_SIZE),
+            'notion': _Writer('notion', self.logger, self.WRITER_QUEUE_SIZE),
+        }
+
+        for worker in list(writers.values()) + fetchers:
+            worker.start()
+
+        def submit(op: SyncOp):
+            target = 'supabase' if op.action in (SyncOp.CREATE_IN_SUPABASE, SyncOp.UPDATE_IN_SUPABASE) else 'notion'
+
+            def apply():
+                local = {'created': 0, 'updated': 0, 'deleted': 0}
+                self._apply_operation(op, local)
+                with stats_lock:
+                    for key, value in local.items():
+                        stats[key] += value
+
+            writers[target].submit(apply)
+
+        try:
+            self._diff_stage(batches, len(fetchers), stats, submit, writers['supabase'])
+        finally:
+            stop.set()
+            for fetcher in fetchers:
+                fetcher.join()
+            for writer in writers.values():
+                writer.close()
+
+        if fetch_errors:
+            raise fetch_errors[0]
+
+        self.logger.info(f"✅ Pipelined apply finished",
+                        supabase_tasks=writers['supabase'].completed,
+                        notion_tasks=writers['notion'].completed)
+
+    def _supabase_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        """Supabase batches with checksums filled in"""
+
+        for batch in self.supabase.iter_record_batches():
+            missing = [record for record in batch if not record.get('checksum')]
+            for record, checksum in zip(missing, self.diff_engine.compute_checksums(missing)):
+                record['checksum'] = checksum
+                record['_checksum_backfill'] = True
+            yield batch
+
+    def _notion_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        """Valid Notion records with checksums filled in"""
+
+        for batch in self.notion.iter_record_batches():
+            valid = [record for record in batch if self.diff_engine.validate_record(record)]
+            missing = [record for record in valid if not record.get('checksum')]
+            for record, checksum in zip(missing, self.diff_engine.compute_checksums(missing)):
+                record['checksum'] = checksum
+            if valid:
+                yield valid
+
+    @trace("sync.pipeline.fetch")
+    def _fetch_stage(self, side: str, produce: Callable[[], Iterator[List[Dict[str, Any]]]],
+                     batches: queue.Queue, errors: List[Exception], stop: threading.Event):
+        """Push keyed batches from one service into the diff queue until done or stopped"""
+
+        end = _DONE
+        try:
+            for batch in produce():
+                if not self._put_batch(batches, (side, batch), stop):
+                    return
+        except Exception as e:
+            self.logger.error(f"❌ Failed to fetch {side} records", error=e)
+            errors.append(e)
+            end = _FAILED
+        finally:
+            self._put_batch(batches, (side, end), stop)
+
+    def _put_batch(self, batches: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Queue an item, waiting for space unless the diff stage has stopped"""
+
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=self.FETCH_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _diff_stage(self, batches: queue.Queue, producers: int, stats: Dict[str, Any],
+                    submit: Callable[[SyncOp], None], supabase_writer: _Writer):
+        """Match records by notion_page_id as batches arrive, resolve the rest at the end"""
+
+        # Records seen on one side whose page-id partner has not arrived yet
+        sb_waiting: Dict[str, Dict[str, Any]] = {}       # notion_page_id -> Supabase record
+        sb_unlinked: Dict[str, Dict[str, Any]] = {}      # id -> Supabase record without page id
+        notion_waiting: Dict[str, Dict[str, Any]] = {}   # notion_page_id -> Notion record
+
+        def compare(sb_record: Dict[str, Any], notion_record: Dict[str, Any]):
+            if sb_record['checksum'] == notion_record['checksum']:
+                return
+            winner = self.diff_engine._resolve_conflict(sb_record, notion_record)
+            if winner == 'supabase':
+                submit(SyncOp(SyncOp.UPDATE_IN_NOTION, notion_record, sb_record))
+            else:
+                submit(SyncOp(SyncOp.UPDATE_IN_SUPABASE, sb_record, notion_record))
+
+        failed_sides = []
+        remaining = producers
+        while remaining:
+            side, batch = batches.get()
+            if batch is _DONE or batch is _FAILED:
+                if batch is _FAILED:
+                    failed_sides.append(side)
+                remaining -= 1
+                continue
+
+            if side == 'supabase':
+                stats['supabase_count'] += len(batch)
+                for record in batch:
+                    if record.pop('_checksum_backfill', False) and not self.dry_run:
+                        supabase_writer.submit(lambda r=record: self.supabase.upsert_record(r))
+                    if not record.get('id'):
+                        continue
+                    page_id = record.get('notion_page_id')
+                    if page_id and page_id in notion_waiting:
+                        compare(record, notion_waiting.pop(page_id))
+                    elif page_id and page_id not in sb_waiting:
+                        sb_waiting[page_id] = record
+                    else:
+                        sb_unlinked[record['id']] = record
+            else:
+                stats['notion_count'] += len(batch)
+                for record in batch:
+                    page_id = record.get('notion_page_id')
+                    if page_id in sb_waiting:
+                        compare(sb_waiting.pop(page_id), record)
+                    else:
+                        notion_waiting[page_id] = record
+
+        # Leftovers: checksum fallback matching and creates need both full sides
+        if failed_sides:
+            self.logger.warning(f"⚠️ Skipping unmatched records: {', '.join(failed_sides)} fetch failed",
+                                leftover_supabase=len(sb_waiting) + len(sb_unlinked),
+                                leftover_notion=len(notion_waiting))
+            return
+
+        leftover_sb = list(sb_waiting.values()) + list(sb_unlinked.values())
+        leftover_notion = list(notion_waiting.values())
+
+        if leftover_sb or leftover_notion:
+            delta = self.diff_engine.compute_sync_delta(leftover_sb, leftover_notion)
+            for op in delta.iter_operations():
+                submit(op)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Near-real-time push sync from Supabase to Notion
+Event-driven worker fed by the decision_vault change log for Angles AI Universe™
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import select
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+from .config import get_config, CHANGE_NOTIFY_CHANNEL
+from .logging_util import get_logger
+from .run_sync import BidirectionalSync
+from .diff import SyncOp
+
+
+# Columns written back when a pushed record's stored checksum was stale
+CHECKSUM_WRITEBACK_FIELDS = ('id', 'decision', 'type', 'date', 'checksum')
+
+
+class RealtimeSyncWorker:
+    """Long-running worker that pushes decision_vault changes to Notion within seconds
+
+    Changes are read from the trigger-fed ``decision_vault_changes`` table
+    (see migrations/decision_vault_change_log.sql) after a persisted cursor.
+    When DATABASE_URL is set and psycopg2 is available the worker LISTENs on
+    the trigger's NOTIFY channel and wakes immediately; otherwise it polls
+    the change log every ``realtime_poll_seconds``. Bursts are coalesced by
+    waiting ``realtime_batch_window`` seconds after a wake-up and pushing each
+    changed record once.
+
+    The full bidirectional reconcile still runs every ``sync_interval``
+    minutes as a safety net for missed events and Notion-side edits.
+    """
+
+    def __init__(self, dry_run: bool = False):
+        """Initialize realtime sync worker"""
+        self.config = get_config()
+        self.logger = get_logger()
+        self.dry_run = dry_run
+
+        self.sync_runner = BidirectionalSync(dry_run=dry_run)
+        self.supabase = self.sync_runner.supabase
+        self.diff_engine = self.sync_runner.diff_engine
+
+        self.cursor_file = Path(self.config.realtime_cursor_file)
+        self.cursor: Optional[int] = self._load_cursor()
+        self.listen_conn = None
+
+        self.logger.info(f"⚡ Realtime sync worker initialized {'(DRY RUN)' if dry_run else ''}")
+
+    def _load_cursor(self) -> Optional[int]:
+        """Load the last processed change sequence number"""
+        try:
+            if self.cursor_file.exists():
+                with open(self.cursor_file, 'r') as f:
+                    return int(json.load(f)['seq'])
+        except Exception as e:
+            self.logger.warning("⚠️ Failed to load realtime cursor", error=e)
+        return None
+
+    def _save_cursor(self, seq: int):
+        """Persist the cursor atomically"""
+        self.cursor = seq
+        self.cursor_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cursor_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({'seq': seq, 'updated_at': datetime.now(timezone.utc).isoformat()}, f)
+        tmp_file.replace(self.cursor_file)
+
+    def _advance_cursor(self, seq: int):
+        """Move the cursor forward (persisted unless dry run)"""
+        if self.dry_run:
+            self.cursor = seq
+        else:
+            self._save_cursor(seq)
+
+    def _connect_listener(self) -> bool:
+        """Subscribe to change notifications when a direct Postgres URL is available"""
+        if psycopg2 is None or not self.config.database_url:
+            return False
+
+        try:
+            conn = psycopg2.connect(self.config.database_url)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANGE_NOTIFY_CHANNEL};")
+            self.listen_conn = conn
+            self.logger.info(f"👂 Listening on channel {CHANGE_NOTIFY_CHANNEL}")
+            return True
+        except Exception as e:
+            self.logger.warning("⚠️ LISTEN unavailable, falling back to polling", error=e)
+            self.listen_conn = None
+            return False
+
+    def wait_for_changes(self, timeout: float) -> bool:
+        """Block until a change notification arrives or timeout elapses
+
+        Returns True when woken by a notification. Without a listener this
+        is a plain sleep and the caller polls the change log afterwards.
+        """
+        if self.listen_conn is None:
+            time.sleep(timeout)
+            return False
+
+        try:
+            ready, _, _ = select.select([self.listen_conn], [], [], timeout)
+            if not ready:
+                return False
+            self.listen_conn.poll()
+            woke = bool(self.listen_conn.notifies)
+            self.listen_conn.notifies.clear()
+            return woke
+        except Exception as e:
+            self.logger.warning("⚠️ Listener connection lost, reconnecting", error=e)
+            self.listen_conn = None
+            self._connect_listener()
+            return False
+
+    def process_pending_changes(self) -> Dict[str, int]:
+        """Push every change after the cursor to Notion, one batch at a time
+
+        Entries up to the cursor are pruned from the change log once they
+        have been pushed, so the trigger-fed table does not grow forever.
+        The cursor stops before the first entry whose push failed, so that
+        entry and everything after it are retried on the next pass.
+        """
+
+        totals = {'changes': 0, 'pushed': 0, 'skipped': 0, 'failed': 0}
+        start_cursor = self.cursor
+
+        if self.cursor is None:
+            self._advance_cursor(self.supabase.latest_change_seq())
+
+        while True:
+            changes = self.supabase.fetch_changes(self.cursor, self.config.batch_size)
+            if not changes:
+                break
+
+            batch_stats = self.push_changes(changes)
+            committed_seq = batch_stats.pop('committed_seq')
+            for key, value in batch_stats.items():
+                totals[key] += value
+
+            if committed_seq is not None:
+                self._advance_cursor(committed_seq)
+
+            if batch_stats['failed']:
+                self.logger.warning("⚠️ Push failed, keeping change log entries for retry",
+                                    failed=batch_stats['failed'], cursor=self.cursor)
+                break
+
+            if len(changes) < self.config.batch_size:
+                break
+
+        if self.cursor != start_cursor and not self.dry_run:
+            self.supabase.prune_changes(self.cursor)
+
+        if totals['changes']:
+            self.logger.info("⚡ Pushed realtime changes", **totals)
+        return totals
+
+    def push_changes(self, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Coalesce a batch of change log entries and push each record once
+
+        'committed_seq' in the result is the last seq up to which every
+        entry was pushed (None when the first entry failed).
+        """
+
+        stats = {'changes': len(changes), 'pushed': 0, 'skipped': 0, 'failed': 0,
+                 'committed_seq': changes[-1]['seq'] if changes else None}
+
+        # Later entries win; deletes are left to the soft-delete policy
+        latest_op: Dict[str, str] = {}
+        for change in changes:
+            latest_op[change['record_id']] = change['op']
+
+        record_ids = [record_id for record_id, op in latest_op.items() if op != 'DELETE']
+        stats['skipped'] += len(latest_op) - len(record_ids)
+        if not record_ids:
+            return stats
+
+        records = self.supabase.fetch_records_by_ids(record_ids)
+        stats['skipped'] += len(record_ids) - len(records)
+
+        records = [record for record in records if self.diff_engine.validate_record(record)]
+        checksums = self.diff_engine.compute_checksums(records)
+
+        stale = []
+        failed_ids = set()
+        apply_stats = {'created': 0, 'updated': 0, 'deleted': 0}
+        for record, checksum in zip(records, checksums):
+            if record.get('notion_page_id'):
+                op = SyncOp(SyncOp.UPDATE_IN_NOTION, {'notion_page_id': record['notion_page_id']}, record)
+            else:
+                op = SyncOp(SyncOp.CREATE_IN_NOTION, None, record)
+            if not self.sync_runner._apply_operation(op, apply_stats):
+                failed_ids.add(record['id'])
+                continue
+
+            # Only records that reached Notion get their checksum refreshed
+            if record.get('checksum') != checksum:
+                record['checksum'] = checksum
+                stale.append(record)
+
+        stats['pushed'] = apply_stats['created'] + apply_stats['updated']
+        stats['failed'] = len(failed_ids)
+        if failed_ids:
+            first_failed = next(index for index, change in enumerate(changes) if change['record_id'] in failed_ids)
+            stats['committed_seq'] = changes[first_failed - 1]['seq'] if first_failed else None
+
+        # Content-neutral write-back of checksums only (the change log trigger
+        # ignores it, and notion_page_id set by mark_synced is left alone)
+        if stale and not self.dry_run:
+            try:
+                self.supabase.bulk_upsert_records([
+                    {field: record.get(field) for field in CHECKSUM_WRITEBACK_FIELDS} for record in stale
+                ])
+            except Exception as e:
+                self.logger.warning("⚠️ Failed to write back refreshed checksums", error=e)
+
+        return stats
+
+    def run_forever(self):
+        """Run the event loop with a periodic full reconcile as safety net"""
+
+        self._connect_listener()
+
+        reconcile_seconds = self.config.sync_interval * 60
+        last_reconcile = None
+
+        self.logger.info(f"🚀 Realtime sync worker started (reconcile every {self.config.sync_interval} minutes)")
+
+        try:
+            while True:
+                now = time.monotonic()
+                if last_reconcile is None or now - last_reconcile >= reconcile_seconds:
+                    # Capture the cursor first so changes during the reconcile are still pushed
+                    if self.cursor is None:
+                        self._advance_cursor(self.supabase.latest_change_seq())
+                    try:
+                        self.sync_runner.run_sync()
+                    except Exception as e:
+                        self.logger.error("❌ Safety-net reconcile failed", error=e)
+                    last_reconcile = now
+
+                if self.wait_for_changes(self.config.realtime_poll_seconds):
+                    # Let a burst of writes land before reading the change log
+                    time.sleep(self.config.realtime_batch_window)
+
+                try:
+                    self.process_pending_changes()
+                except Exception as e:
+                    self.logger.error("❌ Failed to process change log", error=e)
+
+        except KeyboardInterrupt:
+            self.logger.info("🛑 Realtime sync worker stopped by user")
+        finally:
+            if self.listen_conn is not None:
+                self.listen_conn.close()
+
+
+def main():
+    """CLI entry point for realtime sync worker"""
+
+    parser = argparse.ArgumentParser(description="Near-real-time Supabase-to-Notion push sync")
+    parser.add_argument('--once', action='store_true', help='Push pending changes once and exit')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be pushed without making changes')
+
+    args = parser.parse_args()
+
+    try:
+        worker = RealtimeSyncWorker(dry_run=args.dry_run)
+
+        if args.once:
+            totals = worker.process_pending_changes()
+            print(f"✅ Processed {totals['changes']} changes, pushed {totals['pushed']} records")
+            return 0
+
+        print("⚡ Starting realtime sync worker...")
+        print("🔄 Press Ctrl+C to stop")
+        worker.run_forever()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n🛑 Realtime sync stopped by user")
+        return 130
+    except Exception as e:
+        print(f"\n💥 Realtime sync failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,7 +17,8 @@ from .config import get_config
 from .logging_util import get_logger, save_health_status, load_health_status
 from .supabase_client import SupabaseClient
 from .notion_client import NotionClient
-from .diff import DiffEngine, SyncDelta
+from .diff import DiffEngine, StreamingDiffEngine, SyncDelta, SyncOp
+from utils.tracing import trace
 
 
 class BidirectionalSync:
@@ -36,6 +37,7 @@ class BidirectionalSync:
         
         self.logger.info(f"🔄 Bidirectional sync initialized {'(DRY RUN)' if dry_run else ''}")
     
+    @trace("sync.run")
     def run_sync(self) -> Dict[str, Any]:
         """Run complete bidirectional sync process"""
         
@@ -116,6 +118,7 @@ class BidirectionalSync:
             self.logger.error("❌ Connection test failed", error=e)
             return False
     
+    @trace("sync.fetch_supabase")
     def _fetch_supabase_records(self) -> List[Dict[str, Any]]:
         """Fetch all records from Supabase"""
         
@@ -125,15 +128,14 @@ class BidirectionalSync:
             records = self.supabase.fetch_all_records()
             
             # Compute checksums for records missing them
-            updated_records = []
-            for record in records:
-                if not record.get('checksum'):
-                    record['checksum'] = self.diff_engine.compute_checksum(record)
-                    # Update in database if not dry run
-                    if not self.dry_run:
-                        self.supabase.upsert_record(record)
-                
-                updated_records.append(record)
+            missing = [record for record in records if not record.get('checksum')]
+            for record, checksum in zip(missing, self.diff_engine.compute_checksums(missing)):
+                record['checksum'] = checksum
+                # Update in database if not dry run
+                if not self.dry_run:
+                    self.supabase.upsert_record(record)
+            
+            updated_records = records
             
             self.logger.info(f"✅ Fetched {len(updated_records)} Supabase records")
             return updated_records
@@ -142,6 +144,7 @@ class BidirectionalSync:
             self.logger.error("❌ Failed to fetch Supabase records", error=e)
             raise
     
+    @trace("sync.fetch_notion")
     def _fetch_notion_records(self) -> List[Dict[str, Any]]:
         """Fetch all records from Notion"""
         
@@ -177,6 +180,7 @@ class BidirectionalSync:
             self.logger.error("❌ Failed to fetch Notion records", error=e)
             raise
     
+    @trace("sync.diff")
     def _compute_differences(self, supabase_records: List[Dict[str, Any]], notion_records: List[Dict[str, Any]]) -> SyncDelta:
         """Compute sync differences"""
         
@@ -206,49 +210,141 @@ class BidirectionalSync:
         stats = {'created': 0, 'updated': 0, 'deleted': 0}
         
         try:
-            # 1. Create records in Supabase
-            for notion_record in delta.create_in_supabase:
-                try:
-                    created = self.supabase.upsert_record(notion_record, self.dry_run)
-                    if created:
-                        stats['created'] += 1
-                except Exception as e:
-                    self.logger.error("❌ Failed to create in Supabase", error=e, record=notion_record.get('notion_page_id'))
+            for op in delta.iter_operations():
+                self._apply_operation(op, stats)
             
-            # 2. Create records in Notion
-            for sb_record in delta.create_in_notion:
-                try:
-                    created_page = self.notion.create_page(sb_record, self.dry_run)
-                    if created_page and not self.dry_run:
-                        # Update Supabase with notion_page_id
-                        self.supabase.mark_synced(sb_record['id'], created_page['id'])
-                    stats['created'] += 1
-                except Exception as e:
-                    self.logger.error("❌ Failed to create in Notion", error=e, record=sb_record.get('id'))
+            self.logger.info(f"✅ Applied changes", **stats)
+            return stats
             
-            # 3. Update records in Supabase
-            for current, new in delta.update_in_supabase:
+        except Exception as e:
+            self.logger.error("❌ Failed to apply changes", error=e)
+            raise
+    
+    @trace("sync.apply_operation")
+    def _apply_operation(self, op: SyncOp, stats: Dict[str, int]) -> bool:
+        """Apply a single sync operation, counting it into stats
+        
+        Failures are logged rather than raised so one bad record does not
+        stop a full sync; the return value tells callers that track
+        progress (the realtime worker) whether the write reached its target.
+        """
+        
+        if op.action == SyncOp.CREATE_IN_SUPABASE:
+            try:
+                created = self.supabase.upsert_record(op.new, self.dry_run)
+                if created:
+                    stats['created'] += 1
+                return bool(created) or self.dry_run
+            except Exception as e:
+                self.logger.error("❌ Failed to create in Supabase", error=e, record=op.new.get('notion_page_id'))
+                return False
+        
+        elif op.action == SyncOp.CREATE_IN_NOTION:
+            try:
+                created_page = self.notion.create_page(op.new, self.dry_run)
+            except Exception as e:
+                self.logger.error("❌ Failed to create in Notion", error=e, record=op.new.get('id'))
+                return False
+            stats['created'] += 1
+            if created_page and not self.dry_run:
+                # Update Supabase with notion_page_id; if this fails the page exists and is
+                # linked by checksum on the next reconcile, so the create itself succeeded
                 try:
-                    updated = self.supabase.upsert_record(new, self.dry_run)
-                    if updated:
-                        stats['updated'] += 1
+                    self.supabase.mark_synced(op.new['id'], created_page['id'])
                 except Exception as e:
-                    self.logger.error("❌ Failed to update in Supabase", error=e, record=current.get('id'))
+                    self.logger.error("❌ Failed to link created Notion page", error=e, record=op.new.get('id'))
+            return True
+        
+        elif op.action == SyncOp.UPDATE_IN_SUPABASE:
+            try:
+                updated = self.supabase.upsert_record(op.new, self.dry_run)
+                if updated:
+                    stats['updated'] += 1
+                return bool(updated) or self.dry_run
+            except Exception as e:
+                self.logger.error("❌ Failed to update in Supabase", error=e, record=op.current.get('id'))
+                return False
+        
+        elif op.action == SyncOp.UPDATE_IN_NOTION:
+            try:
+                updated_page = self.notion.update_page(op.current['notion_page_id'], op.new, self.dry_run)
+                if updated_page:
+                    stats['updated'] += 1
+                return bool(updated_page) or self.dry_run
+            except Exception as e:
+                self.logger.error("❌ Failed to update in Notion", error=e, record=op.current.get('notion_page_id'))
+                return False
+        
+        return False
+    
+    @trace("sync.run_streaming")
+    def run_streaming_sync(self) -> Dict[str, Any]:
+        """Run bidirectional sync in streaming mode for very large sync sets
+        
+        Builds compact checksum indexes from slim paged reads, fetches full
+        payloads only for records that differ and applies each operation as
+        soon as it is yielded. Memory stays bounded by the index size rather
+        than the full record payloads.
+        """
+        
+        start_time = datetime.now()
+        stats = {
+            'start_time': start_time.isoformat(),
+            'mode': 'streaming',
+            'supabase_count': 0,
+            'notion_count': 0,
+            'created': 0,
+            'updated': 0,
+            'deleted': 0,
+            'errors': 0,
+            'error_details': []
+        }
+        
+        try:
+            self.logger.sync_start("streaming bidirectional")
             
-            # 4. Update records in Notion
-            for current, new in delta.update_in_notion:
-                try:
-                    updated_page = self.notion.update_page(current['notion_page_id'], new, self.dry_run)
-                    if updated_page:
-                        stats['updated'] += 1
-                except Exception as e:
-                    self.logger.error("❌ Failed to update in Notion", error=e, record=current.get('notion_page_id'))
+            if not self._test_connections():
+                raise Exception("Connection tests failed")
             
-            self.logger.info(f"✅ Applied changes", **stats)
+            engine = StreamingDiffEngine(batch_size=self.config.batch_size)
+            
+            def supabase_rows():
+                for row in self.supabase.iter_checksum_rows():
+                    stats['supabase_count'] += 1
+                    yield row
+            
+            def notion_rows():
+                for record in self.notion.iter_records():
+                    if self.diff_engine.validate_record(record):
+                        stats['notion_count'] += 1
+                        yield record
+            
+            ops = engine.iter_sync_delta(
+                supabase_rows(),
+                notion_rows(),
+                fetch_supabase=self.supabase.fetch_records_by_ids,
+                fetch_notion=self.notion.fetch_records_by_page_ids
+            )
+            
+            for op in ops:
+                self._apply_operation(op, stats)
+            
+            end_time = datetime.now()
+            stats['duration'] = (end_time - start_time).total_seconds()
+            stats['end_time'] = end_time.isoformat()
+            
+            self._save_health_status(stats)
+            
+            self.logger.sync_complete(stats)
             return stats
             
         except Exception as e:
-            self.logger.error("❌ Failed to apply changes", error=e)
+            stats['errors'] = 1
+            stats['error_details'].append(str(e))
+            stats['duration'] = (datetime.now() - start_time).total_seconds()
+            
+            self.logger.sync_error(e, "streaming sync")
+            self._save_health_status(stats)
             raise
     
     def _print_dry_run_plan(self, delta: SyncDelta):
@@ -317,6 +413,8 @@ def main():
     parser = argparse.ArgumentParser(description="Bidirectional Supabase-Notion Sync")
     parser.add_argument('--dry-run', action='store_true', help='Show what would be synced without making changes')
     parser.add_argument('--report', action='store_true', help='Show last sync run statistics')
+    parser.add_argument('--streaming', action='store_true', help='Memory-bounded streaming diff for very large sync sets')
+    parser.add_argument('--pipelined', action='store_true', help='Fetch both sides concurrently and apply while fetching')
     
     args = parser.parse_args()
     
@@ -354,8 +452,15 @@ def main():
             return 0
         
         # Run sync
-        sync_runner = BidirectionalSync(dry_run=args.dry_run)
-        result = sync_runner.run_sync()
+        if args.pipelined:
+            from .pipeline import PipelinedSync
+            sync_runner = PipelinedSync(dry_run=args.dry_run)
+        else:
+            sync_runner = BidirectionalSync(dry_run=args.dry_run)
+        if args.streaming:
+            result = sync_runner.run_streaming_sync()
+        else:
+            result = sync_runner.run_sync()
         
         if args.dry_run:
             print(f"\n✅ Dry run completed - {result.get('duration', 0):.2f}s")
@@ -9,7 +9,7 @@ Version: 1.0.0
 
 import time
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 try:
     from supabase import create_client, Client
@@ -18,8 +18,13 @@ except ImportError:
     create_client = None
     Client = None
 
-from .config import get_config, SUPABASE_TABLE
+from .config import get_config, SUPABASE_TABLE, CHANGE_LOG_TABLE
 from .logging_util import get_logger
+from utils.near_duplicates import index_decisions
+
+
+# Columns needed to build a streaming diff index entry
+CHECKSUM_COLUMNS = "id,notion_page_id,checksum,updated_at,decision,type,date"
 
 
 class SupabaseClient:
@@ -90,13 +95,54 @@ class SupabaseClient:
         self.logger.info(f"✅ Fetched {len(records)} total records from Supabase")
         return records
     
-    def _fetch_batch_with_retry(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+    def iter_record_batches(self, columns: str = "*") -> Iterator[List[Dict[str, Any]]]:
+        """Yield records one page (batch_size rows) at a time"""
+        
+        offset = 0
+        batch_size = self.config.batch_size
+        
+        while True:
+            batch = self._fetch_batch_with_retry(offset, batch_size, columns=columns)
+            if not batch:
+                break
+            
+            yield batch
+            offset += len(batch)
+            
+            time.sleep(self.config.rate_limit_delay)
+            
+            if len(batch) < batch_size:
+                break
+    
+    def iter_checksum_rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield slim rows (keys, checksum, timestamp and checksum inputs) page by page"""
+        
+        for batch in self.iter_record_batches(columns=CHECKSUM_COLUMNS):
+            yield from batch
+    
+    def fetch_records_by_ids(self, record_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch full records for a list of ids (one request per batch_size ids)"""
+        
+        records = []
+        batch_size = self.config.batch_size
+        
+        for start in range(0, len(record_ids), batch_size):
+            chunk = record_ids[start:start + batch_size]
+            result = (self.client.table(SUPABASE_TABLE)
+                     .select("*")
+                     .in_('id', chunk)
+                     .execute())
+            records.extend(result.data or [])
+        
+        return records
+    
+    def _fetch_batch_with_retry(self, offset: int, limit: int, columns: str = "*") -> List[Dict[str, Any]]:
         """Fetch a batch of records with retry logic"""
         
         for attempt in range(self.config.max_retries):
             try:
                 result = (self.client.table(SUPABASE_TABLE)
-                         .select("*")
+                         .select(columns)
                          .range(offset, offset + limit - 1)
                          .order('created_at')
                          .execute())
@@ -130,6 +176,7 @@ class SupabaseClient:
             if result.data:
                 upserted = result.data[0]
                 self.logger.info(f"✅ Upserted record: {upserted.get('id')}")
+                index_decisions(result.data)
                 return upserted
             else:
                 self.logger.error("❌ Upsert failed: no data returned")
@@ -161,6 +208,7 @@ class SupabaseClient:
             
             if result.data:
                 self.logger.info(f"✅ Bulk upserted {len(result.data)} records")
+                index_decisions(result.data)
                 return result.data
             else:
                 self.logger.warning("⚠️ Bulk upsert returned no data")
@@ -200,6 +248,42 @@ class SupabaseClient:
             self.logger.error(f"❌ Failed to mark record as synced", error=e, record_id=record_id)
             return False
     
+    def fetch_changes(self, after_seq: int, limit: int) -> List[Dict[str, Any]]:
+        """Fetch change log entries newer than a cursor, oldest first"""
+        
+        result = (self.client.table(CHANGE_LOG_TABLE)
+                 .select("seq,record_id,op,changed_at")
+                 .gt('seq', after_seq)
+                 .order('seq')
+                 .limit(limit)
+                 .execute())
+        
+        return result.data or []
+    
+    def latest_change_seq(self) -> int:
+        """Get the newest change log sequence number (0 if empty)"""
+        
+        result = (self.client.table(CHANGE_LOG_TABLE)
+                 .select("seq")
+                 .order('seq', desc=True)
+                 .limit(1)
+                 .execute())
+        
+        return result.data[0]['seq'] if result.data else 0
+    
+    def prune_changes(self, up_to_seq: int) -> bool:
+        """Delete processed change log entries"""
+        
+        try:
+            (self.client.table(CHANGE_LOG_TABLE)
+             .delete()
+             .lte('seq', up_to_seq)
+             .execute())
+            return True
+        except Exception as e:
+            self.logger.warning("⚠️ Failed to prune change log", error=e, up_to_seq=up_to_seq)
+            return False
+    
     def find_by_checksum(self, checksum: str) -> Optional[Dict[str, Any]]:
         """Find record by checksum (fallback matching)"""
         
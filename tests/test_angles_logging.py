@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the AnglesLogger batched log shipper
+Uses an in-memory fake Supabase client
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import angles_logging
+from angles_logging import AnglesLogger
+
+
+class _FakeTable:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.rows = None
+
+    def select(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def upsert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if not self.client.online:
+            raise ConnectionError("offline")
+        if self.rows is None:
+            return SimpleNamespace(data=[{'id': 1}])
+        with self.client.lock:
+            self.client.requests.append((self.name, len(self.rows)))
+            for row in self.rows:
+                self.client.rows.setdefault(self.name, {})[row['id']] = row
+        return SimpleNamespace(data=self.rows)
+
+
+class _FakeSupabase:
+    def __init__(self, online=True):
+        self.online = online
+        self.lock = threading.Lock()
+        self.requests = []
+        self.rows = {}
+
+    def table(self, name):
+        return _FakeTable(self, name)
+
+
+class TestAnglesLogShipper(unittest.TestCase):
+    """Tests for batching, spilling and replay"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.env = patch.dict(os.environ, {'ANGLES_LOG_BUFFER_SIZE': '50', 'ANGLES_LOG_BATCH_SIZE': '20',
+                                           'ANGLES_LOG_FLUSH_INTERVAL': '0.05',
+                                           'SUPABASE_URL': '', 'SUPABASE_KEY': '',
+                                           'SUPABASE_SERVICE_ROLE_KEY': ''})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def _make_logger(self, fake):
+        logger = AnglesLogger()
+        logger.supabase = fake
+        logger.is_connected = fake.online
+        logger.connection_retry_interval = 0
+        return logger
+
+    def _wait_for(self, condition, timeout=3.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def test_multi_row_batches_per_table(self):
+        """Entries are shipped as multi-row requests grouped by table"""
+        fake = _FakeSupabase()
+        logger = self._make_logger(fake)
+
+        for i in range(45):
+            logger.log_memory_event('sync', f"event {i}")
+        for i in range(5):
+            logger.log_agent_activity('agent', f"activity {i}")
+
+        self.assertTrue(self._wait_for(lambda: logger.metrics['shipped'] == 50))
+        logger.shutdown()
+
+        self.assertEqual(len(fake.rows['memory_log']), 45)
+        self.assertEqual(len(fake.rows['agent_activity']), 5)
+        self.assertTrue(all(count <= 20 for _, count in fake.requests))
+        self.assertLess(len(fake.requests), 50)
+
+    def test_offline_spill_and_replay(self):
+        """Offline entries overflow to disk and are replayed exactly once"""
+        fake = _FakeSupabase(online=False)
+        logger = self._make_logger(fake)
+
+        start = time.perf_counter()
+        for i in range(120):
+            logger.log_memory_event('sync', f"event {i}")
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+        status = logger.get_queue_status()
+        self.assertLessEqual(status['queue_size'], 50)
+        self.assertGreater(status['metrics']['spilled'], 0)
+
+        fake.online = True
+        self.assertTrue(self._wait_for(lambda: len(fake.rows.get('memory_log', {})) == 120))
+        logger.shutdown()
+        self.assertEqual(logger.spool.pending_bytes(), 0)
+
+    def test_legacy_json_queue_is_migrated(self):
+        """Queues written by earlier versions are shipped through the spool"""
+        Path('logs').mkdir()
+        Path('logs/pending_logs.json').write_text(
+            '[{"table": "memory_log", "data": {"id": "legacy-1", "event_type": "sync"}}]')
+
+        fake = _FakeSupabase()
+        logger = self._make_logger(fake)
+
+        self.assertFalse(Path('logs/pending_logs.json').exists())
+        self.assertTrue(self._wait_for(lambda: 'legacy-1' in fake.rows.get('memory_log', {})))
+        logger.shutdown()
+
+    def test_shutdown_spills_unshipped_logs(self):
+        """Shutdown while offline leaves the backlog on disk for the next session"""
+        fake = _FakeSupabase(online=False)
+        logger = self._make_logger(fake)
+        for i in range(10):
+            logger.log_memory_event('sync', f"event {i}")
+        logger.shutdown()
+
+        fake.online = True
+        next_session = self._make_logger(fake)
+        self.assertTrue(self._wait_for(lambda: len(fake.rows.get('memory_log', {})) == 10))
+        next_session.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
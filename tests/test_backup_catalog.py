@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the backup catalog index and its JSON-lines manifest
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import zipfile
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.backup_catalog import BackupCatalog, describe_archive, read_manifest
+
+
+class TestBackupCatalog(unittest.TestCase):
+    """Latest/any backup lookups without listing storage"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.catalog = BackupCatalog(os.path.join(self.temp_dir.name, 'catalog.sqlite3'))
+        self.catalog.record_backup('backup_20250801_000000', 'backup_20250801_000000.zip',
+                                   {'local': 'backups/backup_20250801_000000.zip', 'github': 'backups/backup_20250801_000000.zip'},
+                                   created_at=1754006400, tables=['decision_vault', 'memory_log'], backup_type='full')
+        self.catalog.record_backup('memory_backup_2025-08-02', 'memory_backup_2025-08-02.zip.encrypted',
+                                   {'supabase': 'daily/memory_backup_2025-08-02.zip.encrypted'},
+                                   created_at=1754092800, backup_type='daily')
+        self.catalog.record_backup('backup_20250803_000000', 'backup_20250803_000000.zip',
+                                   {'local': 'backups/backup_20250803_000000.zip'},
+                                   created_at=1754179200, tables=['memory_log'], backup_type='full')
+
+    def tearDown(self):
+        self.catalog.close()
+        self.temp_dir.cleanup()
+
+    def test_latest_by_source_type_and_table(self):
+        self.assertEqual(self.catalog.latest()['backup_id'], 'backup_20250803_000000')
+        self.assertEqual(self.catalog.latest(source='github')['backup_id'], 'backup_20250801_000000')
+        self.assertEqual(self.catalog.latest(source='supabase')['locations']['supabase'],
+                         'daily/memory_backup_2025-08-02.zip.encrypted')
+        self.assertEqual(self.catalog.latest(backup_type='daily')['backup_id'], 'memory_backup_2025-08-02')
+        self.assertEqual(self.catalog.latest(table='decision_vault')['backup_id'], 'backup_20250801_000000')
+        self.assertIsNone(self.catalog.latest(source='notion'))
+
+    def test_rerecording_updates_in_place(self):
+        self.catalog.record_backup('backup_20250803_000000', 'backup_20250803_000000.zip',
+                                   {'github': 'backups/backup_20250803_000000.zip'},
+                                   created_at=1754179200, tables=['memory_log'], size_bytes=42)
+
+        entry = self.catalog.find('backup_20250803_000000.zip')
+        self.assertEqual(set(entry['locations']), {'local', 'github'})
+        self.assertEqual(entry['size_bytes'], 42)
+        self.assertEqual(entry['backup_type'], 'full')
+        self.assertEqual(self.catalog.summary()['backup_count'], 3)
+
+    def test_remove_location(self):
+        self.assertTrue(self.catalog.remove_location('backup_20250801_000000.zip', 'local'))
+        self.assertEqual(set(self.catalog.find('backup_20250801_000000')['locations']), {'github'})
+
+        self.assertTrue(self.catalog.remove_location('backup_20250801_000000', 'github'))
+        self.assertIsNone(self.catalog.find('backup_20250801_000000'))
+        self.assertFalse(self.catalog.remove_location('backup_20250801_000000', 'github'))
+
+        summary = self.catalog.summary()
+        self.assertEqual(summary['backup_count'], 2)
+        self.assertEqual(summary['sources'], {'local': 1, 'supabase': 1})
+
+    def test_jsonl_round_trip(self):
+        manifest = os.path.join(self.temp_dir.name, 'backups', 'catalog.jsonl')
+        self.assertEqual(self.catalog.export_jsonl(manifest), 3)
+
+        entries = read_manifest(manifest)
+        self.assertEqual([entry['backup_id'] for entry in entries],
+                         ['backup_20250803_000000', 'memory_backup_2025-08-02', 'backup_20250801_000000'])
+        self.assertEqual(os.listdir(os.path.dirname(manifest)), ['catalog.jsonl'])
+
+        copy = BackupCatalog(':memory:')
+        self.assertEqual(copy.import_jsonl(manifest), 3)
+        self.assertEqual(copy.list_backups(), self.catalog.list_backups())
+        copy.close()
+
+    def test_describe_archive(self):
+        archive_path = os.path.join(self.temp_dir.name, 'backup.zip')
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            archive.writestr('./export/decision_vault_20250807_120000.json', json.dumps([]))
+            archive.writestr('./export/agent_activity.json', json.dumps([]))
+            archive.writestr('./memory/state.json', json.dumps({}))
+
+        description = describe_archive(archive_path)
+
+        self.assertEqual(description['file_count'], 3)
+        self.assertEqual(description['tables'], ['agent_activity', 'decision_vault'])
+        self.assertEqual(description['size_bytes'], os.path.getsize(archive_path))
+        self.assertEqual(len(description['checksum']), 64)
+
+
+class TestRestoreLookups(unittest.TestCase):
+    """GitHub restore finds the latest backup from the catalog instead of cloning/listing"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.archive_path = os.path.join(self.temp_dir.name, 'backup_20250807_120000.zip')
+        with zipfile.ZipFile(self.archive_path, 'w') as archive:
+            archive.writestr('./export/memory_log_20250807_120000.json', json.dumps([]))
+
+        os.environ['BACKUP_CATALOG_PATH'] = os.path.join(self.temp_dir.name, 'catalog.sqlite3')
+        from github_restore import GitHubRestoreSystem
+        self.restore_system = GitHubRestoreSystem()
+
+    def tearDown(self):
+        self.restore_system.catalog.close()
+        del os.environ['BACKUP_CATALOG_PATH']
+        self.temp_dir.cleanup()
+
+    def record(self, size_bytes: int):
+        self.restore_system.catalog.record_backup(
+            'backup_20250807_120000', 'backup_20250807_120000.zip',
+            {'local': self.archive_path, 'github': 'backups/backup_20250807_120000.zip'},
+            size_bytes=size_bytes)
+
+    def test_local_copy_of_latest_github_backup(self):
+        self.assertIsNone(self.restore_system.find_cataloged_backup())
+
+        self.record(os.path.getsize(self.archive_path))
+        self.assertEqual(self.restore_system.find_cataloged_backup(), self.archive_path)
+
+        self.record(1)
+        self.assertIsNone(self.restore_system.find_cataloged_backup())
+
+    def test_manifest_in_cloned_repository(self):
+        repo_backups = os.path.join(self.temp_dir.name, 'repo', 'backups')
+        os.makedirs(repo_backups)
+        for name in ('backup_20250807_120000.zip', 'backup_20250901_000000.zip'):
+            Path(repo_backups, name).touch()
+
+        self.record(1)
+        self.restore_system.catalog.export_jsonl(os.path.join(repo_backups, 'catalog.jsonl'))
+
+        latest = self.restore_system.find_latest_backup(os.path.join(self.temp_dir.name, 'repo'))
+        self.assertEqual(os.path.basename(latest), 'backup_20250807_120000.zip')
+
+
+if __name__ == '__main__':
+    unittest.main()
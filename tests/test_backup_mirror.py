@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for the partial-clone backup repository mirror and sparse checkouts
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.backup_mirror import BackupMirror
+
+
+def git(*args, cwd):
+    subprocess.run(['git', '-c', 'user.name=Backup Agent', '-c', 'user.email=backup@example.com'] + list(args),
+                   cwd=cwd, check=True, capture_output=True)
+
+
+class BackupRepoTestCase(unittest.TestCase):
+    """Local backup repository with a few commits of history"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.remote = os.path.join(self.temp_dir.name, 'remote')
+        os.makedirs(os.path.join(self.remote, 'backups'))
+        os.makedirs(os.path.join(self.remote, 'export'))
+        git('init', '-q', '-b', 'main', cwd=self.remote)
+        git('config', 'uploadpack.allowFilter', 'true', cwd=self.remote)
+        for day in range(1, 4):
+            self.commit_backup(f"backup_2025080{day}_000000.zip", f"archive {day}")
+        self.repo_url = Path(self.remote).as_uri()
+        self.mirror_dir = os.path.join(self.temp_dir.name, 'mirror')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def commit_backup(self, filename: str, content: str):
+        Path(self.remote, 'backups', filename).write_text(content)
+        Path(self.remote, 'backups', filename + '.checksums').write_text('{}')
+        Path(self.remote, 'export', 'decision_vault.json').write_text(json.dumps([{'id': filename}]))
+        git('add', '-A', cwd=self.remote)
+        git('commit', '-q', '-m', f"Automated backup {filename}", cwd=self.remote)
+
+    def blob_count(self, mirror: BackupMirror) -> int:
+        objects = mirror._git(['cat-file', '--batch-check', '--batch-all-objects']).stdout
+        return sum(1 for line in objects.splitlines() if line.split()[1] == 'blob')
+
+
+class TestBackupMirror(BackupRepoTestCase):
+    """Shallow blob-less mirror, incremental sync and sparse checkout"""
+
+    def test_sync_fetches_tip_without_contents(self):
+        mirror = BackupMirror(self.repo_url, mirror_dir=self.mirror_dir)
+
+        first = mirror.sync()
+        self.assertTrue(first['initial_clone'])
+        self.assertEqual(mirror.branch, 'main')
+        self.assertEqual(self.blob_count(mirror), 0)
+        self.assertEqual(mirror._git(['rev-list', '--count', mirror.ref]).stdout.strip(), '1')
+
+        self.commit_backup('backup_20250804_000000.zip', 'archive 4')
+        second = mirror.sync()
+        self.assertFalse(second['initial_clone'])
+        self.assertNotEqual(first['commit'], second['commit'])
+        self.assertIn('backups/backup_20250804_000000.zip', mirror.list_files('backups/'))
+        self.assertEqual(self.blob_count(mirror), 0)
+
+    def test_read_and_copy_single_files(self):
+        mirror = BackupMirror(self.repo_url, mirror_dir=self.mirror_dir)
+        mirror.sync()
+
+        self.assertEqual(mirror.read_file('backups/backup_20250803_000000.zip'), b'archive 3')
+        self.assertIsNone(mirror.read_file('backups/missing.zip'))
+        self.assertEqual(self.blob_count(mirror), 1)
+
+        dest = os.path.join(self.temp_dir.name, 'copy.zip')
+        self.assertTrue(mirror.copy_file('backups/backup_20250802_000000.zip', dest))
+        self.assertEqual(Path(dest).read_text(), 'archive 2')
+
+    def test_sparse_checkout(self):
+        mirror = BackupMirror(self.repo_url, mirror_dir=self.mirror_dir)
+        mirror.sync()
+
+        dest = mirror.checkout(os.path.join(self.temp_dir.name, 'checkout'), ['export/'])
+
+        self.assertEqual(sorted(name for name in os.listdir(dest) if name != '.git'), ['export'])
+        self.assertEqual(os.listdir(os.path.join(dest, 'export')), ['decision_vault.json'])
+        self.assertEqual(self.blob_count(mirror), 1)
+
+    def test_fetch_tag(self):
+        git('tag', 'v1', 'HEAD~1', cwd=self.remote)
+        mirror = BackupMirror(self.repo_url, mirror_dir=self.mirror_dir)
+        mirror.sync()
+
+        revision = mirror.fetch_revision('v1')
+
+        self.assertNotIn('backups/backup_20250803_000000.zip', mirror.list_files('backups/', revision))
+        self.assertEqual(mirror.read_file('backups/backup_20250802_000000.zip', revision), b'archive 2')
+
+    def test_rebuilds_damaged_mirror(self):
+        mirror = BackupMirror(self.repo_url, mirror_dir=self.mirror_dir)
+        mirror.sync()
+        mirror._git(['remote', 'remove', 'origin'])
+
+        self.assertTrue(mirror.sync()['initial_clone'])
+
+
+class TestRestoreCheckout(BackupRepoTestCase):
+    """GitHub restore checks out only the latest backup"""
+
+    def test_clone_backup_repository(self):
+        from github_restore import GitHubRestoreSystem
+
+        environment = {'BACKUP_MIRROR_DIR': self.mirror_dir,
+                       'BACKUP_CATALOG_PATH': os.path.join(self.temp_dir.name, 'catalog.sqlite3')}
+        repo_dir = os.path.join(self.temp_dir.name, 'repo')
+        with patch.dict(os.environ, environment):
+            restore_system = GitHubRestoreSystem()
+            restore_system.env.update(repo_url=self.repo_url, github_token=None)
+            self.assertTrue(restore_system.clone_backup_repository(repo_dir))
+        restore_system.catalog.close()
+
+        self.assertEqual(sorted(os.listdir(os.path.join(repo_dir, 'backups'))),
+                         ['backup_20250803_000000.zip', 'backup_20250803_000000.zip.checksums'])
+        self.assertEqual(os.path.basename(restore_system.find_latest_backup(repo_dir)),
+                         'backup_20250803_000000.zip')
+
+
+if __name__ == '__main__':
+    unittest.main()
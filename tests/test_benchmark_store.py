@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark sample store, Mann-Whitney regression detection
+and repeated-sample benchmarking
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.benchmark_store import BenchmarkStore, detect_regression, mann_whitney_u
+
+
+class TestMannWhitney(unittest.TestCase):
+    """One-sided Mann-Whitney U test"""
+
+    def test_separated_samples(self):
+        u, p_value = mann_whitney_u([6, 7, 8, 9, 10], [1, 2, 3, 4, 5])
+        self.assertEqual(u, 25)
+        self.assertAlmostEqual(p_value, 0.0061, places=3)
+
+        _, p_value = mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+        self.assertGreater(p_value, 0.99)
+
+    def test_identical_samples_are_not_significant(self):
+        _, p_value = mann_whitney_u([5.0] * 8, [5.0] * 8)
+        self.assertEqual(p_value, 1.0)
+
+
+class TestDetectRegression(unittest.TestCase):
+    """Significance plus minimum effect size"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.baseline = [rng.gauss(100, 5) for _ in range(50)]
+        self.rng = rng
+
+    def test_significant_slowdown(self):
+        current = [self.rng.gauss(130, 5) for _ in range(10)]
+        result = detect_regression(current, self.baseline)
+        self.assertTrue(result['regressed'])
+        self.assertGreater(result['slowdown'], 0.2)
+
+    def test_same_distribution_is_not_a_regression(self):
+        current = [self.rng.gauss(100, 5) for _ in range(10)]
+        self.assertFalse(detect_regression(current, self.baseline)['regressed'])
+
+    def test_small_but_significant_change_is_ignored(self):
+        baseline = [100.0 + i * 0.01 for i in range(50)]
+        current = [103.0 + i * 0.01 for i in range(10)]
+        result = detect_regression(current, baseline, min_slowdown=0.10)
+        self.assertLess(result['p_value'], 0.01)
+        self.assertFalse(result['regressed'])
+
+    def test_too_few_samples_are_not_tested(self):
+        result = detect_regression([500.0], self.baseline)
+        self.assertFalse(result['tested'])
+        self.assertFalse(result['regressed'])
+
+
+class TestBenchmarkStore(unittest.TestCase):
+    """Per-operation sample columns"""
+
+    def setUp(self):
+        self.store = BenchmarkStore(':memory:')
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_trailing_samples_and_runs(self):
+        for run in range(5):
+            self.store.record_run(f"run{run}", 1000.0 + run, {
+                'read': [float(run), float(run) + 0.5],
+                'write': [float(run * 10)]
+            })
+
+        trailing = self.store.trailing_samples('read', before=1004.0, runs=2)
+        self.assertEqual(trailing, [[3.0, 3.5], [2.0, 2.5]])
+
+        runs = self.store.runs_since(1003.0)
+        self.assertEqual([run['run_id'] for run in runs], ['run3', 'run4'])
+        self.assertEqual(runs[1]['write'], [40.0])
+
+        self.assertEqual(self.store.prune(1002.0), 4)
+        self.assertEqual(len(self.store.runs_since(0)), 3)
+
+
+class TestRepeatedSampleBenchmark(unittest.TestCase):
+    """PerformanceBenchmarkSystem sampling and regression alerts"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_patcher = patch.dict(os.environ, {
+            'BENCHMARK_STORE_PATH': os.path.join(self.temp_dir.name, 'benchmarks.sqlite3'),
+            'PERF_BENCHMARK_SAMPLES': '8'
+        })
+        self.env_patcher.start()
+
+        from perf.perf_benchmark import PerformanceBenchmarkSystem
+        with patch('perf.perf_benchmark.AlertManager'), patch('perf.perf_benchmark.GitHelper'):
+            self.system = PerformanceBenchmarkSystem()
+        self.system.alert_manager = Mock()
+
+    def tearDown(self):
+        if self.system.store:
+            self.system.store.close()
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_sample_operation_warms_up_and_takes_median(self):
+        durations = iter([999.0, 30.0, 10.0, 20.0, 50.0, 40.0, 60.0, 70.0, 80.0])
+        benchmark = Mock(side_effect=lambda: {'success': True, 'duration_ms': next(durations)})
+
+        result, samples = self.system.sample_operation('supabase_read', benchmark)
+
+        self.assertEqual(benchmark.call_count, 9)
+        self.assertNotIn(999.0, samples)
+        self.assertEqual(result['samples'], 8)
+        self.assertEqual(result['duration_ms'], 50.0)
+        self.assertEqual(result['latency']['count'], 8)
+
+    def test_failed_warmup_stops_sampling(self):
+        benchmark = Mock(return_value={'success': False, 'duration_ms': None, 'error_message': 'no credentials'})
+
+        result, samples = self.system.sample_operation('supabase_read', benchmark)
+
+        self.assertEqual(benchmark.call_count, 1)
+        self.assertEqual(samples, [])
+        self.assertEqual(result['error_message'], 'no credentials')
+
+    def test_regression_against_trailing_window(self):
+        store = self.system.get_store()
+        rng = random.Random(3)
+        for run in range(7):
+            store.record_run(f"run{run}", 1000.0 + run, {'supabase_read': [rng.gauss(100, 5) for _ in range(8)]})
+
+        steady = self.system.detect_regressions({'supabase_read': [rng.gauss(100, 5) for _ in range(8)]}, 2000.0)
+        self.assertEqual(steady, [])
+
+        slow = self.system.detect_regressions({'supabase_read': [rng.gauss(150, 5) for _ in range(8)]}, 2000.0)
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0]['operation'], 'supabase_read')
+        self.assertEqual(slow[0]['baseline_runs'], 7)
+
+    def test_statistics_from_sample_lists(self):
+        perf_data = [
+            {'timestamp': '2025-01-01T00:00:00+00:00', 'supabase_read_ms': [100.0, 110.0, 120.0]},
+            {'timestamp': '2025-01-02T00:00:00+00:00', 'supabase_read_ms': [90.0, 130.0], 'git_push_ms': None}
+        ]
+
+        stats = self.system.calculate_performance_statistics(perf_data)
+
+        read = stats['metrics']['supabase_read_ms']
+        self.assertEqual(read['count'], 5)
+        self.assertEqual(read['min'], 90.0)
+        self.assertAlmostEqual(read['avg'], 110.0)
+        self.assertAlmostEqual(read['p50'], 110.0, delta=110.0 * 0.04)
+        self.assertEqual(stats['metrics']['git_push_ms']['count'], 0)
+        self.assertIn('N/A', self.system.generate_summary_markdown(stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
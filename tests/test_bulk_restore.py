@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk, idempotent decision_vault restore against the local fake Supabase
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.fake_services import FakeServices
+from restore_from_github import RestoreRunner
+
+
+def make_decisions(count: int):
+    return [{
+        'decision': f"Bulk decision {i}",
+        'date': f"2025-08-{(i % 28) + 1:02d}",
+        'type': 'technical',
+        'active': True
+    } for i in range(count)]
+
+
+class TestBulkRestore(unittest.TestCase):
+    """Keyset-paged prefetch plus batched on_conflict upserts"""
+
+    def setUp(self):
+        self.fake = FakeServices().start()
+        self.env_patcher = patch.dict(os.environ, self.fake.environment())
+        self.env_patcher.start()
+        self.export_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.export_dir.cleanup()
+        self.env_patcher.stop()
+        self.fake.stop()
+
+    def write_export(self, decisions, name='decisions.json'):
+        with open(os.path.join(self.export_dir.name, name), 'w') as f:
+            json.dump({'decisions': decisions}, f)
+
+    def make_runner(self, **kwargs) -> RestoreRunner:
+        runner = RestoreRunner(**kwargs)
+        runner.safe_export_dir = Path(self.export_dir.name)
+        runner.logger.setLevel(logging.WARNING)
+        return runner
+
+    def supabase_requests(self) -> dict:
+        # The fake records each request before responding, so this is exact once the restore returns
+        routes = self.fake.stats_snapshot()['supabase']['routes']
+        return {route: entry['requests'] for route, entry in routes.items()}
+
+    def test_restore_skips_existing_and_batches_requests(self):
+        decisions = make_decisions(250)
+        self.fake.tables.seed('decision_vault', decisions[:30])
+        self.write_export(decisions + decisions[:5])
+        self.fake.reset_stats()
+
+        runner = self.make_runner(batch_size=100)
+        runner.scan_page_size = 20
+        self.assertTrue(runner.restore_decisions_from_files())
+
+        stats = runner.restore_stats
+        self.assertEqual(stats['decisions_processed'], 255)
+        self.assertEqual(stats['decisions_restored'], 220)
+        self.assertEqual(stats['decisions_skipped'], 35)
+        self.assertEqual(len(self.fake.tables.rows('decision_vault')), 250)
+        # Two scan pages and three upsert batches instead of two requests per decision
+        self.assertEqual(self.supabase_requests(), {'GET /rest/v1/decision_vault': 2,
+                                                    'POST /rest/v1/decision_vault': 3})
+
+    def test_rerun_is_idempotent(self):
+        self.write_export(make_decisions(40))
+        self.make_runner().restore_decisions_from_files()
+        rows_after_first = len(self.fake.tables.rows('decision_vault'))
+
+        # Rows written by a restore that was interrupted before updating its stats
+        runner = self.make_runner()
+        with patch.object(runner, 'fetch_existing_keys', return_value=set()):
+            self.assertTrue(runner.restore_decisions_from_files())
+
+        self.assertEqual(rows_after_first, 40)
+        self.assertEqual(len(self.fake.tables.rows('decision_vault')), 40)
+
+    def test_dry_run_writes_nothing(self):
+        self.write_export(make_decisions(10))
+        runner = self.make_runner(dry_run=True)
+        self.assertTrue(runner.restore_decisions_from_files())
+        self.assertEqual(self.fake.tables.rows('decision_vault'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
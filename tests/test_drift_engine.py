@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for bucketed row-hash drift analysis against in-memory and fake Supabase tables
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import sys
+import uuid
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.fake_services import FakeServices
+from utils.drift_engine import DriftEngine, RecordsSource, SupabaseTableSource
+
+
+def make_records(count: int):
+    return [{
+        'id': str(uuid.UUID(int=(i * 7919 + 1) << 64)),
+        'decision': f"Decision {i}",
+        'date': '2025-08-07',
+        'type': 'technical',
+        'active': i % 3 != 0,
+        'created_at': '2025-08-07T10:00:00+00:00'
+    } for i in range(count)]
+
+
+class TestDriftEngine(unittest.TestCase):
+    """Exact full-table drift from differing buckets only"""
+
+    def setUp(self):
+        self.backup = make_records(1000)
+        self.engine = DriftEngine(rows_per_bucket=50)
+
+    def drifted_live(self):
+        live = [dict(record) for record in self.backup[5:]]   # 5 missing in live
+        live[100]['decision'] = 'Changed'                      # 1 modified
+        live[200]['active'] = not live[200]['active']          # 1 modified
+        live[300]['created_at'] = '2025-09-01T00:00:00+00:00'  # Ignored column
+        live.extend(make_records(1003)[1000:])                 # 3 missing in backup
+        return live
+
+    def test_identical_tables_compare_by_root(self):
+        live = [dict(record, created_at='2026-01-01T00:00:00+00:00') for record in reversed(self.backup)]
+        source = RecordsSource(live)
+
+        analysis = self.engine.compare(self.backup, source)
+
+        self.assertTrue(analysis['root_match'])
+        self.assertEqual(analysis['drift_percentage'], 0)
+        self.assertEqual(source.rows_fetched, 0)
+
+    def test_exact_counts_fetching_only_differing_buckets(self):
+        source = RecordsSource(self.drifted_live())
+
+        analysis = self.engine.compare(self.backup, source)
+
+        self.assertEqual(analysis['missing_in_live'], 5)
+        self.assertEqual(analysis['missing_in_backup'], 3)
+        self.assertEqual(analysis['modified_records'], 2)
+        self.assertAlmostEqual(analysis['drift_percentage'], 1.0)
+        self.assertEqual(analysis['buckets'], 20)
+        self.assertLessEqual(analysis['mismatched_buckets'], 6)
+        self.assertLess(analysis['rows_fetched'], 350)
+        self.assertIn('Changed', [sample['live']['decision'] for sample in analysis['sample_differences']])
+
+
+class TestSupabaseDrift(unittest.TestCase):
+    """Live side through the fake PostgREST server"""
+
+    def setUp(self):
+        self.fake = FakeServices().start()
+        self.backup = make_records(1000)
+        live = [dict(record) for record in self.backup[:-4]]
+        live[10]['type'] = 'strategic'
+        self.fake.tables.seed('decision_vault', live)
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def compare(self, use_rpc: bool, page_size: int = 1000):
+        source = SupabaseTableSource(self.fake.url, 'fake-service-key', 'decision_vault',
+                                     page_size=page_size, use_rpc=use_rpc)
+        return DriftEngine(rows_per_bucket=100).compare(self.backup, source)
+
+    def test_rpc_summary_then_bucket_fetch(self):
+        analysis = self.compare(use_rpc=True)
+
+        self.assertEqual(analysis['method'], 'rpc')
+        self.assertEqual((analysis['missing_in_live'], analysis['missing_in_backup'], analysis['modified_records']),
+                         (4, 0, 1))
+        self.assertEqual(analysis['live_count'], 996)
+        # One digest call plus one page for each of the two differing buckets
+        self.assertEqual(analysis['round_trips'], 3)
+        self.assertLessEqual(analysis['rows_fetched'], 200)
+
+    def test_scan_fallback_matches_rpc(self):
+        analysis = self.compare(use_rpc=False, page_size=100)
+
+        self.assertEqual(analysis['method'], 'scan')
+        self.assertEqual((analysis['missing_in_live'], analysis['missing_in_backup'], analysis['modified_records']),
+                         (4, 0, 1))
+
+    def test_github_restore_uses_live_sources(self):
+        from github_restore import GitHubRestoreSystem
+
+        restore_system = GitHubRestoreSystem()
+        restore_system.env.update(supabase_url=self.fake.url, supabase_key='fake-service-key')
+        restore_system.config['drift_rows_per_bucket'] = 100
+
+        drift = restore_system.analyze_data_drift({'decision_vault': self.backup},
+                                                  restore_system.live_table_sources())
+
+        table = drift['tables']['decision_vault']
+        self.assertEqual(table['modified_records'], 1)
+        self.assertEqual(table['missing_in_live'], 4)
+        self.assertEqual(drift['tables']['memory_log']['drift_percentage'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
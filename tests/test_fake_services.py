@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the local fake Supabase/Notion services and the offline load test
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import requests
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.fake_services import FakeServices, FaultProfile
+
+SUPABASE_HEADERS = {'apikey': 'test-key', 'Authorization': 'Bearer test-key'}
+NOTION_HEADERS = {'Authorization': 'Bearer test-token', 'Notion-Version': '2022-06-28'}
+
+
+class TestFakePostgrest(unittest.TestCase):
+    """PostgREST subset"""
+
+    def setUp(self):
+        self.fake = FakeServices().start()
+        self.url = f"{self.fake.url}/rest/v1/decision_vault"
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_insert_filter_order_and_count(self):
+        rows = [{'decision': f"d{i}", 'seq': i, 'synced': i % 2 == 0} for i in range(10)]
+        response = requests.post(self.url, json=rows, headers=SUPABASE_HEADERS)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(all('id' in row for row in response.json()))
+
+        response = requests.get(f"{self.url}?select=seq&synced=eq.false&seq=gte.5&order=seq.desc",
+                                headers=SUPABASE_HEADERS)
+        self.assertEqual(response.json(), [{'seq': 9}, {'seq': 7}, {'seq': 5}])
+
+        response = requests.get(f"{self.url}?select=id&limit=3&offset=2",
+                                headers={**SUPABASE_HEADERS, 'Prefer': 'count=exact'})
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(response.headers['Content-Range'], '2-4/10')
+
+    def test_patch_in_filter_and_upsert(self):
+        created = requests.post(self.url, json=[{'decision': 'a'}, {'decision': 'b'}],
+                                headers=SUPABASE_HEADERS).json()
+        ids = ",".join(row['id'] for row in created)
+
+        response = requests.patch(f"{self.url}?id=in.({ids})", json={'synced': True}, headers=SUPABASE_HEADERS)
+        self.assertEqual(len(response.json()), 2)
+
+        requests.post(self.url, json={'id': created[0]['id'], 'decision': 'a2'},
+                      headers={**SUPABASE_HEADERS, 'Prefer': 'resolution=merge-duplicates'})
+        rows = self.fake.tables.rows('decision_vault')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(sorted(row['decision'] for row in rows), ['a2', 'b'])
+        self.assertTrue(all(row['synced'] for row in rows))
+
+    def test_requires_api_key(self):
+        self.assertEqual(requests.get(self.url).status_code, 401)
+
+
+class TestFakeNotion(unittest.TestCase):
+    """Notion database and page endpoints"""
+
+    def setUp(self):
+        self.fake = FakeServices().start()
+        self.base = f"{self.fake.url}/v1"
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def create(self, title, checksum):
+        return requests.post(f"{self.base}/pages", headers=NOTION_HEADERS, json={
+            'parent': {'database_id': self.fake.database_id},
+            'properties': {
+                'Decision': {'title': [{'text': {'content': title}}]},
+                'Checksum': {'rich_text': [{'text': {'content': checksum}}]}
+            }
+        })
+
+    def test_query_pagination_and_filter(self):
+        for i in range(5):
+            self.assertEqual(self.create(f"page {i}", f"sum{i}").status_code, 200)
+
+        seen, cursor = [], None
+        while True:
+            body = {'page_size': 2, **({'start_cursor': cursor} if cursor else {})}
+            page = requests.post(f"{self.base}/databases/{self.fake.database_id}/query",
+                                 headers=NOTION_HEADERS, json=body).json()
+            seen.extend(result['id'] for result in page['results'])
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+        self.assertEqual(len(set(seen)), 5)
+
+        filtered = requests.post(f"{self.base}/databases/{self.fake.database_id}/query", headers=NOTION_HEADERS,
+                                 json={'filter': {'property': 'Checksum', 'rich_text': {'equals': 'sum3'}}}).json()
+        self.assertEqual(len(filtered['results']), 1)
+
+    def test_update_and_missing_page(self):
+        page_id = self.create("old", "x").json()['id']
+        updated = requests.patch(f"{self.base}/pages/{page_id}", headers=NOTION_HEADERS, json={
+            'properties': {'Decision': {'title': [{'text': {'content': 'new'}}]}}
+        }).json()
+        self.assertEqual(updated['properties']['Decision']['title'][0]['text']['content'], 'new')
+        self.assertEqual(requests.get(f"{self.base}/pages/missing", headers=NOTION_HEADERS).status_code, 404)
+
+
+class TestFaultInjection(unittest.TestCase):
+    """Rate limiting, failures and stats"""
+
+    def test_rate_limit_returns_429_with_retry_after(self):
+        with FakeServices(notion_faults=FaultProfile(rate_limit=1, burst=2)) as fake:
+            responses = [requests.get(f"{fake.url}/v1/users/me", headers=NOTION_HEADERS) for _ in range(4)]
+            self.assertEqual([r.status_code for r in responses], [200, 200, 429, 429])
+            self.assertIn('Retry-After', responses[2].headers)
+            self.assertEqual(fake.stats_snapshot()['notion']['throttled'], 2)
+
+    def test_failure_rate_and_runtime_reconfiguration(self):
+        with FakeServices(supabase_faults=FaultProfile(failure_rate=1.0)) as fake:
+            url = f"{fake.url}/rest/v1/decision_vault"
+            self.assertEqual(requests.get(url, headers=SUPABASE_HEADERS).status_code, 503)
+
+            requests.post(f"{fake.url}/__fake/faults", json={'supabase': {'failure_rate': 0}})
+            self.assertEqual(requests.get(url, headers=SUPABASE_HEADERS).status_code, 200)
+
+            stats = requests.get(f"{fake.url}/__fake/stats").json()['supabase']
+            self.assertEqual(stats['routes']['GET /rest/v1/decision_vault']['statuses'], {'503': 1, '200': 1})
+
+    def test_stats_are_recorded_before_the_response(self):
+        with FakeServices() as fake, requests.Session() as session:
+            for count in range(1, 51):
+                session.get(f"{fake.url}/v1/users/me", headers=NOTION_HEADERS)
+                self.assertEqual(fake.stats_snapshot()['notion']['requests'], count)
+
+
+class TestLoadTest(unittest.TestCase):
+    """Offline load test scenarios"""
+
+    def test_memory_sync_and_restore_scenarios(self):
+        from perf.load_test import run_load_test
+
+        report = run_load_test(['memory_sync', 'restore'], records=20)
+
+        memory_sync = report['scenarios']['memory_sync']
+        self.assertEqual(memory_sync['result']['synced'], 20)
+        self.assertEqual(memory_sync['verified'], {'notion_pages': 20, 'rows_marked_synced': 20})
+
+        restore = report['scenarios']['restore']
+        self.assertEqual(restore['result']['decisions_restored'], 18)
+        self.assertEqual(restore['result']['decisions_skipped'], 2)
+        self.assertGreater(restore['services']['supabase']['requests'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
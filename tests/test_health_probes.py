@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent health probes with dependencies, deadlines and the shared TTL cache
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.health_probes import Probe, ProbeCache, ProbeRunner
+
+
+def sleeper(seconds: float, status: str = 'healthy', calls: list = None):
+    def check():
+        if calls is not None:
+            calls.append(time.perf_counter())
+        time.sleep(seconds)
+        return {'status': status, 'metrics': {}, 'issues': []}
+    return check
+
+
+class TestProbeRunner(unittest.TestCase):
+    """Concurrency, deadlines and dependency ordering"""
+
+    def test_probes_run_concurrently(self):
+        runner = ProbeRunner([Probe(f"probe_{i}", sleeper(0.3)) for i in range(5)])
+
+        start = time.perf_counter()
+        results = runner.run()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result['status'] == 'healthy' for result in results.values()))
+        self.assertLess(elapsed, 0.9)
+
+    def test_per_probe_deadline(self):
+        release = threading.Event()
+
+        def hangs():
+            release.wait(5)
+            return {'status': 'healthy', 'metrics': {}, 'issues': []}
+
+        runner = ProbeRunner([Probe('fast', sleeper(0.05)), Probe('hung', hangs, timeout=0.2)])
+        start = time.perf_counter()
+        results = runner.run()
+        elapsed = time.perf_counter() - start
+        release.set()
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(results['fast']['status'], 'healthy')
+        self.assertEqual(results['hung']['status'], 'error')
+        self.assertIn('timed out', results['hung']['issues'][0])
+
+    def test_dependencies_order_and_skip(self):
+        started = {}
+
+        def record(name, status='healthy'):
+            def check():
+                started[name] = time.perf_counter()
+                time.sleep(0.1)
+                return {'status': status, 'metrics': {}, 'issues': []}
+            return check
+
+        runner = ProbeRunner([
+            Probe('integrity', record('integrity'), depends_on=['database']),
+            Probe('database', record('database')),
+            Probe('queue', record('queue'), depends_on=['broker']),
+            Probe('broker', record('broker', status='critical')),
+        ])
+        results = runner.run()
+
+        self.assertEqual(list(results), ['database', 'integrity', 'broker', 'queue'])
+        self.assertGreaterEqual(started['integrity'] - started['database'], 0.09)
+        self.assertTrue(results['queue']['skipped'])
+        self.assertNotIn('queue', started)
+
+    def test_selection_pulls_in_dependencies(self):
+        runner = ProbeRunner([Probe('a', sleeper(0)), Probe('b', sleeper(0), depends_on=['a']),
+                              Probe('c', sleeper(0))])
+        self.assertEqual(list(runner.run(['b'])), ['a', 'b'])
+
+    def test_exceptions_and_bad_graphs(self):
+        def broken():
+            raise RuntimeError('boom')
+
+        result = ProbeRunner([Probe('broken', broken)]).run()['broken']
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('boom', result['issues'][0])
+
+        with self.assertRaises(ValueError):
+            ProbeRunner([Probe('a', broken, depends_on=['b']), Probe('b', broken, depends_on=['a'])])
+        with self.assertRaises(ValueError):
+            ProbeRunner([Probe('a', broken, depends_on=['missing'])])
+
+
+class TestProbeCache(unittest.TestCase):
+    """Fresh results are shared between runners (and processes) through SQLite"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'probe_cache.sqlite3')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ttl_cache_shared_between_runners(self):
+        calls = []
+        probes = [Probe('slow', sleeper(0.05, calls=calls), ttl=60), Probe('volatile', sleeper(0), ttl=0)]
+
+        first = ProbeRunner(probes, cache=ProbeCache(self.path)).run()
+        second = ProbeRunner(probes, cache=ProbeCache(self.path)).run()
+
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(first['slow']['cached'])
+        self.assertTrue(second['slow']['cached'])
+        self.assertFalse(second['volatile']['cached'])
+        self.assertEqual(second['slow']['checked_at'], first['slow']['checked_at'])
+
+        ProbeRunner(probes, cache=ProbeCache(self.path)).run(force=True)
+        self.assertEqual(len(calls), 2)
+
+    def test_late_result_refreshes_cache(self):
+        cache = ProbeCache(self.path)
+        runner = ProbeRunner([Probe('late', sleeper(0.3), timeout=0.05)], cache=cache)
+
+        self.assertEqual(runner.run()['late']['status'], 'error')
+        self.assertIsNone(cache.get('late'))
+
+        time.sleep(0.5)
+        self.assertEqual(cache.get('late')['result']['status'], 'healthy')
+        self.assertEqual(list(cache.all('la')), ['late'])
+        self.assertEqual(cache.all('other'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared LLM call cache
+Uses a fake OpenAI client so no API key is required
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.llm_cache import LLMCache, is_json_object
+
+
+class _FakeClient:
+    """Minimal stand-in for openai.OpenAI with a call counter"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False, content: str = None,
+                 finish_reason: str = 'stop'):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self.content = content
+        self.finish_reason = finish_reason
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **params):
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("API unavailable")
+        content = self.content if self.content is not None else f"{model}:{messages[-1]['content']}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content),
+                                                        finish_reason=self.finish_reason)])
+
+
+class TestLLMCache(unittest.TestCase):
+    """Tests for LLMCache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "llm_cache.sqlite3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _messages(self, text):
+        return [{"role": "user", "content": text}]
+
+    def test_hit_after_miss_and_persistence(self):
+        """Second identical call is served from disk, also by a new cache instance"""
+        client = _FakeClient()
+        cache = LLMCache(self.db_path)
+
+        first = cache.chat_completion(client, "gpt-5", self._messages("hello"), temperature=0.3)
+        second = cache.chat_completion(client, "gpt-5", self._messages("hello"), temperature=0.3)
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+        reopened = LLMCache(self.db_path)
+        reopened.chat_completion(client, "gpt-5", self._messages("hello"), temperature=0.3)
+        self.assertEqual(client.calls, 1)
+
+    def test_key_includes_model_and_params(self):
+        """Different model or params are separate entries"""
+        client = _FakeClient()
+        cache = LLMCache(self.db_path)
+
+        cache.chat_completion(client, "gpt-5", self._messages("hello"), temperature=0.3)
+        cache.chat_completion(client, "gpt-4o", self._messages("hello"), temperature=0.3)
+        cache.chat_completion(client, "gpt-5", self._messages("hello"), temperature=0.7)
+
+        self.assertEqual(client.calls, 3)
+
+    def test_lru_eviction_bounds_size(self):
+        """Cache never grows past max_entries and keeps recently used entries"""
+        client = _FakeClient()
+        cache = LLMCache(self.db_path, max_entries=10)
+
+        cache.chat_completion(client, "gpt-5", self._messages("keep"))
+        for i in range(20):
+            cache.chat_completion(client, "gpt-5", self._messages(f"prompt {i}"))
+            cache.chat_completion(client, "gpt-5", self._messages("keep"))
+
+        stats = cache.get_stats()
+        self.assertLessEqual(stats['entries'], 10)
+        self.assertGreater(stats['evictions'], 0)
+
+        calls = client.calls
+        cache.chat_completion(client, "gpt-5", self._messages("keep"))
+        self.assertEqual(client.calls, calls)
+
+    def test_hits_do_not_write(self):
+        """Recency bumps are queued on hits and written before the next insert"""
+        client = _FakeClient()
+        cache = LLMCache(self.db_path)
+        cache.chat_completion(client, "gpt-5", self._messages("hello"))
+
+        writes = cache._conn.total_changes
+        for _ in range(5):
+            cache.chat_completion(client, "gpt-5", self._messages("hello"))
+        self.assertEqual(cache._conn.total_changes, writes)
+
+        cache.flush()
+        self.assertEqual(cache._conn.total_changes, writes + 1)
+
+    def test_inflight_requests_are_coalesced(self):
+        """Concurrent identical calls reach the API once"""
+        client = _FakeClient(delay=0.2)
+        cache = LLMCache(self.db_path)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                cache.chat_completion(client, "gpt-5", self._messages("same"))))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(cache.get_stats()['coalesced'] + cache.get_stats()['hits'], 4)
+
+    def test_errors_are_not_cached(self):
+        """API failures propagate so callers can fall back, and are retried next time"""
+        cache = LLMCache(self.db_path)
+
+        with self.assertRaises(RuntimeError):
+            cache.chat_completion(_FakeClient(fail=True), "gpt-5", self._messages("boom"))
+
+        client = _FakeClient()
+        cache.chat_completion(client, "gpt-5", self._messages("boom"))
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(cache.get_stats()['errors'], 1)
+
+    def test_rejected_responses_are_not_cached(self):
+        """Truncated or invalid content is returned to the caller but never replayed"""
+        cache = LLMCache(self.db_path)
+        messages = self._messages("classify")
+
+        truncated = _FakeClient(content='{"type": "archi', finish_reason='length')
+        self.assertEqual(cache.chat_completion(truncated, "gpt-5", messages), '{"type": "archi')
+
+        malformed = _FakeClient(content='not json')
+        cache.chat_completion(malformed, "gpt-5", messages, validate=is_json_object)
+        cache.chat_completion(malformed, "gpt-5", messages, validate=is_json_object)
+        self.assertEqual(malformed.calls, 2)
+        self.assertEqual(cache.get_stats()['rejected'], 3)
+
+        # Once the API answers properly the response is cached as usual
+        recovered = _FakeClient(content='{"type": "architecture"}')
+        cache.chat_completion(recovered, "gpt-5", messages, validate=is_json_object)
+        self.assertEqual(cache.chat_completion(recovered, "gpt-5", messages, validate=is_json_object),
+                         '{"type": "architecture"}')
+        self.assertEqual(recovered.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
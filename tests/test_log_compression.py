@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming log compression and LogManager maintenance
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import gzip
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.log_compression import _ForwardReader, compress_file, open_archive
+from log_manager import LogManager
+
+
+def write_lines(path, count, start=0):
+    with open(path, 'a') as f:
+        for i in range(start, start + count):
+            f.write(f"2025-08-04 10:00:00,000 - INFO - sync step {i} completed for decision_vault\n")
+
+
+class TestLogCompression(unittest.TestCase):
+    """Tests for utils.log_compression"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, 'sync_20250804_000000.log')
+        write_lines(self.source, 5000)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_gzip_roundtrip(self):
+        """Streaming gzip output decompresses to the original bytes"""
+        target = f"{self.source}.gz"
+        result = compress_file(self.source, target)
+
+        with open(self.source, 'rb') as f, open_archive(target) as g:
+            self.assertEqual(f.read(), g.read())
+        self.assertLess(result['bytes_out'], result['bytes_in'])
+        self.assertFalse(os.path.exists(f"{target}.tmp"))
+
+    def test_forward_reader_seeks(self):
+        """Forward seeks skip bytes, backward seeks reopen the stream"""
+        target = f"{self.source}.gz"
+        compress_file(self.source, target)
+        with open(self.source, 'rb') as f:
+            f.seek(1000)
+            expected = f.readline()
+
+        reader = _ForwardReader(lambda: gzip.open(target, 'rb'))
+        reader.seek(5000)
+        reader.seek(1000)
+        self.assertEqual(reader.readline(), expected)
+        self.assertEqual(reader.tell(), 1000 + len(expected))
+        reader.close()
+
+
+class TestLogManagerMaintenance(unittest.TestCase):
+    """Tests for LogManager rotation and compression"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.manager = LogManager()
+        self.manager.config['compress_after_days'] = -1
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def test_parallel_compression_reports_throughput(self):
+        """Archives are compressed across workers and originals removed"""
+        for n in range(3):
+            write_lines(f"logs/archive/sync_2025080{n}_000000.log", 2000)
+        self.manager.config['compression_workers'] = 2
+
+        stats = self.manager.compress_archive_files()
+
+        self.assertEqual(stats['files_compressed'], 3)
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual(stats['errors'], [])
+        self.assertGreater(stats['bytes_per_second'], 0)
+        self.assertLess(stats['compression_ratio'], 50)
+        self.assertEqual(sorted(os.listdir('logs/compressed')),
+                         [f"sync_2025080{n}_000000.log.gz" for n in range(3)])
+        self.assertEqual(os.listdir('logs/archive'), [])
+
+    def test_copy_truncate_keeps_open_handles(self):
+        """Writes through a handle opened before rotation land in the live file"""
+        log_file = 'logs/active/busy.log'
+        handler = logging.FileHandler(log_file)
+        writer = logging.getLogger('test_copy_truncate')
+        writer.propagate = False
+        writer.addHandler(handler)
+        writer.warning("before rotation")
+
+        self.manager.config['max_log_size'] = 0
+        self.manager.config['exclude_patterns'] = []
+        self.manager.config['log_patterns'] = [log_file]
+        stats = self.manager.rotate_large_files()
+        writer.warning("after rotation")
+        handler.close()
+        writer.removeHandler(handler)
+
+        self.assertEqual(stats['files_rotated'], 1)
+        with open(log_file) as f:
+            self.assertEqual(f.read(), "after rotation\n")
+        archive = os.listdir('logs/archive')[0]
+        with open(os.path.join('logs/archive', archive)) as f:
+            self.assertEqual(f.read(), "before rotation\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed log query engine
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import gzip
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import utils.log_index as log_index
+from utils.log_index import LogIndex, parse_line
+
+BASE = datetime(2025, 8, 4, tzinfo=timezone.utc)
+
+
+def write_log(path, start_hour, hours, component=None, mode='w'):
+    """Write one line per minute; every 60th line is an ERROR"""
+    with open(path, mode) as f:
+        for minute in range(hours * 60):
+            ts = (BASE + timedelta(hours=start_hour, minutes=minute)).isoformat()
+            level = 'ERROR' if minute % 60 == 0 else 'INFO'
+            prefix = f"{ts} - {component} - " if component else f"{ts} - "
+            f.write(f"{prefix}{level} - backup step {start_hour}:{minute}\n")
+            if level == 'ERROR':
+                f.write("Traceback (most recent call last):\n")
+
+
+class TestLogIndex(unittest.TestCase):
+    """Tests for LogIndex"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        for directory in ('logs/active', 'logs/archive', 'logs/compressed'):
+            os.makedirs(directory)
+        self.original_checkpoint = log_index.CHECKPOINT_BYTES
+        log_index.CHECKPOINT_BYTES = 1024
+
+    def tearDown(self):
+        log_index.CHECKPOINT_BYTES = self.original_checkpoint
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def test_parse_line_formats(self):
+        """Both the 3-part and the component format parse, tracebacks do not"""
+        self.assertEqual(parse_line("2025-08-04T00:00:00+00:00 - INFO - a - b")['message'], "a - b")
+        parsed = parse_line("2025-08-04 00:00:00,123 - sync_service - WARNING - slow")
+        self.assertEqual((parsed['component'], parsed['level']), ('sync_service', 'WARNING'))
+        self.assertIsNone(parse_line("Traceback (most recent call last):"))
+
+    def test_time_window_across_active_and_gzip_archive(self):
+        """Queries find entries in active files and compressed archives, skipping other files"""
+        write_log('logs/archive/backup_20250804_000000.log', 0, 24)
+        write_log('logs/active/backup.log', 48, 24)
+
+        index = LogIndex('logs/index/log_index.json')
+        self.assertEqual(len(list(index.query('logs/active/backup*.log'))), 48 * 60)
+
+        # log_manager compresses the archive; its entry is reused, not re-scanned
+        archive = 'logs/archive/backup_20250804_000000.log'
+        with open(archive, 'rb') as f_in, gzip.open(f"logs/compressed/{Path(archive).name}.gz", 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(archive)
+
+        index = LogIndex('logs/index/log_index.json')
+        window = list(index.query('logs/active/backup*.log',
+                                  start=BASE + timedelta(hours=10), end=BASE + timedelta(hours=10, minutes=29)))
+        self.assertEqual(len(window), 30)
+        self.assertTrue(all(entry['file'].endswith('.gz') for entry in window))
+        self.assertEqual(window[0]['timestamp'], (BASE + timedelta(hours=10)).isoformat())
+        self.assertEqual(index.stats['files_indexed'], 0)
+        self.assertEqual(index.stats['files_skipped'], 2)
+
+    def test_level_and_component_filters(self):
+        """Sparse levels are read by offset; component filters match per-line names"""
+        write_log('logs/active/sync.log', 0, 5, component='sync_service')
+
+        index = LogIndex('logs/index/log_index.json')
+        errors = list(index.query('logs/active/sync.log', levels=['ERROR'], include_archives=False))
+        self.assertEqual(len(errors), 5)
+        self.assertEqual({entry['component'] for entry in errors}, {'sync_service'})
+        self.assertEqual(list(index.query('logs/active/sync.log', components=['other'])), [])
+
+    def test_incremental_append_and_rotation(self):
+        """Appends are indexed from the last offset; a rotated file is re-indexed"""
+        path = 'logs/active/backup.log'
+        write_log(path, 0, 2)
+        index = LogIndex('logs/index/log_index.json')
+        list(index.query(path, include_archives=False))
+        first_bytes = index.stats['bytes_indexed']
+
+        write_log(path, 2, 1, mode='a')
+        self.assertEqual(len(list(index.query(path, include_archives=False))), 180)
+        self.assertLess(index.stats['bytes_indexed'] - first_bytes, first_bytes)
+
+        write_log(path, 5, 1)  # Replaced by a new file
+        self.assertEqual(len(list(index.query(path, include_archives=False))), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
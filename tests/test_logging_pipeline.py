@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the queued structured logging pipeline
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import queue
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import LazyQueueHandler, LoggingPipeline, SamplingFilter
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    """Tests for LoggingPipeline"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.temp_dir.name, 'angles.jsonl')
+        env = {'LOG_CONSOLE': 'false', 'LOG_JSON_FILE': self.json_file,
+               'LOG_SAMPLING': 'test_pipeline.sampled=0', 'LOG_RATE_LIMITS': ''}
+        with patch.dict(os.environ, env):
+            self.pipeline = LoggingPipeline()
+
+    def tearDown(self):
+        self.pipeline.stop()
+        for handler in self.pipeline._file_handlers.values():
+            handler.close()
+        for handler in self.pipeline.dispatch.shared:
+            handler.close()
+        self.temp_dir.cleanup()
+
+    def _read_json(self):
+        with open(self.json_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_json_lines_include_context(self):
+        """Records reach the shared JSON file with their structured context"""
+        logger = logging.getLogger('test_pipeline.json')
+        self.pipeline.attach(logger, logging.INFO)
+
+        logger.info("Synced %d records", 5, extra={'context': {'table': 'decision_vault'}})
+        logger.debug("Not enabled")
+        self.pipeline.flush()
+
+        entries = self._read_json()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['msg'], "Synced 5 records")
+        self.assertEqual(entries[0]['level'], 'INFO')
+        self.assertEqual(entries[0]['logger'], 'test_pipeline.json')
+        self.assertEqual(entries[0]['context'], {'table': 'decision_vault'})
+
+    def test_json_file_is_opt_in(self):
+        """Without LOG_JSON_FILE no shared JSON file is written"""
+        env = {key: value for key, value in os.environ.items() if key != 'LOG_JSON_FILE'}
+        with patch.dict(os.environ, {**env, 'LOG_CONSOLE': 'false'}, clear=True):
+            pipeline = LoggingPipeline()
+        try:
+            self.assertEqual(pipeline.dispatch.shared, [])
+        finally:
+            pipeline.stop()
+
+    def test_per_logger_text_file_keeps_format(self):
+        """Per-module files keep the 'timestamp - level - message' layout parsers rely on"""
+        log_file = os.path.join(self.temp_dir.name, 'module.log')
+        logger = logging.getLogger('test_pipeline.text')
+        self.pipeline.attach(logger, logging.INFO, log_file)
+        self.pipeline.attach(logger, logging.INFO, log_file)  # Idempotent
+
+        logger.warning("Disk almost full")
+        self.pipeline.flush()
+
+        with open(log_file) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        parts = lines[0].split(' - ')
+        self.assertEqual(parts[1:], ['WARNING', 'Disk almost full'])
+        self.assertEqual(len(logger.handlers), 1)
+
+    def test_sampling_drops_info_keeps_warnings(self):
+        """Sampled loggers drop low-level records but never warnings"""
+        logger = logging.getLogger('test_pipeline.sampled')
+        self.pipeline.attach(logger, logging.INFO)
+
+        for i in range(20):
+            logger.info("noise %d", i)
+        logger.error("real problem")
+        self.pipeline.flush()
+
+        self.assertEqual([entry['msg'] for entry in self._read_json()], ["real problem"])
+        self.assertEqual(self.pipeline.stats()['loggers']['test_pipeline.sampled']['sampled_out'], 20)
+
+
+class TestLazyQueueHandler(unittest.TestCase):
+    """Tests for LazyQueueHandler"""
+
+    def test_args_are_snapshotted_at_call_time(self):
+        """Mutating an argument after the call does not change the queued message"""
+        records = queue.Queue()
+        logger = logging.getLogger('test_pipeline.snapshot')
+        logger.propagate = False
+        logger.addHandler(LazyQueueHandler(records))
+        self.addCleanup(logger.handlers.clear)
+
+        state = {'phase': 'before'}
+        logger.warning("state %s", state)
+        state['phase'] = 'after'
+
+        record = records.get_nowait()
+        self.assertEqual(record.getMessage(), "state {'phase': 'before'}")
+        self.assertIsNone(record.args)
+
+
+class TestSamplingFilter(unittest.TestCase):
+    """Tests for SamplingFilter"""
+
+    def _record(self, level):
+        return logging.LogRecord('rate', level, __file__, 1, "msg", None, None)
+
+    def test_rate_limit(self):
+        """Token bucket caps records per second below WARNING"""
+        sampling_filter = SamplingFilter(max_per_second=5)
+
+        passed = sum(sampling_filter.filter(self._record(logging.INFO)) for _ in range(50))
+
+        self.assertLessEqual(passed, 6)
+        self.assertGreater(sampling_filter.rate_limited, 40)
+        self.assertTrue(sampling_filter.filter(self._record(logging.WARNING)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for AI memory bridge batch classification
+Runs against the local StubChatClient, no API key required
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from memory_bridge import AIEnhancedMemoryBridge
+from tools.ai_client import StubChatClient
+from utils import near_duplicates
+from utils.near_duplicates import NearDuplicateIndex
+from utils import llm_cache
+from utils.llm_cache import LLMCache
+
+
+DECISIONS = {
+    'd1': 'Adopt PostgreSQL schema migrations for the decision vault',
+    'd2': 'Critical security review of API tokens every month',
+    'd3': 'Cleanup of the weekly process workflow',
+}
+
+
+@patch.dict(os.environ, {'LLM_CACHE_DISABLED': 'true'})
+class TestBatchClassification(unittest.TestCase):
+    """Tests for AIEnhancedMemoryBridge.classify_decisions"""
+
+    def test_packs_decisions_into_batches(self):
+        """One request per batch, every id classified by the model"""
+        client = StubChatClient()
+        bridge = AIEnhancedMemoryBridge(client=client)
+
+        results = bridge.classify_decisions(DECISIONS, batch_size=2)
+
+        self.assertEqual(len(client.requests), 2)
+        self.assertEqual(set(results), set(DECISIONS))
+        self.assertTrue(all(result['ai_analysis'] for result in results.values()))
+        self.assertEqual(results['d2']['type'], 'security')
+        self.assertEqual(results['d2']['priority'], 'high')
+
+    def test_partial_response_falls_back_per_item(self):
+        """Ids missing from the model output get keyword classification"""
+        bridge = AIEnhancedMemoryBridge(client=StubChatClient(omit_ids=['d3']))
+
+        results = bridge.classify_decisions(DECISIONS)
+
+        self.assertTrue(results['d1']['ai_analysis'])
+        self.assertFalse(results['d3']['ai_analysis'])
+        self.assertEqual(results['d3']['category'], 'workflow')
+
+    def test_malformed_response_falls_back(self):
+        """Truncated JSON falls back for the whole batch without raising"""
+        bridge = AIEnhancedMemoryBridge(client=StubChatClient(malformed=True))
+
+        results = bridge.classify_decisions(DECISIONS)
+
+        self.assertEqual(set(results), set(DECISIONS))
+        self.assertFalse(any(result['ai_analysis'] for result in results.values()))
+
+    def test_partial_batch_is_not_cached(self):
+        """A batch with missing ids is asked again; a complete one is served from cache"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {'LLM_CACHE_DISABLED': 'false'}), \
+                patch.object(llm_cache, '_cache', LLMCache(str(Path(tmp) / 'llm_cache.sqlite3'))):
+            partial = StubChatClient(omit_ids=['d3'])
+            AIEnhancedMemoryBridge(client=partial).classify_decisions(DECISIONS)
+            AIEnhancedMemoryBridge(client=partial).classify_decisions(DECISIONS)
+            self.assertEqual(len(partial.requests), 2)
+
+            complete = StubChatClient()
+            AIEnhancedMemoryBridge(client=complete).classify_decisions(DECISIONS)
+            results = AIEnhancedMemoryBridge(client=complete).classify_decisions(DECISIONS)
+            self.assertEqual(len(complete.requests), 1)
+            self.assertTrue(results['d3']['ai_analysis'])
+
+    def test_ai_disabled_uses_fallback(self):
+        """Without AI every decision is classified locally"""
+        bridge = AIEnhancedMemoryBridge(enable_ai=False)
+
+        results = bridge.classify_decisions(DECISIONS)
+
+        self.assertEqual(results['d1']['category'], 'database')
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    """Tests for the MinHash/LSH duplicate index"""
+
+    def setUp(self):
+        self.index = NearDuplicateIndex()
+        self.index.add('a', 'Use PostgreSQL as the primary database for decision storage')
+        self.index.add('b', 'Rotate all API keys every month and audit access logs')
+        self.index.add('c', 'Weekly summary emails go out every Monday morning')
+
+    def test_finds_near_duplicate(self):
+        """Small edits are found, unrelated decisions are not"""
+        matches = self.index.query('We use PostgreSQL as the primary database for decision storage!')
+
+        self.assertEqual([match['id'] for match in matches], ['a'])
+        self.assertGreaterEqual(matches[0]['similarity_score'], 0.6)
+
+    def test_threshold_and_similar_to(self):
+        """Exact copies score 1.0 and are reported as duplicates"""
+        self.index.add('d', 'Use PostgreSQL as the primary database for decision storage')
+
+        matches = self.index.similar_to('d', threshold=0.95)
+
+        self.assertEqual(matches[0]['id'], 'a')
+        self.assertEqual(matches[0]['overlap_type'], 'duplicate')
+
+    def test_remove_and_reindex(self):
+        """Removed decisions disappear, re-adding replaces the signature"""
+        self.index.remove('a')
+        self.assertEqual(self.index.query('Use PostgreSQL as the primary database for decision storage'), [])
+
+        self.index.add('b', 'Use PostgreSQL as the primary database for decision storage')
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.query('Rotate all API keys every month and audit access logs'), [])
+
+    def test_save_and_load_roundtrip(self):
+        """Persisted signatures answer the same queries"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / 'duplicate_index.json')
+            self.index.save(path)
+            loaded = NearDuplicateIndex.load(path)
+
+        text = 'Rotate all API keys monthly and audit access logs'
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.query(text), self.index.query(text))
+
+    def test_index_decisions_journals_until_compaction(self):
+        """Writes append to the journal; the snapshot is rewritten only on compaction"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'duplicate_index.json'
+            journal = Path(f"{path}.journal")
+            with patch.dict(os.environ, {'DUPLICATE_INDEX_PATH': str(path)}), \
+                 patch.object(near_duplicates, '_index', None), \
+                 patch.object(near_duplicates, 'JOURNAL_COMPACT_EVERY', 3):
+                self.assertTrue(near_duplicates.index_decision('a', 'Use PostgreSQL as the primary database'))
+                self.assertEqual(near_duplicates.index_decisions([
+                    {'id': 'a', 'decision': 'Use PostgreSQL as the primary database'},
+                    {'id': 'b', 'decision': 'Rotate all API keys every month'}
+                ]), 1)
+                self.assertFalse(path.exists())
+                self.assertEqual(len(journal.read_text().splitlines()), 2)
+
+                # A fresh process replays the journal on top of the (missing) snapshot
+                replayed = NearDuplicateIndex.load(str(path))
+                self.assertEqual(replayed.query('Rotate all API keys every month')[0]['id'], 'b')
+
+                near_duplicates.index_decision('c', 'Weekly summary emails go out every Monday')
+                self.assertTrue(path.exists())
+                self.assertFalse(journal.exists())
+                self.assertEqual(len(NearDuplicateIndex.load(str(path))), 3)
+
+    def test_index_failures_are_logged_not_raised(self):
+        """A broken index never fails the decision write"""
+        with patch.object(near_duplicates, 'get_duplicate_index', side_effect=OSError('disk full')), \
+             self.assertLogs(near_duplicates.logger, level='WARNING'):
+            self.assertFalse(near_duplicates.index_decision('a', 'Use PostgreSQL'))
+
+    def test_query_is_fast_on_large_corpus(self):
+        """Queries stay in the millisecond range with a large corpus"""
+        index = NearDuplicateIndex()
+        for i in range(500):
+            index.add(f"n{i}", f"decision {i} about service {i % 37} owned by team {i % 11} in region {i % 5}")
+
+        start = time.perf_counter()
+        index.query('decision 123 about service 13 owned by team 2 in region 4')
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+    def test_bridge_uses_local_index(self):
+        """find_similar_decisions works without AI and only returns given decisions"""
+        bridge = AIEnhancedMemoryBridge(enable_ai=False)
+        existing = [
+            {'id': 'x1', 'decision': 'Use PostgreSQL as the primary database for decision storage'},
+            {'id': 'x2', 'decision': 'Weekly summary emails go out every Monday morning'},
+        ]
+
+        with patch('memory_bridge.get_duplicate_index', return_value=self.index):
+            similar = bridge.find_similar_decisions('Use PostgreSQL as primary database for decision storage',
+                                                    existing)
+
+        self.assertEqual([match['id'] for match in similar], ['x1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
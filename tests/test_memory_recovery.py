@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent multi-source memory recovery and time-to-recover history
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from memory_recovery import MemoryRecoverySystem
+
+
+class TestRecoveryRacing(unittest.TestCase):
+    """Freshest snapshot wins, failed and slow sources do not add up"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.write_backup('github', '2025-08-07T22:34:00Z')
+        self.write_backup('supabase', '2025-08-07T22:34:00Z')
+        self.write_backup('local', '2025-08-07T22:34:00Z')
+        self.write_backup('notion', '2025-08-07T22:34:00Z')
+        self.recovery = MemoryRecoverySystem()
+
+    def tearDown(self):
+        for handler in self.recovery.logger.handlers:
+            handler.close()
+        os.chdir(self.original_cwd)
+        self.temp_dir.cleanup()
+
+    def write_backup(self, source: str, timestamp: str):
+        with open(f'backup_{source}.json', 'w') as f:
+            json.dump({'source': source.title(), 'data': f"{source} backup", 'timestamp': timestamp}, f)
+
+    def auto_entries(self):
+        return [entry for entry in self.recovery.get_restore_history() if entry['source'] == 'auto']
+
+    def test_priority_breaks_ties(self):
+        data = self.recovery.auto_restore(mock=True)
+        self.assertEqual(data['source'], 'Github')
+
+    def test_freshest_snapshot_wins(self):
+        self.write_backup('local', '2025-08-08T09:00:00Z')
+        os.remove('backup_github.json')
+
+        data = self.recovery.auto_restore(mock=True)
+
+        self.assertEqual(data['source'], 'Local')
+        entry = self.auto_entries()[-1]
+        self.assertEqual(entry['selected_source'], 'local')
+        self.assertIsNotNone(entry['time_to_recover_ms'])
+        self.assertEqual(set(entry['probes']), {'supabase', 'local', 'notion'})
+        failures = [e for e in self.recovery.get_restore_history() if e['source'] == 'github']
+        self.assertEqual(failures[-1]['status'], 'fail')
+
+    def test_full_snapshot_beats_newer_notion_pages(self):
+        self.write_backup('notion', '2025-08-09T12:00:00Z')
+
+        data = self.recovery.auto_restore(mock=True)
+
+        self.assertEqual(data['source'], 'Github')
+
+    def test_notion_is_last_resort(self):
+        for source in ('github', 'supabase', 'local'):
+            os.remove(f'backup_{source}.json')
+
+        data = self.recovery.auto_restore(mock=True)
+
+        self.assertEqual(data['source'], 'Notion')
+
+    def test_invalid_snapshot_falls_back_to_next_freshest(self):
+        with open('backup_github.json', 'w') as f:
+            json.dump({'timestamp': '2025-09-01T00:00:00Z', 'unexpected': True}, f)
+
+        data = self.recovery.auto_restore(mock=True)
+
+        self.assertEqual(data['source'], 'Supabase')
+
+    def test_slow_probe_is_abandoned(self):
+        self.recovery.probe_timeout = 0.3
+        probe = self.recovery._probe
+
+        def slow_github(source, mock, cancel):
+            if source == 'github':
+                cancel.wait(2)
+            return probe(source, mock, cancel)
+
+        start = time.perf_counter()
+        with patch.object(self.recovery, '_probe', side_effect=slow_github):
+            data = self.recovery.auto_restore(mock=True)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(data['source'], 'Supabase')
+        self.assertLess(elapsed, 1.5)
+        self.assertIn('timed out', self.recovery.get_restore_history()[0]['error'])
+
+    def test_all_sources_down(self):
+        for source in ('github', 'supabase', 'local', 'notion'):
+            os.remove(f'backup_{source}.json')
+
+        self.assertIsNone(self.recovery.auto_restore(mock=True))
+        entry = self.auto_entries()[-1]
+        self.assertEqual(entry['status'], 'fail')
+        self.assertIsNone(entry['time_to_recover_ms'])
+
+    def test_time_to_recover_summary(self):
+        self.recovery.auto_restore(mock=True)
+        self.recovery.auto_restore(mock=True)
+
+        summary = self.recovery.get_time_to_recover_summary()
+        self.assertEqual(summary['count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Tests for the staged MemorySync.sync_decisions pipeline against the local fake services
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.fake_services import FakeServices
+import memory_sync
+from memory_sync import MemorySync
+
+
+class _ShuffledBridge:
+    """AI bridge whose per-decision answers come back in random order"""
+
+    def __init__(self):
+        self.rng = random.Random(30)
+
+    def classify_decisions(self, pending):
+        raise RuntimeError("batch classification unavailable")
+
+    def classify_decision(self, decision_text):
+        time.sleep(self.rng.uniform(0, 0.02))
+        return {'type': 'technical', 'priority': 'high', 'confidence': 0.9}
+
+
+class TestStagedMemorySync(unittest.TestCase):
+    """Enrichment pool -> Notion writers -> one synced PATCH per batch"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+        self.fake = FakeServices().start()
+        self.env = patch.dict(os.environ, {**self.fake.environment(),
+                                           'MEMORY_SYNC_BATCH_SIZE': '4',
+                                           'MEMORY_SYNC_AI_WORKERS': '3',
+                                           'MEMORY_SYNC_NOTION_WORKERS': '2'})
+        self.env.start()
+
+        self.fake.tables.seed('decision_vault', [{
+            'decision': f"Decision {i}",
+            'date': f"2025-08-{i + 1:02d}",
+            'type': 'technical',
+            'synced': False,
+            'created_at': f"2025-08-{i + 1:02d}T10:00:00Z"
+        } for i in range(10)])
+
+        self.sync = MemorySync(dry_run=False)
+        self.sync.ai_bridge = _ShuffledBridge()
+
+        self.patch_spy = patch('memory_sync.requests.patch', wraps=requests.patch)
+        self.patch_calls = self.patch_spy.start()
+
+    def tearDown(self):
+        self.patch_spy.stop()
+        for handler in self.sync.logger.handlers:
+            handler.close()
+        self.env.stop()
+        self.fake.stop()
+        os.chdir(self.original_cwd)
+        self.temp_dir.cleanup()
+
+    def rows_by_decision(self):
+        return {row['decision']: row for row in self.fake.tables.rows('decision_vault')}
+
+    def notion_titles(self):
+        return sorted(page['properties']['Name']['title'][0]['text']['content']
+                      for page in self.fake.workspace.pages.values())
+
+    def test_every_decision_written_and_marked_in_bulk(self):
+        self.assertTrue(self.sync.sync_decisions())
+
+        self.assertEqual(self.sync.sync_stats, {'processed': 10, 'synced': 10, 'failed': 0, 'skipped': 0})
+        self.assertEqual(self.notion_titles(), sorted(f"Decision {i}" for i in range(10)))
+        self.assertTrue(all(row['synced'] for row in self.rows_by_decision().values()))
+
+        # One id=in.(...) PATCH per batch of 4, covering exactly that batch's ids
+        urls = [call.args[0] for call in self.patch_calls.call_args_list]
+        self.assertEqual(len(urls), 3)
+        self.assertTrue(all('id=in.(' in url for url in urls))
+        ids_by_decision = {decision: row['id'] for decision, row in self.rows_by_decision().items()}
+        newest_first = [ids_by_decision[f"Decision {i}"] for i in reversed(range(10))]
+        patched = [url.split('id=in.(', 1)[1].rstrip(')').split(',') for url in urls]
+        self.assertEqual([sorted(ids) for ids in patched],
+                         [sorted(newest_first[start:start + 4]) for start in range(0, 10, 4)])
+
+    def test_failed_notion_write_is_not_marked_synced(self):
+        create_page = self.sync.notion_client.create_page
+
+        def flaky_create_page(decision):
+            return None if decision['decision'] == 'Decision 6' else create_page(decision)
+
+        with patch.object(self.sync.notion_client, 'create_page', side_effect=flaky_create_page):
+            self.assertFalse(self.sync.sync_decisions())
+
+        self.assertEqual(self.sync.sync_stats['synced'], 9)
+        self.assertEqual(self.sync.sync_stats['failed'], 1)
+        rows = self.rows_by_decision()
+        self.assertFalse(rows['Decision 6']['synced'])
+        self.assertEqual([name for name, row in rows.items() if not row['synced']], ['Decision 6'])
+        self.assertNotIn('Decision 6', self.notion_titles())
+
+    def test_failed_mark_step_counts_written_batch_as_failed(self):
+        get_unsynced = self.sync.get_unsynced_decisions
+
+        def fetch_then_break_supabase(*args, **kwargs):
+            decisions = get_unsynced(*args, **kwargs)
+            self.fake.faults['supabase'].update(failure_rate=1.0)
+            return decisions
+
+        with patch.object(self.sync, 'get_unsynced_decisions', side_effect=fetch_then_break_supabase):
+            self.assertFalse(self.sync.sync_decisions())
+
+        # Pages were created, but no row is flagged, so the next run picks them up again
+        self.assertEqual(len(self.notion_titles()), 10)
+        self.assertEqual(self.sync.sync_stats['synced'], 0)
+        self.assertEqual(self.sync.sync_stats['failed'], 10)
+        self.assertFalse(any(row['synced'] for row in self.rows_by_decision().values()))
+        self.assertEqual(self.patch_calls.call_count, 3)
+
+
+
+class _FlakyModelBridge:
+    """AI bridge that falls back to keywords until the model comes back"""
+
+    def __init__(self):
+        self.model_up = False
+        self.calls = 0
+
+    def classify_decision(self, decision_text):
+        self.calls += 1
+        return {'type': 'technical', 'priority': 'high', 'ai_analysis': self.model_up}
+
+    def collect_classification_batch(self, batch_id):
+        return {f"key-{i}": {'type': 'technical', 'ai_analysis': i != 1} for i in range(4)}
+
+
+class TestClassificationCache(unittest.TestCase):
+    """Only model output is reused or persisted"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.env = patch.dict(os.environ, {'SUPABASE_URL': 'http://127.0.0.1:9', 'SUPABASE_KEY': 'test-key'})
+        self.env.start()
+        self.sync = MemorySync(dry_run=True)
+        self.sync.ai_bridge = _FlakyModelBridge()
+
+    def tearDown(self):
+        for handler in self.sync.logger.handlers:
+            handler.close()
+        self.env.stop()
+        os.chdir(self.original_cwd)
+        self.temp_dir.cleanup()
+
+    def test_fallback_classification_is_not_cached(self):
+        bridge = self.sync.ai_bridge
+        self.assertFalse(self.sync._classify_cached("Use Redis")['ai_analysis'])
+        bridge.model_up = True
+        self.assertTrue(self.sync._classify_cached("Use Redis")['ai_analysis'])
+        self.sync._classify_cached("Use Redis")
+        self.assertEqual(bridge.calls, 2)
+
+    def test_stored_classifications_skip_fallbacks_and_are_capped(self):
+        with patch.object(memory_sync, 'AI_CLASSIFICATIONS_MAX', 2):
+            self.assertTrue(self.sync.collect_ai_backfill('batch-1'))
+
+        with open(memory_sync.AI_CLASSIFICATIONS_FILE) as f:
+            self.assertEqual(list(json.load(f)), ['key-2', 'key-3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
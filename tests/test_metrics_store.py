@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the time-series metrics store
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import random
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.metrics_store import LatencyHistogram, MetricsStore, RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Tests for RingBuffer"""
+
+    def test_overwrites_oldest(self):
+        """Only the newest capacity rows are kept, oldest first"""
+        ring = RingBuffer(['value'], capacity=4)
+        for i in range(10):
+            ring.append(value=i)
+
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.column('value'), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(ring.column('value', last=2), [8.0, 9.0])
+        self.assertEqual(ring.mean('value'), 7.5)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Tests for LatencyHistogram"""
+
+    def test_percentiles_within_bucket_error(self):
+        """Percentiles stay within the 2^-5 relative bucket error"""
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(3, 1.5) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percent in (50, 95, 99):
+            exact = values[int(len(values) * percent / 100) - 1]
+            self.assertAlmostEqual(histogram.percentile(percent) / exact, 1.0, delta=1 / 32)
+
+    def test_merge_and_serialize(self):
+        """Merged histograms equal one histogram of all values"""
+        left, right, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 200):
+            (left if value % 2 else right).record(value)
+            combined.record(value)
+
+        left.merge(LatencyHistogram.from_json(right.to_json()))
+        self.assertEqual(left.summary(), combined.summary())
+
+
+class TestMetricsStore(unittest.TestCase):
+    """Tests for MetricsStore"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'metrics.sqlite3')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_rollups_survive_restart(self):
+        """Closed windows are persisted and queryable at coarser resolution"""
+        store = MetricsStore(self.path, ring_capacity=8, rollup_seconds=60)
+        now = time.time()
+        base = now - (now % 3600) - 7200
+        for minute in range(10):
+            for run in range(5):
+                store.record_task('backup', 100.0 * (minute + 1), success=run != 0,
+                                  timestamp=base + minute * 60 + run)
+        store.close()
+
+        reopened = MetricsStore(self.path, rollup_seconds=60)
+        per_minute = reopened.query_task_latency('backup')
+        self.assertEqual(len(per_minute), 10)
+        self.assertEqual(per_minute[3]['count'], 5)
+        self.assertEqual(per_minute[3]['failures'], 1)
+
+        hourly = reopened.query_task_latency('backup', resolution_seconds=3600)
+        self.assertEqual(len(hourly), 1)
+        self.assertEqual(hourly[0]['count'], 50)
+        self.assertEqual(hourly[0]['max_ms'], 1000.0)
+        self.assertEqual(reopened.persisted_tasks(), ['backup'])
+
+    def test_flush_does_not_lose_window(self):
+        """An early flush followed by more runs in the same window keeps every run"""
+        store = MetricsStore(self.path, rollup_seconds=3600)
+        store.record_task('sync', 10.0)
+        store.flush()
+        store.record_task('sync', 20.0)
+        store.flush()
+
+        self.assertEqual(sum(row['count'] for row in store.query_task_latency('sync')), 2)
+        self.assertEqual([run['duration_ms'] for run in store.recent_runs('sync')], [10.0, 20.0])
+        store.close()
+
+        restarted = MetricsStore(self.path, rollup_seconds=3600)
+        restarted.record_task('sync', 30.0)
+        restarted.flush()
+        self.assertEqual(sum(row['count'] for row in restarted.query_task_latency('sync')), 3)
+        restarted.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
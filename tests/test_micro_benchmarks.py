@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline micro-benchmark suite: case runner and run comparison
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from perf.micro_benchmarks import (
+    BenchmarkCase, SkipBenchmark, compare_results, run_benchmarks, run_case
+)
+
+
+def results(scale=1.0, **min_times):
+    return {
+        'scale': scale,
+        'benchmarks': {name: {'name': name, 'min_s': value, 'median_s': value}
+                       for name, value in min_times.items()}
+    }
+
+
+class TestCompareResults(unittest.TestCase):
+    """Regression thresholds between two runs"""
+
+    def test_classifies_changes(self):
+        reference = results(a=1.0, b=1.0, c=1.0)
+        current = results(a=1.3, b=0.7, c=1.1)
+
+        comparison = compare_results(current, reference, threshold=0.2, case_thresholds={})
+
+        self.assertEqual([e['name'] for e in comparison['regressions']], ['a'])
+        self.assertEqual([e['name'] for e in comparison['improvements']], ['b'])
+        self.assertEqual([e['name'] for e in comparison['unchanged']], ['c'])
+        self.assertAlmostEqual(comparison['regressions'][0]['change'], 0.3)
+
+    def test_case_threshold_override(self):
+        comparison = compare_results(results(a=1.3), results(a=1.0), threshold=0.2,
+                                     case_thresholds={'a': 0.5})
+        self.assertEqual(comparison['regressions'], [])
+        self.assertEqual(comparison['unchanged'][0]['threshold'], 0.5)
+
+    def test_missing_and_skipped_cases(self):
+        current = results(a=1.0, b=1.0)
+        current['benchmarks']['c'] = {'name': 'c', 'skipped': 'no database'}
+        reference = results(a=1.0, c=1.0)
+
+        comparison = compare_results(current, reference, case_thresholds={})
+
+        self.assertEqual(sorted(comparison['missing']), ['b', 'c'])
+
+    def test_scale_mismatch_is_not_compared(self):
+        comparison = compare_results(results(scale=0.1, a=5.0), results(a=1.0))
+        self.assertTrue(comparison['scale_mismatch'])
+        self.assertEqual(comparison['regressions'], [])
+
+
+class TestRunCase(unittest.TestCase):
+    """Case runner"""
+
+    def test_setup_runs_each_round_untimed(self):
+        setups = []
+
+        def setup(n):
+            setups.append(n)
+            return lambda: sum(range(n))
+
+        result = run_case(BenchmarkCase('sum', setup, 1000), rounds=3, warmup=1)
+
+        self.assertEqual(len(setups), 4)
+        self.assertEqual(result['rounds'], 3)
+        self.assertLessEqual(result['min_s'], result['median_s'])
+        self.assertGreater(result['ops_per_sec'], 0)
+
+    def test_skip_runs_teardown(self):
+        torn_down = []
+
+        def setup(n):
+            raise SkipBenchmark("stand-in unavailable")
+
+        result = run_case(BenchmarkCase('skip', setup, 1, teardown=lambda: torn_down.append(True)), rounds=2)
+
+        self.assertEqual(result, {'name': 'skip', 'skipped': 'stand-in unavailable'})
+        self.assertEqual(torn_down, [True])
+
+    def test_offline_cases_run_at_small_scale(self):
+        os.environ.pop('BENCHMARK_POSTGRES_URL', None)
+        run = run_benchmarks(rounds=1, scale=0.01, only=['sync_delta', 'detect_changes', 'vault'])
+
+        self.assertEqual(set(run['benchmarks']),
+                         {'sync.compute_sync_delta', 'autosync.detect_changes', 'vault.naive_search'})
+        self.assertIn('skipped', run['benchmarks']['vault.naive_search'])
+        self.assertGreater(run['benchmarks']['sync.compute_sync_delta']['ops_per_sec'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming, selective restore from zip archives
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import io
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.streaming_restore import StreamingArchiveRestore, iter_json_array
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Incremental JSON array parsing"""
+
+    def setUp(self):
+        self.records = [{'id': f"d{i}", 'decision': 'x' * (i % 40), 'score': i * 1.5, 'tags': [i, None, True]}
+                        for i in range(300)] + [12345, "text", None]
+
+    def test_plain_array_with_tiny_chunks(self):
+        for chunk_size in (1, 7, 4096):
+            stream = io.StringIO(json.dumps(self.records))
+            self.assertEqual(list(iter_json_array(stream, chunk_size=chunk_size)), self.records)
+
+    def test_array_under_object_key(self):
+        document = {'export_timestamp': '2025-08-07', 'meta': {'nested': [1, 2]}, 'decisions': self.records}
+        stream = io.StringIO(json.dumps(document, indent=2))
+        self.assertEqual(list(iter_json_array(stream, key='decisions', chunk_size=5)), self.records)
+
+    def test_empty_and_truncated_input(self):
+        self.assertEqual(list(iter_json_array(io.StringIO('[]'))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"id": 1}, {"id": 2}')))
+
+
+class TestStreamingArchiveRestore(unittest.TestCase):
+    """Selective, checksum-verified member restore"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive_path = os.path.join(self.temp_dir, 'backup.zip')
+        self.members = {
+            'state.json': b'{"state": 1}',
+            'indexes/a.idx': b'a' * 5000,
+            'indexes/b.idx': b'b' * 10,
+            'export/decision_vault_20250807.json': json.dumps({'decisions': [{'id': 'd1'}, {'id': 'd2'}]}).encode(),
+            'logs/run.log': b'log line'
+        }
+        with zipfile.ZipFile(self.archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, data in self.members.items():
+                archive.writestr(name, data)
+        self.checksums = {name: sha256(data) for name, data in self.members.items()}
+        self.target = Path(self.temp_dir) / 'target'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_selective_restore_by_glob(self):
+        with StreamingArchiveRestore(self.archive_path, self.checksums) as archive:
+            stats = archive.restore(str(self.target), patterns=['indexes/', 'state.json'])
+
+        self.assertEqual(stats['restored'], 3)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual((self.target / 'indexes' / 'a.idx').read_bytes(), self.members['indexes/a.idx'])
+        self.assertFalse((self.target / 'logs').exists())
+        self.assertEqual(list(self.target.rglob('*.restore_tmp')), [])
+
+    def test_checksum_mismatch_keeps_existing_file(self):
+        self.target.mkdir()
+        (self.target / 'state.json').write_text('current')
+        checksums = dict(self.checksums, **{'state.json': sha256(b'something else')})
+
+        with StreamingArchiveRestore(self.archive_path, checksums) as archive:
+            stats = archive.restore(str(self.target), patterns=['state.json'])
+
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual((self.target / 'state.json').read_text(), 'current')
+
+    def test_verify_reports_missing_members(self):
+        checksums = dict(self.checksums, **{'memory/missing.json': sha256(b'')})
+        with StreamingArchiveRestore(self.archive_path, checksums) as archive:
+            result = archive.verify(list(checksums))
+
+        self.assertEqual(result['verified'], len(self.members))
+        self.assertEqual(result['missing'], ['memory/missing.json'])
+        self.assertEqual(result['failed'], 1)
+
+    def test_rejects_unsafe_member_paths(self):
+        with zipfile.ZipFile(self.archive_path, 'a') as archive:
+            archive.writestr('../escape.txt', b'nope')
+
+        with StreamingArchiveRestore(self.archive_path) as archive:
+            stats = archive.restore(str(self.target), patterns=['../*'])
+
+        self.assertEqual(stats['failed'], 1)
+        self.assertFalse((Path(self.temp_dir) / 'escape.txt').exists())
+
+    def test_github_restore_streams_from_archive(self):
+        from github_restore import GitHubRestoreSystem
+
+        with open(self.archive_path + '.checksums', 'w') as f:
+            json.dump(self.checksums, f)
+
+        restore_system = GitHubRestoreSystem()
+        restore_system.alert_manager = None
+
+        self.assertTrue(restore_system.verify_backup_checksums(self.archive_path))
+        self.assertEqual(restore_system.load_backup_data(self.archive_path),
+                         {'decision_vault': [{'id': 'd1'}, {'id': 'd2'}]})
+
+        self.assertTrue(restore_system.restore_files(self.archive_path, str(self.target)))
+        self.assertEqual(restore_system.restore_results['files_restored'], 4)
+        self.assertFalse((self.target / 'logs' / 'run.log').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
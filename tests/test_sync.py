@@ -8,15 +8,20 @@ Version: 1.0.0
 """
 
 import sys
+import tempfile
+import threading
 import unittest
 from pathlib import Path
+from unittest.mock import patch, MagicMock
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sync.config import get_config
-from sync.diff import DiffEngine
+from sync.diff import DiffEngine, StreamingDiffEngine, SyncOp
 from sync.run_sync import BidirectionalSync
+from sync.pipeline import PipelinedSync
+from sync.realtime_sync import RealtimeSyncWorker
 
 
 class TestSyncIntegration(unittest.TestCase):
@@ -84,6 +89,23 @@ class TestSyncIntegration(unittest.TestCase):
         
         self.assertEqual(checksum1, checksum3, "Case should not affect checksum")
     
+    def test_batch_checksums_match_per_record(self):
+        """Test compute_checksums is identical to per-record compute_checksum"""
+        
+        records = [
+            self.sample_supabase_record,
+            self.sample_notion_record,
+            {'decision': '  Mixed\tCASE \n text\u00a0here ', 'type': ' ops ', 'date': '2025-08-07T23:59:59Z'},
+            {'decision': '\x1cseparators\u2003inside\x1f', 'type': None, 'date': None},
+            {'decision': None, 'type': 0, 'date': ''},
+            {}
+        ]
+        
+        expected = [self.diff_engine.compute_checksum(record) for record in records]
+        
+        self.assertEqual(self.diff_engine.compute_checksums(records), expected)
+        self.assertEqual(self.diff_engine.compute_checksums([]), [])
+    
     def test_record_validation(self):
         """Test record validation logic"""
         
@@ -205,6 +227,381 @@ class TestSyncIntegration(unittest.TestCase):
                 raise
 
 
+def _mixed_dataset():
+    """Supabase and Notion records covering every match strategy"""
+    supabase_records = [
+        # Linked by page id, Supabase newer -> update Notion
+        {'id': 'sb-1', 'decision': 'Adopt Postgres', 'type': 'Architecture', 'date': '2025-08-01',
+         'notion_page_id': 'np-1', 'updated_at': '2025-08-05T10:00:00Z'},
+        # Linked by page id, Notion newer -> update Supabase
+        {'id': 'sb-2', 'decision': 'Weekly ops review', 'type': 'Ops', 'date': '2025-08-02',
+         'notion_page_id': 'np-2', 'updated_at': '2025-08-01T10:00:00Z'},
+        # Linked and identical -> no change
+        {'id': 'sb-3', 'decision': 'Dark mode', 'type': 'UX', 'date': '2025-08-03',
+         'notion_page_id': 'np-3', 'updated_at': '2025-08-01T10:00:00Z'},
+        # Unlinked but same content -> link by checksum
+        {'id': 'sb-4', 'decision': 'Rotate keys monthly', 'type': 'Policy', 'date': '2025-08-04'},
+        # Only in Supabase -> create in Notion
+        {'id': 'sb-5', 'decision': 'Add CDN', 'type': 'Architecture', 'date': '2025-08-05'},
+    ]
+    notion_records = [
+        {'notion_page_id': 'np-1', 'decision': 'Adopt MySQL', 'type': 'Architecture', 'date': '2025-08-01',
+         'updated_at': '2025-08-02T10:00:00Z'},
+        {'notion_page_id': 'np-2', 'decision': 'Daily ops review', 'type': 'Ops', 'date': '2025-08-02',
+         'updated_at': '2025-08-06T10:00:00Z'},
+        {'notion_page_id': 'np-3', 'decision': 'Dark mode', 'type': 'UX', 'date': '2025-08-03',
+         'updated_at': '2025-08-01T10:00:00Z'},
+        {'notion_page_id': 'np-4', 'decision': 'rotate  keys monthly', 'type': 'Policy', 'date': '2025-08-04'},
+        # Only in Notion -> create in Supabase
+        {'notion_page_id': 'np-6', 'decision': 'Hire SRE', 'type': 'Ops', 'date': '2025-08-06'},
+    ]
+    return supabase_records, notion_records
+
+
+class TestStreamingDiff(unittest.TestCase):
+    """Streaming diff must produce the same operations as compute_sync_delta"""
+    
+    def setUp(self):
+        """Set up a mixed dataset covering every match strategy"""
+        self.supabase_records, self.notion_records = _mixed_dataset()
+    
+    def _fetchers(self, fetch_log):
+        sb_by_id = {r['id']: r for r in self.supabase_records}
+        notion_by_id = {r['notion_page_id']: r for r in self.notion_records}
+        
+        def fetch_supabase(ids):
+            fetch_log.extend(ids)
+            return [dict(sb_by_id[i]) for i in ids]
+        
+        def fetch_notion(ids):
+            fetch_log.extend(ids)
+            return [dict(notion_by_id[i]) for i in ids]
+        
+        return fetch_supabase, fetch_notion
+    
+    @staticmethod
+    def _summarize(ops):
+        return sorted(
+            (op.action,
+             (op.current or {}).get('id') or (op.current or {}).get('notion_page_id'),
+             op.new.get('id') or op.new.get('notion_page_id'),
+             op.new.get('notion_page_id'))
+            for op in ops
+        )
+    
+    def test_streaming_matches_batch_delta(self):
+        """Test streaming and batch engines agree on every operation"""
+        
+        batch_delta = DiffEngine().compute_sync_delta(
+            [dict(r) for r in self.supabase_records],
+            [dict(r) for r in self.notion_records]
+        )
+        
+        fetch_log = []
+        fetch_supabase, fetch_notion = self._fetchers(fetch_log)
+        ops = list(StreamingDiffEngine(batch_size=2).iter_sync_delta(
+            iter(self.supabase_records), iter(self.notion_records), fetch_supabase, fetch_notion
+        ))
+        
+        self.assertEqual(self._summarize(ops), self._summarize(batch_delta.iter_operations()))
+        self.assertEqual(len(ops), batch_delta.total_changes)
+    
+    def test_streaming_fetches_only_differing_records(self):
+        """Test unchanged records are never fetched in full"""
+        
+        fetch_log = []
+        fetch_supabase, fetch_notion = self._fetchers(fetch_log)
+        ops = StreamingDiffEngine().iter_sync_delta(
+            iter(self.supabase_records), iter(self.notion_records), fetch_supabase, fetch_notion
+        )
+        
+        # Nothing is fetched until the consumer pulls
+        self.assertEqual(fetch_log, [])
+        list(ops)
+        
+        self.assertNotIn('sb-3', fetch_log)
+        self.assertNotIn('np-3', fetch_log)
+        # Checksum links only need the Supabase side
+        self.assertNotIn('np-4', fetch_log)
+    
+    def test_streaming_reuses_streamed_notion_records(self):
+        """Test differing Notion pages come from the stream, not per-page retrieval"""
+        
+        notion_fetches = []
+        fetch_supabase, _ = self._fetchers([])
+        ops = list(StreamingDiffEngine(batch_size=2).iter_sync_delta(
+            iter(self.supabase_records), iter(self.notion_records), fetch_supabase, notion_fetches.extend
+        ))
+        
+        self.assertEqual(notion_fetches, [])
+        notion_payloads = {op.new['notion_page_id'] for op in ops
+                           if op.action in (SyncOp.CREATE_IN_SUPABASE, SyncOp.UPDATE_IN_SUPABASE)}
+        self.assertIn('np-2', notion_payloads)
+        self.assertIn('np-6', notion_payloads)
+    
+    def test_linked_record_carries_page_id(self):
+        """Test checksum fallback links the Supabase record to its Notion page"""
+        
+        fetch_supabase, fetch_notion = self._fetchers([])
+        ops = StreamingDiffEngine().iter_sync_delta(
+            iter(self.supabase_records), iter(self.notion_records), fetch_supabase, fetch_notion
+        )
+        links = [op for op in ops if op.action == SyncOp.UPDATE_IN_SUPABASE and op.current['id'] == 'sb-4']
+        
+        self.assertEqual(len(links), 1)
+        self.assertEqual(links[0].new['notion_page_id'], 'np-4')
+        self.assertTrue(links[0].new['notion_synced'])
+
+
+class _FakeService:
+    """In-memory stand-in for the Supabase and Notion sync clients"""
+    
+    def __init__(self, records, batch_size=2):
+        self.records = records
+        self.batch_size = batch_size
+        self.calls = []
+    
+    def test_connection(self):
+        return True
+    
+    def iter_record_batches(self):
+        for start in range(0, len(self.records), self.batch_size):
+            yield [dict(r) for r in self.records[start:start + self.batch_size]]
+    
+    def upsert_record(self, record, dry_run=False):
+        self.calls.append(('upsert', record.get('id') or record.get('notion_page_id')))
+        return record
+    
+    def mark_synced(self, record_id, notion_page_id, dry_run=False):
+        self.calls.append(('mark_synced', record_id))
+        return True
+    
+    def create_page(self, record, dry_run=False):
+        self.calls.append(('create_page', record.get('id')))
+        return {'id': f"np-new-{record.get('id')}"}
+    
+    def update_page(self, page_id, record, dry_run=False):
+        self.calls.append(('update_page', page_id))
+        return {'id': page_id}
+
+
+class _FailingFetchService(_FakeService):
+    """Fake service whose fetch fails after the first batch"""
+    
+    def iter_record_batches(self):
+        yield [dict(r) for r in self.records[:self.batch_size]]
+        raise ConnectionError("fetch interrupted")
+
+
+class TestPipelinedSync(unittest.TestCase):
+    """Pipelined runner must apply the same changes as the sequential delta"""
+    
+    def test_pipelined_applies_batch_delta(self):
+        """Test pipelined sync applies every operation of compute_sync_delta"""
+        
+        supabase_records, notion_records = _mixed_dataset()
+        supabase = _FakeService(supabase_records)
+        notion = _FakeService(notion_records)
+        
+        expected = DiffEngine().compute_sync_delta(
+            [dict(r) for r in supabase_records],
+            [dict(r) for r in notion_records]
+        )
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('Config', (), {'health_file': str(Path(tmp) / 'health.json')})()
+            with patch('sync.run_sync.get_config', return_value=config), \
+                 patch('sync.run_sync.SupabaseClient', return_value=supabase), \
+                 patch('sync.run_sync.NotionClient', return_value=notion):
+                stats = PipelinedSync().run_sync()
+        
+        self.assertEqual(stats['supabase_count'], len(supabase_records))
+        self.assertEqual(stats['notion_count'], len(notion_records))
+        self.assertEqual(stats['created'] + stats['updated'], expected.total_changes)
+        
+        # Checksum backfill writes plus one write per planned operation
+        backfills = len(supabase_records)
+        self.assertEqual(len([c for c in supabase.calls if c[0] == 'upsert']),
+                         backfills + len(expected.create_in_supabase) + len(expected.update_in_supabase))
+        self.assertEqual(sorted(c[1] for c in notion.calls if c[0] == 'update_page'),
+                         sorted(current['notion_page_id'] for current, _ in expected.update_in_notion))
+        self.assertEqual(sorted(c[1] for c in notion.calls if c[0] == 'create_page'),
+                         sorted(r['id'] for r in expected.create_in_notion))
+    
+    def test_pipelined_diff_failure_does_not_hang(self):
+        """Test a diff stage error is raised while fetchers are blocked on a full queue"""
+        
+        supabase = _FakeService([
+            {'id': f"sb-{i}", 'decision': f"Decision {i}", 'type': 'Ops', 'date': '2025-08-01',
+             'notion_page_id': f"np-{i}", 'updated_at': '2025-08-01T10:00:00Z'} for i in range(100)
+        ], batch_size=1)
+        notion = _FakeService([
+            {'notion_page_id': f"np-{i}", 'decision': f"Changed {i}", 'type': 'Ops', 'date': '2025-08-01',
+             'updated_at': '2025-08-02T10:00:00Z'} for i in range(100)
+        ], batch_size=1)
+        outcome = {}
+        
+        def run():
+            try:
+                PipelinedSync().run_sync()
+            except Exception as e:
+                outcome['error'] = e
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('Config', (), {'health_file': str(Path(tmp) / 'health.json')})()
+            with patch('sync.run_sync.get_config', return_value=config), \
+                 patch('sync.run_sync.SupabaseClient', return_value=supabase), \
+                 patch('sync.run_sync.NotionClient', return_value=notion), \
+                 patch.object(PipelinedSync, 'FETCH_PUT_TIMEOUT', 0.05), \
+                 patch.object(DiffEngine, '_resolve_conflict', side_effect=RuntimeError("conflict check failed")):
+                runner = threading.Thread(target=run, daemon=True)
+                runner.start()
+                runner.join(timeout=10)
+        
+        self.assertFalse(runner.is_alive(), "pipelined sync hung after a diff stage error")
+        self.assertIn('conflict check failed', str(outcome.get('error')))
+    
+    def test_failed_fetch_issues_no_creates(self):
+        """Test a partial fetch on either side never creates records from the leftovers"""
+        
+        supabase_records = [
+            {'id': f"sb-{i}", 'decision': f"Decision {i}", 'type': 'Ops', 'date': '2025-08-01',
+             'notion_page_id': f"np-{i}", 'checksum': f"c-{i}"} for i in range(10)
+        ]
+        notion_records = [
+            {'notion_page_id': f"np-{i}", 'decision': f"Decision {i}", 'type': 'Ops', 'date': '2025-08-01',
+             'checksum': f"c-{i}"} for i in range(10)
+        ]
+        
+        for failing_side in ('supabase', 'notion'):
+            with self.subTest(failing_side=failing_side):
+                supabase = (_FailingFetchService if failing_side == 'supabase' else _FakeService)(supabase_records)
+                notion = (_FailingFetchService if failing_side == 'notion' else _FakeService)(notion_records)
+                
+                with tempfile.TemporaryDirectory() as tmp:
+                    config = type('Config', (), {'health_file': str(Path(tmp) / 'health.json')})()
+                    with patch('sync.run_sync.get_config', return_value=config), \
+                         patch('sync.run_sync.SupabaseClient', return_value=supabase), \
+                         patch('sync.run_sync.NotionClient', return_value=notion):
+                        with self.assertRaises(ConnectionError):
+                            PipelinedSync().run_sync()
+                
+                self.assertEqual([c for c in notion.calls if c[0] == 'create_page'], [])
+                self.assertEqual([c for c in supabase.calls if c[0] == 'upsert'], [])
+
+
+class TestRealtimeSync(unittest.TestCase):
+    """Change log entries are coalesced and pushed once per record"""
+    
+    def test_push_changes_coalesces_burst(self):
+        """Test a burst of changes results in one push per record"""
+        
+        supabase_records, _ = _mixed_dataset()
+        by_id = {r['id']: dict(r) for r in supabase_records}
+        
+        runner = MagicMock()
+        runner.diff_engine = DiffEngine()
+        runner.supabase.fetch_records_by_ids.side_effect = lambda ids: [by_id[i] for i in ids if i in by_id]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('Config', (), {'realtime_cursor_file': str(Path(tmp) / 'cursor.json'),
+                                         'batch_size': 100})()
+            with patch('sync.realtime_sync.get_config', return_value=config), \
+                 patch('sync.realtime_sync.BidirectionalSync', return_value=runner):
+                worker = RealtimeSyncWorker()
+            
+            stats = worker.push_changes([
+                {'seq': 1, 'record_id': 'sb-1', 'op': 'INSERT'},
+                {'seq': 2, 'record_id': 'sb-1', 'op': 'UPDATE'},
+                {'seq': 3, 'record_id': 'sb-5', 'op': 'UPDATE'},
+                {'seq': 4, 'record_id': 'sb-gone', 'op': 'DELETE'},
+            ])
+        
+        runner.supabase.fetch_records_by_ids.assert_called_once_with(['sb-1', 'sb-5'])
+        applied = [call.args[0] for call in runner._apply_operation.call_args_list]
+        self.assertEqual([(op.action, op.new['id']) for op in applied],
+                         [(SyncOp.UPDATE_IN_NOTION, 'sb-1'), (SyncOp.CREATE_IN_NOTION, 'sb-5')])
+        self.assertEqual(stats['changes'], 4)
+        self.assertEqual(stats['skipped'], 1)
+        
+        # Stale checksums are written back without touching notion_page_id
+        written = runner.supabase.bulk_upsert_records.call_args.args[0]
+        self.assertTrue(all('notion_page_id' not in row for row in written))
+    
+    def test_processed_changes_are_pruned(self):
+        """Test the change log is pruned up to the cursor after a successful push"""
+        
+        changes = [{'seq': seq, 'record_id': 'sb-5', 'op': 'UPDATE'} for seq in (11, 12, 13)]
+        runner = MagicMock()
+        runner.diff_engine = DiffEngine()
+        runner.supabase.fetch_changes.side_effect = lambda after, limit: [c for c in changes if c['seq'] > after]
+        runner.supabase.fetch_records_by_ids.return_value = []
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('Config', (), {'realtime_cursor_file': str(Path(tmp) / 'cursor.json'),
+                                         'batch_size': 100})()
+            with patch('sync.realtime_sync.get_config', return_value=config), \
+                 patch('sync.realtime_sync.BidirectionalSync', return_value=runner):
+                worker = RealtimeSyncWorker()
+            worker._save_cursor(10)
+            
+            worker.process_pending_changes()
+            runner.supabase.prune_changes.assert_called_once_with(13)
+            
+            # Nothing new: no extra delete request
+            worker.process_pending_changes()
+            runner.supabase.prune_changes.assert_called_once_with(13)
+            
+            # A failed push keeps the entries for the next attempt
+            changes.append({'seq': 14, 'record_id': 'sb-5', 'op': 'UPDATE'})
+            runner.supabase.fetch_records_by_ids.side_effect = RuntimeError("Supabase down")
+            with self.assertRaises(RuntimeError):
+                worker.process_pending_changes()
+            runner.supabase.prune_changes.assert_called_once_with(13)
+            self.assertEqual(worker.cursor, 13)
+    
+    def test_failed_notion_push_keeps_cursor_and_entries(self):
+        """Test a Notion update failure stops the cursor before the failed entry"""
+        
+        supabase_records, _ = _mixed_dataset()
+        by_id = {r['id']: dict(r) for r in supabase_records}
+        changes = [{'seq': 11, 'record_id': 'sb-5', 'op': 'UPDATE'},
+                   {'seq': 12, 'record_id': 'sb-1', 'op': 'UPDATE'},
+                   {'seq': 13, 'record_id': 'sb-5', 'op': 'UPDATE'}]
+        
+        runner = MagicMock()
+        runner.dry_run = False
+        runner.diff_engine = DiffEngine()
+        runner._apply_operation.side_effect = lambda op, stats: BidirectionalSync._apply_operation(runner, op, stats)
+        runner.supabase.fetch_changes.side_effect = lambda after, limit: [c for c in changes if c['seq'] > after]
+        runner.supabase.fetch_records_by_ids.side_effect = lambda ids: [dict(by_id[i]) for i in ids]
+        runner.notion.create_page.return_value = {'id': 'np-new'}
+        runner.notion.update_page.side_effect = RuntimeError("Notion unavailable")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('Config', (), {'realtime_cursor_file': str(Path(tmp) / 'cursor.json'),
+                                         'batch_size': 100})()
+            with patch('sync.realtime_sync.get_config', return_value=config), \
+                 patch('sync.realtime_sync.BidirectionalSync', return_value=runner):
+                worker = RealtimeSyncWorker()
+            worker._save_cursor(10)
+            
+            totals = worker.process_pending_changes()
+            self.assertEqual((totals['pushed'], totals['failed']), (1, 1))
+            self.assertEqual(worker.cursor, 11)
+            runner.supabase.prune_changes.assert_called_once_with(11)
+            
+            # Only the record that reached Notion gets its checksum written back
+            written = runner.supabase.bulk_upsert_records.call_args.args[0]
+            self.assertEqual([row['id'] for row in written], ['sb-5'])
+            
+            # Once Notion recovers the kept entries are pushed and pruned
+            runner.notion.update_page.side_effect = None
+            worker.process_pending_changes()
+            self.assertEqual(worker.cursor, 13)
+            runner.supabase.prune_changes.assert_called_with(13)
+
+
 def run_integration_test():
     """Run integration test manually"""
     
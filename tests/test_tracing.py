@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the tracing layer
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import tracing
+from utils.tracing import Tracer
+
+
+class TestTracer(unittest.TestCase):
+    """Tests for Tracer"""
+
+    def setUp(self):
+        self.received = []
+        self.tracer = Tracer(sink=self.received.extend, flush_interval=60)
+
+    def tearDown(self):
+        self.tracer.shutdown()
+
+    def test_nested_spans_and_errors(self):
+        """Spans record parent, depth and the exception type"""
+        @self.tracer.trace("inner")
+        def inner():
+            raise ValueError("boom")
+
+        @self.tracer.trace()
+        def outer():
+            with self.tracer.span("block"):
+                pass
+            try:
+                inner()
+            except ValueError:
+                pass
+
+        outer()
+        self.tracer.flush()
+
+        spans = {span.name: span for span in self.received}
+        self.assertEqual(set(spans), {'inner', 'block', 'TestTracer.test_nested_spans_and_errors.<locals>.outer'})
+        self.assertEqual((spans['block'].parent, spans['block'].depth), (outer.__qualname__, 1))
+        self.assertEqual(spans['inner'].error, 'ValueError')
+        self.assertFalse(spans['inner'].success)
+        self.assertTrue(spans[outer.__qualname__].success)
+        self.assertGreaterEqual(spans[outer.__qualname__].duration_ns, spans['inner'].duration_ns)
+        self.assertIsNone(spans['block'].memory_delta_bytes)
+
+    def test_threads_and_async_tasks(self):
+        """Per-thread buffers are all drained; asyncio tasks keep separate span stacks"""
+        @self.tracer.trace("work")
+        def work():
+            pass
+
+        threads = [threading.Thread(target=lambda: [work() for _ in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        @self.tracer.trace("child")
+        async def child():
+            await asyncio.sleep(0)
+
+        @self.tracer.trace("request")
+        async def request():
+            await asyncio.gather(child(), child())
+
+        async def main():
+            await asyncio.gather(request(), request())
+
+        asyncio.run(main())
+        self.tracer.flush()
+
+        self.assertEqual(sum(1 for span in self.received if span.name == 'work'), 400)
+        children = [span for span in self.received if span.name == 'child']
+        self.assertEqual(len(children), 4)
+        self.assertTrue(all(span.parent == 'request' and span.depth == 1 for span in children))
+
+    def test_memory_sampling_and_disable(self):
+        """Sampled spans carry a memory delta; a disabled tracer records nothing"""
+        sampled = Tracer(sink=self.received.extend, flush_interval=60, memory_sample_rate=1.0)
+        with sampled.span("alloc"):
+            data = [0] * 100000
+        sampled.shutdown()
+        self.assertIsNotNone(self.received[0].memory_delta_bytes)
+        del data
+
+        self.tracer.enabled = False
+        with self.tracer.span("ignored"):
+            pass
+        self.tracer.flush()
+        self.assertEqual([span.name for span in self.received], ['alloc'])
+
+    def test_sinks_fan_out_and_close_on_removal(self):
+        """Added sinks do not displace existing ones; removal delivers pending spans and closes"""
+        extra = []
+        closed = []
+
+        def extra_sink(spans):
+            extra.extend(spans)
+        extra_sink.close = lambda: closed.append(True)
+
+        self.tracer.add_sink(extra_sink)
+        with self.tracer.span("shared"):
+            pass
+        self.tracer.remove_sink(extra_sink)
+        self.assertEqual(closed, [True])
+
+        with self.tracer.span("after"):
+            pass
+        self.tracer.flush()
+        self.assertEqual([span.name for span in extra], ['shared'])
+        self.assertEqual([span.name for span in self.received], ['shared', 'after'])
+
+
+class TestProcessTracer(unittest.TestCase):
+    """Tests for get_tracer's default sink"""
+
+    def test_no_metrics_store_unless_configured(self):
+        """Spans only reach a metrics store when METRICS_STORE_PATH is set"""
+        env = {key: value for key, value in os.environ.items() if key != 'METRICS_STORE_PATH'}
+        with patch.dict(os.environ, env, clear=True), patch.object(tracing, '_tracer', None):
+            tracer = tracing.get_tracer()
+            self.assertEqual(tracer.sinks, [])
+            tracer.shutdown()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'metrics.sqlite3')
+            with patch.dict(os.environ, {'METRICS_STORE_PATH': path}), patch.object(tracing, '_tracer', None):
+                tracer = tracing.get_tracer()
+                with tracer.span("stored"):
+                    pass
+                tracer.shutdown()
+            self.assertTrue(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,816 @@
+#!/usr/bin/env python3
+"""
+Angles AI Universe™ Fake Supabase/Notion Services
+In-process stand-in for the PostgREST subset and Notion endpoints the backend uses
+
+Serves both APIs from one local HTTP server so sync, memory sync, restore
+and benchmarks can run without network access:
+
+- Supabase: GET/POST/PATCH/DELETE /rest/v1/{table} with eq, neq, gt, gte,
+  lt, lte, in, is, like and ilike filters, select, order, limit/offset (or
+  a Range header), Prefer count=exact and resolution=merge-duplicates or
+  ignore-duplicates, plus POST /rest/v1/rpc/drift_bucket_digests
+- Notion: /v1/databases/{id}, /v1/databases/{id}/query (cursor paging and
+  property filters), /v1/pages, /v1/pages/{id} and /v1/users/me
+
+Each service gets its own fault profile: added latency with jitter, a
+token-bucket rate limit answered with 429 + Retry-After, and random
+failures. Control endpoints live under /__fake/ (stats, reset, faults).
+
+Author: Angles AI Universe™ Backend Team
+Version: 1.0.0
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlparse
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.drift_engine import DIGEST_FUNCTION, TableSummary, row_digest
+from utils.metrics_store import LatencyHistogram
+
+SERVICE_SUPABASE = "supabase"
+SERVICE_NOTION = "notion"
+
+NOTION_MAX_PAGE_SIZE = 100
+FILTER_OPERATORS = {'eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'in', 'is', 'like', 'ilike'}
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+# Route keys used in stats: collapse ids so all page reads share one entry
+_ROUTE_IDS = re.compile(r'/(?:pages|databases)/[^/]+')
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FaultProfile:
+    """
+    Latency, rate limit and failure injection for one service
+
+    ``rate_limit`` is requests per second (0 disables it) with bursts of up
+    to ``burst`` requests. ``failure_rate`` is the probability that a request
+    fails with ``failure_status`` after its latency has been served.
+    """
+
+    FIELDS = ('latency_ms', 'jitter_ms', 'rate_limit', 'burst', 'failure_rate', 'failure_status')
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, rate_limit: float = 0.0,
+                 burst: int = 10, failure_rate: float = 0.0, failure_status: int = 503, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+
+    def update(self, **settings):
+        with self._lock:
+            for field in self.FIELDS:
+                if field in settings:
+                    setattr(self, field, type(getattr(self, field))(settings[field]))
+            self._tokens = float(self.burst)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def admit(self) -> Optional[float]:
+        """Take a rate-limit token; returns the Retry-After seconds when throttled"""
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate_limit
+
+    def delay(self) -> float:
+        """Seconds of injected latency for one request"""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000.0
+
+    def should_fail(self) -> bool:
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+
+class ServiceStats:
+    """Per-route request counts, status codes and latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.routes: Dict[str, Dict[str, Any]] = {}
+            self.started = time.monotonic()
+
+    def record(self, route: str, status: int, elapsed_ms: float):
+        with self._lock:
+            entry = self.routes.setdefault(route, {'requests': 0, 'statuses': {}, 'histogram': LatencyHistogram()})
+            entry['requests'] += 1
+            entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+            entry['histogram'].record(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            routes = {
+                route: {'requests': entry['requests'], 'statuses': dict(entry['statuses']),
+                        'latency': entry['histogram'].summary()}
+                for route, entry in self.routes.items()
+            }
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'requests': total,
+            'requests_per_second': round(total / elapsed, 2),
+            'throttled': sum(route['statuses'].get('429', 0) for route in routes.values()),
+            'routes': routes
+        }
+
+
+# PostgREST subset
+
+def _text(value: Any) -> str:
+    """Row value as PostgREST renders it in filters"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def _compare(left: Any, right: str) -> Optional[int]:
+    if left is None:
+        return None
+    try:
+        a, b = float(left), float(right)
+    except (TypeError, ValueError):
+        a, b = _text(left), right
+    return (a > b) - (a < b)
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 0, value
+    return 1, _text(value)
+
+
+def _like(value: Any, pattern: str, ignore_case: bool) -> bool:
+    regex = '^' + '.*'.join(re.escape(part) for part in pattern.replace('*', '%').split('%')) + '$'
+    return value is not None and re.match(regex, _text(value), re.IGNORECASE if ignore_case else 0) is not None
+
+
+def _parse_in(values: str) -> List[str]:
+    inner = values.strip()
+    if inner.startswith('(') and inner.endswith(')'):
+        inner = inner[1:-1]
+    return [item.strip().strip('"') for item in inner.split(',') if item.strip()]
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    negate = expression.startswith('not.')
+    if negate:
+        expression = expression[4:]
+    operator, _, value = expression.partition('.')
+    current = row.get(column)
+
+    if operator == 'eq':
+        result = _text(current) == value
+    elif operator == 'neq':
+        result = _text(current) != value
+    elif operator in ('gt', 'gte', 'lt', 'lte'):
+        order = _compare(current, value)
+        result = order is not None and {'gt': order > 0, 'gte': order >= 0,
+                                        'lt': order < 0, 'lte': order <= 0}[operator]
+    elif operator == 'in':
+        result = _text(current) in _parse_in(value)
+    elif operator == 'is':
+        result = _text(current) == value.lower()
+    elif operator in ('like', 'ilike'):
+        result = _like(current, value, operator == 'ilike')
+    else:
+        raise ValueError(f"Unsupported filter operator: {operator}")
+
+    return result != negate
+
+
+class PostgrestTables:
+    """In-memory tables answering the PostgREST subset"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            target = self.tables.setdefault(table, [])
+            for row in rows:
+                target.append(self._with_defaults(dict(row)))
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self.tables.get(table, [])]
+
+    def clear(self):
+        with self._lock:
+            self.tables.clear()
+
+    @staticmethod
+    def _with_defaults(row: Dict[str, Any]) -> Dict[str, Any]:
+        row.setdefault('id', str(uuid.uuid4()))
+        row.setdefault('created_at', _now())
+        return row
+
+    @staticmethod
+    def _filters(params: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        def is_filter(expression: str) -> bool:
+            if expression.startswith('not.'):
+                expression = expression[4:]
+            return expression.split('.', 1)[0] in FILTER_OPERATORS
+        return [(key, value) for key, value in params if key not in RESERVED_PARAMS and is_filter(value)]
+
+    def _select(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        filters = self._filters(params)
+        return [row for row in self.tables.get(table, [])
+                if all(_matches(row, column, expression) for column, expression in filters)]
+
+    def get(self, table: str, params: List[Tuple[str, str]],
+            range_header: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Rows for a GET plus the total match count (for Content-Range)"""
+        query = dict(params)
+        with self._lock:
+            rows = list(self._select(table, params))
+
+        for term in reversed([term for term in query.get('order', '').split(',') if term]):
+            parts = term.split('.')
+            column, descending = parts[0], 'desc' in parts[1:]
+            nulls_first = 'nullsfirst' in parts[1:] or (descending and 'nullslast' not in parts[1:])
+            present = sorted((row for row in rows if row.get(column) is not None),
+                             key=lambda row: _sort_key(row[column]), reverse=descending)
+            missing = [row for row in rows if row.get(column) is None]
+            rows = missing + present if nulls_first else present + missing
+
+        total = len(rows)
+        offset = int(query.get('offset', 0))
+        limit = int(query['limit']) if 'limit' in query else None
+        if range_header and '-' in range_header:
+            start, _, end = range_header.partition('-')
+            offset = int(start)
+            limit = int(end) - offset + 1 if end else None
+        rows = rows[offset:offset + limit if limit is not None else None]
+
+        columns = [column.strip() for column in query.get('select', '*').split(',')]
+        if '*' not in columns:
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return [dict(row) for row in rows], total
+
+    def insert(self, table: str, payload: Any, upsert: bool, on_conflict: str,
+               ignore_duplicates: bool = False) -> List[Dict[str, Any]]:
+        records = payload if isinstance(payload, list) else [payload]
+        keys = [key.strip() for key in on_conflict.split(',')]
+        written = []
+        with self._lock:
+            rows = self.tables.setdefault(table, [])
+            index = {tuple(_text(row.get(key)) for key in keys): row
+                     for row in rows} if upsert or ignore_duplicates else {}
+            for record in records:
+                conflict_key = tuple(_text(record.get(key)) for key in keys)
+                existing = index.get(conflict_key) if all(record.get(key) is not None for key in keys) else None
+                if existing is not None:
+                    # ON CONFLICT DO NOTHING returns no row for the skipped record
+                    if not ignore_duplicates:
+                        existing.update(record)
+                        written.append(dict(existing))
+                    continue
+                row = self._with_defaults(dict(record))
+                rows.append(row)
+                index[conflict_key] = row
+                written.append(dict(row))
+        return written
+
+    def update(self, table: str, params: List[Tuple[str, str]], changes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            matched = self._select(table, params)
+            for row in matched:
+                row.update(changes)
+            return [dict(row) for row in matched]
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            matched = self._select(table, params)
+            matched_ids = {id(row) for row in matched}
+            self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in matched_ids]
+            return [dict(row) for row in matched]
+
+
+# Notion subset
+
+def _plain_text(prop: Dict[str, Any]) -> Optional[str]:
+    for kind in ('title', 'rich_text'):
+        if kind in prop:
+            return ''.join(part.get('text', {}).get('content', '') for part in prop[kind] or [])
+    if 'select' in prop:
+        return (prop['select'] or {}).get('name')
+    if 'date' in prop:
+        return (prop['date'] or {}).get('start')
+    return None
+
+
+def _page_matches(page: Dict[str, Any], condition: Optional[Dict[str, Any]]) -> bool:
+    if not condition:
+        return True
+    if 'and' in condition:
+        return all(_page_matches(page, part) for part in condition['and'])
+    if 'or' in condition:
+        return any(_page_matches(page, part) for part in condition['or'])
+
+    prop = page['properties'].get(condition.get('property'), {})
+    for kind in ('title', 'rich_text', 'select', 'date'):
+        if kind in condition:
+            test = condition[kind]
+            value = _plain_text(prop)
+            if 'equals' in test:
+                return value == test['equals']
+            if 'contains' in test:
+                return value is not None and test['contains'] in value
+            if 'is_empty' in test:
+                return not value
+            if 'on_or_after' in test:
+                return value is not None and value >= test['on_or_after']
+    if 'multi_select' in condition:
+        names = [option.get('name') for option in prop.get('multi_select', [])]
+        return condition['multi_select'].get('contains') in names
+    if 'checkbox' in condition:
+        return prop.get('checkbox') == condition['checkbox'].get('equals')
+    return True
+
+
+class NotionWorkspace:
+    """In-memory Notion databases and pages"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.databases: Dict[str, Dict[str, Any]] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+
+    def ensure_database(self, database_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._ensure_database(database_id)
+
+    def _ensure_database(self, database_id: str) -> Dict[str, Any]:
+        if database_id not in self.databases:
+            self.databases[database_id] = {
+                'object': 'database', 'id': database_id, 'created_time': _now(),
+                'title': [{'type': 'text', 'text': {'content': 'Decision Vault'}, 'plain_text': 'Decision Vault'}],
+                'properties': {}, '_pages': []
+            }
+        return self.databases[database_id]
+
+    def database(self, database_id: str) -> Dict[str, Any]:
+        with self._lock:
+            database = self._ensure_database(database_id)
+            return {key: value for key, value in database.items() if not key.startswith('_')}
+
+    def create_page(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        database_id = (body.get('parent') or {}).get('database_id')
+        if not database_id:
+            raise ValueError("body.parent.database_id should be defined")
+        now = _now()
+        page = {
+            'object': 'page', 'id': str(uuid.uuid4()), 'created_time': now, 'last_edited_time': now,
+            'archived': False, 'parent': {'type': 'database_id', 'database_id': database_id},
+            'properties': body.get('properties', {})
+        }
+        with self._lock:
+            database = self._ensure_database(database_id)
+            for name, prop in page['properties'].items():
+                database['properties'].setdefault(name, {'name': name, 'type': next(iter(prop), 'rich_text')})
+            database['_pages'].append(page['id'])
+            self.pages[page['id']] = page
+        return json.loads(json.dumps(page))
+
+    def update_page(self, page_id: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            page = self.pages.get(page_id)
+            if page is None:
+                return None
+            page['properties'].update(body.get('properties', {}))
+            if 'archived' in body:
+                page['archived'] = bool(body['archived'])
+            page['last_edited_time'] = _now()
+            return json.loads(json.dumps(page))
+
+    def get_page(self, page_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            page = self.pages.get(page_id)
+            return json.loads(json.dumps(page)) if page else None
+
+    def query(self, database_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        page_size = min(int(body.get('page_size', NOTION_MAX_PAGE_SIZE)), NOTION_MAX_PAGE_SIZE)
+        with self._lock:
+            database = self._ensure_database(database_id)
+            matches = [self.pages[page_id] for page_id in database['_pages']
+                       if not self.pages[page_id]['archived'] and _page_matches(self.pages[page_id], body.get('filter'))]
+            start = 0
+            if body.get('start_cursor'):
+                positions = {page['id']: i for i, page in enumerate(matches)}
+                if body['start_cursor'] not in positions:
+                    raise ValueError("start_cursor is invalid")
+                start = positions[body['start_cursor']]
+            window = matches[start:start + page_size]
+            has_more = start + page_size < len(matches)
+            return {
+                'object': 'list',
+                'results': json.loads(json.dumps(window)),
+                'next_cursor': matches[start + page_size]['id'] if has_more else None,
+                'has_more': has_more
+            }
+
+    def clear(self):
+        with self._lock:
+            self.databases.clear()
+            self.pages.clear()
+
+
+# HTTP layer
+
+class _FakeServiceHandler(BaseHTTPRequestHandler):
+    """Routes requests to the fake PostgREST tables or Notion workspace"""
+
+    server_version = "AnglesFakeServices/1.0"
+    protocol_version = "HTTP/1.1"
+    # (stats, route, start) of the request being served, recorded by _send
+    _pending_stats: Optional[Tuple['ServiceStats', str, float]] = None
+
+    def log_message(self, format, *args):
+        pass  # Request logging would dominate load tests
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _send(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None):
+        payload = b'' if body is None else json.dumps(body, default=str).encode('utf-8')
+        # Record before the client can see the response, so stats never lag behind it
+        if self._pending_stats is not None:
+            stats, route, start = self._pending_stats
+            self._pending_stats = None
+            stats.record(route, status, (time.perf_counter() - start) * 1000)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _dispatch(self, method: str):
+        services: 'FakeServices' = self.server.services
+        start = time.perf_counter()
+        self._pending_stats = None
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip('/')
+        params = parse_qsl(parsed.query, keep_blank_values=True)
+
+        if path.startswith('/__fake'):
+            self._admin(method, path)
+            return
+
+        if path.startswith('/rest/v1/'):
+            service, route = SERVICE_SUPABASE, f"{method} {path}"
+        elif path.startswith('/v1/'):
+            service, route = SERVICE_NOTION, f"{method} {_ROUTE_IDS.sub(lambda m: m.group(0).rsplit('/', 1)[0] + '/{id}', path)}"
+        else:
+            self._send(404, {'message': f"Unknown path {path}"})
+            return
+
+        self._pending_stats = (services.stats[service], route, start)
+        faults = services.faults[service]
+        retry_after = faults.admit()
+        if retry_after is not None:
+            if service == SERVICE_NOTION:
+                body = {'object': 'error', 'status': 429, 'code': 'rate_limited',
+                        'message': 'You have been rate limited. Please try again in a few minutes.'}
+            else:
+                body = {'code': '429', 'message': 'Too Many Requests', 'details': None, 'hint': None}
+            self._send(429, body, {'Retry-After': str(max(1, round(retry_after)))})
+        else:
+            delay = faults.delay()
+            if delay:
+                time.sleep(delay)
+            if faults.should_fail():
+                status = faults.failure_status
+                self._send(status, {'object': 'error', 'status': status, 'code': 'service_unavailable',
+                                    'message': 'Injected failure'})
+            else:
+                try:
+                    if service == SERVICE_SUPABASE:
+                        self._supabase(method, path[len('/rest/v1/'):], params)
+                    else:
+                        self._notion(method, path[len('/v1/'):])
+                except (ValueError, json.JSONDecodeError) as e:
+                    self._send(400, {'object': 'error', 'status': 400, 'code': 'validation_error',
+                                     'message': str(e)})
+
+    def _authorized(self, service: str) -> bool:
+        if service == SERVICE_SUPABASE:
+            return bool(self.headers.get('apikey') or self.headers.get('Authorization'))
+        return (self.headers.get('Authorization') or '').startswith('Bearer ')
+
+    def _supabase(self, method: str, table: str, params: List[Tuple[str, str]]) -> int:
+        tables: PostgrestTables = self.server.services.tables
+        if not self._authorized(SERVICE_SUPABASE):
+            self._send(401, {'message': 'No API key found in request', 'hint': 'No `apikey` request header or url param was found.'})
+            return 401
+
+        table = unquote(table)
+        prefer = self.headers.get('Prefer', '')
+
+        if table.startswith('rpc/'):
+            return self._rpc(method, table[len('rpc/'):])
+
+        if method == 'GET':
+            rows, total = tables.get(table, params, self.headers.get('Range'))
+            headers = {}
+            if 'count=exact' in prefer:
+                first = dict(params).get('offset', '0')
+                headers['Content-Range'] = f"{first}-{int(first) + len(rows) - 1}/{total}" if rows else f"*/{total}"
+            self._send(200, rows, headers)
+            return 200
+
+        if method == 'POST':
+            payload = self._read_json()
+            upsert = 'resolution=merge-duplicates' in prefer
+            rows = tables.insert(table, payload, upsert, dict(params).get('on_conflict', 'id'),
+                                 ignore_duplicates='resolution=ignore-duplicates' in prefer)
+            # Callers here read the inserted rows back, so representation is the default
+            if 'return=minimal' in prefer:
+                self._send(201)
+            else:
+                self._send(201, rows)
+            return 201
+
+        if method == 'PATCH':
+            rows = tables.update(table, params, self._read_json() or {})
+            if 'return=minimal' in prefer:
+                self._send(204)
+                return 204
+            self._send(200, rows)
+            return 200
+
+        if method == 'DELETE':
+            rows = tables.delete(table, params)
+            if 'return=representation' in prefer:
+                self._send(200, rows)
+                return 200
+            self._send(204)
+            return 204
+
+        self._send(405, {'message': f"Method {method} not allowed"})
+        return 405
+
+    def _rpc(self, method: str, function: str) -> int:
+        """Stored functions; only the drift bucket digests are provided"""
+        if method != 'POST' or function != DIGEST_FUNCTION:
+            self._send(404, {'code': 'PGRST202', 'message': f"Could not find the function public.{function}"})
+            return 404
+
+        body = self._read_json() or {}
+        columns = body.get('p_columns') or ['id']
+        summary = TableSummary(body.get('p_boundaries') or [])
+        for row in self.server.services.tables.rows(body.get('p_table', '')):
+            summary.add(row.get('id'), row_digest(row, columns))
+
+        def signed(value: int) -> int:
+            return value - (1 << 64) if value >= 1 << 63 else value
+
+        self._send(200, [{'bucket': bucket, 'row_count': count,
+                          'hi': signed(digest >> 64), 'lo': signed(digest & ((1 << 64) - 1))}
+                         for bucket, (count, digest) in sorted(summary.buckets.items())])
+        return 200
+
+    def _notion(self, method: str, path: str) -> int:
+        workspace: NotionWorkspace = self.server.services.workspace
+        if not self._authorized(SERVICE_NOTION):
+            self._send(401, {'object': 'error', 'status': 401, 'code': 'unauthorized',
+                             'message': 'API token is invalid.'})
+            return 401
+
+        parts = path.split('/')
+        body = self._read_json() if method in ('POST', 'PATCH') else None
+        result: Any = None
+
+        if parts == ['users', 'me'] and method == 'GET':
+            result = {'object': 'user', 'id': 'fake-bot', 'type': 'bot', 'name': 'Angles Fake Integration'}
+        elif parts[0] == 'databases' and len(parts) == 2 and method == 'GET':
+            result = workspace.database(parts[1])
+        elif parts[0] == 'databases' and len(parts) == 3 and parts[2] == 'query' and method == 'POST':
+            result = workspace.query(parts[1], body or {})
+        elif parts == ['pages'] and method == 'POST':
+            result = workspace.create_page(body or {})
+        elif parts[0] == 'pages' and len(parts) == 2 and method in ('GET', 'PATCH'):
+            result = workspace.get_page(parts[1]) if method == 'GET' else workspace.update_page(parts[1], body or {})
+            if result is None:
+                self._send(404, {'object': 'error', 'status': 404, 'code': 'object_not_found',
+                                 'message': f"Could not find page with ID: {parts[1]}."})
+                return 404
+        else:
+            self._send(400, {'object': 'error', 'status': 400, 'code': 'invalid_request_url',
+                             'message': 'Invalid request URL.'})
+            return 400
+
+        self._send(200, result)
+        return 200
+
+    def _admin(self, method: str, path: str) -> int:
+        services: 'FakeServices' = self.server.services
+        if path == '/__fake/stats' and method == 'GET':
+            self._send(200, services.stats_snapshot())
+        elif path == '/__fake/reset' and method == 'POST':
+            services.reset()
+            self._send(200, {'reset': True})
+        elif path == '/__fake/faults' and method == 'POST':
+            for service, settings in (self._read_json() or {}).items():
+                services.faults[service].update(**settings)
+            self._send(200, {service: profile.to_dict() for service, profile in services.faults.items()})
+        else:
+            self._send(404, {'message': f"Unknown control path {path}"})
+            return 404
+        return 200
+
+
+class FakeServices:
+    """
+    Local Supabase REST + Notion stand-in on a background thread
+
+    Usage:
+        with FakeServices(notion_faults=FaultProfile(rate_limit=3)) as fake:
+            os.environ.update(fake.environment())
+            ...
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 supabase_faults: Optional[FaultProfile] = None,
+                 notion_faults: Optional[FaultProfile] = None,
+                 database_id: str = 'fake-decision-db'):
+        self.host = host
+        self.port = port
+        self.database_id = database_id
+        self.tables = PostgrestTables()
+        self.workspace = NotionWorkspace()
+        self.faults = {
+            SERVICE_SUPABASE: supabase_faults or FaultProfile(),
+            SERVICE_NOTION: notion_faults or FaultProfile(seed=1)
+        }
+        self.stats = {SERVICE_SUPABASE: ServiceStats(), SERVICE_NOTION: ServiceStats()}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._state_dir: Optional[tempfile.TemporaryDirectory] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'FakeServices':
+        self._server = ThreadingHTTPServer((self.host, self.port), _FakeServiceHandler)
+        self._server.daemon_threads = True
+        self._server.services = self
+        self.port = self._server.server_address[1]
+        self._state_dir = tempfile.TemporaryDirectory(prefix="fake-services-")
+        self.workspace.ensure_database(self.database_id)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._state_dir is not None:
+            self._state_dir.cleanup()
+            self._state_dir = None
+
+    def __enter__(self) -> 'FakeServices':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables pointing every client in the repo at this server"""
+        # Local state derived from the fake data (the duplicate index) lives with the server, not in memory/
+        return {
+            'DUPLICATE_INDEX_PATH': str(Path(self._state_dir.name) / 'duplicate_index.json'),
+            'SUPABASE_URL': self.url,
+            'SUPABASE_KEY': 'fake-service-key',
+            'SUPABASE_SERVICE_ROLE_KEY': 'fake-service-key',
+            'NOTION_TOKEN': 'fake-notion-token',
+            'NOTION_API_KEY': 'fake-notion-token',
+            'NOTION_DATABASE_ID': self.database_id,
+            'NOTION_API_BASE_URL': self.url
+        }
+
+    def reset(self):
+        """Drop all data and statistics (fault profiles are kept)"""
+        self.tables.clear()
+        self.workspace.clear()
+        self.workspace.ensure_database(self.database_id)
+        self.reset_stats()
+
+    def reset_stats(self):
+        for stats in self.stats.values():
+            stats.reset()
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        return {
+            service: {**stats.snapshot(), 'faults': self.faults[service].to_dict()}
+            for service, stats in self.stats.items()
+        }
+
+
+def main():
+    """Run the fake services standalone"""
+    parser = argparse.ArgumentParser(description='Local fake Supabase REST / Notion API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('FAKE_SERVICES_PORT', '8787')))
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Uniform latency jitter (+/-)')
+    parser.add_argument('--notion-rate-limit', type=float, default=3.0, help='Notion requests/sec (0 = off)')
+    parser.add_argument('--supabase-rate-limit', type=float, default=0.0, help='Supabase requests/sec (0 = off)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Probability of an injected 503')
+    parser.add_argument('--seed-decisions', type=int, default=0, help='Unsynced decision_vault rows to create')
+
+    args = parser.parse_args()
+
+    def profile(rate_limit: float, seed: int) -> FaultProfile:
+        return FaultProfile(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit=rate_limit,
+                            failure_rate=args.failure_rate, seed=seed)
+
+    fake = FakeServices(args.host, args.port,
+                        supabase_faults=profile(args.supabase_rate_limit, 0),
+                        notion_faults=profile(args.notion_rate_limit, 1))
+    fake.start()
+
+    if args.seed_decisions:
+        fake.tables.seed('decision_vault', [
+            {'decision': f"Seeded decision {i}", 'date': '2025-08-07', 'type': 'technical',
+             'active': True, 'synced': False} for i in range(args.seed_decisions)
+        ])
+
+    print(f"🧪 Fake Supabase/Notion services on {fake.url}")
+    for name, value in fake.environment().items():
+        print(f"   export {name}={value}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping fake services")
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,8 @@ class HealthDashboardServer:
         self.snapshot_interval = 300  # 5 minutes
         self.last_snapshot_time = None
         self.cached_status = None
+        self.metrics_store = None
+        self.probe_cache = None
         
         # Ensure directories exist
         os.makedirs("logs/health", exist_ok=True)
@@ -86,6 +88,20 @@ class HealthDashboardServer:
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
     
+    def get_metrics_store(self):
+        """Open the shared task metrics store on first use"""
+        if self.metrics_store is None:
+            from utils.metrics_store import open_metrics_store
+            self.metrics_store = open_metrics_store()
+        return self.metrics_store
+    
+    def get_probe_cache(self):
+        """Open the health probe result cache shared with the CLI and schedulers on first use"""
+        if self.probe_cache is None:
+            from utils.health_probes import open_probe_cache
+            self.probe_cache = open_probe_cache()
+        return self.probe_cache
+    
     def _snapshot_loop(self):
         """Background thread for generating health snapshots"""
         while True:
@@ -142,6 +158,7 @@ class HealthDashboardServer:
             'backup_status': self._get_backup_status(),
             'alert_status': self._get_recent_alerts(),
             'system_metrics': self._get_system_metrics(),
+            'deep_health': self._get_deep_health(),
             'health_score': 0
         }
         
@@ -287,6 +304,34 @@ class HealthDashboardServer:
         
         return metrics
     
+    def _get_deep_health(self) -> Dict[str, Any]:
+        """Latest probe results recorded by health_check.py and the monitors, without rerunning them"""
+        deep_health = {
+            'probes': {},
+            'failing': [],
+            'oldest_result_age_seconds': None
+        }
+        
+        try:
+            for name, entry in self.get_probe_cache().all().items():
+                status = entry['result'].get('status', 'unknown')
+                deep_health['probes'][name] = {
+                    'status': status,
+                    'age_seconds': round(entry['age_seconds'], 1),
+                    'duration_ms': entry['duration_ms'],
+                    'issues': entry['result'].get('issues', [])[:3]
+                }
+                if status in ('critical', 'error', 'failed'):
+                    deep_health['failing'].append(name)
+            
+            if deep_health['probes']:
+                deep_health['oldest_result_age_seconds'] = max(
+                    probe['age_seconds'] for probe in deep_health['probes'].values())
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not read health probe cache: {e}")
+        
+        return deep_health
+    
     def _calculate_health_score(self, status: Dict) -> int:
         """Calculate overall health score (0-100)"""
         score = 100
@@ -456,6 +501,10 @@ class HealthHTTPRequestHandler(BaseHTTPRequestHandler):
                 self._serve_ping()
             elif path == '/snapshot':
                 self._serve_snapshot()
+            elif path == '/metrics/tasks':
+                self._serve_task_latency(parse_qs(parsed_path.query))
+            elif path == '/health/probes':
+                self._serve_probe_results(parse_qs(parsed_path.query))
             else:
                 self._serve_404()
         except Exception as e:
@@ -544,7 +593,8 @@ class HealthHTTPRequestHandler(BaseHTTPRequestHandler):
                     'scheduler_status': status_data.get('scheduler_status', {}),
                     'backup_status': status_data.get('backup_status', {}),
                     'alert_status': status_data.get('alert_status', {}),
-                    'system_metrics': status_data.get('system_metrics', {})
+                    'system_metrics': status_data.get('system_metrics', {}),
+                    'deep_health': status_data.get('deep_health', {})
                 }
             
             self._send_response(200, json.dumps(response, indent=2, default=str), 'application/json')
@@ -574,6 +624,43 @@ class HealthHTTPRequestHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._serve_500(str(e))
     
+    def _serve_task_latency(self, query: Dict[str, Any]):
+        """Serve task latency percentiles over time from the metrics store"""
+        try:
+            store = self.server_instance.get_metrics_store()
+            task = query.get('task', [None])[0]
+            if not task:
+                response = {'tasks': store.persisted_tasks()}
+            else:
+                hours = float(query.get('hours', ['24'])[0])
+                resolution = int(query.get('resolution', ['3600'])[0])
+                response = {
+                    'task': task,
+                    'hours': hours,
+                    'resolution_seconds': resolution,
+                    'series': store.query_task_latency(task, since=time.time() - hours * 3600,
+                                                       resolution_seconds=resolution)
+                }
+            self._send_response(200, json.dumps(response, indent=2, default=str), 'application/json')
+        except ValueError as e:
+            self._send_response(400, json.dumps({'error': str(e)}), 'application/json')
+        except Exception as e:
+            self.server_instance.logger.error(f"❌ Task latency API error: {str(e)}")
+            self._serve_500(str(e))
+    
+    def _serve_probe_results(self, query: Dict[str, Any]):
+        """Serve cached health probe results (optionally ?prefix=backend_monitor.)"""
+        try:
+            prefix = query.get('prefix', [''])[0]
+            response = {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'probes': self.server_instance.get_probe_cache().all(prefix)
+            }
+            self._send_response(200, json.dumps(response, indent=2, default=str), 'application/json')
+        except Exception as e:
+            self.server_instance.logger.error(f"❌ Probe results API error: {str(e)}")
+            self._serve_500(str(e))
+    
     def _serve_404(self):
         """Serve 404 error"""
         self._send_response(404, "404 Not Found", 'text/plain')
@@ -0,0 +1,271 @@
+"""
+Backup catalog
+SQLite index of every backup (where it is stored, size, checksum, tables) with an atomic JSON-lines mirror
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DEFAULT_CATALOG_PATH = "backups/backup_catalog.sqlite3"
+DEFAULT_MANIFEST_PATH = "backups/catalog.jsonl"
+
+# export/decision_vault_20250807_120000.json -> decision_vault
+_EXPORT_MEMBER = re.compile(r'(?:^|/)export/([A-Za-z][A-Za-z0-9_]*?)(?:_\d{8}(?:_\d{6})?)?\.json$')
+
+
+def archive_tables(names: Iterable[str]) -> List[str]:
+    """Table names of the export members in an archive"""
+    return sorted({match.group(1) for match in map(_EXPORT_MEMBER.search, names) if match})
+
+
+def describe_archive(path: str) -> Dict[str, Any]:
+    """Size, SHA-256, file count and exported tables of a backup file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    description = {
+        'size_bytes': os.path.getsize(path),
+        'checksum': digest.hexdigest(),
+        'file_count': None,
+        'tables': []
+    }
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [info.filename for info in archive.infolist() if not info.is_dir()]
+        description['file_count'] = len(names)
+        description['tables'] = archive_tables(names)
+    return description
+
+
+class BackupCatalog:
+    """
+    One row per backup plus one row per place it is stored
+
+    Answers "which backups exist, where, and which is newest" from an index
+    instead of cloning the backup repository or listing storage buckets.
+    Each backup is recorded in a single transaction at backup time.
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.path = path
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS backups (
+                backup_id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                backup_type TEXT,
+                tag TEXT,
+                size_bytes INTEGER,
+                checksum TEXT,
+                file_count INTEGER,
+                tables TEXT NOT NULL DEFAULT '[]'
+            );
+            CREATE INDEX IF NOT EXISTS idx_backups_created ON backups (created_at);
+            CREATE INDEX IF NOT EXISTS idx_backups_filename ON backups (filename);
+
+            CREATE TABLE IF NOT EXISTS backup_locations (
+                backup_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                location TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                PRIMARY KEY (backup_id, source)
+            );
+            CREATE INDEX IF NOT EXISTS idx_backup_locations_source ON backup_locations (source);
+        """)
+        self._conn.commit()
+
+    def record_backup(self, backup_id: str, filename: str, locations: Dict[str, str],
+                      created_at: Optional[float] = None, size_bytes: Optional[int] = None,
+                      checksum: Optional[str] = None, file_count: Optional[int] = None,
+                      tables: Optional[List[str]] = None, backup_type: Optional[str] = None,
+                      tag: Optional[str] = None):
+        """Insert or update a backup and its storage locations atomically"""
+        created_at = created_at if created_at is not None else time.time()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO backups (backup_id, filename, created_at, backup_type, tag,
+                                     size_bytes, checksum, file_count, tables)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (backup_id) DO UPDATE SET
+                    filename = excluded.filename,
+                    created_at = excluded.created_at,
+                    backup_type = COALESCE(excluded.backup_type, backup_type),
+                    tag = COALESCE(excluded.tag, tag),
+                    size_bytes = COALESCE(excluded.size_bytes, size_bytes),
+                    checksum = COALESCE(excluded.checksum, checksum),
+                    file_count = COALESCE(excluded.file_count, file_count),
+                    tables = excluded.tables
+            """, (backup_id, filename, created_at, backup_type, tag, size_bytes, checksum,
+                  file_count, json.dumps(sorted(tables or []))))
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO backup_locations (backup_id, source, location, recorded_at)
+                VALUES (?, ?, ?, ?)
+            """, [(backup_id, source, location, now) for source, location in locations.items()])
+
+    def add_location(self, backup_id: str, source: str, location: str):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO backup_locations (backup_id, source, location, recorded_at)
+                VALUES (?, ?, ?, ?)
+            """, (backup_id, source, location, time.time()))
+
+    def remove_location(self, name: str, source: str) -> bool:
+        """Forget one copy of a backup (by id or filename); the backup goes once no copy is left"""
+        entry = self.find(name)
+        if not entry or source not in entry['locations']:
+            return False
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM backup_locations WHERE backup_id = ? AND source = ?",
+                               (entry['backup_id'], source))
+            if len(entry['locations']) == 1:
+                self._conn.execute("DELETE FROM backups WHERE backup_id = ?", (entry['backup_id'],))
+        return True
+
+    def _entries(self, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        ids = [row['backup_id'] for row in rows]
+        with self._lock:
+            location_rows = self._conn.execute(
+                f"SELECT backup_id, source, location FROM backup_locations "
+                f"WHERE backup_id IN ({','.join('?' * len(ids))})", ids).fetchall()
+        locations: Dict[str, Dict[str, str]] = {}
+        for row in location_rows:
+            locations.setdefault(row['backup_id'], {})[row['source']] = row['location']
+
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry['tables'] = json.loads(entry['tables'])
+            entry['timestamp'] = datetime.fromtimestamp(entry['created_at'], timezone.utc).isoformat()
+            entry['locations'] = locations.get(row['backup_id'], {})
+            entries.append(entry)
+        return entries
+
+    def list_backups(self, source: Optional[str] = None, backup_type: Optional[str] = None,
+                     table: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Backups newest first, optionally only those stored in source / of a type / containing a table"""
+        query = "SELECT b.* FROM backups b"
+        conditions, params = [], []
+        if source:
+            query += " JOIN backup_locations l ON l.backup_id = b.backup_id AND l.source = ?"
+            params.append(source)
+        if backup_type:
+            conditions.append("b.backup_type = ?")
+            params.append(backup_type)
+        if table:
+            conditions.append("EXISTS (SELECT 1 FROM json_each(b.tables) WHERE json_each.value = ?)")
+            params.append(table)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY b.created_at DESC, b.backup_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return self._entries(rows)
+
+    def latest(self, source: Optional[str] = None, backup_type: Optional[str] = None,
+               table: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Newest backup matching the filters (an index lookup on created_at)"""
+        entries = self.list_backups(source, backup_type, table, limit=1)
+        return entries[0] if entries else None
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Backup by id or filename"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM backups WHERE backup_id = ? OR filename = ? ORDER BY created_at DESC LIMIT 1",
+                (name, name)).fetchall()
+        entries = self._entries(rows)
+        return entries[0] if entries else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Backup count, newest backup and its age, and copies per source"""
+        with self._lock:
+            count, newest = self._conn.execute("SELECT COUNT(*), MAX(created_at) FROM backups").fetchone()
+            sources = dict(self._conn.execute(
+                "SELECT source, COUNT(*) FROM backup_locations GROUP BY source").fetchall())
+        latest = self.latest()
+        return {
+            'backup_count': count,
+            'latest_backup_id': latest['backup_id'] if latest else None,
+            'latest_backup_time': latest['timestamp'] if latest else None,
+            'latest_backup_age_hours': (time.time() - newest) / 3600 if newest else None,
+            'sources': sources
+        }
+
+    def export_jsonl(self, path: str = DEFAULT_MANIFEST_PATH) -> int:
+        """Write the whole catalog as JSON lines, replacing the file atomically"""
+        entries = self.list_backups()
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{target.name}.", dir=str(target.parent))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, sort_keys=True) + '\n')
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return len(entries)
+
+    def import_jsonl(self, path: str = DEFAULT_MANIFEST_PATH) -> int:
+        """Merge a JSON-lines manifest (e.g. from the backup repository) into the catalog"""
+        imported = 0
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.record_backup(entry['backup_id'], entry['filename'], entry.get('locations', {}),
+                                   created_at=entry['created_at'], size_bytes=entry.get('size_bytes'),
+                                   checksum=entry.get('checksum'), file_count=entry.get('file_count'),
+                                   tables=entry.get('tables'), backup_type=entry.get('backup_type'),
+                                   tag=entry.get('tag'))
+                imported += 1
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def parse_manifest(text: str) -> List[Dict[str, Any]]:
+    """Entries of JSON-lines manifest text, newest first"""
+    entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    entries.sort(key=lambda entry: (entry['created_at'], entry['backup_id']), reverse=True)
+    return entries
+
+
+def read_manifest(path: str) -> List[Dict[str, Any]]:
+    """Entries of a JSON-lines manifest file, newest first, without opening a catalog"""
+    with open(path, 'r') as f:
+        return parse_manifest(f.read())
+
+
+def open_backup_catalog(path: Optional[str] = None) -> BackupCatalog:
+    """Open the backup catalog at path, BACKUP_CATALOG_PATH or the default location"""
+    return BackupCatalog(path or os.getenv('BACKUP_CATALOG_PATH', DEFAULT_CATALOG_PATH))
@@ -0,0 +1,199 @@
+"""
+Backup repository mirror
+Persistent shallow, blob-less mirror of the backup repository with incremental fetch and sparse checkouts
+"""
+
+import base64
+import os
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+DEFAULT_MIRROR_DIR = ".cache/backup_mirror"
+
+
+class MirrorError(Exception):
+    """A git operation on the backup mirror failed"""
+
+
+class BackupMirror:
+    """
+    Local mirror of the backup repository
+
+    The mirror is a bare partial clone: only the newest `depth` commits and
+    their trees are fetched, file contents (blobs) are downloaded on demand.
+    Each sync is an incremental shallow fetch of the branch tip, and
+    checkouts are sparse worktrees holding just the requested paths, so
+    the cost of a restore depends on the snapshot read, not on how much
+    backup history the repository has accumulated.
+    """
+
+    def __init__(self, repo_url: str, token: Optional[str] = None, mirror_dir: Optional[str] = None,
+                 branch: Optional[str] = None, depth: int = 1, timeout: int = 300):
+        self.repo_url = repo_url
+        self.token = token
+        self.mirror_dir = os.path.abspath(mirror_dir or os.getenv('BACKUP_MIRROR_DIR', DEFAULT_MIRROR_DIR))
+        self.branch = branch
+        self.depth = depth
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def _config_args(self) -> List[str]:
+        # The token is passed per command and never written to the mirror's config
+        if self.token and self.repo_url.startswith('https://'):
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            return ['-c', f"http.extraHeader=Authorization: Basic {credentials}"]
+        return []
+
+    def _git(self, args: List[str], cwd: Optional[str] = None, check: bool = True,
+             text: bool = True, stdout=subprocess.PIPE) -> subprocess.CompletedProcess:
+        cmd = ['git'] + self._config_args() + args
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        try:
+            result = subprocess.run(cmd, cwd=cwd or self.mirror_dir, stdout=stdout, stderr=subprocess.PIPE,
+                                    text=text, timeout=self.timeout, env=env)
+        except subprocess.TimeoutExpired:
+            raise MirrorError(f"git {args[0]} timed out after {self.timeout}s")
+        if check and result.returncode != 0:
+            stderr = result.stderr if text else result.stderr.decode('utf-8', 'replace')
+            raise MirrorError(f"git {args[0]} failed: {stderr.strip()}")
+        return result
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the mirror across threads and processes"""
+        with self._lock:
+            if not fcntl:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.mirror_dir), exist_ok=True)
+            with open(self.mirror_dir + '.lock', 'w') as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @property
+    def exists(self) -> bool:
+        return os.path.isfile(os.path.join(self.mirror_dir, 'HEAD'))
+
+    @property
+    def ref(self) -> str:
+        return f"refs/heads/{self.branch}" if self.branch else 'HEAD'
+
+    def _clone(self):
+        shutil.rmtree(self.mirror_dir, ignore_errors=True)
+        os.makedirs(os.path.dirname(self.mirror_dir), exist_ok=True)
+
+        args = ['clone', '--bare', '--filter=blob:none', '--depth', str(self.depth), '--single-branch']
+        if self.branch:
+            args += ['--branch', self.branch]
+        self._git(args + [self.repo_url, self.mirror_dir], cwd=os.path.dirname(self.mirror_dir))
+
+        if not self.branch:
+            self.branch = self._git(['symbolic-ref', '--short', 'HEAD']).stdout.strip()
+        self._git(['config', 'remote.origin.fetch', f"+refs/heads/{self.branch}:refs/heads/{self.branch}"])
+
+    def _fetch(self):
+        if self._git(['config', 'remote.origin.url']).stdout.strip() != self.repo_url:
+            self._git(['remote', 'set-url', 'origin', self.repo_url])
+        if not self.branch:
+            self.branch = self._git(['symbolic-ref', '--short', 'HEAD']).stdout.strip()
+
+        self._git(['fetch', '--depth', str(self.depth), '--prune', 'origin',
+                   f"+refs/heads/{self.branch}:refs/heads/{self.branch}"])
+        self._git(['worktree', 'prune'])
+        self._git(['gc', '--auto', '--quiet'], check=False)
+
+    def sync(self) -> Dict[str, Any]:
+        """Create the mirror or bring it up to date with the remote branch tip"""
+        start = time.perf_counter()
+        with self._locked():
+            initial = not self.exists
+            if initial:
+                self._clone()
+            else:
+                try:
+                    self._fetch()
+                except MirrorError:
+                    # A damaged mirror is cheap to rebuild: it only holds the tip
+                    initial = True
+                    self._clone()
+
+        commit, commit_date = self.commit_info()
+        return {
+            'commit': commit,
+            'commit_date': commit_date,
+            'initial_clone': initial,
+            'seconds': time.perf_counter() - start
+        }
+
+    def fetch_revision(self, name: str) -> str:
+        """Shallow-fetch a tag (or commit id) into the mirror and return its commit id"""
+        with self._locked():
+            try:
+                self._git(['fetch', '--depth', str(self.depth), 'origin', f"+refs/tags/{name}:refs/tags/{name}"])
+                revision = f"refs/tags/{name}"
+            except MirrorError:
+                self._git(['fetch', '--depth', str(self.depth), 'origin', name])
+                revision = 'FETCH_HEAD'
+            return self._git(['rev-parse', f"{revision}^{{commit}}"]).stdout.strip()
+
+    def commit_info(self, revision: Optional[str] = None) -> Tuple[str, str]:
+        """Hash and ISO committer date of the mirrored tip (or revision)"""
+        output = self._git(['log', '-1', '--format=%H|%cI', revision or self.ref]).stdout.strip()
+        commit, commit_date = output.split('|')
+        return commit, commit_date
+
+    def list_files(self, path: str = '', revision: Optional[str] = None) -> List[str]:
+        """Paths of files under path (tree objects only, no content download)"""
+        args = ['ls-tree', '-r', '--name-only', '-z', revision or self.ref]
+        if path:
+            args += ['--', path]
+        return [name for name in self._git(args).stdout.split('\0') if name]
+
+    def read_file(self, path: str, revision: Optional[str] = None) -> Optional[bytes]:
+        """Content of one file, fetching just that blob; None when absent"""
+        spec = f"{revision or self.ref}:{path}"
+        if self._git(['cat-file', '-e', spec], check=False).returncode != 0:
+            return None
+        return self._git(['cat-file', 'blob', spec], text=False).stdout
+
+    def copy_file(self, path: str, dest: str, revision: Optional[str] = None) -> bool:
+        """Stream one file to dest without holding it in memory; False when absent"""
+        spec = f"{revision or self.ref}:{path}"
+        if self._git(['cat-file', '-e', spec], check=False).returncode != 0:
+            return False
+        with open(dest, 'wb') as f:
+            self._git(['cat-file', 'blob', spec], text=False, stdout=f)
+        return True
+
+    def checkout(self, dest: str, paths: Iterable[str]) -> str:
+        """
+        Sparse worktree of the tip at dest containing only paths
+
+        A path ending in '/' selects a directory. Missing blobs for the
+        selected files are fetched in one batch by the checkout. The
+        worktree registration is pruned on the next sync once dest is gone.
+        """
+        patterns = ['/' + path.lstrip('/') for path in paths]
+        if not patterns:
+            raise MirrorError("No paths requested for checkout")
+
+        dest = os.path.abspath(dest)
+        with self._locked():
+            self._git(['worktree', 'prune'])
+            self._git(['worktree', 'add', '--no-checkout', '--detach', dest, self.ref])
+        self._git(['sparse-checkout', 'set', '--no-cone'] + patterns, cwd=dest)
+        self._git(['checkout', '--detach'], cwd=dest)
+        return dest
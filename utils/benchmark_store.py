@@ -0,0 +1,196 @@
+"""
+Columnar benchmark sample store
+Per-operation sample columns in SQLite and Mann-Whitney regression detection
+"""
+
+import math
+import os
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BENCHMARK_PATH = "logs/perf/benchmarks.sqlite3"
+MIN_SAMPLES = 5
+
+
+def _pack(samples: Sequence[float]) -> bytes:
+    return array('d', samples).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    values = array('d')
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class BenchmarkStore:
+    """
+    Benchmark samples stored column-wise: one packed float64 array per
+    (run, operation)
+
+    Reading one operation's trailing window touches only that operation's
+    rows through the (operation, timestamp) index, instead of re-parsing
+    every day's results.
+    """
+
+    def __init__(self, path: str = DEFAULT_BENCHMARK_PATH):
+        self.path = path
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS benchmark_samples (
+                run_id TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                count INTEGER NOT NULL,
+                min_ms REAL,
+                median_ms REAL,
+                samples BLOB NOT NULL,
+                PRIMARY KEY (run_id, operation)
+            );
+            CREATE INDEX IF NOT EXISTS idx_benchmark_operation_time
+                ON benchmark_samples (operation, timestamp);
+        """)
+        self._conn.commit()
+
+    def record_run(self, run_id: str, timestamp: float, operations: Dict[str, Sequence[float]]):
+        """Store one run's samples (milliseconds) per operation"""
+        rows = []
+        for operation, samples in operations.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            rows.append((run_id, operation, timestamp, len(ordered), ordered[0],
+                         ordered[len(ordered) // 2], _pack(samples)))
+
+        with self._lock:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO benchmark_samples
+                    (run_id, operation, timestamp, count, min_ms, median_ms, samples)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+
+    def trailing_samples(self, operation: str, before: float, runs: int) -> List[List[float]]:
+        """Samples of the last ``runs`` runs of an operation before a timestamp, newest first"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT samples FROM benchmark_samples
+                WHERE operation = ? AND timestamp < ?
+                ORDER BY timestamp DESC LIMIT ?
+            """, (operation, before, runs)).fetchall()
+        return [_unpack(row[0]) for row in rows]
+
+    def runs_since(self, since: float) -> List[Dict[str, Any]]:
+        """Runs since a timestamp: run_id, timestamp and the samples of each operation"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT run_id, timestamp, operation, samples FROM benchmark_samples
+                WHERE timestamp >= ? ORDER BY timestamp
+            """, (since,)).fetchall()
+
+        runs: Dict[str, Dict[str, Any]] = {}
+        for run_id, timestamp, operation, samples in rows:
+            run = runs.setdefault(run_id, {'run_id': run_id, 'timestamp': timestamp})
+            run[operation] = _unpack(samples)
+        return list(runs.values())
+
+    def prune(self, before: float) -> int:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM benchmark_samples WHERE timestamp < ?", (before,)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_benchmark_store(path: Optional[str] = None) -> BenchmarkStore:
+    """Open the benchmark store at path, BENCHMARK_STORE_PATH or the default location"""
+    return BenchmarkStore(path or os.getenv('BENCHMARK_STORE_PATH', DEFAULT_BENCHMARK_PATH))
+
+
+# Regression detection
+
+def _ranks(values: List[float]) -> Tuple[List[float], float]:
+    """Average ranks (1-based) and the tie correction term sum(t^3 - t)"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        average = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = average
+        tied = j - i + 1
+        ties += tied ** 3 - tied
+        i = j + 1
+    return ranks, ties
+
+
+def mann_whitney_u(current: Sequence[float], baseline: Sequence[float]) -> Tuple[float, float]:
+    """
+    One-sided Mann-Whitney U test that ``current`` tends to be larger
+    (slower) than ``baseline``
+
+    Uses the normal approximation with tie and continuity corrections,
+    which is accurate enough from about five samples per side.
+
+    Returns:
+        (U statistic of current, p-value)
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 0.0, 1.0
+
+    ranks, ties = _ranks(list(current) + list(baseline))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def detect_regression(current: Sequence[float], baseline: Sequence[float],
+                      alpha: float = 0.01, min_slowdown: float = 0.10) -> Dict[str, Any]:
+    """
+    Decide whether current samples are a significant slowdown over a baseline
+
+    A regression needs both statistical significance (p < alpha) and a
+    practically relevant effect: the median at least ``min_slowdown``
+    slower. Either side with fewer than MIN_SAMPLES samples is not tested.
+    """
+    result = {'regressed': False, 'tested': False, 'p_value': None, 'slowdown': None,
+              'current_median_ms': None, 'baseline_median_ms': None,
+              'current_samples': len(current), 'baseline_samples': len(baseline)}
+    if len(current) < MIN_SAMPLES or len(baseline) < MIN_SAMPLES:
+        return result
+
+    current_median = sorted(current)[len(current) // 2]
+    baseline_median = sorted(baseline)[len(baseline) // 2]
+    _, p_value = mann_whitney_u(current, baseline)
+    slowdown = current_median / baseline_median - 1 if baseline_median > 0 else 0.0
+
+    result.update({
+        'tested': True,
+        'p_value': p_value,
+        'slowdown': round(slowdown, 4),
+        'current_median_ms': round(current_median, 3),
+        'baseline_median_ms': round(baseline_median, 3),
+        'regressed': p_value < alpha and slowdown >= min_slowdown
+    })
+    return result
@@ -0,0 +1,309 @@
+"""
+Table drift engine
+Exact backup-vs-live drift from bucketed row-hash summaries, fetching only the buckets that differ
+"""
+
+import json
+import hashlib
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+
+IGNORED_COLUMNS = ('created_at', 'updated_at')
+DIGEST_FUNCTION = 'drift_bucket_digests'
+ROWS_PER_BUCKET = 500
+PAGE_SIZE = 1000
+_MASK64 = (1 << 64) - 1
+
+
+def id_key(value: Any) -> Tuple[int, Any]:
+    """Sort key matching Postgres ordering for integer and uuid ids"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return 0, value
+    return 1, str(value)
+
+
+def canonical_text(value: Any) -> str:
+    """Column value as Postgres renders it with ::text (NULL as \\N)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, separators=(', ', ': '))
+    return str(value)
+
+
+def row_digest(record: Dict[str, Any], columns: Sequence[str]) -> str:
+    """md5 over the compared columns, identical to the SQL drift_bucket_digests row digest"""
+    text = '\x1f'.join(canonical_text(record.get(column)) for column in columns)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def compare_columns(records: Iterable[Dict[str, Any]],
+                    ignored: Sequence[str] = IGNORED_COLUMNS) -> List[str]:
+    """Sorted union of record keys, minus volatile columns"""
+    columns = {'id'}
+    for record in records:
+        columns.update(record.keys())
+    return sorted(column for column in columns if column not in ignored)
+
+
+def bucket_boundaries(ids: Iterable[Any], rows_per_bucket: int = ROWS_PER_BUCKET) -> List[Any]:
+    """Lower bounds of buckets 1..n, every rows_per_bucket-th id in id order"""
+    ordered = sorted(ids, key=id_key)
+    return ordered[rows_per_bucket::rows_per_bucket]
+
+
+class TableSummary:
+    """
+    Two-level hash tree over a table
+
+    Rows fall into id-range buckets; each bucket keeps a row count and the
+    XOR of its row digests (so rows can be added in any order), and the
+    root hashes all buckets. Equal roots mean equal tables.
+    """
+
+    def __init__(self, boundaries: Sequence[Any]):
+        self.boundaries = list(boundaries)
+        self._keys = [id_key(boundary) for boundary in self.boundaries]
+        self.buckets: Dict[int, List[int]] = {}
+
+    def bucket_of(self, record_id: Any) -> int:
+        return bisect_right(self._keys, id_key(record_id))
+
+    def add(self, record_id: Any, digest: str):
+        entry = self.buckets.setdefault(self.bucket_of(record_id), [0, 0])
+        entry[0] += 1
+        entry[1] ^= int(digest, 16)
+
+    def add_bucket(self, bucket: int, count: int, digest: int):
+        self.buckets[bucket] = [count, digest]
+
+    @property
+    def count(self) -> int:
+        return sum(entry[0] for entry in self.buckets.values())
+
+    @property
+    def root(self) -> str:
+        digest = hashlib.sha256()
+        for bucket in sorted(self.buckets):
+            count, value = self.buckets[bucket]
+            digest.update(f"{bucket}:{count}:{value:032x};".encode('ascii'))
+        return digest.hexdigest()
+
+    def mismatched(self, other: 'TableSummary') -> List[int]:
+        return sorted(bucket for bucket in set(self.buckets) | set(other.buckets)
+                      if self.buckets.get(bucket) != other.buckets.get(bucket))
+
+    def bucket_range(self, bucket: int) -> Tuple[Optional[Any], Optional[Any]]:
+        """Inclusive lower and exclusive upper id bound (None when open)"""
+        lower = self.boundaries[bucket - 1] if bucket > 0 else None
+        upper = self.boundaries[bucket] if bucket < len(self.boundaries) else None
+        return lower, upper
+
+
+class RecordsSource:
+    """Live side already held in memory"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+        self.method = 'local'
+        self.round_trips = 0
+        self.rows_fetched = 0
+
+    def summarize(self, columns: Sequence[str], boundaries: Sequence[Any]) -> TableSummary:
+        summary = TableSummary(boundaries)
+        for record in self.records:
+            summary.add(record.get('id'), row_digest(record, columns))
+        return summary
+
+    def fetch_buckets(self, summary: TableSummary, buckets: Sequence[int]) -> Iterator[Dict[str, Any]]:
+        wanted = set(buckets)
+        for record in self.records:
+            if summary.bucket_of(record.get('id')) in wanted:
+                self.rows_fetched += 1
+                yield record
+
+
+class SupabaseTableSource:
+    """
+    Live side read through PostgREST
+
+    Bucket summaries come from the drift_bucket_digests SQL function in one
+    request when it is installed (create_drift_functions.sql), otherwise
+    from a keyset-paged scan that keeps only the bucket accumulators.
+    Mismatching buckets are fetched by id range, adjacent ones merged.
+    """
+
+    def __init__(self, supabase_url: str, supabase_key: str, table: str,
+                 page_size: int = PAGE_SIZE, timeout: int = 30, use_rpc: bool = True):
+        self.base_url = f"{supabase_url}/rest/v1"
+        self.table = table
+        self.page_size = page_size
+        self.timeout = timeout
+        self.use_rpc = use_rpc
+        self.headers = {
+            'apikey': supabase_key,
+            'Authorization': f"Bearer {supabase_key}",
+            'Content-Type': 'application/json'
+        }
+        self.method = None
+        self.round_trips = 0
+        self.rows_fetched = 0
+
+    def _rpc_summary(self, columns: Sequence[str], boundaries: Sequence[Any]) -> Optional[TableSummary]:
+        self.round_trips += 1
+        response = requests.post(
+            f"{self.base_url}/rpc/{DIGEST_FUNCTION}",
+            headers=self.headers,
+            json={'p_table': self.table, 'p_columns': list(columns),
+                  'p_boundaries': [str(boundary) for boundary in boundaries]},
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            return None
+
+        summary = TableSummary(boundaries)
+        for row in response.json():
+            digest = ((row['hi'] & _MASK64) << 64) | (row['lo'] & _MASK64)
+            summary.add_bucket(row['bucket'], row['row_count'], digest)
+        return summary
+
+    def summarize(self, columns: Sequence[str], boundaries: Sequence[Any]) -> TableSummary:
+        if self.use_rpc:
+            summary = self._rpc_summary(columns, boundaries)
+            if summary is not None:
+                self.method = 'rpc'
+                return summary
+
+        self.method = 'scan'
+        summary = TableSummary(boundaries)
+        for record in self.iter_range(None, None, count_rows=False):
+            summary.add(record.get('id'), row_digest(record, columns))
+        return summary
+
+    def iter_range(self, lower: Optional[Any], upper: Optional[Any],
+                   count_rows: bool = True) -> Iterator[Dict[str, Any]]:
+        """Rows with lower <= id < upper, keyset-paged by id"""
+        last_id = None
+        while True:
+            params = [('select', '*'), ('order', 'id.asc'), ('limit', str(self.page_size))]
+            if lower is not None:
+                params.append(('id', f"gte.{lower}"))
+            if upper is not None:
+                params.append(('id', f"lt.{upper}"))
+            if last_id is not None:
+                params.append(('id', f"gt.{last_id}"))
+
+            self.round_trips += 1
+            response = requests.get(f"{self.base_url}/{self.table}", headers=self.headers,
+                                    params=params, timeout=self.timeout)
+            if response.status_code != 200:
+                raise RuntimeError(f"{self.table}: HTTP {response.status_code} reading live rows")
+
+            rows = response.json()
+            if count_rows:
+                self.rows_fetched += len(rows)
+            yield from rows
+
+            if len(rows) < self.page_size:
+                return
+            last_id = rows[-1]['id']
+
+    def fetch_buckets(self, summary: TableSummary, buckets: Sequence[int]) -> Iterator[Dict[str, Any]]:
+        ranges = []
+        for bucket in sorted(buckets):
+            if ranges and ranges[-1][1] == bucket - 1:
+                ranges[-1][1] = bucket
+            else:
+                ranges.append([bucket, bucket])
+
+        for first, last in ranges:
+            lower, _ = summary.bucket_range(first)
+            _, upper = summary.bucket_range(last)
+            yield from self.iter_range(lower, upper)
+
+
+class DriftEngine:
+    """Exact full-table drift between backup records and a live source"""
+
+    def __init__(self, rows_per_bucket: int = ROWS_PER_BUCKET,
+                 ignored_columns: Sequence[str] = IGNORED_COLUMNS, max_samples: int = 3):
+        self.rows_per_bucket = rows_per_bucket
+        self.ignored_columns = tuple(ignored_columns)
+        self.max_samples = max_samples
+
+    def compare(self, backup_records: List[Dict[str, Any]], live_source) -> Dict[str, Any]:
+        """
+        Compare a backup table with its live counterpart
+
+        Only buckets whose count or digest differ are fetched and compared
+        row by row, and that row comparison is authoritative: a bucket that
+        differs only because Postgres renders a value differently (jsonb,
+        timestamps) costs an extra fetch but is not reported as drift.
+        """
+        columns = compare_columns(backup_records, self.ignored_columns)
+        boundaries = bucket_boundaries((record.get('id') for record in backup_records), self.rows_per_bucket)
+
+        backup_summary = TableSummary(boundaries)
+        backup_digests = []
+        for record in backup_records:
+            digest = row_digest(record, columns)
+            backup_digests.append(digest)
+            backup_summary.add(record.get('id'), digest)
+
+        live_summary = live_source.summarize(columns, boundaries)
+        mismatched = backup_summary.mismatched(live_summary)
+
+        analysis = {
+            'backup_count': len(backup_records),
+            'live_count': live_summary.count,
+            'missing_in_live': 0,
+            'missing_in_backup': 0,
+            'modified_records': 0,
+            'drift_percentage': 0,
+            'sample_differences': [],
+            'method': live_source.method,
+            'root_match': backup_summary.root == live_summary.root,
+            'buckets': len(boundaries) + 1,
+            'mismatched_buckets': len(mismatched),
+            'rows_fetched': 0,
+            'round_trips': 0
+        }
+
+        if mismatched:
+            wanted = set(mismatched)
+            pending = {str(record.get('id', '')): (record, digest)
+                       for record, digest in zip(backup_records, backup_digests)
+                       if backup_summary.bucket_of(record.get('id')) in wanted}
+
+            for live_record in live_source.fetch_buckets(live_summary, mismatched):
+                backup_entry = pending.pop(str(live_record.get('id', '')), None)
+                if backup_entry is None:
+                    analysis['missing_in_backup'] += 1
+                    continue
+
+                backup_record, digest = backup_entry
+                if row_digest(live_record, columns) != digest:
+                    analysis['modified_records'] += 1
+                    if len(analysis['sample_differences']) < self.max_samples:
+                        analysis['sample_differences'].append({
+                            'id': str(backup_record.get('id', '')),
+                            'backup': {k: v for k, v in backup_record.items() if k not in self.ignored_columns},
+                            'live': {k: v for k, v in live_record.items() if k not in self.ignored_columns}
+                        })
+
+            analysis['missing_in_live'] = len(pending)
+
+        analysis['rows_fetched'] = live_source.rows_fetched
+        analysis['round_trips'] = live_source.round_trips
+
+        total_changes = analysis['missing_in_live'] + analysis['missing_in_backup'] + analysis['modified_records']
+        total_records = max(analysis['backup_count'], analysis['live_count'])
+        if total_records > 0:
+            analysis['drift_percentage'] = (total_changes / total_records) * 100
+
+        return analysis
@@ -0,0 +1,248 @@
+"""
+Health probes
+Concurrent health checks with dependencies, per-probe deadlines and a TTL result cache shared between processes
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+DEFAULT_PROBE_CACHE_PATH = "logs/health/probe_cache.sqlite3"
+FAILED_STATUSES = ('critical', 'error', 'failed')
+
+
+class Probe:
+    """A named health check, how long its result stays fresh and what it needs first"""
+
+    def __init__(self, name: str, check: Callable[[], Dict[str, Any]], ttl: float = 60,
+                 timeout: float = 30, depends_on: Sequence[str] = (), critical: bool = False):
+        self.name = name
+        self.check = check
+        self.ttl = ttl
+        self.timeout = timeout
+        self.depends_on = tuple(depends_on)
+        self.critical = critical
+
+
+def error_result(probe: Probe, message: str) -> Dict[str, Any]:
+    return {'status': 'error', 'error': message, 'metrics': {}, 'issues': [message]}
+
+
+def skipped_result(probe: Probe, reason: str) -> Dict[str, Any]:
+    return {'status': 'info', 'skipped': True, 'metrics': {}, 'issues': [reason]}
+
+
+class ProbeCache:
+    """Latest result per probe in SQLite, readable by every process that runs or shows health checks"""
+
+    def __init__(self, path: str = DEFAULT_PROBE_CACHE_PATH):
+        self.path = path
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS probe_results (
+                name TEXT PRIMARY KEY,
+                status TEXT,
+                result TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                duration_ms REAL
+            );
+        """)
+        self._conn.commit()
+
+    def put(self, name: str, result: Dict[str, Any], duration_ms: float, checked_at: Optional[float] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO probe_results (name, status, result, checked_at, duration_ms) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, result.get('status'), json.dumps(result, default=str),
+                 checked_at if checked_at is not None else time.time(), duration_ms))
+
+    def _entry(self, row) -> Dict[str, Any]:
+        name, result, checked_at, duration_ms = row
+        return {
+            'name': name,
+            'result': json.loads(result),
+            'checked_at': checked_at,
+            'age_seconds': time.time() - checked_at,
+            'duration_ms': duration_ms
+        }
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, result, checked_at, duration_ms FROM probe_results WHERE name = ?",
+                (name,)).fetchone()
+        return self._entry(row) if row else None
+
+    def all(self, prefix: str = '') -> Dict[str, Dict[str, Any]]:
+        """Every cached result, optionally only probe names starting with prefix"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, result, checked_at, duration_ms FROM probe_results "
+                "WHERE substr(name, 1, ?) = ? ORDER BY name", (len(prefix), prefix)).fetchall()
+        return {row[0]: self._entry(row) for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ProbeRunner:
+    """
+    Runs probes concurrently in dependency order
+
+    A probe starts as soon as its dependencies have results; if one of them
+    failed it is skipped instead of waiting out its own timeouts. Each probe
+    has its own deadline: a probe still running at its deadline is reported
+    as timed out and abandoned, and a late result still refreshes the cache.
+    Results younger than the probe's TTL come from the cache, so a full run
+    costs about as much as the slowest probe that is actually due.
+    """
+
+    def __init__(self, probes: Iterable[Probe], cache: Optional[ProbeCache] = None,
+                 failure_result: Callable[[Probe, str], Dict[str, Any]] = error_result,
+                 skip_result: Callable[[Probe, str], Dict[str, Any]] = skipped_result,
+                 failed_statuses: Sequence[str] = FAILED_STATUSES):
+        self.probes = {probe.name: probe for probe in probes}
+        self.cache = cache
+        self.failure_result = failure_result
+        self.skip_result = skip_result
+        self.failed_statuses = tuple(failed_statuses)
+
+        for probe in self.probes.values():
+            for dependency in probe.depends_on:
+                if dependency not in self.probes:
+                    raise ValueError(f"Probe {probe.name} depends on unknown probe {dependency}")
+        self._order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Probe dependency cycle through {name}")
+            visiting.add(name)
+            for dependency in self.probes[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.probes:
+            visit(name)
+        return order
+
+    def _selected(self, names: Optional[Iterable[str]]) -> List[str]:
+        if names is None:
+            return list(self._order)
+        wanted = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in self.probes:
+                raise ValueError(f"Unknown probe: {name}")
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(self.probes[name].depends_on)
+        return [name for name in self._order if name in wanted]
+
+    @staticmethod
+    def _annotate(result: Dict[str, Any], checked_at: float, duration_ms: float, cached: bool) -> Dict[str, Any]:
+        return dict(result,
+                    checked_at=datetime.fromtimestamp(checked_at, timezone.utc).isoformat(),
+                    duration_ms=round(duration_ms, 1),
+                    cached=cached)
+
+    def _execute(self, probe: Probe) -> Dict[str, Any]:
+        checked_at = time.time()
+        start = time.perf_counter()
+        try:
+            result = probe.check()
+        except Exception as e:
+            result = self.failure_result(probe, f"Check execution failed: {e}")
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if self.cache:
+            try:
+                self.cache.put(probe.name, result, duration_ms, checked_at)
+            except sqlite3.Error:
+                pass
+        return self._annotate(result, checked_at, duration_ms, cached=False)
+
+    def run(self, names: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Results of the named probes (and their dependencies), in dependency order"""
+        selected = self._selected(names)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        if self.cache and not force:
+            for name in selected:
+                entry = self.cache.get(name)
+                if entry and entry['age_seconds'] < self.probes[name].ttl:
+                    results[name] = self._annotate(entry['result'], entry['checked_at'],
+                                                   entry['duration_ms'] or 0, cached=True)
+
+        waiting = [name for name in selected if name not in results]
+        if not waiting:
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=len(waiting), thread_name_prefix='health-probe')
+        running = {}
+        try:
+            while waiting or running:
+                for name in list(waiting):
+                    probe = self.probes[name]
+                    if any(dependency not in results for dependency in probe.depends_on):
+                        continue
+                    waiting.remove(name)
+
+                    failed = [dependency for dependency in probe.depends_on
+                              if results[dependency]['status'] in self.failed_statuses]
+                    if failed:
+                        reason = f"Skipped: {failed[0]} is {results[failed[0]]['status']}"
+                        results[name] = self._annotate(self.skip_result(probe, reason), time.time(), 0, cached=False)
+                        continue
+
+                    running[executor.submit(self._execute, probe)] = (name, time.perf_counter())
+
+                if not running:
+                    continue
+
+                deadline = min(started + self.probes[name].timeout for name, started in running.values())
+                done, _ = wait(running, timeout=max(0, deadline - time.perf_counter()),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, _ = running.pop(future)
+                    results[name] = future.result()
+
+                now = time.perf_counter()
+                for future, (name, started) in list(running.items()):
+                    probe = self.probes[name]
+                    if now - started >= probe.timeout:
+                        del running[future]
+                        message = f"{name} timed out after {probe.timeout:g}s"
+                        results[name] = self._annotate(self.failure_result(probe, message), time.time(),
+                                                       (now - started) * 1000, cached=False)
+        finally:
+            # Timed-out probes keep their thread; never wait for them
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {name: results[name] for name in selected}
+
+
+def open_probe_cache(path: Optional[str] = None) -> ProbeCache:
+    """Open the shared probe cache at path, HEALTH_PROBE_CACHE_PATH or the default location"""
+    return ProbeCache(path or os.getenv('HEALTH_PROBE_CACHE_PATH', DEFAULT_PROBE_CACHE_PATH))
@@ -0,0 +1,278 @@
+"""
+Shared LLM call layer with a persistent content-keyed cache
+Caches chat completions in SQLite by (model, prompt hash, params hash)
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import setup_logger
+
+
+logger = setup_logger("llm_cache")
+
+DEFAULT_CACHE_PATH = "memory/llm_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 10000
+# Recency bumps from cache hits are written in batches of this size or age
+ACCESS_FLUSH_SIZE = 256
+ACCESS_FLUSH_SECONDS = 30.0
+
+
+def is_json_object(content: str) -> bool:
+    """Validator for callers that request response_format json_object"""
+    return isinstance(json.loads(content), dict)
+
+
+class LLMCache:
+    """
+    Size-bounded SQLite cache for LLM responses
+
+    Entries are keyed by model, a hash of the messages and a hash of the
+    remaining request parameters. When the cache grows past ``max_entries``
+    the least recently used 10% are evicted in one statement. Hits only
+    queue their recency bump in memory; bumps are written in one batch
+    before the next insert or eviction, every ACCESS_FLUSH_SIZE hits or
+    ACCESS_FLUSH_SECONDS, and at exit, so reads do not take the write lock
+    that other processes sharing the file need. Identical
+    calls that are in flight at the same time are coalesced so only one
+    request reaches the API. Only complete responses (finish_reason "stop")
+    that pass the caller's validator are stored, so a truncated or
+    malformed answer is retried on the next call instead of being replayed.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._pending_access: Dict[str, float] = {}
+        self._last_access_flush = time.monotonic()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'evictions': 0, 'rejected': 0}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                params_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def _hash(value: Any) -> str:
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def make_key(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, str]:
+        """Build the cache key parts for a request"""
+        prompt_hash = self._hash(messages)
+        params_hash = self._hash(params)
+        return {
+            'key': self._hash([model, prompt_hash, params_hash]),
+            'model': model,
+            'prompt_hash': prompt_hash,
+            'params_hash': params_hash
+        }
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response and queue a refresh of its recency"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._pending_access.pop(key, None)
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._entries -= 1
+                return None
+            self._pending_access[key] = now
+            if (len(self._pending_access) >= ACCESS_FLUSH_SIZE
+                    or time.monotonic() - self._last_access_flush >= ACCESS_FLUSH_SECONDS):
+                self._write_access()
+                self._conn.commit()
+            return row[0]
+
+    def _write_access(self):
+        """Write queued recency bumps (caller holds the lock and commits)"""
+        if self._pending_access:
+            self._conn.executemany("UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._pending_access.items()])
+            self._pending_access.clear()
+        self._last_access_flush = time.monotonic()
+
+    def flush(self):
+        """Write queued recency bumps now"""
+        with self._lock:
+            if self._pending_access:
+                self._write_access()
+                self._conn.commit()
+
+    def put(self, parts: Dict[str, str], response: str):
+        """Store a response, evicting least recently used entries if needed"""
+        now = time.time()
+        with self._lock:
+            # Eviction below must see the real recency of every hit
+            self._write_access()
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, prompt_hash, params_hash, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (parts['key'], parts['model'], parts['prompt_hash'], parts['params_hash'], response, now, now)
+            )
+            self._entries += cursor.rowcount if cursor.rowcount > 0 else 0
+
+            if self._entries > self.max_entries:
+                self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                excess = self._entries - self.max_entries
+                if excess > 0:
+                    evict = excess + max(1, self.max_entries // 10)
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)", (evict,)
+                    )
+                    self.stats['evictions'] += evict
+                    self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            self._conn.commit()
+
+    @staticmethod
+    def _cacheable(choice: Any, content: Optional[str], validate: Optional[Callable[[str], bool]]) -> bool:
+        """Whether a fresh response is complete and valid enough to be replayed"""
+        if content is None or getattr(choice, 'finish_reason', 'stop') != 'stop':
+            return False
+        if validate is None:
+            return True
+        try:
+            return bool(validate(content))
+        except Exception:
+            return False
+
+    def chat_completion(self, client: Any, model: str, messages: List[Dict[str, Any]],
+                        validate: Optional[Callable[[str], bool]] = None, **params) -> str:
+        """
+        Return the message content of a chat completion, served from cache when possible
+
+        Exceptions from the API are not cached and propagate to the caller so
+        existing fallbacks keep working. ``validate`` receives the content of
+        a fresh response; it is only cached when validate returns True (a
+        raised exception counts as invalid). The content is returned either way.
+        """
+        parts = self.make_key(model, messages, params)
+        key = parts['key']
+
+        cached = self.get(key)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            self.stats['coalesced'] += 1
+            return future.result()
+
+        try:
+            # Another caller may have finished between the lookup and taking ownership
+            cached = self.get(key)
+            if cached is not None:
+                self.stats['hits'] += 1
+                future.set_result(cached)
+                return cached
+
+            self.stats['misses'] += 1
+            response = client.chat.completions.create(model=model, messages=messages, **params)
+            choice = response.choices[0]
+            content = choice.message.content
+            if self._cacheable(choice, content, validate):
+                self.put(parts, content)
+            else:
+                self.stats['rejected'] += 1
+                logger.warning(f"Not caching {model} response "
+                               f"(finish_reason={getattr(choice, 'finish_reason', None)}, failed validation or empty)")
+            future.set_result(content)
+            return content
+        except Exception as e:
+            self.stats['errors'] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics for the current process"""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['coalesced']
+        return {
+            **self.stats,
+            'entries': self._entries,
+            'max_entries': self.max_entries,
+            'hit_rate': round((self.stats['hits'] + self.stats['coalesced']) / lookups, 4) if lookups else 0.0,
+            'path': self.path
+        }
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._entries = 0
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Get the process-wide LLM cache (configured from environment)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            ttl_days = os.getenv('LLM_CACHE_TTL_DAYS')
+            _cache = LLMCache(
+                path=os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH),
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', str(DEFAULT_MAX_ENTRIES))),
+                ttl_seconds=float(ttl_days) * 86400 if ttl_days else None
+            )
+            atexit.register(_cache.flush)
+            logger.info(f"LLM cache ready at {_cache.path} ({_cache._entries} entries)")
+        return _cache
+
+
+def cached_chat_completion(client: Any, model: str, messages: List[Dict[str, Any]],
+                           validate: Optional[Callable[[str], bool]] = None, **params) -> str:
+    """
+    Shared entry point for chat completions
+
+    Pass ``validate`` (e.g. is_json_object) so only usable responses are cached.
+    Set LLM_CACHE_DISABLED=true to bypass the cache (calls go straight to the API).
+    """
+    if os.getenv('LLM_CACHE_DISABLED', '').lower() == 'true':
+        response = client.chat.completions.create(model=model, messages=messages, **params)
+        return response.choices[0].message.content
+    return get_llm_cache().chat_completion(client, model, messages, validate=validate, **params)
@@ -0,0 +1,200 @@
+"""
+Streaming log archive codecs
+gzip by default, zstd (optionally with a trained dictionary) when zstandard is installed
+"""
+
+import glob
+import gzip
+import io
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+CODEC_SUFFIXES = {CODEC_GZIP: ".gz", CODEC_ZSTD: ".zst"}
+
+CHUNK_SIZE = 1024 * 1024
+DICTIONARY_DIR = "logs/compressed/dictionaries"
+DICTIONARY_SIZE = 112 * 1024
+DICTIONARY_SAMPLE_BYTES = 4096
+
+
+def compressed_suffix(codec: str) -> str:
+    return CODEC_SUFFIXES[codec]
+
+
+def is_compressed(path: str) -> bool:
+    return path.endswith(tuple(CODEC_SUFFIXES.values()))
+
+
+def _load_dictionary(dict_id: int, dictionary_dir: str = DICTIONARY_DIR):
+    with open(os.path.join(dictionary_dir, f"{dict_id}.dict"), 'rb') as f:
+        return zstandard.ZstdCompressionDict(f.read())
+
+
+def compress_file(source: str, target: str, codec: str = CODEC_GZIP, level: int = 6,
+                  dictionary_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Stream-compress one file in fixed-size chunks (bounded memory)
+
+    Writes to a temporary file and renames it into place, so a crash never
+    leaves a truncated archive. Safe to run on several worker threads at once.
+
+    Returns:
+        source, target, bytes_in, bytes_out, seconds
+    """
+    start = time.perf_counter()
+    tmp_target = f"{target}.tmp"
+
+    with open(source, 'rb') as f_in:
+        if codec == CODEC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is not installed")
+            dict_data = None
+            if dictionary_path:
+                with open(dictionary_path, 'rb') as f_dict:
+                    dict_data = zstandard.ZstdCompressionDict(f_dict.read())
+            compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data, write_checksum=True)
+            with open(tmp_target, 'wb') as f_out:
+                compressor.copy_stream(f_in, f_out, size=os.fstat(f_in.fileno()).st_size,
+                                       read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+        else:
+            with gzip.open(tmp_target, 'wb', compresslevel=level) as f_out:
+                while True:
+                    chunk = f_in.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f_out.write(chunk)
+
+    os.replace(tmp_target, target)
+
+    return {
+        'source': source,
+        'target': target,
+        'bytes_in': os.path.getsize(source),
+        'bytes_out': os.path.getsize(target),
+        'seconds': time.perf_counter() - start
+    }
+
+
+def train_dictionary(sample_files: List[str], dictionary_dir: str = DICTIONARY_DIR,
+                     size: int = DICTIONARY_SIZE, max_samples: int = 10000) -> Optional[str]:
+    """
+    Train a zstd dictionary on blocks of archived log lines
+
+    Dictionaries are stored by id so any archive can be decompressed later:
+    zstd records the dictionary id in each frame header.
+
+    Returns:
+        Path of the saved dictionary, or None if there was too little data
+    """
+    if not ZSTD_AVAILABLE:
+        return None
+
+    samples: List[bytes] = []
+    for path in sample_files:
+        with open(path, 'rb') as f:
+            while len(samples) < max_samples:
+                block = f.read(DICTIONARY_SAMPLE_BYTES)
+                if not block:
+                    break
+                samples.append(block)
+        if len(samples) >= max_samples:
+            break
+
+    if len(samples) < 10 or sum(len(sample) for sample in samples) < size * 2:
+        return None
+
+    dictionary = zstandard.train_dictionary(size, samples)
+    Path(dictionary_dir).mkdir(parents=True, exist_ok=True)
+    dictionary_path = os.path.join(dictionary_dir, f"{dictionary.dict_id()}.dict")
+    with open(dictionary_path, 'wb') as f:
+        f.write(dictionary.as_bytes())
+    return dictionary_path
+
+
+def latest_dictionary(dictionary_dir: str = DICTIONARY_DIR) -> Optional[str]:
+    """Most recently trained dictionary, if any"""
+    candidates = glob.glob(os.path.join(dictionary_dir, "*.dict"))
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+class _ForwardReader:
+    """
+    Line reader over a non-seekable decompression stream
+
+    Supports forward seeks by skipping decompressed bytes; a backward seek
+    reopens the stream.
+    """
+
+    def __init__(self, opener):
+        self._opener = opener
+        self._open()
+
+    def _open(self):
+        self._stream = io.BufferedReader(self._opener(), buffer_size=CHUNK_SIZE)
+        self._position = 0
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("only absolute seeks are supported")
+        if offset < self._position:
+            self._stream.close()
+            self._open()
+        while self._position < offset:
+            skipped = len(self._stream.read(min(CHUNK_SIZE, offset - self._position)))
+            if not skipped:
+                break
+            self._position += skipped
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self._position += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        line = self._stream.readline()
+        self._position += len(line)
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def open_archive(path: str, dictionary_dir: str = DICTIONARY_DIR):
+    """Open a plain, gzip or zstd log file for streaming binary reads"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.zst'):
+        if not ZSTD_AVAILABLE:
+            raise OSError(f"zstandard is not installed, cannot read {path}")
+        with open(path, 'rb') as f:
+            dict_id = zstandard.get_frame_parameters(f.read(18)).dict_id
+        decompressor = zstandard.ZstdDecompressor(
+            dict_data=_load_dictionary(dict_id, dictionary_dir) if dict_id else None
+        )
+        return _ForwardReader(lambda: decompressor.stream_reader(open(path, 'rb'), closefd=True))
+    return open(path, 'rb')
@@ -0,0 +1,406 @@
+"""
+Indexed queries over text log files
+Keeps per-file time ranges, checkpoints and level offsets in a sidecar index
+"""
+
+import argparse
+import bisect
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Union
+
+from utils.log_compression import is_compressed, open_archive
+from utils.logger import setup_logger
+
+
+logger = setup_logger("log_index")
+
+DEFAULT_INDEX_PATH = "logs/index/log_index.json"
+ARCHIVE_DIRS = ("logs/archive", "logs/compressed")
+
+INDEX_VERSION = 1
+CHECKPOINT_BYTES = 64 * 1024
+HEAD_BYTES = 256
+# Records are timestamped on creation but written in order, so allow a little skew
+ORDER_SLACK_SECONDS = 5.0
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# Levels rare enough to keep every offset for
+SPARSE_LEVELS = ("WARNING", "ERROR", "CRITICAL")
+
+_ARCHIVE_SUFFIX = re.compile(r'_\d{8}_\d{6}$')
+
+TimeBound = Union[datetime, float, None]
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one "timestamp - [component -] level - message" line
+
+    Returns None for continuation lines (tracebacks) and malformed lines.
+    Naive timestamps (logging's asctime) are local time.
+    """
+    parts = line.rstrip('\r\n').split(' - ', 3)
+    if len(parts) < 3:
+        return None
+
+    try:
+        timestamp = datetime.fromisoformat(parts[0].replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+    if parts[1] in LEVELS or len(parts) == 3:
+        component, level, message = None, parts[1], ' - '.join(parts[2:])
+    else:
+        component, level, message = parts[1], parts[2], parts[3]
+
+    return {
+        'epoch': timestamp.timestamp(),
+        'level': level,
+        'component': component,
+        'message': message
+    }
+
+
+def file_component(path: str) -> str:
+    """Component name of a log file: its stem without rotation timestamp"""
+    name = Path(path).name
+    for suffix in ('.gz', '.zst', '.log'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return _ARCHIVE_SUFFIX.sub('', name)
+
+
+def _to_epoch(value: TimeBound) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return value.timestamp()
+
+
+class LogIndex:
+    """
+    Sidecar index that lets log queries skip files and seek within them
+
+    For every indexed file the index stores its time range, level counts,
+    a sparse list of (time, offset) checkpoints every ``CHECKPOINT_BYTES``
+    and the offset of every WARNING/ERROR/CRITICAL line. Offsets in gzip
+    and zstd archives are uncompressed offsets, so an index built for a rotated
+    archive stays valid once log_manager compresses it.
+
+    Active files are indexed incrementally from where the last pass
+    stopped; a file that shrank or whose first bytes changed was rotated
+    and is re-indexed from the start.
+    """
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        self.index_path = index_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'files_indexed': 0, 'files_skipped': 0, 'bytes_indexed': 0, 'lines_scanned': 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.entries = data.get('files', {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable log index {self.index_path}, rebuilding: {e}")
+
+    def save(self):
+        """Persist the index atomically if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = Path(f"{self.index_path}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': INDEX_VERSION, 'files': self.entries}, f)
+            tmp_path.replace(self.index_path)
+            self._dirty = False
+
+    # Indexing
+
+    @staticmethod
+    def _head_hash(path: str) -> str:
+        with open_archive(path) as f:
+            return hashlib.sha1(f.read(HEAD_BYTES)).hexdigest()
+
+    def _new_entry(self, path: str, head: str) -> Dict[str, Any]:
+        return {
+            'component': file_component(path),
+            'head': head,
+            'indexed_bytes': 0,
+            'start': None,
+            'end': None,
+            'lines': 0,
+            'level_counts': {},
+            'components': [],
+            'checkpoints': [],
+            'level_offsets': {level: [] for level in SPARSE_LEVELS}
+        }
+
+    def _adopt_archive(self, path: str) -> Optional[Dict[str, Any]]:
+        """Reuse the entry of the uncompressed archive a compressed file was made from"""
+        original = Path(path).stem
+        for other_path, entry in list(self.entries.items()):
+            if Path(other_path).name == original and not os.path.exists(other_path):
+                del self.entries[other_path]
+                return entry
+        return None
+
+    def refresh(self, path: str) -> Optional[Dict[str, Any]]:
+        """Bring the index entry for one file up to date"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry is None and is_compressed(path):
+                entry = self._adopt_archive(path)
+                if entry is not None:
+                    entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime
+                    self.entries[path] = entry
+                    self._dirty = True
+
+            if entry is not None and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime:
+                self.stats['files_skipped'] += 1
+                return entry
+
+            head = self._head_hash(path)
+            if entry is None or is_compressed(path) or head != entry['head'] or stat.st_size < entry.get('size', 0):
+                # New, rotated or truncated file (compressed archives are never appended to)
+                entry = self._new_entry(path, head)
+
+            self._scan(path, entry)
+            entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime
+            self.entries[path] = entry
+            self._dirty = True
+            self.stats['files_indexed'] += 1
+            return entry
+
+    def _scan(self, path: str, entry: Dict[str, Any]):
+        offset = entry['indexed_bytes']
+        next_checkpoint = (entry['checkpoints'][-1][1] + CHECKPOINT_BYTES) if entry['checkpoints'] else 0
+        level_counts = entry['level_counts']
+        level_offsets = entry['level_offsets']
+
+        with open_archive(path) as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # Partial line still being written
+                line_offset = offset
+                offset += len(raw)
+                self.stats['lines_scanned'] += 1
+
+                parsed = parse_line(raw.decode('utf-8', errors='replace'))
+                if parsed is None:
+                    continue
+
+                epoch = parsed['epoch']
+                entry['lines'] += 1
+                if entry['start'] is None or epoch < entry['start']:
+                    entry['start'] = epoch
+                if entry['end'] is None or epoch > entry['end']:
+                    entry['end'] = epoch
+
+                if parsed['component'] and parsed['component'] not in entry['components']:
+                    entry['components'].append(parsed['component'])
+
+                level = parsed['level']
+                level_counts[level] = level_counts.get(level, 0) + 1
+                if level in level_offsets:
+                    level_offsets[level].append(line_offset)
+
+                if line_offset >= next_checkpoint:
+                    entry['checkpoints'].append([epoch, line_offset])
+                    next_checkpoint = line_offset + CHECKPOINT_BYTES
+
+        self.stats['bytes_indexed'] += offset - entry['indexed_bytes']
+        entry['indexed_bytes'] = offset
+
+    def prune(self):
+        """Drop entries for files that no longer exist"""
+        with self._lock:
+            for path in [path for path in self.entries if not os.path.exists(path)]:
+                del self.entries[path]
+                self._dirty = True
+
+    # Querying
+
+    @staticmethod
+    def expand(patterns: Union[str, Sequence[str]], include_archives: bool = True) -> List[str]:
+        """Files matching the patterns, plus rotated/compressed archives of them"""
+        if isinstance(patterns, str):
+            patterns = [patterns]
+
+        paths: List[str] = []
+        for pattern in patterns:
+            paths.extend(glob.glob(pattern))
+            if include_archives:
+                stem_pattern = Path(pattern).name
+                if stem_pattern.endswith('.log'):
+                    stem_pattern = stem_pattern[:-len('.log')]
+                for archive_dir in ARCHIVE_DIRS:
+                    paths.extend(glob.glob(os.path.join(archive_dir, f"{stem_pattern}_*.log")))
+                    paths.extend(glob.glob(os.path.join(archive_dir, f"{stem_pattern}_*.log.gz")))
+                    paths.extend(glob.glob(os.path.join(archive_dir, f"{stem_pattern}_*.log.zst")))
+
+        return sorted(set(paths))
+
+    def query(self, patterns: Union[str, Sequence[str]], start: TimeBound = None, end: TimeBound = None,
+              levels: Optional[Iterable[str]] = None, components: Optional[Iterable[str]] = None,
+              include_archives: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream log entries in [start, end] from files matching the patterns
+
+        Args:
+            patterns: Glob pattern(s) for active log files
+            start, end: Time window (datetime or epoch seconds), open if None
+            levels: Only these levels
+            components: Only these components (file stem or logger name field)
+            include_archives: Also search logs/archive and logs/compressed
+
+        Yields:
+            Dicts with timestamp (ISO, UTC), level, component, message and file
+        """
+        start_epoch, end_epoch = _to_epoch(start), _to_epoch(end)
+        level_set = {level.upper() for level in levels} if levels else None
+        component_set = set(components) if components else None
+
+        for path in self.expand(patterns, include_archives):
+            entry = self.refresh(path)
+            if entry is None or entry['lines'] == 0:
+                continue
+            if start_epoch is not None and entry['end'] < start_epoch - ORDER_SLACK_SECONDS:
+                continue
+            if end_epoch is not None and entry['start'] > end_epoch + ORDER_SLACK_SECONDS:
+                continue
+            if component_set and component_set.isdisjoint([entry['component']] + entry['components']):
+                continue
+            if level_set and not any(entry['level_counts'].get(level) for level in level_set):
+                continue
+
+            try:
+                yield from self._read_file(path, entry, start_epoch, end_epoch, level_set, component_set)
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to read log file {path}: {e}")
+
+        self.save()
+
+    def _read_file(self, path: str, entry: Dict[str, Any], start_epoch: Optional[float],
+                   end_epoch: Optional[float], level_set: Optional[Set[str]],
+                   component_set: Optional[Set[str]]) -> Iterator[Dict[str, Any]]:
+        def accept(parsed):
+            if parsed is None:
+                return False
+            if start_epoch is not None and parsed['epoch'] < start_epoch:
+                return False
+            if end_epoch is not None and parsed['epoch'] > end_epoch:
+                return False
+            if level_set and parsed['level'] not in level_set:
+                return False
+            component = parsed['component'] or entry['component']
+            return not component_set or component in component_set
+
+        def to_entry(parsed):
+            return {
+                'timestamp': datetime.fromtimestamp(parsed['epoch'], timezone.utc).isoformat(),
+                'level': parsed['level'],
+                'component': parsed['component'] or entry['component'],
+                'message': parsed['message'],
+                'file': path
+            }
+
+        with open_archive(path) as f:
+            if level_set and level_set.issubset(SPARSE_LEVELS):
+                # Seek straight to the indexed lines of the requested levels
+                offsets = sorted(offset for level in level_set for offset in entry['level_offsets'].get(level, ()))
+                for offset in offsets:
+                    f.seek(offset)
+                    parsed = parse_line(f.readline().decode('utf-8', errors='replace'))
+                    if accept(parsed):
+                        yield to_entry(parsed)
+                return
+
+            offset = 0
+            if start_epoch is not None and entry['checkpoints']:
+                times = [checkpoint[0] for checkpoint in entry['checkpoints']]
+                position = bisect.bisect_left(times, start_epoch - ORDER_SLACK_SECONDS) - 1
+                if position >= 0:
+                    offset = entry['checkpoints'][position][1]
+            f.seek(offset)
+
+            while offset < entry['indexed_bytes']:
+                raw = f.readline()
+                if not raw:
+                    break
+                offset += len(raw)
+                parsed = parse_line(raw.decode('utf-8', errors='replace'))
+                if parsed is not None and end_epoch is not None and parsed['epoch'] > end_epoch + ORDER_SLACK_SECONDS:
+                    break
+                if accept(parsed):
+                    yield to_entry(parsed)
+
+
+_index: Optional[LogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_log_index() -> LogIndex:
+    """Get the process-wide log index (path from LOG_INDEX_PATH)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LogIndex(os.getenv('LOG_INDEX_PATH', DEFAULT_INDEX_PATH))
+        return _index
+
+
+def main():
+    """CLI entry point for log queries"""
+    parser = argparse.ArgumentParser(description='Query log files through the sidecar index')
+    parser.add_argument('patterns', nargs='*', default=['logs/active/*.log'], help='Log file glob patterns')
+    parser.add_argument('--since', help='ISO start time')
+    parser.add_argument('--until', help='ISO end time')
+    parser.add_argument('--level', action='append', help='Only this level (repeatable)')
+    parser.add_argument('--component', action='append', help='Only this component (repeatable)')
+    parser.add_argument('--no-archives', action='store_true', help='Skip rotated and compressed archives')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the index before querying')
+
+    args = parser.parse_args()
+
+    index = get_log_index()
+    if args.rebuild:
+        index.entries = {}
+    index.prune()
+
+    count = 0
+    for entry in index.query(args.patterns,
+                             start=datetime.fromisoformat(args.since) if args.since else None,
+                             end=datetime.fromisoformat(args.until) if args.until else None,
+                             levels=args.level, components=args.component,
+                             include_archives=not args.no_archives):
+        print(f"{entry['timestamp']} - {entry['component']} - {entry['level']} - {entry['message']}")
+        count += 1
+
+    print(f"🔎 {count} entries ({index.stats['files_indexed']} files indexed, "
+          f"{index.stats['files_skipped']} unchanged)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,63 +3,302 @@ Logging configuration and utilities
 Provides structured logging for the entire application
 """
 
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
 
 
-def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
+DEFAULT_FILE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including structured context"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName
+        }
+        context = getattr(record, 'context', None)
+        if context:
+            entry['context'] = context
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text format with structured context appended"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        context = getattr(record, 'context', None)
+        if context:
+            message += f" | Context: {json.dumps(context, default=str)}"
+        return message
+
+
+class SamplingFilter(logging.Filter):
     """
-    Set up a logger with both console and file handlers
+    Per-logger sampling and rate limiting for records below WARNING
+    
+    Runs on the calling thread before the record is queued, so dropped
+    records cost a random draw and a counter update.
     """
-    logger = logging.getLogger(name)
     
-    # Don't add handlers if they already exist
-    if logger.handlers:
-        return logger
-    
-    # Set level
-    numeric_level = getattr(logging, level.upper(), logging.INFO)
-    logger.setLevel(numeric_level)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(numeric_level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler (if specified)
-    if log_file:
-        try:
-            # Create logs directory if it doesn't exist
-            log_path = Path(log_file)
-            log_path.parent.mkdir(parents=True, exist_ok=True)
+    def __init__(self, rate: float = 1.0, max_per_second: Optional[float] = None):
+        super().__init__()
+        self.rate = rate
+        self.max_per_second = max_per_second
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self._tokens = max_per_second or 0.0
+        self._last_refill = time.monotonic()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        
+        if self.rate < 1.0 and random.random() >= self.rate:
+            self.sampled_out += 1
+            return False
+        
+        if self.max_per_second:
+            now = time.monotonic()
+            self._tokens = min(self.max_per_second, self._tokens + (now - self._last_refill) * self.max_per_second)
+            self._last_refill = now
+            if self._tokens < 1:
+                self.rate_limited += 1
+                return False
+            self._tokens -= 1
+        
+        return True
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves layout, timestamps and tracebacks to the listener thread"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge %-args now so later mutation of the args cannot change the
+        # logged text; everything else is formatted by the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Console handler that always writes to the current sys.stdout"""
+    
+    def __init__(self):
+        logging.Handler.__init__(self)
+    
+    @property
+    def stream(self):
+        return sys.stdout
+
+
+class _DispatchHandler(logging.Handler):
+    """Listener-side handler routing records to shared and per-logger outputs"""
+    
+    def __init__(self):
+        super().__init__()
+        self.shared: List[logging.Handler] = []
+        self.per_logger: Dict[str, List[logging.Handler]] = {}
+    
+    def emit(self, record: logging.LogRecord):
+        for handler in self.shared:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        for handler in self.per_logger.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    
+    def flush(self):
+        for handler in self.shared + [h for handlers in self.per_logger.values() for h in handlers]:
+            handler.flush()
+
+
+class LoggingPipeline:
+    """
+    Process-wide logging pipeline
+    
+    Loggers obtained through get_logger() only enqueue records; a single
+    QueueListener thread formats them and writes the console, the shared
+    JSON lines file and any per-logger text files. Configuration comes from
+    the environment:
+    
+    - LOG_LEVEL: default level (INFO)
+    - LOG_JSON_FILE: shared JSON lines file, e.g. logs/angles.jsonl (off unless set)
+    - LOG_CONSOLE: write to stdout (true)
+    - LOG_SAMPLING: per-logger sample rates, e.g. "sync_service=0.1,token_vault=0.01"
+    - LOG_RATE_LIMITS: per-logger records/second, e.g. "sync_service=50"
+    """
+    
+    def __init__(self):
+        self.level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+        self.sampling = self._parse_mapping(os.getenv('LOG_SAMPLING', ''))
+        self.rate_limits = self._parse_mapping(os.getenv('LOG_RATE_LIMITS', ''))
+        
+        self.queue: queue.Queue = queue.Queue()
+        self.dispatch = _DispatchHandler()
+        self.filters: Dict[str, SamplingFilter] = {}
+        self._file_handlers: Dict[str, logging.Handler] = {}
+        self._lock = threading.Lock()
+        
+        if os.getenv('LOG_CONSOLE', 'true').lower() == 'true':
+            console = _ConsoleHandler()
+            console.setFormatter(TextFormatter(CONSOLE_FORMAT))
+            self.dispatch.shared.append(console)
+        
+        json_file = os.getenv('LOG_JSON_FILE', '')
+        if json_file:
+            try:
+                Path(json_file).parent.mkdir(parents=True, exist_ok=True)
+                json_handler = logging.handlers.RotatingFileHandler(
+                    json_file, maxBytes=50*1024*1024, backupCount=5, encoding='utf-8'
+                )
+                json_handler.setFormatter(JsonFormatter())
+                self.dispatch.shared.append(json_handler)
+            except OSError as e:
+                print(f"⚠️ JSON log file unavailable: {e}", file=sys.stderr)
+        
+        self.listener = logging.handlers.QueueListener(self.queue, self.dispatch, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop)
+    
+    @staticmethod
+    def _parse_mapping(value: str) -> Dict[str, float]:
+        mapping = {}
+        for item in value.split(','):
+            if '=' in item:
+                name, number = item.split('=', 1)
+                try:
+                    mapping[name.strip()] = float(number)
+                except ValueError:
+                    continue
+        return mapping
+    
+    def attach(self, logger: logging.Logger, level: Optional[int] = None,
+               log_file: Optional[str] = None, file_format: str = DEFAULT_FILE_FORMAT,
+               max_bytes: Optional[int] = None):
+        """Route a logger through the queue (idempotent)"""
+        with self._lock:
+            logger.setLevel(level if level is not None else self.level)
+            logger.propagate = False
             
-            # Use rotating file handler to manage log file size
-            file_handler = logging.handlers.RotatingFileHandler(
-                log_file,
-                maxBytes=10*1024*1024,  # 10MB
-                backupCount=5
-            )
-            file_handler.setLevel(numeric_level)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            if not any(isinstance(handler, LazyQueueHandler) for handler in logger.handlers):
+                for handler in logger.handlers[:]:
+                    logger.removeHandler(handler)
+                
+                queue_handler = LazyQueueHandler(self.queue)
+                sampling_filter = SamplingFilter(self.sampling.get(logger.name, 1.0),
+                                                 self.rate_limits.get(logger.name))
+                queue_handler.addFilter(sampling_filter)
+                self.filters[logger.name] = sampling_filter
+                logger.addHandler(queue_handler)
             
-        except Exception as e:
-            logger.warning(f"Failed to setup file logging: {e}")
+            if log_file:
+                key = str(Path(log_file).resolve())
+                if key not in self._file_handlers:
+                    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+                    if max_bytes:
+                        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=5)
+                    else:
+                        file_handler = logging.FileHandler(log_file)
+                    file_handler.setFormatter(TextFormatter(file_format))
+                    self._file_handlers[key] = file_handler
+                handlers = self.dispatch.per_logger.setdefault(logger.name, [])
+                if self._file_handlers[key] not in handlers:
+                    handlers.append(self._file_handlers[key])
+    
+    def flush(self):
+        """Block until every queued record has been written"""
+        self.queue.join()
+        self.dispatch.flush()
+    
+    def stop(self):
+        """Drain the queue and stop the listener thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+            self.dispatch.flush()
     
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and per-logger drop counters"""
+        return {
+            'queued': self.queue.qsize(),
+            'loggers': {
+                name: {'sampled_out': f.sampled_out, 'rate_limited': f.rate_limited}
+                for name, f in self.filters.items() if f.sampled_out or f.rate_limited
+            }
+        }
+
+
+_pipeline: Optional[LoggingPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_logging() -> LoggingPipeline:
+    """Create the process-wide logging pipeline (once)"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LoggingPipeline()
+        return _pipeline
+
+
+def get_logger(name: str, log_file: Optional[str] = None, level: Optional[str] = None,
+               file_format: str = DEFAULT_FILE_FORMAT, max_bytes: Optional[int] = None) -> logging.Logger:
+    """
+    Get a logger routed through the shared asynchronous pipeline
+    
+    Args:
+        name: Logger name (also the key for LOG_SAMPLING / LOG_RATE_LIMITS)
+        log_file: Optional per-logger text log file
+        level: Level name overriding LOG_LEVEL
+        file_format: Format of the per-logger text file
+        max_bytes: Rotate the per-logger file at this size
+    """
+    logger = logging.getLogger(name)
+    numeric_level = getattr(logging, level.upper(), None) if level else None
+    configure_logging().attach(logger, numeric_level, log_file, file_format, max_bytes)
     return logger
 
 
+def flush_logging():
+    """Wait until all queued log records are written"""
+    if _pipeline is not None:
+        _pipeline.flush()
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Pipeline queue depth and sampling/rate-limit drop counters"""
+    return _pipeline.stats() if _pipeline is not None else {}
+
+
+def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
+    """
+    Set up a logger with both console and file handlers
+    """
+    return get_logger(name, log_file=log_file, level=level, file_format=CONSOLE_FORMAT,
+                      max_bytes=10*1024*1024 if log_file else None)
+
+
 class OperationLogger:
     """Context manager for logging operations with timing"""
     
@@ -0,0 +1,405 @@
+"""
+Compact time-series metrics store
+Fixed-size ring buffers, log-linear latency histograms and SQLite rollups
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from utils.logger import setup_logger
+
+
+logger = setup_logger("metrics_store")
+
+DEFAULT_METRICS_PATH = "logs/optimization/metrics.sqlite3"
+DEFAULT_RING_CAPACITY = 1024
+DEFAULT_ROLLUP_SECONDS = 60
+DEFAULT_RETENTION_DAYS = 30
+
+
+class RingBuffer:
+    """
+    Fixed-capacity columnar ring buffer of floats
+
+    Appends overwrite the oldest row in O(1). Columns are NumPy arrays when
+    NumPy is installed and ``array('d')`` otherwise.
+    """
+
+    def __init__(self, fields: Iterable[str], capacity: int = DEFAULT_RING_CAPACITY):
+        self.fields = list(fields)
+        self.capacity = capacity
+        if NUMPY_AVAILABLE:
+            self._columns = {field: np.zeros(capacity, dtype=np.float64) for field in self.fields}
+        else:
+            self._columns = {field: array('d', bytes(8 * capacity)) for field in self.fields}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, **values: float):
+        for field in self.fields:
+            self._columns[field][self._next] = values.get(field, 0.0)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def column(self, field: str, last: Optional[int] = None) -> List[float]:
+        """Values of one column, oldest first (optionally only the last N)"""
+        count = self._size if last is None else min(last, self._size)
+        start = (self._next - count) % self.capacity
+        data = self._columns[field]
+        if start + count <= self.capacity:
+            values = data[start:start + count]
+        else:
+            values = list(data[start:]) + list(data[:self._next])
+        return [float(value) for value in values]
+
+    def rows(self, last: Optional[int] = None) -> List[Dict[str, float]]:
+        """Rows as dicts, oldest first"""
+        columns = {field: self.column(field, last) for field in self.fields}
+        return [dict(zip(self.fields, values)) for values in zip(*columns.values())]
+
+    def mean(self, field: str, last: Optional[int] = None) -> float:
+        values = self.column(field, last)
+        if not values:
+            return 0.0
+        if NUMPY_AVAILABLE:
+            return float(np.mean(values))
+        return sum(values) / len(values)
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of latencies in milliseconds
+
+    Values are recorded in microseconds. Each power of two is split into
+    ``2 ** sub_bucket_bits`` linear sub-buckets, giving a relative error of
+    at most ``2 ** -sub_bucket_bits`` (about 3% by default) at any scale with
+    a few hundred buckets. Histograms merge by adding counts, which is what
+    makes rollups over arbitrary windows exact.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 5):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.max_ms = 0.0
+        self.sum_ms = 0.0
+
+    def _index(self, value_us: int) -> int:
+        exponent = max(value_us.bit_length() - 1 - self.sub_bucket_bits, 0)
+        return (exponent << self.sub_bucket_bits) + (value_us >> exponent)
+
+    def _upper_bound_us(self, index: int) -> int:
+        exponent = max((index >> self.sub_bucket_bits) - 1, 0) if index >= (2 << self.sub_bucket_bits) else 0
+        mantissa = index - (exponent << self.sub_bucket_bits)
+        return ((mantissa + 1) << exponent) - 1
+
+    def record(self, value_ms: float, count: int = 1):
+        value_us = max(int(value_ms * 1000), 0)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum_ms += value_ms * count
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percent: float) -> float:
+        """Latency (ms) at or below which percent of values fall"""
+        if not self.total:
+            return 0.0
+        target = max(math.ceil(self.total * percent / 100.0), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper_bound_us(index) / 1000.0, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.total,
+            'mean_ms': round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 3)
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({'bits': self.sub_bucket_bits, 'counts': self.counts,
+                           'sum_ms': self.sum_ms, 'max_ms': self.max_ms})
+
+    @classmethod
+    def from_json(cls, data: str) -> 'LatencyHistogram':
+        payload = json.loads(data)
+        histogram = cls(payload['bits'])
+        histogram.counts = {int(index): count for index, count in payload['counts'].items()}
+        histogram.total = sum(histogram.counts.values())
+        histogram.sum_ms = payload['sum_ms']
+        histogram.max_ms = payload['max_ms']
+        return histogram
+
+
+class _TaskSeries:
+    """Live state for one task"""
+
+    FIELDS = ('timestamp', 'duration_ms', 'memory_delta_bytes', 'success')
+
+    def __init__(self, capacity: int):
+        self.ring = RingBuffer(self.FIELDS, capacity)
+        self.window = LatencyHistogram()
+        self.window_failures = 0
+        self.window_merged = False
+        self.lifetime = LatencyHistogram()
+
+
+class MetricsStore:
+    """
+    In-process task and system metrics with periodic SQLite persistence
+
+    Each task run lands in a per-task ring buffer (recent runs), a lifetime
+    histogram and the histogram of the current rollup window. Every
+    ``rollup_seconds`` the window histograms are written as one row per
+    task to ``task_rollups``, so history survives restarts at a fixed cost
+    per task per window. Rollups older than ``retention_days`` are pruned.
+    """
+
+    SYSTEM_FIELDS = ('timestamp', 'cpu_percent', 'memory_percent', 'disk_percent')
+
+    def __init__(self, path: Optional[str] = DEFAULT_METRICS_PATH, ring_capacity: int = DEFAULT_RING_CAPACITY,
+                 rollup_seconds: int = DEFAULT_ROLLUP_SECONDS, retention_days: int = DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self.ring_capacity = ring_capacity
+        self.rollup_seconds = rollup_seconds
+        self.retention_days = retention_days
+
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, _TaskSeries] = {}
+        self.system = RingBuffer(self.SYSTEM_FIELDS, ring_capacity)
+        self._window_start = self._window_for(time.time())
+
+        self._conn = None
+        if path:
+            if path != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_rollups (
+                    task TEXT NOT NULL,
+                    window_start REAL NOT NULL,
+                    window_seconds INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    failures INTEGER NOT NULL,
+                    p50_ms REAL NOT NULL,
+                    p95_ms REAL NOT NULL,
+                    p99_ms REAL NOT NULL,
+                    max_ms REAL NOT NULL,
+                    histogram TEXT NOT NULL,
+                    PRIMARY KEY (task, window_start)
+                )
+            """)
+            self._conn.commit()
+
+    def _window_for(self, timestamp: float) -> float:
+        return timestamp - (timestamp % self.rollup_seconds)
+
+    # Recording
+
+    def record_task(self, task: str, duration_ms: float, success: bool = True,
+                    memory_delta_bytes: float = 0.0, timestamp: Optional[float] = None):
+        """Record one task run"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._window_for(timestamp) != self._window_start:
+                self._rollup_locked()
+                self._window_start = self._window_for(timestamp)
+
+            series = self._tasks.get(task)
+            if series is None:
+                series = self._tasks[task] = _TaskSeries(self.ring_capacity)
+            series.ring.append(timestamp=timestamp, duration_ms=duration_ms,
+                               memory_delta_bytes=memory_delta_bytes, success=1.0 if success else 0.0)
+            series.window.record(duration_ms)
+            series.lifetime.record(duration_ms)
+            if not success:
+                series.window_failures += 1
+
+    def record_system(self, cpu_percent: float, memory_percent: float, disk_percent: float,
+                      timestamp: Optional[float] = None):
+        """Record one system resource sample"""
+        with self._lock:
+            self.system.append(timestamp=time.time() if timestamp is None else timestamp,
+                               cpu_percent=cpu_percent, memory_percent=memory_percent, disk_percent=disk_percent)
+
+    # Persistence
+
+    def _rollup_locked(self, reset: bool = True):
+        """
+        Write the current window of every task
+
+        The window keeps accumulating until it closes (reset=True), so an
+        early flush is simply overwritten by the complete row later. Rows
+        left for the same window by an earlier process are merged in once.
+        """
+        if self._conn is None:
+            if reset:
+                for series in self._tasks.values():
+                    series.window, series.window_failures = LatencyHistogram(), 0
+            return
+
+        try:
+            rows = []
+            for task, series in self._tasks.items():
+                if not series.window.total:
+                    continue
+                if not series.window_merged:
+                    existing = self._conn.execute(
+                        "SELECT failures, histogram FROM task_rollups WHERE task = ? AND window_start = ?",
+                        (task, self._window_start)
+                    ).fetchone()
+                    if existing:
+                        series.window.merge(LatencyHistogram.from_json(existing[1]))
+                        series.window_failures += existing[0]
+                    series.window_merged = True
+
+                summary = series.window.summary()
+                rows.append((task, self._window_start, self.rollup_seconds, summary['count'],
+                             series.window_failures, summary['p50_ms'], summary['p95_ms'], summary['p99_ms'],
+                             summary['max_ms'], series.window.to_json()))
+                if reset:
+                    series.window, series.window_failures = LatencyHistogram(), 0
+                    series.window_merged = False
+
+            if rows:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO task_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute("DELETE FROM task_rollups WHERE window_start < ?",
+                                   (time.time() - self.retention_days * 86400,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"❌ Failed to persist metrics rollup: {e}")
+
+    def flush(self):
+        """Persist the current window now (e.g. on shutdown)"""
+        with self._lock:
+            self._rollup_locked(reset=False)
+
+    # Queries
+
+    def tasks(self) -> List[str]:
+        with self._lock:
+            return sorted(self._tasks)
+
+    def persisted_tasks(self) -> List[str]:
+        """Tasks with persisted rollups (from any process writing this store)"""
+        if self._conn is None:
+            return []
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT task FROM task_rollups ORDER BY task")]
+
+    def recent_runs(self, task: str, last: int = 10) -> List[Dict[str, Any]]:
+        """Most recent runs of a task, oldest first"""
+        with self._lock:
+            series = self._tasks.get(task)
+            if series is None:
+                return []
+            return [{
+                'timestamp': row['timestamp'],
+                'duration_ms': row['duration_ms'],
+                'memory_delta_bytes': int(row['memory_delta_bytes']),
+                'success': bool(row['success'])
+            } for row in series.ring.rows(last)]
+
+    def task_summary(self, task: str) -> Dict[str, float]:
+        """Lifetime latency percentiles of a task in this process"""
+        with self._lock:
+            series = self._tasks.get(task)
+            return series.lifetime.summary() if series else LatencyHistogram().summary()
+
+    def system_means(self, last: int = 10) -> Dict[str, float]:
+        """Mean of the last N system samples"""
+        with self._lock:
+            return {field: self.system.mean(field, last) for field in self.SYSTEM_FIELDS[1:]}
+
+    def query_task_latency(self, task: str, since: Optional[float] = None, until: Optional[float] = None,
+                           resolution_seconds: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Latency over time for a task from persisted rollups
+
+        Args:
+            task: Task name
+            since, until: Epoch seconds bounds on window start
+            resolution_seconds: Merge rollups into buckets of this size
+
+        Returns:
+            One dict per bucket: window_start, count, failures, p50/p95/p99/max_ms
+        """
+        if self._conn is None:
+            return []
+
+        query = "SELECT window_start, failures, histogram FROM task_rollups WHERE task = ?"
+        params: List[Any] = [task]
+        if since is not None:
+            query += " AND window_start >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND window_start <= ?"
+            params.append(until)
+        query += " ORDER BY window_start"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        resolution = max(resolution_seconds or self.rollup_seconds, 1)
+        buckets: Dict[float, Dict[str, Any]] = {}
+        for window_start, failures, histogram_json in rows:
+            key = window_start - (window_start % resolution)
+            bucket = buckets.setdefault(key, {'histogram': LatencyHistogram(), 'failures': 0})
+            bucket['histogram'].merge(LatencyHistogram.from_json(histogram_json))
+            bucket['failures'] += failures
+
+        return [{
+            'window_start': key,
+            'failures': bucket['failures'],
+            **bucket['histogram'].summary()
+        } for key, bucket in sorted(buckets.items())]
+
+    def close(self):
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def open_metrics_store(path: Optional[str] = None) -> MetricsStore:
+    """Metrics store at METRICS_STORE_PATH (or the given path)"""
+    return MetricsStore(
+        path or os.getenv('METRICS_STORE_PATH', DEFAULT_METRICS_PATH),
+        ring_capacity=int(os.getenv('METRICS_RING_CAPACITY', str(DEFAULT_RING_CAPACITY))),
+        rollup_seconds=int(os.getenv('METRICS_ROLLUP_SECONDS', str(DEFAULT_ROLLUP_SECONDS))),
+        retention_days=int(os.getenv('METRICS_RETENTION_DAYS', str(DEFAULT_RETENTION_DAYS)))
+    )
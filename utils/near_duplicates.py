@@ -0,0 +1,377 @@
+"""
+Local near-duplicate detection for decisions
+MinHash signatures with LSH banding over the full decision_vault corpus
+"""
+
+import argparse
+import atexit
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from utils.logger import setup_logger
+
+
+logger = setup_logger("near_duplicates")
+
+DEFAULT_INDEX_PATH = "memory/indexes/duplicate_index.json"
+DEFAULT_THRESHOLD = 0.6
+DUPLICATE_SCORE = 0.9
+# Journaled additions folded into the snapshot file once this many have accumulated
+JOURNAL_COMPACT_EVERY = 500
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class NearDuplicateIndex:
+    """
+    Incrementally maintained MinHash/LSH index of decision texts
+
+    Texts are reduced to character shingles and summarised by ``num_perm``
+    MinHash values. Signatures are split into ``bands`` bands; decisions that
+    share any band bucket become candidates and are scored by the fraction of
+    matching signature values (an estimate of Jaccard similarity). More bands
+    find weaker matches at the cost of more candidates: the LSH sensitivity
+    threshold is roughly ``(1 / bands) ** (bands / num_perm)``.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 5,
+                 threshold: float = DEFAULT_THRESHOLD, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+        self._lock = threading.RLock()
+        self.journaled = 0
+        self._signatures: Dict[str, array] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, decision_id: str) -> bool:
+        return str(decision_id) in self._signatures
+
+    def _shingles(self, text: str) -> Set[str]:
+        normalized = ' '.join(_TOKEN_PATTERN.findall(text.lower()))
+        if len(normalized) <= self.shingle_size:
+            return {normalized} if normalized else set()
+        return {normalized[i:i + self.shingle_size] for i in range(len(normalized) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> array:
+        """MinHash signature of a text"""
+        hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+                  for shingle in self._shingles(text)]
+        if not hashes:
+            return array('I', [_MAX_HASH] * self.num_perm)
+        return array('I', [min([(a * h + b) % _MERSENNE_PRIME for h in hashes]) & _MAX_HASH
+                           for a, b in self._perms])
+
+    def _band_keys(self, signature: array) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, decision_id: str, text: str):
+        """Index (or re-index) one decision"""
+        self._insert(str(decision_id), self.signature(text or ''))
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Index decision records ({'id', 'decision'}); returns number indexed"""
+        count = 0
+        for record in records:
+            text = record.get('decision', record.get('text', ''))
+            if record.get('id') is not None and text:
+                self.add(record['id'], text)
+                count += 1
+        return count
+
+    def _insert(self, decision_id: str, signature: array):
+        with self._lock:
+            self.remove(decision_id)
+            self._signatures[decision_id] = signature
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                band.setdefault(key, set()).add(decision_id)
+
+    def remove(self, decision_id: str):
+        """Drop a decision from the index"""
+        decision_id = str(decision_id)
+        with self._lock:
+            signature = self._signatures.pop(decision_id, None)
+            if signature is None:
+                return
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                bucket = band.get(key)
+                if bucket is not None:
+                    bucket.discard(decision_id)
+                    if not bucket:
+                        del band[key]
+
+    def _similarity(self, left: array, right: array) -> float:
+        return sum(1 for x, y in zip(left, right) if x == y) / self.num_perm
+
+    def query_signature(self, signature: array, threshold: Optional[float] = None, limit: int = 10,
+                        exclude_id: Optional[str] = None,
+                        candidate_ids: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Decisions whose estimated similarity to the signature reaches threshold"""
+        threshold = self.threshold if threshold is None else threshold
+
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(band.get(key, ()))
+            candidates.discard(exclude_id)
+            if candidate_ids is not None:
+                candidates &= candidate_ids
+
+            scored = []
+            for decision_id in candidates:
+                score = self._similarity(signature, self._signatures[decision_id])
+                if score >= threshold:
+                    scored.append((score, decision_id))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [{
+            'id': decision_id,
+            'similarity_score': round(score, 3),
+            'reason': f"MinHash Jaccard estimate {score:.2f}",
+            'overlap_type': 'duplicate' if score >= DUPLICATE_SCORE else 'related'
+        } for score, decision_id in scored[:limit]]
+
+    def query(self, text: str, threshold: Optional[float] = None, limit: int = 10,
+              exclude_id: Optional[str] = None, candidate_ids: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Decisions similar to a text across the whole index"""
+        return self.query_signature(self.signature(text or ''), threshold, limit, exclude_id, candidate_ids)
+
+    def similar_to(self, decision_id: str, threshold: Optional[float] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Decisions similar to an already indexed decision"""
+        decision_id = str(decision_id)
+        signature = self._signatures.get(decision_id)
+        if signature is None:
+            return []
+        return self.query_signature(signature, threshold, limit, exclude_id=decision_id)
+
+    def get_signature(self, decision_id: str) -> Optional[array]:
+        """Stored signature of an indexed decision, if any"""
+        return self._signatures.get(str(decision_id))
+
+    def save(self, path: str = DEFAULT_INDEX_PATH):
+        """Persist signatures atomically (buckets are rebuilt on load) and drop the journal"""
+        with self._lock:
+            data = {
+                'index_type': 'minhash_lsh',
+                'version': '1.0.0',
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+                'params': {'num_perm': self.num_perm, 'bands': self.bands,
+                           'shingle_size': self.shingle_size, 'seed': self.seed},
+                'signatures': {decision_id: base64.b64encode(signature.tobytes()).decode('ascii')
+                               for decision_id, signature in self._signatures.items()}
+            }
+
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = Path(f"{path}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            tmp_path.replace(path)
+            Path(f"{path}.journal").unlink(missing_ok=True)
+
+    def append_journal(self, path: str, decision_ids: Iterable[str]):
+        """Append the current signatures of decision_ids to the index journal (O(1) per decision)"""
+        with self._lock:
+            lines = [json.dumps({'id': decision_id,
+                                 'signature': base64.b64encode(self._signatures[decision_id].tobytes()).decode('ascii')})
+                     for decision_id in map(str, decision_ids) if decision_id in self._signatures]
+            if not lines:
+                return
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(f"{path}.journal", 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+
+    def _replay_journal(self, path: str) -> int:
+        replayed = 0
+        try:
+            with open(f"{path}.journal", 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A torn final line from an interrupted append
+                    signature = array('I')
+                    signature.frombytes(base64.b64decode(entry['signature']))
+                    self._insert(entry['id'], signature)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return replayed
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH, threshold: float = DEFAULT_THRESHOLD) -> 'NearDuplicateIndex':
+        """Load a saved index plus its journal, or return an empty one if missing or unreadable"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = None
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load duplicate index {path}, starting empty: {e}")
+            return cls(threshold=threshold)
+
+        index = cls(threshold=threshold, **(data['params'] if data else {}))
+        for decision_id, encoded in (data or {}).get('signatures', {}).items():
+            signature = array('I')
+            signature.frombytes(base64.b64decode(encoded))
+            index._insert(decision_id, signature)
+        index.journaled = index._replay_journal(path)
+        return index
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_path: Optional[str] = None
+_index_lock = threading.Lock()
+
+
+def get_index_path() -> str:
+    return os.getenv('DUPLICATE_INDEX_PATH', DEFAULT_INDEX_PATH)
+
+
+def get_duplicate_index() -> NearDuplicateIndex:
+    """Get the process-wide duplicate index (loaded from disk on first use or when the path changes)"""
+    global _index, _index_path
+    with _index_lock:
+        path = get_index_path()
+        if _index is None or _index_path != path:
+            flush_index()
+            _index = NearDuplicateIndex.load(
+                path,
+                threshold=float(os.getenv('DUPLICATE_THRESHOLD', str(DEFAULT_THRESHOLD)))
+            )
+            _index_path = path
+            logger.info(f"🔎 Duplicate index ready ({len(_index)} decisions)")
+        return _index
+
+
+def index_decisions(records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Add written decision_vault rows ({'id', 'decision'}) to the shared index
+
+    Called from every path that writes decisions. Changed signatures are
+    appended to a journal next to the index file; the full snapshot is only
+    rewritten every JOURNAL_COMPACT_EVERY additions and at exit. Failures
+    are logged, never raised, so indexing cannot fail the write itself.
+    Returns the number of decisions whose signature changed.
+    """
+    try:
+        index = get_duplicate_index()
+        path = get_index_path()
+        changed = []
+        with index._lock:
+            for record in records:
+                decision_id = record.get('id')
+                text = record.get('decision', record.get('text', ''))
+                if decision_id is None or not text:
+                    continue
+                signature = index.signature(text)
+                if index.get_signature(decision_id) != signature:
+                    index._insert(str(decision_id), signature)
+                    changed.append(str(decision_id))
+            if not changed:
+                return 0
+
+            index.append_journal(path, changed)
+            index.journaled += len(changed)
+            if index.journaled >= JOURNAL_COMPACT_EVERY:
+                index.save(path)
+                index.journaled = 0
+        return len(changed)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to update duplicate index: {e}")
+        return 0
+
+
+def index_decision(decision_id: str, text: str) -> bool:
+    """Add one stored decision to the shared index (see index_decisions)"""
+    return index_decisions([{'id': decision_id, 'decision': text}]) > 0
+
+
+@atexit.register
+def flush_index():
+    """Fold journaled additions into the snapshot file"""
+    index = _index
+    if index is None or not index.journaled or not Path(f"{_index_path}.journal").exists():
+        return
+    try:
+        index.save(_index_path)
+        index.journaled = 0
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to compact duplicate index: {e}")
+
+
+def rebuild_index() -> NearDuplicateIndex:
+    """
+    Rebuild the shared index from every decision_vault row
+
+    Scheduled daily by scheduler.py: rows written outside the indexed write
+    paths (SQL consoles, other tools, deletes) only reach the index here.
+    """
+    global _index, _index_path
+    from sync.supabase_client import SupabaseClient
+
+    index = NearDuplicateIndex(threshold=float(os.getenv('DUPLICATE_THRESHOLD', str(DEFAULT_THRESHOLD))))
+    for batch in SupabaseClient().iter_record_batches():
+        index.add_many(batch)
+
+    index.save(get_index_path())
+    with _index_lock:
+        _index = index
+        _index_path = get_index_path()
+    logger.info(f"✅ Duplicate index rebuilt ({len(index)} decisions)")
+    return index
+
+
+def main():
+    """CLI entry point for the duplicate index"""
+    parser = argparse.ArgumentParser(description='Near-duplicate decision index')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from decision_vault')
+    parser.add_argument('--query', metavar='TEXT', help='Find decisions similar to TEXT')
+    parser.add_argument('--similar-to', metavar='ID', help='Find decisions similar to an indexed decision')
+    parser.add_argument('--threshold', type=float, help='Minimum estimated similarity')
+
+    args = parser.parse_args()
+
+    index = rebuild_index() if args.rebuild else get_duplicate_index()
+
+    if args.query:
+        matches = index.query(args.query, threshold=args.threshold)
+    elif args.similar_to:
+        matches = index.similar_to(args.similar_to, threshold=args.threshold)
+    else:
+        print(f"🔎 {len(index)} decisions indexed")
+        return 0
+
+    for match in matches:
+        print(f"  {match['similarity_score']:.2f}  {match['overlap_type']:<9}  {match['id']}")
+    print(f"🔎 {len(matches)} similar decisions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Segmented append-only spool for queueing records on disk
+Crash-safe replacement for rewriting whole JSON queue files
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from utils.logger import setup_logger
+
+
+logger = setup_logger("spool")
+
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_NEVER = "never"
+
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILE = "cursor.json"
+LOCK_FILE = ".lock"
+
+# Position in the spool: (segment number, byte offset)
+Position = Tuple[int, int]
+
+
+class Spool:
+    """
+    Append-only, segmented on-disk queue with a single consumer cursor
+
+    Records are JSON lines appended to numbered segment files; the active
+    segment is rotated once it reaches ``segment_bytes``. Readers get a
+    batch plus the position after it and ``commit`` that position once the
+    batch has been handled, so a crash replays at most the uncommitted
+    batch (at-least-once delivery). Segments behind the cursor are deleted
+    on commit.
+
+    fsync policies: ``always`` syncs every append, ``interval`` at most every
+    ``fsync_interval`` seconds, ``never`` leaves flushing to the OS. A torn
+    final line left by a crash is truncated when the spool is reopened.
+
+    Several processes may share one spool directory: every operation holds
+    an flock on the directory's lock file, re-reads the shared cursor and
+    follows rotations made by other processes. Appends are flushed before
+    the lock is released, so a partial line seen under the lock can only
+    come from a crashed writer.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 4 * 1024 * 1024,
+                 fsync: str = FSYNC_INTERVAL, fsync_interval: float = 1.0):
+        if fsync not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._last_fsync = 0.0
+        self.stats_counters = {'appended': 0, 'committed': 0, 'corrupt': 0, 'rotations': 0}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._active = 0
+        with self._locked():
+            self.cursor: Position = self._load_cursor()
+            self._recover()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the spool across threads and processes"""
+        with self._lock:
+            if not fcntl:
+                yield
+                return
+            with open(self.directory / LOCK_FILE, 'w') as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Pick up the cursor and rotations written by other processes (lock held)"""
+        self.cursor = self._load_cursor()
+        segments = self._segments()
+        latest = segments[-1] if segments else max(self.cursor[0], self._active, 1)
+        if latest != self._active or not self._segment_path(self._active).exists():
+            self._open_segment(latest)
+
+    # Segment helpers
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"{number:020d}{SEGMENT_SUFFIX}"
+
+    def _segments(self) -> List[int]:
+        return sorted(int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _load_cursor(self) -> Position:
+        try:
+            with open(self.directory / CURSOR_FILE, 'r') as f:
+                data = json.load(f)
+            return int(data['segment']), int(data['offset'])
+        except FileNotFoundError:
+            return 0, 0
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable spool cursor in {self.directory}, replaying from start: {e}")
+            return 0, 0
+
+    def _save_cursor(self, position: Position):
+        tmp_path = self.directory / f"{CURSOR_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'segment': position[0], 'offset': position[1]}, f)
+            f.flush()
+            if self.fsync != FSYNC_NEVER:
+                os.fsync(f.fileno())
+        tmp_path.replace(self.directory / CURSOR_FILE)
+
+    def _recover(self):
+        """Drop a torn trailing record and open the active segment"""
+        segments = self._segments()
+        if not segments:
+            self._open_segment(max(self.cursor[0], 1))
+            return
+
+        active = self._segment_path(segments[-1])
+        with open(active, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                logger.warning(f"⚠️ Truncating torn record at end of {active.name}")
+                f.truncate(end)
+
+        self._open_segment(segments[-1])
+
+    def _open_segment(self, number: int):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._active = number
+        self._file = open(self._segment_path(number), 'ab')
+
+    def _sync(self, force: bool = False):
+        self._file.flush()
+        now = time.monotonic()
+        if self.fsync == FSYNC_ALWAYS or (force and self.fsync != FSYNC_NEVER) or \
+                (self.fsync == FSYNC_INTERVAL and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    # Producer API
+
+    def append(self, record: Dict[str, Any]):
+        """Append one record"""
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        """Append records in one write"""
+        payload = b''.join(json.dumps(record, default=str).encode('utf-8') + b'\n' for record in records)
+        if not payload:
+            return
+
+        with self._locked():
+            self._refresh()
+            self._file.write(payload)
+            self.stats_counters['appended'] += payload.count(b'\n')
+            self._sync()
+
+            if self._file.tell() >= self.segment_bytes:
+                self._sync(force=True)
+                self._open_segment(self._active + 1)
+                self.stats_counters['rotations'] += 1
+
+    # Consumer API
+
+    def read_batch(self, max_records: int = 100) -> Tuple[List[Dict[str, Any]], Position]:
+        """
+        Read up to max_records after the cursor without consuming them
+
+        Returns:
+            (records, position) - pass position to commit() once handled
+        """
+        records: List[Dict[str, Any]] = []
+
+        with self._locked():
+            self._refresh()
+            segment, offset = self.cursor
+
+            for number in self._segments():
+                if number < segment:
+                    continue
+                if number > segment:
+                    segment, offset = number, 0
+
+                with open(self._segment_path(number), 'rb') as f:
+                    f.seek(offset)
+                    while len(records) < max_records:
+                        line = f.readline()
+                        if not line.endswith(b'\n'):
+                            break  # End of segment (or record still being written)
+                        offset += len(line)
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            self.stats_counters['corrupt'] += 1
+
+                if len(records) >= max_records:
+                    break
+
+        return records, (segment, offset)
+
+    def commit(self, position: Position):
+        """Advance the cursor (never backwards past another consumer) and delete consumed segments"""
+        with self._locked():
+            self._refresh()
+            committed = position > self.cursor
+            if committed:
+                self.cursor = position
+                self._save_cursor(position)
+                self.stats_counters['committed'] += 1
+            self._compact_locked()
+
+    def compact(self):
+        """Delete consumed segments and start fresh if everything was consumed"""
+        with self._locked():
+            self._refresh()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        segment, offset = self.cursor
+
+        for number in self._segments():
+            if number < segment:
+                self._segment_path(number).unlink()
+
+        # Active segment fully consumed: rotate so its space can be reclaimed
+        if segment == self._active and offset > 0 and offset >= self._segment_path(segment).stat().st_size:
+            self._open_segment(self._active + 1)
+            self._segment_path(segment).unlink()
+            self.cursor = (self._active, 0)
+            self._save_cursor(self.cursor)
+
+    # Introspection
+
+    def pending_bytes(self) -> int:
+        """Bytes appended but not yet committed"""
+        with self._locked():
+            self._refresh()
+            segment, offset = self.cursor
+            total = 0
+            for number in self._segments():
+                if number >= segment:
+                    size = self._segment_path(number).stat().st_size
+                    total += size - offset if number == segment else size
+            return max(total, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Spool counters and on-disk footprint"""
+        return {
+            **self.stats_counters,
+            'segments': len(self._segments()),
+            'pending_bytes': self.pending_bytes(),
+            'cursor': list(self.cursor),
+            'fsync': self.fsync
+        }
+
+    def flush(self):
+        """Force appended records to disk (subject to the fsync policy)"""
+        with self._lock:
+            if self._file is not None:
+                self._sync(force=True)
+
+    def close(self):
+        """Flush and close the active segment"""
+        with self._lock:
+            if self._file is not None:
+                self._sync(force=True)
+                self._file.close()
+                self._file = None
@@ -0,0 +1,283 @@
+"""
+Streaming archive restore
+Selective restore straight from zip members with on-the-fly checksums, and incremental JSON array parsing
+"""
+
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+
+CHUNK_SIZE = 1024 * 1024
+JSON_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = ' \t\n\r'
+
+
+class ChecksumMismatch(Exception):
+    """A restored member does not match its recorded SHA-256"""
+
+
+def matches(name: str, patterns: Optional[Iterable[str]]) -> bool:
+    """
+    True when a member name matches any glob; None matches everything
+
+    A pattern ending in '/' selects a whole directory.
+    """
+    if patterns is None:
+        return True
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            if name.startswith(pattern):
+                return True
+        elif fnmatch.fnmatchcase(name, pattern):
+            return True
+    return False
+
+
+# Incremental JSON
+
+class _JsonStream:
+    """Text buffer over a stream that only keeps the unconsumed tail"""
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, '' at end of input"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON input, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def array(self) -> Iterator[Any]:
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+
+
+def iter_json_array(stream: TextIO, key: Optional[str] = None,
+                    chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the items of a JSON array one at a time
+
+    The array is either the whole document or, for an object document, the
+    value under ``key`` (the first array-valued key when key is None), so
+    both plain exports and {"decisions": [...]} exports parse in memory
+    bounded by the largest single item.
+    """
+    parser = _JsonStream(stream, chunk_size)
+    first = parser.peek()
+
+    if first == '[':
+        yield from parser.array()
+        return
+
+    if first != '{':
+        raise ValueError(f"Expected a JSON array or object, found {first!r}")
+
+    parser.pos += 1
+    while parser.peek() not in ('}', ''):
+        name = parser.value()
+        parser.expect(':')
+        if (key is None or name == key) and parser.peek() == '[':
+            yield from parser.array()
+            return
+        parser.value()  # Not the array we want
+        if parser.peek() == ',':
+            parser.pos += 1
+
+
+# Archive restore
+
+class StreamingArchiveRestore:
+    """
+    Restore selected members of a zip archive without extracting it first
+
+    Each member is streamed in fixed-size chunks to a temporary file next to
+    its destination, hashed on the way, and renamed into place only when its
+    CRC (always) and SHA-256 (when a checksum manifest is given) match.
+    """
+
+    def __init__(self, archive_path: str, checksums: Optional[Dict[str, str]] = None, logger=None):
+        self.archive_path = archive_path
+        self.archive = zipfile.ZipFile(archive_path, 'r')
+        self.checksums = checksums or {}
+        self.logger = logger
+
+    def __enter__(self) -> 'StreamingArchiveRestore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.archive.close()
+
+    def names(self) -> List[str]:
+        return [info.filename for info in self.archive.infolist() if not info.is_dir()]
+
+    def select(self, patterns: Optional[Iterable[str]] = None,
+               exclude: Optional[Iterable[str]] = None) -> List[zipfile.ZipInfo]:
+        """File members matching the include globs and none of the exclude globs"""
+        patterns = list(patterns) if patterns is not None else None
+        exclude = list(exclude or [])
+        return [info for info in self.archive.infolist()
+                if not info.is_dir() and matches(info.filename, patterns)
+                and not (exclude and matches(info.filename, exclude))]
+
+    def read_json(self, name: str) -> Any:
+        """Load a small member such as backup metadata"""
+        with self.archive.open(name) as member:
+            return json.load(io.TextIOWrapper(member, encoding='utf-8'))
+
+    def iter_records(self, name: str, key: Optional[str] = None) -> Iterator[Any]:
+        """Stream the records of a JSON array member"""
+        with self.archive.open(name) as member:
+            yield from iter_json_array(io.TextIOWrapper(member, encoding='utf-8'), key=key)
+
+    def _stream_member(self, info: zipfile.ZipInfo, out) -> str:
+        """Copy a member to a binary file object (or nowhere) and return its SHA-256"""
+        digest = hashlib.sha256()
+        with self.archive.open(info) as member:
+            # ZipExtFile checks the CRC once the member is fully read
+            for chunk in iter(lambda: member.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                if out is not None:
+                    out.write(chunk)
+        checksum = digest.hexdigest()
+
+        expected = self.checksums.get(info.filename)
+        if expected and expected != checksum:
+            raise ChecksumMismatch(f"{info.filename}: expected {expected[:12]}, got {checksum[:12]}")
+        return checksum
+
+    def restore_member(self, info: zipfile.ZipInfo, destination: Path) -> str:
+        """Stream one member to destination atomically and return its SHA-256"""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f".{destination.name}.restore_tmp")
+        try:
+            with open(tmp_path, 'wb') as out:
+                checksum = self._stream_member(info, out)
+            os.replace(tmp_path, destination)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        modified = time.mktime(info.date_time + (0, 0, -1))
+        os.utime(destination, (modified, modified))
+        return checksum
+
+    def restore(self, target_dir: str, patterns: Optional[Iterable[str]] = None,
+                exclude: Optional[Iterable[str]] = None, strip_prefix: str = '',
+                dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Restore matching members under target_dir
+
+        Returns:
+            restored, skipped, failed, bytes, files and errors
+        """
+        stats = {'restored': 0, 'skipped': 0, 'failed': 0, 'bytes': 0, 'files': [], 'errors': []}
+        target = Path(target_dir)
+        selected = self.select(patterns, exclude)
+        stats['skipped'] = len(self.names()) - len(selected)
+
+        for info in selected:
+            relative = info.filename[len(strip_prefix):] if strip_prefix and \
+                info.filename.startswith(strip_prefix) else info.filename
+            parts = PurePosixPath(relative).parts
+            if not parts or PurePosixPath(relative).is_absolute() or '..' in parts:
+                stats['failed'] += 1
+                stats['errors'].append(f"Unsafe member path: {info.filename}")
+                continue
+
+            if dry_run:
+                stats['restored'] += 1
+                stats['bytes'] += info.file_size
+                stats['files'].append(relative)
+                continue
+
+            try:
+                self.restore_member(info, target.joinpath(*parts))
+                stats['restored'] += 1
+                stats['bytes'] += info.file_size
+                stats['files'].append(relative)
+            except (ChecksumMismatch, zipfile.BadZipFile, OSError) as e:
+                stats['failed'] += 1
+                stats['errors'].append(f"{info.filename}: {e}")
+                if self.logger:
+                    self.logger.error(f"❌ Failed to restore {info.filename}: {e}")
+
+        return stats
+
+    def verify(self, patterns: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Stream matching members through CRC and SHA-256 checks without writing them"""
+        result = {'verified': 0, 'failed': 0, 'missing': [], 'errors': []}
+        present = set(self.names())
+        result['missing'] = sorted(name for name in self.checksums
+                                   if name not in present and matches(name, patterns))
+
+        for info in self.select(patterns):
+            try:
+                self._stream_member(info, None)
+                result['verified'] += 1
+            except (ChecksumMismatch, zipfile.BadZipFile) as e:
+                result['failed'] += 1
+                result['errors'].append(str(e))
+
+        result['failed'] += len(result['missing'])
+        return result
@@ -0,0 +1,359 @@
+"""
+Low-overhead tracing spans
+perf_counter_ns timings, per-thread buffers and an asynchronous flusher
+"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+from utils.logger import setup_logger
+
+
+logger = setup_logger("tracing")
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BUFFER_SIZE = 10000
+
+# Innermost open span of the current thread or asyncio task: (name, depth)
+_current_span: contextvars.ContextVar = contextvars.ContextVar('angles_current_span', default=None)
+
+
+class Span(NamedTuple):
+    """One finished span"""
+    name: str
+    parent: Optional[str]
+    depth: int
+    timestamp: float          # Wall-clock start, epoch seconds
+    duration_ns: int
+    error: Optional[str]      # Exception class name if the span raised
+    memory_delta_bytes: Optional[int]  # Only for memory-sampled spans
+    thread: str
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def _rss_reader() -> Callable[[], int]:
+    """Cheapest available current-RSS reader (one Process object, reused)"""
+    if PSUTIL_AVAILABLE:
+        process = psutil.Process()
+        return lambda: process.memory_info().rss
+    if os.path.exists('/proc/self/statm'):
+        page_size = os.sysconf('SC_PAGE_SIZE')
+
+        def read_statm() -> int:
+            with open('/proc/self/statm', 'rb') as f:
+                return int(f.read().split()[1]) * page_size
+        return read_statm
+    return lambda: 0
+
+
+class Tracer:
+    """
+    Records timing spans with minimal work on the calling thread
+
+    A span costs two perf_counter_ns calls, a context variable swap and a
+    deque append to a buffer owned by the calling thread. A background
+    thread drains all buffers every ``flush_interval`` seconds and hands the
+    spans to every registered sink, so aggregation never runs inline. Spans nest through
+    a context variable, which also keeps asyncio tasks separate.
+
+    Memory is measured only for a sampled fraction of spans
+    (``memory_sample_rate``): RSS by default, or tracemalloc's traced size
+    when ``use_tracemalloc`` is set.
+    """
+
+    def __init__(self, sink: Optional[Callable[[List[Span]], None]] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 memory_sample_rate: float = 0.0, use_tracemalloc: bool = False, enabled: bool = True):
+        self.sinks: List[Callable[[List[Span]], None]] = [sink] if sink is not None else []
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.memory_sample_rate = memory_sample_rate
+        self.use_tracemalloc = use_tracemalloc
+        self.enabled = enabled
+
+        self.dropped = 0
+        self.flushed = 0
+        self._local = threading.local()
+        self._buffers: List[Tuple[threading.Thread, Deque[tuple]]] = []
+        self._buffers_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Wall time is derived from perf_counter so spans need no extra clock read
+        self._wall_offset = time.time() - time.perf_counter_ns() / 1e9
+        self._read_rss = _rss_reader()
+
+        if use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # Recording
+
+    def _buffer(self) -> Deque[tuple]:
+        try:
+            return self._local.buffer
+        except AttributeError:
+            buffer: Deque[tuple] = deque(maxlen=self.buffer_size)
+            self._local.buffer = buffer
+            with self._buffers_lock:
+                self._buffers.append((threading.current_thread(), buffer))
+                if self._thread is None and not self._stopped:
+                    self._thread = threading.Thread(target=self._flush_loop, name="tracer-flush", daemon=True)
+                    self._thread.start()
+            return buffer
+
+    def _memory(self) -> int:
+        if self.use_tracemalloc:
+            return tracemalloc.get_traced_memory()[0]
+        return self._read_rss()
+
+    def _start(self, name: str):
+        parent = _current_span.get()
+        depth = parent[1] + 1 if parent else 0
+        token = _current_span.set((name, depth))
+        memory = self._memory() if self.memory_sample_rate and random.random() < self.memory_sample_rate else None
+        return token, parent, depth, memory, time.perf_counter_ns()
+
+    def _finish(self, name: str, state, error: Optional[BaseException]):
+        end = time.perf_counter_ns()
+        token, parent, depth, memory, start = state
+        _current_span.reset(token)
+
+        buffer = self._buffer()
+        if len(buffer) == self.buffer_size:
+            self.dropped += 1
+        buffer.append((
+            name, parent[0] if parent else None, depth, start, end - start,
+            type(error).__name__ if error is not None else None,
+            self._memory() - memory if memory is not None else None
+        ))
+
+    def span(self, name: str) -> '_SpanContext':
+        """Context manager timing a block: ``with tracer.span("sync.fetch"):``"""
+        return _SpanContext(self, name)
+
+    def trace(self, name: Optional[str] = None):
+        """Decorator timing every call of a function or coroutine function"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    state = self._start(span_name)
+                    error = None
+                    try:
+                        return await func(*args, **kwargs)
+                    except BaseException as e:
+                        error = e
+                        raise
+                    finally:
+                        self._finish(span_name, state, error)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                state = self._start(span_name)
+                error = None
+                try:
+                    return func(*args, **kwargs)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    self._finish(span_name, state, error)
+            return wrapper
+        return decorator
+
+    # Flushing
+
+    def _drain(self) -> List[Span]:
+        spans: List[Span] = []
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+            # Forget buffers of finished threads once they are empty
+            self._buffers = [(thread, buffer) for thread, buffer in buffers if thread.is_alive() or buffer]
+
+        for thread, buffer in buffers:
+            thread_name = thread.name
+            while True:
+                try:
+                    name, parent, depth, start, duration, error, memory = buffer.popleft()
+                except IndexError:
+                    break
+                spans.append(Span(name, parent, depth, start / 1e9 + self._wall_offset,
+                                  duration, error, memory, thread_name))
+        return spans
+
+    def flush(self):
+        """Deliver all buffered spans to every sink now"""
+        with self._flush_lock:
+            spans = self._drain()
+            if not spans or not self.sinks:
+                return
+            for sink in self.sinks:
+                try:
+                    sink(spans)
+                except Exception as e:
+                    logger.error(f"❌ Trace sink failed for {len(spans)} spans: {e}")
+            self.flushed += len(spans)
+
+    def _flush_loop(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def add_sink(self, sink: Callable[[List[Span]], None]):
+        """Register another span consumer (existing sinks keep receiving spans)"""
+        with self._flush_lock:
+            if sink not in self.sinks:
+                self.sinks.append(sink)
+
+    def remove_sink(self, sink: Callable[[List[Span]], None]):
+        """Deliver pending spans, then unregister the sink and close it (if it has close())"""
+        self.flush()
+        with self._flush_lock:
+            if sink not in self.sinks:
+                return
+            self.sinks.remove(sink)
+        self._close_sink(sink)
+
+    @staticmethod
+    def _close_sink(sink: Callable[[List[Span]], None]):
+        close_sink = getattr(sink, 'close', None)
+        if close_sink is not None:
+            try:
+                close_sink()
+            except Exception as e:
+                logger.error(f"❌ Failed to close trace sink: {e}")
+
+    def shutdown(self):
+        """Stop the flusher, deliver remaining spans and close every sink (if it has close())"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._flush_lock:
+            sinks, self.sinks = self.sinks, []
+        for sink in sinks:
+            self._close_sink(sink)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._buffers_lock:
+            pending = sum(len(buffer) for _, buffer in self._buffers)
+        return {'enabled': self.enabled, 'pending': pending, 'flushed': self.flushed, 'dropped': self.dropped,
+                'memory_sample_rate': self.memory_sample_rate, 'tracemalloc': self.use_tracemalloc}
+
+
+class _SpanContext:
+    __slots__ = ('tracer', 'name', 'state')
+
+    def __init__(self, tracer: Tracer, name: str):
+        self.tracer = tracer
+        self.name = name
+        self.state = None
+
+    def __enter__(self):
+        if self.tracer.enabled:
+            self.state = self.tracer._start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.state is not None:
+            self.tracer._finish(self.name, self.state, exc_val)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return self.__exit__(exc_type, exc_val, exc_tb)
+
+
+def metrics_store_sink() -> Callable[[List[Span]], None]:
+    """Sink recording spans into the shared metrics store"""
+    from utils.metrics_store import open_metrics_store
+
+    store = None
+
+    def sink(spans: List[Span]):
+        nonlocal store
+        if store is None:
+            store = open_metrics_store()
+        for span in spans:
+            store.record_task(span.name, span.duration_ms, span.success,
+                              span.memory_delta_bytes or 0, timestamp=span.timestamp)
+
+    def close():
+        if store is not None:
+            store.close()
+
+    sink.close = close
+    return sink
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer
+
+    Configured from TRACING_ENABLED (true), TRACE_FLUSH_INTERVAL (1.0s),
+    TRACE_MEMORY_SAMPLE_RATE (0.01) and TRACE_TRACEMALLOC (false). Spans are
+    only kept by sinks registered with add_sink; when METRICS_STORE_PATH is
+    set they are also recorded into that metrics store.
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(
+                sink=metrics_store_sink() if os.getenv('METRICS_STORE_PATH') else None,
+                flush_interval=float(os.getenv('TRACE_FLUSH_INTERVAL', str(DEFAULT_FLUSH_INTERVAL))),
+                memory_sample_rate=float(os.getenv('TRACE_MEMORY_SAMPLE_RATE', '0.01')),
+                use_tracemalloc=os.getenv('TRACE_TRACEMALLOC', 'false').lower() == 'true',
+                enabled=os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+            )
+            atexit.register(_tracer.shutdown)
+        return _tracer
+
+
+def trace(name: Optional[str] = None):
+    """Decorator recording a span on the process-wide tracer"""
+    return get_tracer().trace(name)
+
+
+def span(name: str) -> _SpanContext:
+    """Context manager recording a span on the process-wide tracer"""
+    return get_tracer().span(name)